@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import admin, loja, jogador, login, torneio, tipoJogador, ranking, estoque, lojaJogadorLink, enums, categoria, conquista, composicao, temporada, pontuacaoExtra, evento, tenant, pdv
+from app.api.routes import admin, loja, jogador, login, torneio, tipoJogador, ranking, estoque, lojaJogadorLink, enums, categoria, conquista, composicao, temporada, pontuacaoExtra, evento, tenant, pdv, importacao
 from app.core.config import settings
 
 api_router = APIRouter(prefix=settings.API_PREFIX)
@@ -26,3 +26,4 @@ api_router.include_router(evento.router)
 api_router.include_router(admin.router)
 api_router.include_router(tenant.router)
 api_router.include_router(pdv.router)
+api_router.include_router(importacao.router)
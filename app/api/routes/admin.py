@@ -16,6 +16,8 @@ from app.services.AdminEntidadeService import (
     listar_entidades,
     listar_registros,
 )
+from app.services.RankingCacheService import estatisticas_cache_ranking
+from app.services.TorneioCacheService import estatisticas_cache_torneio
 from app.utils.Enums import StatusAprovacaoLoja
 from sqlmodel import select
 
@@ -55,6 +57,22 @@ def rejeitar_loja(loja_id: int, session: SessionDep, _: Annotated[TokenData, Dep
     return loja
 
 
+# ---------------------------------- Caches ----------------------------------
+
+@router.get("/cache/ranking")
+def get_estatisticas_cache_ranking(_: Annotated[TokenData, Depends(retornar_admin_atual)]):
+    """Acertos/faltas/despejos do cache do ranking geral deste processo (cada
+    worker tem o seu) — pra dimensionar RANKING_CACHE_TAMANHO."""
+    return estatisticas_cache_ranking()
+
+
+@router.get("/cache/torneios")
+def get_estatisticas_cache_torneio(_: Annotated[TokenData, Depends(retornar_admin_atual)]):
+    """O mesmo pro JSON de torneio completo em cache (ocupação em bytes) —
+    pra dimensionar TORNEIO_CACHE_BYTES."""
+    return estatisticas_cache_torneio()
+
+
 # ---------------------------------- CRUD Dinâmico de Entidades ----------------------------------
 
 @router.get("/entidades")
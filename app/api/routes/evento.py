@@ -26,6 +26,7 @@ from app.schemas.Evento import (
 )
 from app.schemas.JogadorCriado import JogadorCriadoPublico
 from app.services.EventoService import (
+    RELACOES_EVENTO,
     adicionar_participante,
     listar_jogadores_disponiveis,
     retornar_evento_completo,
@@ -33,11 +34,16 @@ from app.services.EventoService import (
     verificar_permissao_evento,
 )
 from app.models import ParticipanteEvento, PontosManualEvento
+from app.utils.RecorteCamposUtil import RecorteCampos, recorte_de_campos
 
 router = APIRouter(
     prefix="/lojas/eventos",
     tags=["Eventos"])
 
+# Rotas que respondem EventoPublico (sem metas, regras nem participantes)
+# não precisam carregar nem calcular nada além da loja.
+_RECORTE_EVENTO_PUBLICO = RecorteCampos(inclusoes={"loja"}, relacoes=RELACOES_EVENTO)
+
 
 def _buscar_evento_ou_404(session: SessionDep, evento_id: int) -> Evento:
     evento = session.get(Evento, evento_id)
@@ -52,7 +58,7 @@ def criar_evento(session: SessionDep, evento: EventoCriarDTO, loja: Annotated[To
     session.add(novo_evento)
     session.commit()
     session.refresh(novo_evento)
-    return retornar_evento_completo(session, novo_evento)
+    return retornar_evento_completo(session, novo_evento, _RECORTE_EVENTO_PUBLICO)
 
 
 @router.post("/organizador", response_model=EventoPublico)
@@ -84,7 +90,7 @@ def criar_evento_organizador(
     session.add(novo_evento)
     session.commit()
     session.refresh(novo_evento)
-    return retornar_evento_completo(session, novo_evento)
+    return retornar_evento_completo(session, novo_evento, _RECORTE_EVENTO_PUBLICO)
 
 
 @router.get("/", response_model=list[EventoPublico])
@@ -102,7 +108,7 @@ def get_eventos(
     if tcg:
         query = query.where(Evento.tcg == tcg)
     eventos = session.exec(query).all()
-    return [retornar_evento_completo(session, evento) for evento in eventos]
+    return [retornar_evento_completo(session, evento, _RECORTE_EVENTO_PUBLICO) for evento in eventos]
 
 
 @router.get("/loja", response_model=list[EventoPublico])
@@ -111,7 +117,7 @@ def get_eventos_da_loja(session: SessionDep, loja: Annotated[TokenData, Depends(
     if tcg:
         query = query.where(Evento.tcg == tcg)
     eventos = session.exec(query).all()
-    return [retornar_evento_completo(session, evento) for evento in eventos]
+    return [retornar_evento_completo(session, evento, _RECORTE_EVENTO_PUBLICO) for evento in eventos]
 
 
 @router.get("/{evento_id}", response_model=EventoCompletoPublico)
@@ -120,9 +126,10 @@ def get_evento(
     evento_id: int,
     _: Annotated[TokenData, Depends(retornar_usuario_atual)],
     _leitura_publica: Annotated[None, Depends(permitir_leitura_publica)],
+    recorte: Annotated[RecorteCampos, Depends(recorte_de_campos(EventoCompletoPublico, RELACOES_EVENTO))],
 ):
     evento = _buscar_evento_ou_404(session, evento_id)
-    return retornar_evento_completo(session, evento)
+    return recorte.responder(EventoCompletoPublico, retornar_evento_completo(session, evento, recorte))
 
 
 @router.put("/{evento_id}", response_model=EventoPublico)
@@ -140,7 +147,7 @@ def atualizar_evento(
     session.add(evento)
     session.commit()
     session.refresh(evento)
-    return retornar_evento_completo(session, evento)
+    return retornar_evento_completo(session, evento, _RECORTE_EVENTO_PUBLICO)
 
 
 @router.delete("/{evento_id}", status_code=204)
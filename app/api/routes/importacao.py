@@ -0,0 +1,30 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, UploadFile
+
+from app.core.db import SessionDep
+from app.core.exception import TopDeckedException
+from app.core.security import TokenData
+from app.dependencies import retornar_loja_atual
+from app.models import ImportacaoJob
+from app.schemas.Importacao import ImportacaoJobPublico
+from app.services.ImportacaoJobService import criar_job_importacao
+
+router = APIRouter(
+    prefix="/importacoes",
+    tags=["Importações"])
+
+
+@router.post("/", response_model=ImportacaoJobPublico, status_code=202)
+def enviar_importacao(session: SessionDep, arquivo: UploadFile, loja: Annotated[TokenData, Depends(retornar_loja_atual)]):
+    """Mesmo .tdf de POST /lojas/torneios/importar, importado em segundo
+    plano — acompanhe por GET /importacoes/{id}."""
+    return criar_job_importacao(session, arquivo.filename or "arquivo.tdf", arquivo.file.read(), loja.id)
+
+
+@router.get("/{job_id}", response_model=ImportacaoJobPublico)
+def retornar_importacao(session: SessionDep, job_id: str, loja: Annotated[TokenData, Depends(retornar_loja_atual)]):
+    job = session.get(ImportacaoJob, job_id)
+    if not job or job.loja_id != loja.id:
+        raise TopDeckedException.not_found("Importação não encontrada")
+    return job
@@ -12,6 +12,7 @@ from app.utils.Enums import TCG
 from app.services.UsuarioService import verificar_novo_usuario
 from app.services.JogadorService import vincular_historico_e_creditos, calcular_estatisticas, retornar_historico_jogador, retornar_todas_rodadas, contar_impacto_troca_gameid, apagar_jogador_completo
 from app.services.ConquistaService import recalcular_conquistas_jogador
+from app.services.RankingCacheService import invalidar_todo_ranking_apos_commit
 from app.utils.datetimeUtil import data_agora_brasil
 from app.services.EmailService import processar_ativacao_usuario
 from app.dependencies import retornar_jogador_atual, retornar_loja_atual, contexto_dominio, permitir_leitura_publica
@@ -237,7 +238,12 @@ def get_jogadores(
 @router.put("/", response_model=JogadorPublico)
 def update_jogador(novo: JogadorUpdate,
                    session: SessionDep,
-                   token_data: Annotated[TokenData, Depends(retornar_jogador_atual)]):
+                   token_data: Annotated[TokenData, Depends(retornar_jogador_atual)],
+                   _leitura_publica: Annotated[None, Depends(permitir_leitura_publica)]):
+    # permitir_leitura_publica: vincular um GameID refaz as estatísticas
+    # mensais da conta a partir dos torneios de TODAS as lojas (ver
+    # vincular_historico_e_creditos) — sem o bypass, a policy de RLS
+    # esconderia esses torneios e a conta ficaria sem histórico.
 
     jogador = session.get(Jogador, token_data.id)
 
@@ -258,6 +264,8 @@ def update_jogador(novo: JogadorUpdate,
     jogador_data = novo.model_dump(exclude_unset=True, exclude={"senha", "email"})
     jogador.sqlmodel_update(jogador_data)
     session.add(jogador)
+    if "nome" in jogador_data:
+        invalidar_todo_ranking_apos_commit(session)
     session.commit()
     session.refresh(jogador)
 
@@ -1,7 +1,16 @@
 from fastapi import APIRouter, Query, Depends
 from app.core.db import SessionDep
+from app.core.exception import TopDeckedException
 from app.schemas.Ranking import Ranking, RankingPorLoja, RankingPorFormato
-from app.services.RankingService import calcula_ranking_geral, calcula_ranking_geral_por_loja, desempenho_por_formato
+from app.services.RankingService import (
+    calcula_ranking_geral_em_cache,
+    calcula_ranking_geral_por_loja,
+    desempenho_por_formato,
+    pagina_ranking_geral,
+    pagina_ranking_por_loja,
+    ranking_geral_em_torno,
+    ranking_por_loja_em_torno,
+)
 from typing import Annotated
 from app.core.security import TokenData
 from app.dependencies import retornar_jogador_atual, permitir_leitura_publica
@@ -17,9 +26,45 @@ router = APIRouter(
 # jogadortorneiolink/rodada/torneio ficaria fail-closed aqui (ver
 # dependencies.py:permitir_leitura_publica).
 
+# Três formas de recortar o ranking, que não se combinam:
+# - `top=N`: as N primeiras entradas;
+# - `limite=N` (+ cursor `apos_*` da última entrada da página anterior):
+#   paginação por keyset — a próxima página continua do cursor, sem OFFSET;
+# - `em_torno_de=<jogador_id>` (+ `janela`): a entrada do jogador e as
+#   `janela` entradas acima e abaixo dela.
+# Sem nenhum deles, o ranking vem inteiro, como sempre veio.
+
+
+def _validar_recorte(top, limite, cursor: tuple, em_torno_de) -> None:
+    if any(valor is not None for valor in cursor) and None in cursor:
+        raise TopDeckedException.bad_request("Cursor incompleto: informe todos os campos 'apos_*'.")
+    if cursor[0] is not None and limite is None:
+        raise TopDeckedException.bad_request("Cursor 'apos_*' exige 'limite'.")
+    if sum(valor is not None for valor in (top, limite, em_torno_de)) > 1:
+        raise TopDeckedException.bad_request("Use apenas um entre 'top', 'limite' e 'em_torno_de'.")
+
+
 @router.get("/geral", response_model=list[Ranking])
-def get_ranking_geral(session: SessionDep, _leitura_publica: Annotated[None, Depends(permitir_leitura_publica)]):
-    ranking = calcula_ranking_geral(session)
+def get_ranking_geral(
+    session: SessionDep,
+    _leitura_publica: Annotated[None, Depends(permitir_leitura_publica)],
+    top: Annotated[int | None, Query(ge=1, le=500)] = None,
+    limite: Annotated[int | None, Query(ge=1, le=500)] = None,
+    apos_pontos: int | None = None,
+    apos_jogador_criado_id: int | None = None,
+    em_torno_de: int | None = None,
+    janela: Annotated[int, Query(ge=0, le=50)] = 10,
+):
+    cursor = (apos_pontos, apos_jogador_criado_id)
+    _validar_recorte(top, limite, cursor, em_torno_de)
+
+    if em_torno_de is not None:
+        return ranking_geral_em_torno(session, em_torno_de, janela)
+    if top is not None or limite is not None:
+        return pagina_ranking_geral(
+            session, top or limite, apos=cursor if apos_pontos is not None else None)
+
+    ranking = calcula_ranking_geral_em_cache(session)
     return ranking
 
 @router.get("/lojas", response_model=list[RankingPorLoja])
@@ -27,7 +72,23 @@ def get_ranking_geral_por_loja(
     session: SessionDep,
     _leitura_publica: Annotated[None, Depends(permitir_leitura_publica)],
     mes: Annotated[int | None, Query(ge=1, le=12)] = None,
+    top: Annotated[int | None, Query(ge=1, le=500)] = None,
+    limite: Annotated[int | None, Query(ge=1, le=500)] = None,
+    apos_pontos: int | None = None,
+    apos_loja_id: int | None = None,
+    apos_jogador_criado_id: int | None = None,
+    em_torno_de: int | None = None,
+    janela: Annotated[int, Query(ge=0, le=50)] = 10,
 ):
+    cursor = (apos_pontos, apos_loja_id, apos_jogador_criado_id)
+    _validar_recorte(top, limite, cursor, em_torno_de)
+
+    if em_torno_de is not None:
+        return ranking_por_loja_em_torno(session, em_torno_de, janela, mes)
+    if top is not None or limite is not None:
+        return pagina_ranking_por_loja(
+            session, top or limite, apos=cursor if apos_pontos is not None else None, mes=mes)
+
     ranking = calcula_ranking_geral_por_loja(session, mes)
     return ranking
 
@@ -39,4 +100,4 @@ def get_desempenho_por_formato(
 ):
     jogador = session.get(Jogador, usuario.id)
     desempenho = desempenho_por_formato(session,jogador)
-    return desempenho
\ No newline at end of file
+    return desempenho
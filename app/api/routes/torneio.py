@@ -1,9 +1,15 @@
-from fastapi import APIRouter, UploadFile, Depends, Body
+import asyncio
+import zipfile
+from datetime import date
+from fastapi import APIRouter, UploadFile, Depends, Body, Query, Request, Response, WebSocket, WebSocketException, status
 from typing import Annotated
-from app.services.TorneioService import retornar_torneio_completo, retornar_link_completo, editar_torneio_regras, regras_extras_atuais, calcular_pontuacao, calcular_pontuacao_rodada, get_torneio_top, verificar_permissao_gerenciar_torneio, adicionar_juiz, remover_juiz, salvar_link_ou_conflito, apagar_torneio_completo
-from app.services.ImportacaoService import importar_torneio
+from app.services.TorneioService import retornar_torneio_completo, retornar_link_completo, editar_torneio_regras, regras_extras_atuais, calcular_pontuacao, repontuar_resultados, resultado_rodada, finalizar_resultados, get_torneio_top, verificar_permissao_gerenciar_torneio, adicionar_juiz, remover_juiz, salvar_link_ou_conflito, apagar_torneio_completo, listar_torneios_resumidos, RELACOES_TORNEIO
+from app.services.ImportacaoService import arquivos_do_upload, importar_torneio, importar_torneios_em_lote
 from app.services.RodadaService import nova_rodada
+from app.services.TorneioCacheService import torneio_completo_json, versao_publicada
+from app.services.TorneioAoVivoService import canal_torneios, diferenca_placar, mesa_ao_vivo, placar, publicar_apos_commit
 from app.services.ConquistaService import recalcular_conquistas_jogador
+from app.services.RankingService import atualizar_ranking_snapshot, atualizar_ranking_snapshot_torneio, jogadores_criados_do_torneio
 from app.services.ComposicaoService import (
     JOGOS_COM_REPRESENTACAO_DECK,
     JOGOS_COM_COMPOSICAO_POR_PARTIDA,
@@ -15,19 +21,23 @@ from app.services.PontuacaoExtraService import (
     listar_jogadores_disponiveis,
     listar_organizadores_disponiveis_para_juiz,
 )
-from app.schemas.Torneio import TorneioPublico, TorneioAtualizar, CriarTorneioOrganizadorDTO
+from app.schemas.Torneio import TorneioPublico, TorneioResumo, TorneioAtualizar, CriarTorneioOrganizadorDTO
 from app.schemas.JogadorTorneioLink import JogadorTorneioLinkPublico, PontuacaoManualDTO, RegraJogadorDTO, AdicionarJuizDTO
 from app.schemas.Composicao import JogadorComposicaoDTO, ComposicaoPartidaPublico, ComposicaoPartidaAtualizarDTO
 from app.schemas.Rodada import RodadaResultadoDTO, RodadaEditarDTO
 from app.schemas.PontuacaoExtra import PontuacaoExtraCriarDTO, PontuacaoExtraPublico
 from app.schemas.JogadorCriado import JogadorCriadoPublico
+from app.schemas.Importacao import ResultadoImportacaoArquivo
 from app.models import TipoJogador, Loja, LojaJogadorLink, LojaJogadorOrganizadorTCG, Torneio, TorneioBase, JogadorTorneioLink, Jogador, StatusTorneio, Rodada, JogadorCriado, PontuacaoExtra, RepresentacaoComposicao, UnidadeCatalogo, JogadorComposicaoUnidade, RodadaComposicao, ComposicaoPartidaUnidade
 from app.utils.Enums import TCG, MotivoPontuacaoExtra, TipoParticipanteTorneio
 from app.utils.datetimeUtil import agora_brasil
+from app.utils.EtagUtil import etag_confere, gerar_etag
+from app.utils.RecorteCamposUtil import RecorteCampos, recorte_de_campos
+from app.core.config import settings
 from app.core.db import SessionDep
 from app.core.exception import TopDeckedException
 from app.core.security import TokenData
-from app.dependencies import retornar_loja_atual, retornar_jogador_atual, retornar_usuario_atual, contexto_dominio, permitir_leitura_publica, definir_tenant_sessao
+from app.dependencies import retornar_loja_atual, retornar_jogador_atual, retornar_usuario_atual, retornar_usuario_websocket, contexto_dominio, permitir_leitura_publica, definir_tenant_sessao
 from sqlmodel import select
 from sqlalchemy import func
 from typing import Dict
@@ -37,6 +47,22 @@ router = APIRouter(
     prefix="/lojas/torneios",
     tags=["Torneios"])
 
+# As listagens (GET / e GET /loja) devolvem o torneio em modo resumo
+# (TorneioResumo), mais recentes primeiro, filtráveis por status e por
+# intervalo da data efetiva. Com `limite`, vêm paginadas por keyset: o
+# cursor `apos_data` + `apos_id` é a data efetiva e o id do último torneio
+# da página anterior. Sem `limite`, a lista vem inteira.
+
+
+def _validar_cursor_listagem(limite, apos_data, apos_id) -> tuple[date, str] | None:
+    if (apos_data is None) != (apos_id is None):
+        raise TopDeckedException.bad_request("Cursor incompleto: informe 'apos_data' e 'apos_id'.")
+    if apos_data is None:
+        return None
+    if limite is None:
+        raise TopDeckedException.bad_request("Cursor 'apos_*' exige 'limite'.")
+    return apos_data, apos_id
+
 
 @router.post("/criar", response_model=TorneioPublico)
 def criar_torneio(session: SessionDep, torneio: TorneioBase, loja: Annotated[TokenData, Depends(retornar_loja_atual)]):
@@ -206,35 +232,15 @@ def finalizar_varias_rodadas(
     resultados: list[RodadaResultadoDTO],
     session: SessionDep
 ):
-    for item in resultados:
-        rodada_id = item.id_rodada
-        vencedor_id = item.id_vencedor
-
-        rodada = session.get(Rodada, rodada_id)
-        if not rodada:
-            raise TopDeckedException.not_found(
-                f"Rodada {rodada_id} não encontrada")
-
-        if rodada.finalizada:
-            raise TopDeckedException.bad_request(
-                f"Rodada {rodada_id} já finalizada")
-
-        torneio = session.get(Torneio, rodada.torneio_id)
-        if not torneio:
-            raise TopDeckedException.not_found("Torneio não encontrado")
-
-        if vencedor_id is not None and vencedor_id not in [rodada.jogador1_id, rodada.jogador2_id]:
-            raise TopDeckedException.bad_request(
-                f"Jogador {vencedor_id} não pertence à rodada {rodada_id}"
-            )
-
-        rodada.vencedor_id = vencedor_id
-        rodada.finalizada = True
-        calcular_pontuacao_rodada(session, rodada, torneio.regra_basica)
-        session.add(rodada)
-
+    torneios_alterados, participantes = finalizar_resultados(
+        session, [(item.id_rodada, item.id_vencedor) for item in resultados])
+
+    for torneio_alterado in torneios_alterados:
+        atualizar_ranking_snapshot_torneio(session, torneio_alterado)
+    # Classificação montada das mesmas participações já pontuadas em
+    # memória — antes do commit, que as expiraria e forçaria relê-las.
+    top_ranking = get_torneio_top(participantes)
     session.commit()
-    top_ranking = get_torneio_top(session, torneio.id)
 
     return {"ranking": top_ranking}
 
@@ -248,13 +254,41 @@ def importar_torneios(session: SessionDep, arquivo: UploadFile, loja: Annotated[
     return torneio_completo
 
 
-@router.get("/loja", response_model=list[TorneioPublico])
-def get_loja_torneios(session: SessionDep, loja: Annotated[TokenData, Depends(retornar_loja_atual)]):
-    torneios = session.exec(select(Torneio).where(
-        Torneio.loja_id == loja.id
-    )).all()
+@router.post("/importar-lote", response_model=list[ResultadoImportacaoArquivo])
+def importar_torneios_lote(session: SessionDep, arquivos: list[UploadFile], loja: Annotated[TokenData, Depends(retornar_loja_atual)]):
+    """Vários .tdf de uma vez (ou .zip com eles). Um arquivo recusado não
+    impede os outros: o resultado diz, arquivo a arquivo e na ordem do
+    envio, o que foi importado, o que já existia e o que falhou e por quê."""
+    tdfs = []
+    for arquivo in arquivos:
+        # Compactado ou não, nenhum arquivo do envio passa do total permitido.
+        conteudo = arquivo.file.read(settings.IMPORTACAO_LOTE_MAX_BYTES + 1)
+        if len(conteudo) > settings.IMPORTACAO_LOTE_MAX_BYTES:
+            raise TopDeckedException.bad_request(f"Arquivo grande demais: {arquivo.filename}")
+        try:
+            tdfs.extend(arquivos_do_upload(arquivo.filename or "arquivo.tdf", conteudo, tdfs))
+        except zipfile.BadZipFile:
+            raise TopDeckedException.bad_request(f"Arquivo .zip inválido: {arquivo.filename}")
 
-    return [retornar_torneio_completo(session, torneio) for torneio in torneios]
+    return importar_torneios_em_lote(session, tdfs, loja.id)
+
+
+@router.get("/loja", response_model=list[TorneioResumo])
+def get_loja_torneios(
+    session: SessionDep,
+    loja: Annotated[TokenData, Depends(retornar_loja_atual)],
+    status: StatusTorneio | None = None,
+    data_inicio: date | None = None,
+    data_fim: date | None = None,
+    limite: Annotated[int | None, Query(ge=1, le=500)] = None,
+    apos_data: date | None = None,
+    apos_id: str | None = None,
+):
+    cursor = _validar_cursor_listagem(limite, apos_data, apos_id)
+    return listar_torneios_resumidos(
+        session, loja_id=loja.id, status=status, data_inicio=data_inicio, data_fim=data_fim,
+        limite=limite, apos=cursor,
+    )
 
 
 @router.post("/{torneio_id}/importar", response_model=TorneioPublico)
@@ -267,9 +301,20 @@ def reimportar_torneio(session: SessionDep, arquivo: UploadFile, torneio_id: str
     verificar_permissao_gerenciar_torneio(session, torneio, usuario)
 
     loja_id = torneio.loja_id
+    jogadores_criados_anteriores = jogadores_criados_do_torneio(session, torneio_id)
 
     session.delete(torneio)
+    # O DELETE vai pro banco antes do INSERT do torneio novo (mesmo id), mas
+    # na mesma transação da importação — se o arquivo novo falhar, o antigo
+    # continua lá.
+    session.flush()
+    # Mesmo id (vem do arquivo), torneio novo: começa numa versão depois da
+    # do apagado (ver TorneioApagado), não na 1.
     torneio = importar_torneio(session, arquivo, loja_id)
+    # importar_torneio já atualiza o snapshot de quem está no arquivo novo;
+    # quem só estava no torneio antigo perdeu aqueles pontos.
+    atualizar_ranking_snapshot(session, loja_id, jogadores_criados_anteriores)
+    session.commit()
     session.refresh(torneio)
 
     torneio_completo = retornar_torneio_completo(session, torneio)
@@ -305,6 +350,8 @@ def iniciar_torneio(session: SessionDep, torneio_id: str,
 
     torneio.status = StatusTorneio.EM_ANDAMENTO
     session.add(torneio)
+    publicar_apos_commit(session, torneio_id, "status", status=torneio.status)
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(torneio)
 
@@ -332,6 +379,8 @@ def finalizar_torneio(session: SessionDep, torneio_id: str, loja: Annotated[Toke
     if not torneio.fim_real:
         torneio.fim_real = agora_brasil()
     session.add(torneio)
+    publicar_apos_commit(session, torneio_id, "status", status=torneio.status)
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(torneio)
 
@@ -395,6 +444,7 @@ def editar_rodada(session: SessionDep,
         raise TopDeckedException.not_found("Rodada não encontrada neste torneio")
 
     dados_informados = dados.model_dump(exclude_unset=True)
+    resultado_anterior = resultado_rodada(rodada)
 
     def _validar_link_do_torneio(link_id: int | None) -> None:
         if link_id is None:
@@ -445,15 +495,15 @@ def editar_rodada(session: SessionDep,
     session.flush()
 
     # calcular_pontuacao_rodada soma pontuação incrementalmente — chamar de
-    # novo sem resetar dobraria os pontos. Recalcula tudo do zero (mesmo
-    # mecanismo de recalcular_pontuacao_torneio), preservando regras extras
-    # já atribuídas por jogador.
-    if torneio.regra_basica_id:
-        torneio = editar_torneio_regras(
-            session, torneio, torneio.regra_basica_id, regras_extras_atuais(torneio))
-        session.add(torneio)
-        calcular_pontuacao(session, torneio)
-
+    # novo dobraria os pontos. Desfaz o que o resultado antigo da mesa tinha
+    # dado e soma o novo, só pros lados envolvidos (ver
+    # TorneioService.repontuar_resultados).
+    placar_anterior = placar(torneio.jogadores)
+    repontuar_resultados(session, torneio, [(resultado_anterior, resultado_rodada(rodada))])
+    publicar_apos_commit(session, torneio_id, "resultados", mesas=[mesa_ao_vivo(rodada)],
+                         jogadores=diferenca_placar(placar_anterior, torneio.jogadores))
+
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(torneio)
     return retornar_torneio_completo(session, torneio)
@@ -489,6 +539,7 @@ def deletar_rodada(session: SessionDep,
         )
     ).all()
 
+    resultados_apagados = [resultado_rodada(mesa) for mesa in mesas]
     for mesa in mesas:
         rodada_composicoes = session.exec(
             select(RodadaComposicao).where(RodadaComposicao.rodada_id == mesa.id)
@@ -497,7 +548,7 @@ def deletar_rodada(session: SessionDep,
             composicao_partida = rodada_composicao.composicao_partida
             session.delete(rodada_composicao)
             # Pokémon GO clona uma ComposicaoPartida nova a cada rodada (ver
-            # ComposicaoService.garantir_composicao_partida) — TCG/VGC
+            # ComposicaoService.garantir_composicoes_partida) — TCG/VGC
             # reaproveitam a mesma entre rodadas, então só apagamos aqui
             # quando ela é exclusiva desta rodada (GO); senão destruiríamos a
             # composição de rodadas anteriores que ainda a referenciam.
@@ -509,15 +560,15 @@ def deletar_rodada(session: SessionDep,
     session.add(torneio)
     session.flush()
 
-    # Mesma lógica de recomputo do zero usada em editar_rodada — sem ela, os
-    # pontos que a rodada apagada já tivesse distribuído ficariam presos em
+    # Mesma repontuação incremental de editar_rodada — sem ela, os pontos que
+    # a rodada apagada já tivesse distribuído ficariam presos em
     # pontuacao/pontuacao_com_regras mesmo sem a Rodada existir mais.
-    if torneio.regra_basica_id:
-        torneio = editar_torneio_regras(
-            session, torneio, torneio.regra_basica_id, regras_extras_atuais(torneio))
-        session.add(torneio)
-        calcular_pontuacao(session, torneio)
+    placar_anterior = placar(torneio.jogadores)
+    repontuar_resultados(session, torneio, [(resultado, None) for resultado in resultados_apagados])
+    publicar_apos_commit(session, torneio_id, "rodada_apagada", num_rodada=num_rodada,
+                         jogadores=diferenca_placar(placar_anterior, torneio.jogadores))
 
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(torneio)
     return retornar_torneio_completo(session, torneio)
@@ -558,6 +609,7 @@ def editar_torneio(session: SessionDep,
         session.add(torneio)
         calcular_pontuacao(session, torneio)
 
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(torneio)
     return retornar_torneio_completo(session, torneio)
@@ -584,6 +636,7 @@ def atualizar_pontuacao_manual(session: SessionDep,
     link.pontuacao = dados.pontuacao
     link.pontuacao_com_regras = dados.pontuacao_com_regras
     session.add(link)
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(link)
 
@@ -636,6 +689,7 @@ def atualizar_regra_jogador(session: SessionDep,
     torneio = editar_torneio_regras(session, torneio, torneio.regra_basica_id, regras_adicionais)
     session.add(torneio)
     calcular_pontuacao(session, torneio)
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(torneio)
 
@@ -955,6 +1009,7 @@ def recalcular_pontuacao_torneio(session: SessionDep,
     torneio.regra_basica_id = regra_a_usar
     session.add(torneio)
     calcular_pontuacao(session, torneio)
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(torneio)
 
@@ -971,33 +1026,42 @@ def deletar_torneio(session: SessionDep,
 
     verificar_permissao_gerenciar_torneio(session, torneio, usuario)
 
+    loja_id = torneio.loja_id
+    jogadores_criados = jogadores_criados_do_torneio(session, torneio_id)
     apagar_torneio_completo(session, torneio_id)
+    atualizar_ranking_snapshot(session, loja_id, jogadores_criados)
     session.commit()
 
 
-@router.get("/", response_model=list[TorneioPublico])
+@router.get("/", response_model=list[TorneioResumo])
 def get_torneios(
     session: SessionDep,
     _leitura_publica: Annotated[None, Depends(permitir_leitura_publica)],
     loja_id: Annotated[int | None, Depends(contexto_dominio)] = None,
     tcg: str | None = None,
+    status: StatusTorneio | None = None,
+    data_inicio: date | None = None,
+    data_fim: date | None = None,
+    limite: Annotated[int | None, Query(ge=1, le=500)] = None,
+    apos_data: date | None = None,
+    apos_id: str | None = None,
 ):
-    query = select(Torneio)
-    if loja_id is not None:
-        query = query.where(Torneio.loja_id == loja_id)
-    if tcg is not None:
-        query = query.where(Torneio.jogo == tcg)
-
-    torneios = session.exec(query)
-    return [retornar_torneio_completo(session, torneio) for torneio in torneios]
+    cursor = _validar_cursor_listagem(limite, apos_data, apos_id)
+    return listar_torneios_resumidos(
+        session, loja_id=loja_id, tcg=tcg, status=status, data_inicio=data_inicio, data_fim=data_fim,
+        limite=limite, apos=cursor,
+    )
 
 
-@router.get("/{torneio_id}", response_model=TorneioPublico)
+@router.get("/{torneio_id}", response_model=TorneioPublico,
+            responses={304: {"description": "Torneio não mudou desde o ETag enviado em If-None-Match"}})
 def get_torneio_por_loja(
     torneio_id: str,
     session: SessionDep,
+    request: Request,
     _: Annotated[TokenData, Depends(retornar_usuario_atual)],
     _leitura_publica: Annotated[None, Depends(permitir_leitura_publica)],
+    recorte: Annotated[RecorteCampos, Depends(recorte_de_campos(TorneioPublico, RELACOES_TORNEIO))],
 ):
     torneio = session.exec(select(Torneio).where(
         Torneio.id == torneio_id,
@@ -1006,7 +1070,56 @@ def get_torneio_por_loja(
     if not torneio:
         raise TopDeckedException.not_found("Torneio não encontrado.")
 
-    return retornar_torneio_completo(session, torneio)
+    # O ETag sai da versão do torneio e dos participantes (ver
+    # versao_publicada): se o cliente já tem essa versão, responde 304 sem
+    # carregar participações nem rodadas.
+    versao = versao_publicada(session, torneio)
+    cabecalhos = {"ETag": gerar_etag(torneio.id, versao, recorte.chave), "Cache-Control": "private, no-cache"}
+    if etag_confere(request.headers.get("if-none-match"), cabecalhos["ETag"]):
+        return Response(status_code=304, headers=cabecalhos)
+
+    # JSON pronto por (torneio, versão, recorte) — ver TorneioCacheService.
+    return Response(torneio_completo_json(session, torneio, versao, recorte), media_type="application/json",
+                    headers=cabecalhos)
+
+
+@router.websocket("/{torneio_id}/ao-vivo")
+async def acompanhar_torneio_ao_vivo(
+    websocket: WebSocket,
+    torneio_id: str,
+    session: SessionDep,
+    _: Annotated[TokenData, Depends(retornar_usuario_websocket)],
+    _leitura_publica: Annotated[None, Depends(permitir_leitura_publica)],
+):
+    """Canal de atualizações de um torneio. O cliente carrega o torneio uma
+    vez por GET /{torneio_id} e depois só aplica o que chega aqui: "rodada"
+    (mesas novas), "resultados" (mesas alteradas e só os campos de
+    classificação que mudaram em cada participação), "rodada_apagada" e
+    "status". "ressincronizar" avisa que algum evento se perdeu e que o
+    torneio precisa ser relido. O que o cliente mandar é ignorado."""
+    torneio_existe = session.exec(select(Torneio.id).where(Torneio.id == torneio_id)).first()
+    # O socket fica aberto pelo evento inteiro; não precisa segurar uma
+    # conexão do banco esse tempo todo.
+    session.rollback()
+    if not torneio_existe:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Torneio não encontrado.")
+
+    inscricao = canal_torneios.inscrever(torneio_id)
+    try:
+        await websocket.accept()
+
+        async def _enviar():
+            while True:
+                await websocket.send_text(await inscricao.fila.get())
+
+        envio = asyncio.create_task(_enviar())
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            envio.cancel()
+    finally:
+        canal_torneios.cancelar(inscricao)
 
 
 @router.post("/{torneio_id}/inscricao", response_model=JogadorTorneioLinkPublico)
@@ -1056,6 +1169,7 @@ def inscrever_jogador(session: SessionDep, torneio_id: str, token_data: Annotate
     )
 
     salvar_link_ou_conflito(session, inscricao, "Inscrição já realizada")
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(inscricao)
 
@@ -1096,4 +1210,5 @@ def desinscrever_jogador(session: SessionDep, torneio_id: str, token_data: Annot
         return
 
     session.delete(inscricao)
+    atualizar_ranking_snapshot_torneio(session, torneio, [inscricao.jogador_criado_id])
     session.commit()
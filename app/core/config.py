@@ -28,6 +28,48 @@ class Settings(BaseSettings):
 
     ROOT_DOMAIN: str = "brickei.com.br"
 
+    # Quantas combinações de filtro (mes, ano, loja, tcg) do ranking geral
+    # ficam em cache por processo (ver RankingCacheService). 0 desliga.
+    RANKING_CACHE_TAMANHO: int = 256
+
+    # Tempo máximo (segundos) que o pareamento suíço passa procurando uma
+    # rodada sem revanches antes de cair no guloso (ver PareamentoUtil).
+    PAREAMENTO_ORCAMENTO_SEGUNDOS: float = 2.0
+
+    # Editar/apagar mesas repontua só os dois lados afetados; ligado, o
+    # resultado é conferido contra um recálculo completo em memória e, se
+    # divergir, o recálculo completo vale (ver TorneioService.repontuar_resultados).
+    PONTUACAO_CONFERIR_INCREMENTAL: bool = True
+
+    # Quantas mensagens um socket de torneio ao vivo pode acumular sem ler
+    # antes de ser mandado reler o torneio inteiro (ver TorneioAoVivoService).
+    AO_VIVO_FILA_TAMANHO: int = 64
+
+    # Bytes de JSON de torneio completo já serializado que cada processo
+    # guarda em memória (ver TorneioCacheService). 0 desliga.
+    TORNEIO_CACHE_BYTES: int = 64 * 1024 * 1024
+    # Diretório onde o JSON de torneios finalizados também é gravado, pra
+    # sobreviver a reinícios e ser dividido entre workers. Vazio desliga.
+    TORNEIO_CACHE_DIRETORIO: str = ""
+
+    # Importação em lote (ver ImportacaoService.importar_torneios_em_lote):
+    # processos que leem os .tdf em paralelo (1 lê na própria requisição),
+    # quantos torneios vão por transação e quantos arquivos um envio aceita
+    # — e quantos bytes, por .tdf e no envio todo depois de descompactado
+    # (um .zip pequeno pode expandir pra muito mais que isso).
+    IMPORTACAO_PROCESSOS: int = 4
+    IMPORTACAO_LOTE_TAMANHO: int = 20
+    IMPORTACAO_LOTE_MAX_ARQUIVOS: int = 200
+    IMPORTACAO_TDF_MAX_BYTES: int = 5 * 1024 * 1024
+    IMPORTACAO_LOTE_MAX_BYTES: int = 100 * 1024 * 1024
+    # Importação em segundo plano (ver ImportacaoJobService): threads que
+    # processam os jobs e quantos jobs podem esperar na fila do processo —
+    # com a fila cheia, o envio é recusado com 503. Job em processamento há
+    # mais que o limite quando o servidor sobe é dado como interrompido.
+    IMPORTACAO_TRABALHADORES: int = 2
+    IMPORTACAO_FILA_TAMANHO: int = 32
+    IMPORTACAO_JOB_LIMITE_MINUTOS: int = 30
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -73,6 +115,35 @@ class Settings(BaseSettings):
 
             self.ROOT_DOMAIN = os.getenv("ROOT_DOMAIN", self.ROOT_DOMAIN)
 
+            self.RANKING_CACHE_TAMANHO = int(
+                os.getenv("RANKING_CACHE_TAMANHO", str(self.RANKING_CACHE_TAMANHO)))
+            self.PAREAMENTO_ORCAMENTO_SEGUNDOS = float(
+                os.getenv("PAREAMENTO_ORCAMENTO_SEGUNDOS", str(self.PAREAMENTO_ORCAMENTO_SEGUNDOS)))
+            self.PONTUACAO_CONFERIR_INCREMENTAL = os.getenv(
+                "PONTUACAO_CONFERIR_INCREMENTAL", str(self.PONTUACAO_CONFERIR_INCREMENTAL)).lower() in ("1", "true", "yes")
+            self.AO_VIVO_FILA_TAMANHO = int(
+                os.getenv("AO_VIVO_FILA_TAMANHO", str(self.AO_VIVO_FILA_TAMANHO)))
+            self.TORNEIO_CACHE_BYTES = int(
+                os.getenv("TORNEIO_CACHE_BYTES", str(self.TORNEIO_CACHE_BYTES)))
+            self.TORNEIO_CACHE_DIRETORIO = os.getenv(
+                "TORNEIO_CACHE_DIRETORIO", self.TORNEIO_CACHE_DIRETORIO)
+            self.IMPORTACAO_PROCESSOS = int(
+                os.getenv("IMPORTACAO_PROCESSOS", str(self.IMPORTACAO_PROCESSOS)))
+            self.IMPORTACAO_LOTE_TAMANHO = int(
+                os.getenv("IMPORTACAO_LOTE_TAMANHO", str(self.IMPORTACAO_LOTE_TAMANHO)))
+            self.IMPORTACAO_LOTE_MAX_ARQUIVOS = int(
+                os.getenv("IMPORTACAO_LOTE_MAX_ARQUIVOS", str(self.IMPORTACAO_LOTE_MAX_ARQUIVOS)))
+            self.IMPORTACAO_TDF_MAX_BYTES = int(
+                os.getenv("IMPORTACAO_TDF_MAX_BYTES", str(self.IMPORTACAO_TDF_MAX_BYTES)))
+            self.IMPORTACAO_LOTE_MAX_BYTES = int(
+                os.getenv("IMPORTACAO_LOTE_MAX_BYTES", str(self.IMPORTACAO_LOTE_MAX_BYTES)))
+            self.IMPORTACAO_TRABALHADORES = int(
+                os.getenv("IMPORTACAO_TRABALHADORES", str(self.IMPORTACAO_TRABALHADORES)))
+            self.IMPORTACAO_FILA_TAMANHO = int(
+                os.getenv("IMPORTACAO_FILA_TAMANHO", str(self.IMPORTACAO_FILA_TAMANHO)))
+            self.IMPORTACAO_JOB_LIMITE_MINUTOS = int(
+                os.getenv("IMPORTACAO_JOB_LIMITE_MINUTOS", str(self.IMPORTACAO_JOB_LIMITE_MINUTOS)))
+
             if self.ROOT_DOMAIN in ("localhost", "127.0.0.1", "localtest.me"):
                 raise RuntimeError(
                     f"ROOT_DOMAIN='{self.ROOT_DOMAIN}' com DEBUG=False — isso quebraria "
@@ -33,3 +33,9 @@ class TopDeckedException:
         return HTTPException(
             status_code=409,
             detail=message)
+
+    @staticmethod
+    def service_unavailable(message: str):
+        return HTTPException(
+            status_code=503,
+            detail=message)
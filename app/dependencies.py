@@ -5,11 +5,13 @@ from app.core.security import (
     COOKIE_ACCESS_TOKEN,
     COOKIE_CSRF_TOKEN,
     TokenData, validar_token)
+from app.core.config import settings
 from app.core.exception import TopDeckedException
 from app.core.db import SessionDep
 
 from typing import Annotated
-from fastapi import Depends, Request
+from urllib.parse import urlparse
+from fastapi import Depends, Request, WebSocket, WebSocketException, status
 from sqlmodel import Session, text
 from sqlalchemy import event
 import jwt
@@ -136,6 +138,45 @@ async def retornar_usuario_atual_opcional(
     return _token_data_do_payload(payload)
 
 
+def _origem_permitida(origem: str) -> bool:
+    if origem in settings.ALLOWED_ORIGINS:
+        return True
+    host = (urlparse(origem).hostname or "").lower()
+    return host == settings.ROOT_DOMAIN or host.endswith(f".{settings.ROOT_DOMAIN}")
+
+
+async def retornar_usuario_websocket(
+    websocket: WebSocket,
+    session: SessionDep,
+    token: str | None = None,
+) -> TokenData:
+    """retornar_usuario_atual pro handshake de um WebSocket. O browser não
+    deixa mandar Authorization num WebSocket, então o token vem do cookie ou
+    do parâmetro `token`. O handshake não tem o header de CSRF. Por isso,
+    quando o cookie é a única prova de identidade, a origem precisa ser uma
+    das nossas: sem isso, qualquer site poderia abrir o socket com o cookie
+    do usuário."""
+    token_cookie = websocket.cookies.get(COOKIE_ACCESS_TOKEN)
+    autorizacao = websocket.headers.get("authorization", "")
+    token_header = autorizacao[7:] if autorizacao.lower().startswith("bearer ") else None
+    token = token or token_header or token_cookie
+    if not token:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Não autenticado")
+
+    origem = websocket.headers.get("origin")
+    if token == token_cookie and origem and not _origem_permitida(origem):
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Origem não permitida")
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if not await validar_token(payload=payload, session=session):
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Não autenticado")
+    except jwt.PyJWTError:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Token inválido")
+
+    return _token_data_do_payload(payload)
+
+
 async def retornar_loja_atual(
     session: SessionDep,
     token_data: Annotated[str, Depends(retornar_usuario_atual)],
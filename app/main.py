@@ -4,6 +4,7 @@ from app.api.main import api_router
 from app.middleware.TenantHostMiddleware import TenantHostMiddleware
 from app.services.AdministradorService import bootstrap_admin_root
 from app.services.ConquistaService import seed_conquistas_catalogo
+from app.services.ImportacaoJobService import retomar_jobs_importacao
 from app.services.PokemonCatalogoService import garantir_catalogo_atualizado
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -21,6 +22,7 @@ async def lifespan(app: FastAPI):
         bootstrap_admin_root(session)
         seed_conquistas_catalogo(session)
         garantir_catalogo_atualizado(session)
+        retomar_jobs_importacao(session)
     yield
 
 
@@ -48,6 +50,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 app.include_router(api_router)
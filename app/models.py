@@ -4,11 +4,12 @@ import uuid
 from datetime import datetime
 from app.core.db import SessionDep
 from app.utils.datetimeUtil import data_agora_brasil, agora_brasil
-from app.utils.Enums import StatusTorneio, StatusAprovacaoLoja, TCG, FormatoTorneio, FormatoMD, TipoTorneio, TipoParticipanteTorneio, MotivoPontuacaoExtra, TipoRegraPontuacaoEvento, TipoMovimentacaoCredito, TipoMovimentacaoItem, CategoriaConquista
+from app.utils.TorneioDataUtil import chave_ano_mes, data_efetiva_torneio
+from app.utils.Enums import StatusTorneio, StatusAprovacaoLoja, TCG, FormatoTorneio, FormatoMD, TipoTorneio, TipoParticipanteTorneio, MotivoPontuacaoExtra, TipoRegraPontuacaoEvento, TipoMovimentacaoCredito, TipoMovimentacaoItem, CategoriaConquista, StatusImportacaoJob, EtapaImportacao
 from email_validator import validate_email, EmailNotValidError
 from app.core.exception import TopDeckedException
-from sqlmodel import select
-from sqlalchemy import func
+from sqlmodel import Session, select
+from sqlalchemy import func, event, Index, LargeBinary, inspect, update
 from passlib.context import CryptContext
 from datetime import date, time
 
@@ -93,6 +94,9 @@ class JogadorCriado(SQLModel, table=True):
     apelido: Optional[str] = Field(default=None)
     jogador_id: Optional[int] = Field(default=None, foreign_key="jogador.id", ondelete="SET NULL")
     data_nascimento: Optional[date] = Field(default=None)
+    # Sobe quando game_id, jogador_id ou a data de nascimento (dele ou da
+    # conta) mudam (ver "Versão do Torneio").
+    versao: int = Field(default=1, nullable=False, sa_column_kwargs={"server_default": "1"})
     jogador: Optional["Jogador"] | None = Relationship(back_populates="tcgs")
 
 
@@ -188,6 +192,9 @@ class Loja(LojaBase, table=True):
     status: StatusAprovacaoLoja = Field(
         sa_column=Column(Enum(StatusAprovacaoLoja)), default=StatusAprovacaoLoja.PENDENTE)
     slug: str = Field(unique=True, index=True)
+    # Sobe quando o perfil, o usuário ou as temporadas da loja mudam (ver
+    # "Versão do Torneio").
+    versao: int = Field(default=1, nullable=False, sa_column_kwargs={"server_default": "1"})
 
 
 # ---------------------------------- Administrador ----------------------------------
@@ -326,9 +333,27 @@ class TorneioBase(SQLModel):
 
 
 class Torneio(TorneioBase, table=True):
+    __table_args__ = (
+        Index("ix_torneio_loja_jogo_status_data_efetiva", "loja_id", "jogo", "status", "data_efetiva"),
+        Index("ix_torneio_loja_ano_mes_efetivo", "loja_id", "ano_mes_efetivo"),
+    )
     id: Optional[str] = Field(
         default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     loja_id: int = Field(foreign_key="loja.id", nullable=True)
+    # Data efetiva (TorneioDataUtil.data_efetiva_torneio) gravada na linha,
+    # mais a chave (ano, mês) dela — derivadas de status, data/hora
+    # planejada e inicio_real, e recalculadas a cada INSERT/UPDATE pelo ORM
+    # (ver _atualizar_data_efetiva abaixo). Existem pra que recortes por
+    # período (ranking por mês, pontos de evento, estatísticas mensais)
+    # rodem como WHERE indexado no banco em vez de carregar os torneios e
+    # calcular a data em Python. Nunca são editadas diretamente.
+    data_efetiva: Optional[date] = Field(
+        default=None, sa_column=Column(Date, nullable=False))
+    ano_mes_efetivo: Optional[int] = Field(default=None, nullable=False)
+    # Sobe a cada flush que muda o torneio ou o que ele tem dentro (ver
+    # _versionar_torneios no fim deste arquivo) — é de onde sai o ETag de
+    # GET /lojas/torneios/{id}. Nunca é editada diretamente.
+    versao: int = Field(default=1, nullable=False, sa_column_kwargs={"server_default": "1"})
     loja: Optional["Loja"] = Relationship(
         back_populates="torneios", sa_relationship_kwargs={"lazy": "joined"})
     rodadas: List["Rodada"] = Relationship(
@@ -347,6 +372,13 @@ class Torneio(TorneioBase, table=True):
     regra_basica: Optional["TipoJogador"] = Relationship()
 
 
+@event.listens_for(Torneio, "before_insert")
+@event.listens_for(Torneio, "before_update")
+def _atualizar_data_efetiva(mapper, connection, torneio: Torneio) -> None:
+    torneio.data_efetiva = data_efetiva_torneio(torneio)
+    torneio.ano_mes_efetivo = chave_ano_mes(torneio.data_efetiva)
+
+
 # ---------------------------------- PontuacaoExtra ----------------------------------
 
 
@@ -368,6 +400,72 @@ class PontuacaoExtra(PontuacaoExtraBase, table=True):
     jogador_criado: Optional["JogadorCriado"] = Relationship()
 
 
+# ---------------------------------- RankingSnapshot ----------------------------------
+# Modelo de leitura do ranking: totais já agregados por (jogador criado,
+# loja, TCG do torneio, ano, mês), mantidos pelas rotas que mudam resultado
+# de torneio (ver RankingService.atualizar_ranking_snapshot) — o ranking
+# passa a somar poucas linhas por jogador em vez de varrer todas as
+# participações e rodadas da plataforma a cada leitura. Nunca é fonte de
+# verdade: pode ser reconstruído do zero a qualquer momento
+# (app/scripts/reconstruir_ranking_snapshot.py).
+
+
+class RankingSnapshot(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("jogador_criado_id", "loja_id", "tcg", "ano", "mes",
+                         name="ranking_snapshot_jogador_loja_tcg_mes_unique"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jogador_criado_id: int = Field(foreign_key="jogadorcriado.id", index=True)
+    # NULL: torneios sem loja (linhas antigas) — entram só no ranking sem
+    # filtro de loja, como sempre entraram.
+    loja_id: Optional[int] = Field(default=None, foreign_key="loja.id", index=True, nullable=True)
+    tcg: TCG = Field(nullable=False)
+    ano: int
+    mes: int
+    # Pontos/torneios caem no mês da data efetiva do torneio (ver
+    # TorneioDataUtil.data_efetiva_torneio), de qualquer status; pontos já
+    # somados com `int()` por participação, como o ranking sempre fez.
+    pontos: int = Field(default=0)
+    torneios: int = Field(default=0)
+    # Vitórias/derrotas/empates caem no mês de início de cada rodada, e só
+    # de torneios FINALIZADOS.
+    vitorias: int = Field(default=0)
+    derrotas: int = Field(default=0)
+    empates: int = Field(default=0)
+
+
+# ---------------------------------- EstatisticaMensalJogador ----------------------------------
+# Modelo de leitura das estatísticas mensais do painel do jogador
+# (/jogadores/estatisticas): pontos e V/D/E por (conta, loja, TCG do torneio,
+# ano, mês), mantidos junto com o RankingSnapshot (ver
+# RankingService.atualizar_estatisticas_mensais) — o painel lê poucas linhas
+# da própria conta em vez de todas as rodadas e participações dela. Como o
+# snapshot, nunca é fonte de verdade
+# (app/scripts/reconstruir_estatisticas_mensais.py).
+
+
+class EstatisticaMensalJogador(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("jogador_id", "loja_id", "tcg", "ano", "mes",
+                         name="estatistica_mensal_jogador_loja_tcg_mes_unique"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jogador_id: int = Field(foreign_key="jogador.id")
+    # NULL: torneios sem loja, como em RankingSnapshot.
+    loja_id: Optional[int] = Field(default=None, foreign_key="loja.id", index=True, nullable=True)
+    tcg: TCG = Field(nullable=False)
+    ano: int
+    mes: int
+    # Só torneios FINALIZADOS. Pontos (pontuacao_com_regras, sem truncar)
+    # caem no mês da data efetiva do torneio; V/D/E, no mês de início de
+    # cada rodada.
+    pontos: float = Field(default=0)
+    vitorias: int = Field(default=0)
+    derrotas: int = Field(default=0)
+    empates: int = Field(default=0)
+
+
 # ---------------------------------- Evento ----------------------------------
 
 
@@ -771,3 +869,186 @@ class RodadaComposicao(RodadaComposicaoBase, table=True):
     )
     id: Optional[int] = Field(default=None, primary_key=True)
     composicao_partida: Optional["ComposicaoPartida"] = Relationship()
+
+
+# ---------------------------------- ImportacaoJob ----------------------------------
+# Importação de .tdf enviada pra rodar em segundo plano (ver
+# ImportacaoJobService): a requisição só grava o arquivo aqui e volta; um
+# worker do processo faz a importação e vai registrando a etapa, e a loja
+# acompanha por GET /importacoes/{id}. O arquivo é apagado quando o job
+# termina, com sucesso ou não.
+
+
+class ImportacaoJob(SQLModel, table=True):
+    id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    loja_id: int = Field(foreign_key="loja.id", index=True)
+    arquivo: str
+    status: StatusImportacaoJob = Field(default=StatusImportacaoJob.PENDENTE, nullable=False)
+    etapa: Optional[EtapaImportacao] = Field(default=None)
+    conteudo: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
+    # Sem FK: o torneio pode ser apagado ou reimportado depois, e o job
+    # continua sendo o registro do que aconteceu.
+    torneio_id: Optional[str] = Field(default=None)
+    erro: Optional[str] = Field(default=None)
+    criado_em: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        default_factory=agora_brasil)
+    iniciado_em: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+    concluido_em: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+
+
+# ---------------------------------- Versão do Torneio ----------------------------------
+# Torneio.versao muda sempre que muda alguma coisa que GET
+# /lojas/torneios/{id} devolve do próprio torneio: a linha dele, as
+# participações (e a composição de cada uma), as rodadas e as pontuações
+# extras. Um UPDATE só por flush, antes das escritas do flush, qualquer que
+# seja o número de linhas mexidas.
+#
+# O resto do payload vem de fora do torneio e versiona onde mora — quem
+# muda (um jogador reivindicando o GameID, uma loja mexendo nas temporadas)
+# nem sempre pode escrever no torneio (RLS):
+# - JogadorCriado.versao: game_id, conta e data de nascimento de cada
+#   participante (a da conta também, pra categoria);
+# - Loja.versao: a loja embutida (perfil e usuário) e as temporadas dela,
+#   que decidem a categoria dos participantes.
+# O ETag do torneio junta as três (ver TorneioCacheService.versao_publicada).
+#
+# Torneio importado tem o id do arquivo, então um torneio apagado pode
+# voltar com o mesmo id: a última versão de cada torneio apagado fica em
+# TorneioApagado, e o torneio recriado começa na seguinte — nunca repete um
+# ETag (nem uma chave do cache de TorneioCacheService) de antes.
+
+
+class TorneioApagado(SQLModel, table=True):
+    id: str = Field(primary_key=True)
+    versao: int
+
+
+def registrar_torneio_apagado(session: Session, torneio_id: str, versao: int) -> None:
+    """Pra quem apaga torneio sem `session.delete` (ver
+    TorneioService.apagar_torneio_completo)."""
+    with session.no_autoflush:
+        session.merge(TorneioApagado(id=torneio_id, versao=versao))
+
+
+def _torneio_id_afetado(obj) -> str | None:
+    if isinstance(obj, Torneio):
+        return obj.id
+    if obj.torneio_id is not None:
+        return obj.torneio_id
+    # Pendente, ligado pela relação: o FK só é preenchido no flush.
+    torneio = getattr(obj, "torneio", None)
+    return torneio.id if torneio is not None else None
+
+
+def _mudou(obj, *campos: str) -> bool:
+    atributos = inspect(obj).attrs
+    return any(getattr(atributos, campo).history.has_changes() for campo in campos)
+
+
+def _versoes_apagadas(session: Session, torneio_ids: set[str]) -> dict[str, int]:
+    versoes = {
+        obj.id: obj.versao for obj in (*session.new, *session.dirty)
+        if isinstance(obj, TorneioApagado) and obj.id in torneio_ids
+    }
+    faltando = torneio_ids - versoes.keys()
+    if faltando:
+        versoes.update(session.execute(
+            select(TorneioApagado.id, TorneioApagado.versao).where(TorneioApagado.id.in_(faltando))
+        ).all())
+    return versoes
+
+
+def _versionar_torneios(session: Session, flush_context, instances) -> None:
+    torneio_ids: set[str] = set()
+    link_ids: set[int] = set()
+    novos: list[Torneio] = []
+    loja_ids: set[int] = set()
+    usuario_ids: set[int] = set()
+    jogador_ids: set[int] = set()
+    with session.no_autoflush:
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            if isinstance(obj, Torneio):
+                if obj in session.new:
+                    novos.append(obj)
+                elif obj in session.deleted:
+                    registrar_torneio_apagado(session, obj.id, obj.versao)
+                else:
+                    torneio_ids.add(obj.id)
+            elif isinstance(obj, (JogadorTorneioLink, Rodada, PontuacaoExtra)):
+                torneio_ids.add(_torneio_id_afetado(obj))
+            elif isinstance(obj, JogadorComposicaoUnidade):
+                if obj.jogador_torneio_link_id is not None:
+                    link_ids.add(obj.jogador_torneio_link_id)
+                elif obj.link is not None:
+                    torneio_ids.add(_torneio_id_afetado(obj.link))
+            elif isinstance(obj, JogadorCriado) and obj in session.dirty:
+                if _mudou(obj, "jogador_id", "game_id", "data_nascimento") and not _mudou(obj, "versao"):
+                    obj.versao = (obj.versao or 1) + 1
+            elif isinstance(obj, Jogador) and obj in session.dirty:
+                if _mudou(obj, "data_nascimento"):
+                    jogador_ids.add(obj.id)
+            elif isinstance(obj, Temporada):
+                loja_ids.add(obj.loja_id)
+            elif isinstance(obj, Loja) and obj in session.dirty:
+                if not _mudou(obj, "versao"):
+                    loja_ids.add(obj.id)
+            elif isinstance(obj, Usuario) and obj in session.dirty:
+                usuario_ids.add(obj.id)
+
+        if novos:
+            apagadas = _versoes_apagadas(session, {torneio.id for torneio in novos if torneio.id})
+            for torneio in novos:
+                if torneio.id in apagadas:
+                    torneio.versao = max(torneio.versao or 1, apagadas[torneio.id] + 1)
+
+    _versionar_lojas_e_participantes(session, loja_ids, usuario_ids, jogador_ids)
+
+    torneio_ids.discard(None)
+    if not torneio_ids and not link_ids:
+        return
+
+    tabela = Torneio.__table__
+    condicao = tabela.c.id.in_(torneio_ids)
+    if link_ids:
+        condicao |= tabela.c.id.in_(
+            select(JogadorTorneioLink.torneio_id).where(JogadorTorneioLink.id.in_(link_ids)))
+    session.connection().execute(update(tabela).where(condicao).values(versao=tabela.c.versao + 1))
+
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Torneio) and (link_ids or obj.id in torneio_ids):
+            session.expire(obj, ["versao"])
+
+
+def _versionar_lojas_e_participantes(
+    session: Session, loja_ids: set[int], usuario_ids: set[int], jogador_ids: set[int],
+) -> None:
+    loja_ids.discard(None)
+    if loja_ids or usuario_ids:
+        tabela = Loja.__table__
+        session.connection().execute(
+            update(tabela)
+            .where(tabela.c.id.in_(loja_ids) | tabela.c.usuario_id.in_(usuario_ids))
+            .values(versao=tabela.c.versao + 1)
+        )
+    if jogador_ids:
+        tabela = JogadorCriado.__table__
+        session.connection().execute(
+            update(tabela).where(tabela.c.jogador_id.in_(jogador_ids)).values(versao=tabela.c.versao + 1))
+
+    # Pelo dict do estado: ler o atributo de um objeto expirado iria ao banco
+    # no meio do flush.
+    for obj in list(session.identity_map.values()):
+        valores = inspect(obj).dict
+        if isinstance(obj, Loja) and (valores.get("id") in loja_ids or valores.get("usuario_id") in usuario_ids):
+            session.expire(obj, ["versao"])
+        elif isinstance(obj, JogadorCriado) and valores.get("jogador_id") in jogador_ids:
+            session.expire(obj, ["versao"])
+
+
+event.listen(Session, "before_flush", _versionar_torneios)
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from app.utils.Enums import EtapaImportacao, StatusImportacaoArquivo, StatusImportacaoJob
+
+
+class ResultadoImportacaoArquivo(BaseModel):
+    """Resultado de um .tdf de uma importação em lote — `arquivo` é o nome
+    enviado (ou "lote.zip/arquivo.tdf" pra arquivos de dentro de um .zip),
+    `motivo` só vem quando FALHOU."""
+    arquivo: str
+    status: StatusImportacaoArquivo
+    torneio_id: Optional[str] = None
+    motivo: Optional[str] = None
+
+
+class ImportacaoJobPublico(BaseModel):
+    """Estado de uma importação em segundo plano. `etapa` diz onde o job
+    está enquanto PROCESSANDO (e onde parou, se FALHOU); `torneio_id` vem
+    assim que o torneio é gravado, `erro` só quando FALHOU."""
+    id: str
+    arquivo: str
+    status: StatusImportacaoJob
+    etapa: Optional[EtapaImportacao] = None
+    torneio_id: Optional[str] = None
+    erro: Optional[str] = None
+    criado_em: datetime
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
@@ -90,5 +90,6 @@ class JogadorEstatisticas(BaseModel):
     rank_geral: int
     rank_mensal: int
     rank_anual: int
+    total_ranking: int = 0
     estatisticas_anuais: List["EstatisticasAnuais"]
     historico: List["TorneioJogadorPublico"]
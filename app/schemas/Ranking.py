@@ -10,6 +10,8 @@ class Ranking(BaseModel):
     derrotas: int
     empates: int
     taxa_vitoria: float
+    posicao: int | None = None
+    jogador_criado_id: int | None = None
 
 class RankingPorLoja(BaseModel):
     nome_jogador: str
@@ -20,6 +22,10 @@ class RankingPorLoja(BaseModel):
     derrotas: int
     empates: int
     taxa_vitoria: float
+    posicao: int | None = None
+    jogador_id: int | None = None
+    jogador_criado_id: int | None = None
+    loja_id: int | None = None
 
 class RankingPorFormato(BaseModel):
     formato: str
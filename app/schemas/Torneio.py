@@ -80,6 +80,19 @@ class TorneioPublico(TorneioBase):
     loja: Optional["LojaPublico"]
 
 
+class TorneioResumo(TorneioBase):
+    """Torneio como aparece nas listagens: os campos do próprio torneio e
+    contagens agregadas, sem participações, composições e rodadas (essas
+    ficam em GET /lojas/torneios/{id})."""
+    id: str
+    status: StatusTorneio
+    loja_id: int | None = None
+    data_efetiva: date
+    loja: Optional["LojaPublico"]
+    total_jogadores: int = 0
+    total_rodadas: int = 0
+
+
 class TorneioJogadorPublico(TorneioBase):
     id: str
     pontuacao: float = 0
@@ -0,0 +1,13 @@
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, select
+
+
+def tabela_ja_preenchida(session: Session, modelo: type[SQLModel]) -> bool:
+    """Pra reconstruções que o entrypoint do container roda a cada subida:
+    só a primeira (logo depois da migração que cria a tabela) precisa
+    reconstruir. No Postgres, segura um advisory lock até o fim da
+    transação — réplicas subindo juntas esperam a que está reconstruindo e
+    já encontram a tabela preenchida, em vez de reconstruir em paralelo."""
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:tabela))"), {"tabela": modelo.__tablename__})
+    return session.exec(select(modelo).limit(1)).first() is not None
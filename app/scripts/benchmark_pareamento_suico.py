@@ -0,0 +1,79 @@
+"""Benchmark do pareamento suíço em memória (PareamentoUtil.parear_suico):
+simula torneios de 32, 256 e 1024 participantes, com resultados sorteados
+rodada a rodada, e mede o tempo de cada pareamento, quantas revanches
+sobraram e quantas rodadas estouraram o orçamento de busca
+(PAREAMENTO_ORCAMENTO_SEGUNDOS) e caíram no guloso de reserva. Não toca no
+banco — é só o motor de pareamento que `RodadaService.nova_rodada` usa.
+
+    python -m app.scripts.benchmark_pareamento_suico [--rodadas N] [--semente S]
+"""
+import argparse
+import math
+import random
+from time import perf_counter
+
+from app.core.config import settings
+from app.utils.PareamentoUtil import Confrontos, parear_suico
+
+TAMANHOS = (32, 256, 1024)
+
+
+def _simular(tamanho: int, rodadas: int, sorteio: random.Random) -> dict:
+    pontos = {p: 0 for p in range(1, tamanho + 1)}
+    confrontos: Confrontos = set()
+    com_bye: set[int] = set()
+    tempos = []
+    revanches = 0
+    incompletas = 0
+
+    for _ in range(rodadas):
+        ordem = sorted(pontos, key=lambda p: (pontos[p], p), reverse=True)
+        inicio = perf_counter()
+        resultado = parear_suico(ordem, confrontos, com_bye, settings.PAREAMENTO_ORCAMENTO_SEGUNDOS)
+        tempos.append(perf_counter() - inicio)
+
+        revanches += resultado.revanches
+        incompletas += not resultado.completo
+        for jogador1, jogador2 in resultado.mesas:
+            confrontos.add(frozenset((jogador1, jogador2)))
+            sorteado = sorteio.random()
+            if sorteado < 0.45:
+                pontos[jogador1] += 3
+            elif sorteado < 0.9:
+                pontos[jogador2] += 3
+            else:
+                pontos[jogador1] += 1
+                pontos[jogador2] += 1
+        if resultado.bye is not None:
+            com_bye.add(resultado.bye)
+            pontos[resultado.bye] += 3
+
+    return {
+        "total": sum(tempos),
+        "media": sum(tempos) / len(tempos),
+        "pior": max(tempos),
+        "revanches": revanches,
+        "incompletas": incompletas,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rodadas", type=int, default=None,
+                        help="rodadas por torneio (padrão: ceil(log2(participantes)) + 1)")
+    parser.add_argument("--semente", type=int, default=2024)
+    args = parser.parse_args()
+
+    print(f"{'participantes':>13} {'rodadas':>7} {'total (ms)':>11} {'média (ms)':>11} "
+          f"{'pior (ms)':>10} {'revanches':>9} {'estouros':>8}")
+    for tamanho in TAMANHOS:
+        # +1 pra ímpar: também exercita o bye.
+        for participantes in (tamanho, tamanho + 1):
+            rodadas = args.rodadas or math.ceil(math.log2(participantes)) + 1
+            r = _simular(participantes, rodadas, random.Random(args.semente))
+            print(f"{participantes:>13} {rodadas:>7} {r['total'] * 1000:>11.1f} {r['media'] * 1000:>11.2f} "
+                  f"{r['pior'] * 1000:>10.2f} {r['revanches']:>9} {r['incompletas']:>8}")
+
+
+if __name__ == "__main__":
+    main()
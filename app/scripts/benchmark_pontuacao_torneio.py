@@ -0,0 +1,162 @@
+"""Benchmark do motor de pontuação/desempate (PontuacaoUtil.MotorTorneio)
+contra a implementação anterior de TorneioService — que pontuava rodada a
+rodada nos objetos e, no desempate, varria todas as rodadas pra cada
+participante. Simula torneios de 32, 256 e 1024 participantes com
+resultados sorteados, confere que os dois caminhos dão exatamente os mesmos
+pontos, V/D/E e OMW%/OOMW%, e mede o tempo de cada um. Não toca no banco.
+
+    python -m app.scripts.benchmark_pontuacao_torneio [--semente S]
+"""
+import argparse
+import math
+import random
+from time import perf_counter
+from types import SimpleNamespace
+
+from app.utils.PontuacaoUtil import (
+    PISO_TAXA_VITORIA, TETO_TAXA_VITORIA_COMPLETOU, TETO_TAXA_VITORIA_DESISTIU, MotorTorneio,
+)
+
+TAMANHOS = (32, 256, 1024)
+REGRA_BASICA = SimpleNamespace(pt_vitoria=3, pt_derrota=0, pt_empate=1,
+                               pt_oponente_ganha=0, pt_oponente_perde=0, pt_oponente_empate=0)
+REGRA_EXTRA = SimpleNamespace(pt_vitoria=1, pt_derrota=-1, pt_empate=0,
+                              pt_oponente_ganha=2, pt_oponente_perde=1, pt_oponente_empate=0)
+
+
+def _simular_torneio(participantes: int, sorteio: random.Random):
+    links = [
+        SimpleNamespace(id=i, pontuacao=0.0, pontuacao_com_regras=0.0,
+                        regra_extra=REGRA_EXTRA if i % 5 == 0 else None)
+        for i in range(1, participantes + 1)
+    ]
+    rodadas = []
+    for num_rodada in range(1, math.ceil(math.log2(participantes)) + 2):
+        ordem = [link.id for link in links]
+        sorteio.shuffle(ordem)
+        if len(ordem) % 2:
+            rodadas.append(SimpleNamespace(num_rodada=num_rodada, jogador1_id=ordem.pop(), jogador2_id=None,
+                                           vencedor_id=None, finalizada=True))
+        for jogador1_id, jogador2_id in zip(ordem[::2], ordem[1::2]):
+            vencedor_id = sorteio.choice((jogador1_id, jogador2_id, None))
+            rodadas.append(SimpleNamespace(num_rodada=num_rodada, jogador1_id=jogador1_id, jogador2_id=jogador2_id,
+                                           vencedor_id=vencedor_id, finalizada=True))
+    return links, rodadas
+
+
+def _implementacao_anterior(links, rodadas):
+    """Cópia fiel da versão anterior (calcular_pontuacao_rodada por rodada +
+    calcular_desempate_suico varrendo as rodadas por participante)."""
+    por_id = {link.id: link for link in links}
+    pontos = {link.id: [0.0, 0.0] for link in links}
+    b = REGRA_BASICA
+    for rodada in rodadas:
+        j1 = por_id[rodada.jogador1_id]
+        j2 = por_id.get(rodada.jogador2_id)
+        e1 = j1.regra_extra
+        e2 = j2.regra_extra if j2 else None
+        if rodada.vencedor_id == rodada.jogador1_id:
+            pontos[j1.id][1] += b.pt_vitoria + (e1.pt_vitoria if e1 else 0) + (e2.pt_oponente_ganha if e2 else 0)
+            if j2:
+                pontos[j2.id][1] += b.pt_derrota + (e2.pt_derrota if e2 else 0) + (e1.pt_oponente_perde if e1 else 0)
+            pontos[j1.id][0] += b.pt_vitoria + (b.pt_oponente_ganha if j2 else 0)
+            if j2:
+                pontos[j2.id][0] += b.pt_derrota + b.pt_oponente_perde
+        elif j2 and rodada.vencedor_id == rodada.jogador2_id:
+            pontos[j2.id][1] += b.pt_vitoria + (e2.pt_vitoria if e2 else 0) + (e1.pt_oponente_ganha if e1 else 0)
+            pontos[j1.id][1] += b.pt_derrota + (e1.pt_derrota if e1 else 0) + (e2.pt_oponente_perde if e2 else 0)
+            pontos[j2.id][0] += b.pt_vitoria + b.pt_oponente_ganha
+            pontos[j1.id][0] += b.pt_derrota + b.pt_oponente_perde
+        else:
+            pontos[j1.id][1] += b.pt_empate + (e1.pt_empate if e1 else 0) + (e2.pt_oponente_empate if e2 else 0)
+            if j2:
+                pontos[j2.id][1] += b.pt_empate + (e2.pt_empate if e2 else 0) + (e1.pt_oponente_empate if e1 else 0)
+            pontos[j1.id][0] += b.pt_empate + (b.pt_oponente_empate if j2 else 0)
+            if j2:
+                pontos[j2.id][0] += b.pt_empate + b.pt_oponente_empate
+
+    total_rodadas = max((r.num_rodada for r in rodadas), default=0)
+    por_link = {}
+    for link in links:
+        vitorias = derrotas = empates = byes = 0
+        oponentes_ids = []
+        for rodada in rodadas:
+            if rodada.jogador1_id != link.id and rodada.jogador2_id != link.id:
+                continue
+            if not rodada.finalizada:
+                continue
+            if rodada.jogador1_id is None or rodada.jogador2_id is None:
+                byes += 1
+                continue
+            oponente_id = rodada.jogador2_id if rodada.jogador1_id == link.id else rodada.jogador1_id
+            oponentes_ids.append(oponente_id)
+            if rodada.vencedor_id == link.id:
+                vitorias += 1
+            elif rodada.vencedor_id == oponente_id:
+                derrotas += 1
+            else:
+                empates += 1
+        partidas_reais = vitorias + derrotas + empates
+        taxa_bruta = (vitorias / partidas_reais) if partidas_reais else 0.0
+        completou = (vitorias + derrotas + empates + byes) >= total_rodadas
+        teto = TETO_TAXA_VITORIA_COMPLETOU if completou else TETO_TAXA_VITORIA_DESISTIU
+        por_link[link.id] = {"vde": (vitorias, derrotas, empates, byes), "oponentes_ids": oponentes_ids,
+                             "taxa_vitoria": min(max(taxa_bruta, PISO_TAXA_VITORIA), teto)}
+    for link in links:
+        taxas = [por_link[oid]["taxa_vitoria"] for oid in por_link[link.id]["oponentes_ids"] if oid in por_link]
+        por_link[link.id]["omw"] = (sum(taxas) / len(taxas)) if taxas else 0.0
+    resultado = {}
+    for link in links:
+        omws = [por_link[oid]["omw"] for oid in por_link[link.id]["oponentes_ids"] if oid in por_link]
+        oomw = (sum(omws) / len(omws)) if omws else 0.0
+        resultado[link.id] = (*pontos[link.id], *por_link[link.id]["vde"],
+                              round(por_link[link.id]["omw"] * 100, 2), round(oomw * 100, 2))
+    return resultado
+
+
+def _motor(links, rodadas):
+    motor = MotorTorneio(link.id for link in links)
+    for rodada in rodadas:
+        motor.registrar_rodada(rodada.num_rodada, rodada.jogador1_id, rodada.jogador2_id,
+                               rodada.vencedor_id, rodada.finalizada)
+
+    def _regra(regra):
+        return regra and (regra.pt_vitoria, regra.pt_derrota, regra.pt_empate,
+                          regra.pt_oponente_ganha, regra.pt_oponente_perde, regra.pt_oponente_empate)
+
+    motor.pontuar([0.0] * len(links), [0.0] * len(links), _regra(REGRA_BASICA), [_regra(l.regra_extra) for l in links])
+    motor.calcular_desempates()
+    return {
+        link_id: (motor.pontuacao[slot], motor.pontuacao_com_regras[slot], motor.vitorias[slot], motor.derrotas[slot],
+                  motor.empates[slot], motor.byes[slot], motor.omw[slot], motor.oomw[slot])
+        for slot, link_id in enumerate(motor.link_ids)
+    }
+
+
+def _cronometrar(funcao, *args) -> tuple[float, dict]:
+    inicio = perf_counter()
+    resultado = funcao(*args)
+    return perf_counter() - inicio, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--semente", type=int, default=2024)
+    args = parser.parse_args()
+
+    print(f"{'participantes':>13} {'rodadas':>7} {'anterior (ms)':>13} {'motor (ms)':>10} {'ganho':>7}")
+    for tamanho in TAMANHOS:
+        # +1 pra ímpar: também exercita o bye.
+        for participantes in (tamanho, tamanho + 1):
+            links, rodadas = _simular_torneio(participantes, random.Random(args.semente))
+            tempo_anterior, anterior = _cronometrar(_implementacao_anterior, links, rodadas)
+            tempo_motor, motor = _cronometrar(_motor, links, rodadas)
+            if anterior != motor:
+                raise SystemExit(f"Divergência entre as implementações com {participantes} participantes")
+            num_rodadas = max(r.num_rodada for r in rodadas)
+            print(f"{participantes:>13} {num_rodadas:>7} {tempo_anterior * 1000:>13.1f} "
+                  f"{tempo_motor * 1000:>10.1f} {tempo_anterior / tempo_motor:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
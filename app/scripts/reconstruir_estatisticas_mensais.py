@@ -0,0 +1,40 @@
+"""Reconstrói do zero as estatísticas mensais dos jogadores
+(EstatisticaMensalJogador) a partir dos torneios, participações e rodadas.
+Preenche o histórico logo depois da migração que cria a tabela (o
+entrypoint do container roda isto com `--se-vazio` depois do
+`alembic upgrade head`) e corrige qualquer divergência da tabela com os
+resultados.
+
+    python -m app.scripts.reconstruir_estatisticas_mensais [--se-vazio]
+"""
+import argparse
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.dependencies import permitir_leitura_publica
+from app.models import EstatisticaMensalJogador
+from app.scripts import tabela_ja_preenchida
+from app.services.RankingService import reconstruir_estatisticas_mensais
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--se-vazio", action="store_true",
+                        help="só reconstrói se a tabela ainda estiver vazia (entrypoint do container)")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.se_vazio and tabela_ja_preenchida(session, EstatisticaMensalJogador):
+            print("Estatísticas mensais já preenchidas; nada a reconstruir.")
+            return
+        # Sem loja no contexto, o RLS (Postgres) esconderia todos os
+        # torneios e a tabela seria reconstruída vazia.
+        permitir_leitura_publica(session)
+        linhas = reconstruir_estatisticas_mensais(session)
+        session.commit()
+    print(f"Estatísticas mensais reconstruídas: {linhas} linha(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Reconstrói do zero o RankingSnapshot a partir dos torneios, participações
+e rodadas. Usado logo depois da migração que cria a tabela (o entrypoint do
+container roda isto com `--se-vazio` depois do `alembic upgrade head`) e
+sempre que for preciso corrigir alguma divergência do snapshot.
+
+    python -m app.scripts.reconstruir_ranking_snapshot [--se-vazio]
+"""
+import argparse
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.dependencies import permitir_leitura_publica
+from app.models import RankingSnapshot
+from app.scripts import tabela_ja_preenchida
+from app.services.RankingService import reconstruir_ranking_snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--se-vazio", action="store_true",
+                        help="só reconstrói se a tabela ainda estiver vazia (entrypoint do container)")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.se_vazio and tabela_ja_preenchida(session, RankingSnapshot):
+            print("RankingSnapshot já preenchido; nada a reconstruir.")
+            return
+        # Sem loja no contexto, o RLS (Postgres) esconderia todos os
+        # torneios e o snapshot seria reconstruído vazio.
+        permitir_leitura_publica(session)
+        linhas = reconstruir_ranking_snapshot(session)
+        session.commit()
+    print(f"RankingSnapshot reconstruído: {linhas} linha(s).")
+
+
+if __name__ == "__main__":
+    main()
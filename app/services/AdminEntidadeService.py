@@ -18,6 +18,7 @@ from sqlmodel import SQLModel, select
 
 from app.core.db import SessionDep
 from app.core.exception import TopDeckedException
+from app.services.RankingCacheService import invalidar_todo_ranking_apos_commit
 from app.models import (
     Categoria,
     Conquista,
@@ -192,6 +193,10 @@ def criar_registro(session: SessionDep, nome: str, dados: dict[str, Any]) -> dic
     dados_validos = _validar_e_filtrar_dados(session, model, dados)
     registro = model(**dados_validos)
     session.add(registro)
+    # Edição direta de qualquer tabela pode mexer em algo que o ranking mostra
+    # (nome, GameID, participação) — não dá pra saber o alcance, então limpa
+    # o cache inteiro.
+    invalidar_todo_ranking_apos_commit(session)
     session.commit()
     session.refresh(registro)
     return _serializar(registro)
@@ -206,6 +211,7 @@ def atualizar_registro(session: SessionDep, nome: str, registro_id: str, dados:
     dados_validos = _validar_e_filtrar_dados(session, model, dados)
     registro.sqlmodel_update(dados_validos)
     session.add(registro)
+    invalidar_todo_ranking_apos_commit(session)
     session.commit()
     session.refresh(registro)
     return _serializar(registro)
@@ -217,4 +223,5 @@ def deletar_registro(session: SessionDep, nome: str, registro_id: str) -> None:
     if not registro:
         raise TopDeckedException.not_found(f"Registro '{registro_id}' não encontrado em '{nome}'.")
     session.delete(registro)
+    invalidar_todo_ranking_apos_commit(session)
     session.commit()
@@ -1,4 +1,5 @@
-from sqlmodel import select
+from sqlalchemy import insert
+from sqlmodel import select, func
 from app.core.db import SessionDep
 from app.core.exception import TopDeckedException
 from app.core.security import TokenData
@@ -12,6 +13,7 @@ from app.models import (
     RodadaComposicao,
 )
 from app.utils.Enums import TCG
+from app.utils.datetimeUtil import agora_brasil
 
 JOGOS_COM_REPRESENTACAO_DECK = (TCG.POKEMON,)
 
@@ -58,46 +60,83 @@ def retornar_representacao_completa(representacao: RepresentacaoComposicao) -> d
     }
 
 
-def _clonar_time_em_composicao_partida(session: SessionDep, link: JogadorTorneioLink) -> ComposicaoPartida:
-    """Cria uma ComposicaoPartida nova como cópia fiel do time completo que o
-    jogador levou pro torneio (`link.composicao_unidades`) — a cópia é
-    independente: editar a ComposicaoPartida depois (só permitido pra
-    JOGOS_COM_COMPOSICAO_POR_PARTIDA) nunca volta a afetar
-    JogadorComposicaoUnidade."""
-    composicao_partida = ComposicaoPartida()
-    session.add(composicao_partida)
-    session.flush()
-
-    for unidade in link.composicao_unidades:
-        session.add(ComposicaoPartidaUnidade(
-            composicao_partida_id=composicao_partida.id,
-            unidade_catalogo_id=unidade.unidade_catalogo_id,
-            quantidade=unidade.quantidade,
-        ))
-
-    return composicao_partida
-
-
-def garantir_composicao_partida(session: SessionDep, rodada_id: int, link: JogadorTorneioLink, jogo: TCG) -> RodadaComposicao:
-    rodada_anterior = session.exec(
-        select(RodadaComposicao)
-        .where(RodadaComposicao.jogador_torneio_link_id == link.id)
-        .order_by(RodadaComposicao.id.desc())
-    ).first()
-
-    if rodada_anterior and jogo not in JOGOS_COM_COMPOSICAO_POR_PARTIDA:
-        composicao_partida_id = rodada_anterior.composicao_partida_id
-    else:
-        composicao_partida = _clonar_time_em_composicao_partida(session, link)
-        composicao_partida_id = composicao_partida.id
-
-    rodada_composicao = RodadaComposicao(
-        rodada_id=rodada_id,
-        jogador_torneio_link_id=link.id,
-        composicao_partida_id=composicao_partida_id,
-    )
-    session.add(rodada_composicao)
-    return rodada_composicao
+def _clonar_times_em_composicoes_partida(session: SessionDep, links: list[JogadorTorneioLink]) -> list[int]:
+    """Cria uma ComposicaoPartida nova por participação, cópia fiel do time
+    completo que o jogador levou pro torneio (`link.composicao_unidades`) —
+    a cópia é independente: editar a ComposicaoPartida depois (só permitido
+    pra JOGOS_COM_COMPOSICAO_POR_PARTIDA) nunca volta a afetar
+    JogadorComposicaoUnidade. Devolve os ids na ordem de `links`.
+
+    As composições saem num INSERT só de várias linhas; a ordem em que o
+    RETURNING devolve os ids não importa, porque nesse momento elas ainda
+    são todas iguais (vazias) — cada id só ganha dono aqui, ao ser
+    distribuído entre os `links`."""
+    if not links:
+        return []
+    agora = agora_brasil()
+    composicao_ids = session.execute(
+        insert(ComposicaoPartida)
+        .values([{"criado_em": agora}] * len(links))
+        .returning(ComposicaoPartida.id)
+    ).scalars().all()
+
+    unidades = [
+        {
+            "composicao_partida_id": composicao_partida_id,
+            "unidade_catalogo_id": unidade.unidade_catalogo_id,
+            "quantidade": unidade.quantidade,
+        }
+        for link, composicao_partida_id in zip(links, composicao_ids)
+        for unidade in link.composicao_unidades
+    ]
+    if unidades:
+        session.execute(insert(ComposicaoPartidaUnidade), unidades)
+    return list(composicao_ids)
+
+
+def garantir_composicoes_partida(
+    session: SessionDep, lados: list[tuple[int, JogadorTorneioLink]], jogo: TCG,
+) -> None:
+    """Cada lado (rodada_id, participação) de uma rodada recém-criada ganha
+    sua RodadaComposicao: TCG/VGC reaproveitam a ComposicaoPartida da
+    rodada anterior da participação (clonando o time só na primeira),
+    Pokémon GO (JOGOS_COM_COMPOSICAO_POR_PARTIDA) clona uma nova toda rodada.
+    A última composição de cada participação vem numa consulta só e clones
+    e RodadaComposicao saem em INSERTs em lote — usado pela rodada inteira
+    de uma vez, em vez de uma consulta e um flush por jogador.
+    `link.composicao_unidades` deve vir carregado de antemão pra não
+    disparar uma consulta por participação."""
+    if not lados:
+        return
+
+    composicao_anterior = {}
+    if jogo not in JOGOS_COM_COMPOSICAO_POR_PARTIDA:
+        link_ids = {link.id for _, link in lados}
+        ultima = (
+            select(func.max(RodadaComposicao.id))
+            .where(RodadaComposicao.jogador_torneio_link_id.in_(link_ids))
+            .group_by(RodadaComposicao.jogador_torneio_link_id)
+        )
+        composicao_anterior = dict(session.exec(
+            select(RodadaComposicao.jogador_torneio_link_id, RodadaComposicao.composicao_partida_id)
+            .where(RodadaComposicao.id.in_(ultima))
+        ).all())
+
+    sem_composicao = [link for _, link in lados if link.id not in composicao_anterior]
+    composicao_por_link = {
+        **composicao_anterior,
+        **dict(zip((link.id for link in sem_composicao),
+                   _clonar_times_em_composicoes_partida(session, sem_composicao))),
+    }
+
+    session.execute(insert(RodadaComposicao), [
+        {
+            "rodada_id": rodada_id,
+            "jogador_torneio_link_id": link.id,
+            "composicao_partida_id": composicao_por_link[link.id],
+        }
+        for rodada_id, link in lados
+    ])
 
 
 def retornar_composicao_partida_completa(composicao_partida: ComposicaoPartida) -> dict:
@@ -15,8 +15,9 @@ from app.models import (
     Torneio,
 )
 from app.utils.datetimeUtil import data_agora_brasil
+from app.utils.RecorteCamposUtil import RecorteCampos
 from app.utils.Enums import StatusTorneio, TipoParticipanteTorneio, TipoRegraPontuacaoEvento
-from app.utils.TorneioDataUtil import data_efetiva_torneio, momento_efetivo_torneio
+from app.utils.TorneioDataUtil import momento_efetivo_torneio
 
 
 def verificar_permissao_evento(session: SessionDep, evento: Evento, usuario: TokenData) -> None:
@@ -71,41 +72,30 @@ def _composicao_pontos_automaticos(session: SessionDep, evento: Evento, jogador_
     if not pontos_por_tipo:
         return []
 
-    # Sem filtro de data na query: pra torneios FINALIZADOS o que importa é
-    # a data efetiva (real, não a planejada — ver TorneioDataUtil), então o
-    # recorte pelo período do evento é feito em Python logo abaixo, depois
-    # de calcular essa data.
-    candidatos = session.exec(
-        select(Torneio)
+    # O período do evento vale sobre a data efetiva do torneio (real, não
+    # a planejada — ver TorneioDataUtil), que já vem gravada na linha
+    # (Torneio.data_efetiva): torneios e participações do jogador saem numa
+    # consulta só, filtrados pelo índice (loja, jogo, status, data_efetiva).
+    participacoes = session.exec(
+        select(Torneio, JogadorTorneioLink)
+        .join(JogadorTorneioLink, JogadorTorneioLink.torneio_id == Torneio.id)
         .where(
             (Torneio.loja_id == evento.loja_id) &
             (Torneio.jogo == evento.tcg) &
             (Torneio.status == StatusTorneio.FINALIZADO) &
-            Torneio.conta_em_eventos
+            (Torneio.data_efetiva >= evento.data_inicio) &
+            (Torneio.data_efetiva <= evento.data_fim) &
+            Torneio.conta_em_eventos &
+            (JogadorTorneioLink.jogador_criado_id == jogador_criado_id) &
+            (JogadorTorneioLink.tipo.in_([
+                TipoParticipanteTorneio.JOGADOR,
+                TipoParticipanteTorneio.JOGADOR_E_JUIZ,
+            ]))
         )
     ).all()
 
-    torneios = sorted(
-        (t for t in candidatos if evento.data_inicio <= data_efetiva_torneio(t) <= evento.data_fim),
-        key=momento_efetivo_torneio,
-    )
-
     composicao: list[dict] = []
-    for torneio in torneios:
-        link = session.exec(
-            select(JogadorTorneioLink).where(
-                (JogadorTorneioLink.torneio_id == torneio.id) &
-                (JogadorTorneioLink.jogador_criado_id == jogador_criado_id) &
-                (JogadorTorneioLink.tipo.in_([
-                    TipoParticipanteTorneio.JOGADOR,
-                    TipoParticipanteTorneio.JOGADOR_E_JUIZ,
-                ]))
-            )
-        ).first()
-
-        if not link:
-            continue
-
+    for torneio, link in sorted(participacoes, key=lambda par: momento_efetivo_torneio(par[0])):
         momento = momento_efetivo_torneio(torneio)
         if TipoRegraPontuacaoEvento.PARTICIPACAO in pontos_por_tipo:
             composicao.append({"motivo": "Participação", "pontos": pontos_por_tipo[TipoRegraPontuacaoEvento.PARTICIPACAO], "momento": momento})
@@ -181,7 +171,17 @@ def retornar_participante_completo(session: SessionDep, evento: Evento, particip
     }
 
 
-def retornar_evento_completo(session: SessionDep, evento: Evento) -> dict:
+# O que `fields`/`include` (ver RecorteCamposUtil) podem recortar do evento
+# completo — participantes é a parte cara (pontos de cada um recalculados a
+# partir dos torneios do período).
+RELACOES_EVENTO = {"loja": None, "metas": None, "regras": None, "regras_manuais": None, "participantes": None}
+
+
+def retornar_evento_completo(session: SessionDep, evento: Evento, recorte: RecorteCampos | None = None) -> dict:
+    """Evento com loja, metas, regras e participantes (EventoCompletoPublico).
+    Relação fora do `recorte` não é carregada nem calculada — fica vazia e
+    sai da resposta no recorte final da rota."""
+    recorte = recorte or RecorteCampos()
     hoje = data_agora_brasil()
     if hoje < evento.data_inicio:
         status = "AGENDADO"
@@ -193,19 +193,19 @@ def retornar_evento_completo(session: SessionDep, evento: Evento) -> dict:
     return {
         "id": evento.id,
         "loja_id": evento.loja_id,
-        "loja": evento.loja,
+        "loja": evento.loja if recorte.inclui("loja") else None,
         "tcg": evento.tcg,
         "nome": evento.nome,
         "descricao": evento.descricao,
         "data_inicio": evento.data_inicio,
         "data_fim": evento.data_fim,
         "status": status,
-        "metas": sorted(evento.metas, key=lambda m: m.pontos_necessarios),
-        "regras": evento.regras,
-        "regras_manuais": evento.regras_manuais,
+        "metas": sorted(evento.metas, key=lambda m: m.pontos_necessarios) if recorte.inclui("metas") else [],
+        "regras": evento.regras if recorte.inclui("regras") else [],
+        "regras_manuais": evento.regras_manuais if recorte.inclui("regras_manuais") else [],
         "participantes": [
             retornar_participante_completo(session, evento, participante)
-            for participante in evento.participantes
+            for participante in (evento.participantes if recorte.inclui("participantes") else [])
         ],
     }
 
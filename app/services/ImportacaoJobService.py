@@ -0,0 +1,191 @@
+import logging
+import queue
+import threading
+from datetime import timedelta
+from io import BytesIO
+from typing import Callable
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import SessionDep, engine
+from app.core.exception import TopDeckedException
+from app.dependencies import definir_tenant_sessao
+from app.models import ImportacaoJob
+from app.services.ImportacaoService import gravar_tdf, ler_tdf, recalcular_conquistas_dos_torneios
+from app.utils.Enums import EtapaImportacao, StatusImportacaoJob
+from app.utils.datetimeUtil import agora_brasil
+
+# Importação de .tdf em segundo plano: POST /importacoes grava o arquivo num
+# ImportacaoJob e volta na hora; threads do próprio processo fazem a
+# leitura, a gravação e o recálculo de conquistas (ver importar_torneio, o
+# mesmo caminho feito dentro da requisição). A fila é do processo e
+# limitada — cheia, o envio é recusado em vez de acumular trabalho que
+# ninguém vai ver terminar. O que estava na fila quando o processo caiu
+# continua no banco e é retomado na subida (ver retomar_jobs_importacao).
+
+logger = logging.getLogger(__name__)
+
+
+class FilaImportacao:
+    def __init__(self, tamanho: int, trabalhadores: int, abrir_sessao: Callable[[], Session]):
+        self.trabalhadores = max(trabalhadores, 1)
+        self.abrir_sessao = abrir_sessao
+        self._fila: queue.Queue[str] = queue.Queue(maxsize=max(tamanho, 1))
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def enfileirar(self, job_id: str) -> bool:
+        """False com a fila cheia. As threads sobem no primeiro job."""
+        self._iniciar()
+        try:
+            self._fila.put_nowait(job_id)
+        except queue.Full:
+            return False
+        return True
+
+    def aguardar(self) -> None:
+        """Bloqueia até todos os jobs enfileirados terminarem."""
+        self._fila.join()
+
+    def _iniciar(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for numero in range(self.trabalhadores):
+                thread = threading.Thread(target=self._trabalhar, name=f"importacao-{numero}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _trabalhar(self) -> None:
+        while True:
+            job_id = self._fila.get()
+            try:
+                with self.abrir_sessao() as session:
+                    processar_job_importacao(session, job_id)
+            except Exception:
+                logger.exception("Falha ao processar a importação %s", job_id)
+            finally:
+                self._fila.task_done()
+
+
+fila_importacao = FilaImportacao(
+    settings.IMPORTACAO_FILA_TAMANHO, settings.IMPORTACAO_TRABALHADORES, lambda: Session(engine))
+
+
+def criar_job_importacao(session: SessionDep, arquivo: str, conteudo: bytes, loja_id: int) -> ImportacaoJob:
+    job = ImportacaoJob(loja_id=loja_id, arquivo=arquivo, conteudo=conteudo)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    if not fila_importacao.enfileirar(job.id):
+        session.delete(job)
+        session.commit()
+        raise TopDeckedException.service_unavailable(
+            "Há muitas importações na fila agora. Tente de novo em alguns minutos.")
+    return job
+
+
+def retomar_jobs_importacao(session: SessionDep) -> None:
+    """Na subida do servidor: a fila é só da memória do processo, então o
+    que ficou no banco sem terminar é retomado daqui.
+
+    - PROCESSANDO há mais que IMPORTACAO_JOB_LIMITE_MINUTOS: o processo que
+      pegou o job caiu no meio. Se o torneio já tinha sido gravado (etapa
+      CONQUISTAS) o job conclui; senão falha, e a loja envia de novo. Mais
+      novo que isso pode ser de outra réplica ainda trabalhando.
+    - PENDENTE: volta pra fila (o UPDATE condicional de
+      processar_job_importacao impede que duas réplicas processem o mesmo
+      job). O que não couber falha como um envio com a fila cheia."""
+    limite = agora_brasil() - timedelta(minutes=settings.IMPORTACAO_JOB_LIMITE_MINUTOS)
+    interrompidos = session.exec(select(ImportacaoJob.id, ImportacaoJob.etapa).where(
+        (ImportacaoJob.status == StatusImportacaoJob.PROCESSANDO) & (ImportacaoJob.iniciado_em < limite)
+    )).all()
+    for job_id, etapa in interrompidos:
+        if etapa == EtapaImportacao.CONQUISTAS:
+            _encerrar_job(session, job_id, StatusImportacaoJob.CONCLUIDO)
+        else:
+            _encerrar_job(session, job_id, StatusImportacaoJob.FALHOU,
+                          "A importação foi interrompida. Envie o arquivo de novo.")
+
+    pendentes = session.exec(
+        select(ImportacaoJob.id)
+        .where(ImportacaoJob.status == StatusImportacaoJob.PENDENTE)
+        .order_by(ImportacaoJob.criado_em)
+    ).all()
+    for job_id in pendentes:
+        if fila_importacao.enfileirar(job_id):
+            continue
+        recusado = session.execute(
+            update(ImportacaoJob)
+            .where((ImportacaoJob.id == job_id) & (ImportacaoJob.status == StatusImportacaoJob.PENDENTE))
+            .values(status=StatusImportacaoJob.FALHOU, conteudo=None, concluido_em=agora_brasil(),
+                    erro="Havia muitas importações na fila. Envie o arquivo de novo.")
+        )
+        session.commit()
+        if recusado.rowcount:
+            logger.warning("Importação %s descartada na retomada: fila cheia", job_id)
+
+
+def processar_job_importacao(session: SessionDep, job_id: str) -> None:
+    # PENDENTE -> PROCESSANDO num UPDATE condicional: um job nunca é
+    # processado duas vezes, nem se for enfileirado de novo.
+    assumido = session.execute(
+        update(ImportacaoJob)
+        .where((ImportacaoJob.id == job_id) & (ImportacaoJob.status == StatusImportacaoJob.PENDENTE))
+        .values(status=StatusImportacaoJob.PROCESSANDO, etapa=EtapaImportacao.LENDO_ARQUIVO,
+                iniciado_em=agora_brasil())
+    )
+    if assumido.rowcount != 1:
+        session.rollback()
+        return
+    session.commit()
+
+    job = session.get(ImportacaoJob, job_id)
+    definir_tenant_sessao(session, job.loja_id)
+    try:
+        tdf = ler_tdf(BytesIO(job.conteudo))
+
+        job.etapa = EtapaImportacao.GRAVANDO
+        session.add(job)
+        session.commit()
+
+        # O torneio e a etapa seguinte do job no mesmo commit.
+        torneio = gravar_tdf(session, tdf, job.loja_id)
+        job.torneio_id = torneio.id
+        job.etapa = EtapaImportacao.CONQUISTAS
+        session.add(job)
+        session.commit()
+    except HTTPException as erro:
+        session.rollback()
+        _encerrar_job(session, job_id, StatusImportacaoJob.FALHOU, erro.detail)
+        return
+    except Exception:
+        session.rollback()
+        logger.exception("Erro inesperado na importação %s", job_id)
+        _encerrar_job(session, job_id, StatusImportacaoJob.FALHOU, "Erro inesperado ao importar o torneio.")
+        return
+
+    # Daqui em diante o torneio já está gravado: falha nas conquistas não
+    # faz a importação falhar (elas se acertam no próximo recálculo do
+    # jogador) — só fica no log.
+    try:
+        recalcular_conquistas_dos_torneios(session, [job.torneio_id])
+    except Exception:
+        session.rollback()
+        logger.exception("Falha ao recalcular as conquistas da importação %s", job_id)
+
+    _encerrar_job(session, job_id, StatusImportacaoJob.CONCLUIDO)
+
+
+def _encerrar_job(session: SessionDep, job_id: str, status: StatusImportacaoJob, erro: str | None = None) -> None:
+    job = session.get(ImportacaoJob, job_id)
+    job.status = status
+    job.erro = erro
+    job.conteudo = None
+    job.concluido_em = agora_brasil()
+    session.add(job)
+    session.commit()
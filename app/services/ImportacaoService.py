@@ -1,14 +1,25 @@
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from io import BytesIO
+from typing import BinaryIO
+from sqlalchemy import insert, update
 from sqlmodel import select
 from fastapi import UploadFile, HTTPException
 import xml.etree.ElementTree as ET
 from app.core.exception import TopDeckedException
+from app.core.config import settings
 from app.core.db import SessionDep
 from app.utils.datetimeUtil import parse_data, parse_datetime, agora_brasil
 from app.models import Rodada, Torneio, JogadorTorneioLink, StatusTorneio, JogadorCriado, LojaJogadorLink
-from app.utils.Enums import TipoTorneio, TCG
+from app.schemas.Importacao import ResultadoImportacaoArquivo
+from app.utils.Enums import StatusImportacaoArquivo, TipoTorneio, TCG
 from app.utils.ImportacaoConstantes import TIPO_POD_FINALIZADO, TIPO_POD_DNF
 from app.services.ConquistaService import recalcular_conquistas_jogador
+from app.services.RankingService import atualizar_ranking_snapshot_torneio
 
 OUTCOME_JOGADOR1_VENCEU = 1
 OUTCOME_JOGADOR2_VENCEU = 2
@@ -23,13 +34,17 @@ def _erro_importacao(mensagem: str) -> HTTPException:
     )
 
 
+def _bloco_ausente(tag: str, contexto: str) -> HTTPException:
+    return _erro_importacao(
+        f"O bloco '{tag}' não foi encontrado {contexto} — esse arquivo pode ter um formato "
+        "de exportação diferente do que a plataforma espera."
+    )
+
+
 def _exigir_elemento(pai: ET.Element, tag: str, contexto: str) -> ET.Element:
     elemento = pai.find(tag)
     if elemento is None:
-        raise _erro_importacao(
-            f"O bloco '{tag}' não foi encontrado {contexto} — esse arquivo pode ter um formato "
-            "de exportação diferente do que a plataforma espera."
-        )
+        raise _bloco_ausente(tag, contexto)
     return elemento
 
 
@@ -51,109 +66,116 @@ def _int_obrigatorio(valor: str | None, descricao: str) -> int:
 
 
 def importar_torneio(session: SessionDep, arquivo: UploadFile, loja_id: int):
-    dados = arquivo.file.read()
+    # Tudo numa transação só: um arquivo que falha no meio (jogador da
+    # partida fora da lista, por exemplo) não deixa torneio, participação
+    # nem rodada pela metade no banco — e, na reimportação, o torneio
+    # antigo volta a existir.
     try:
-        xml = ET.fromstring(dados)
-    except ET.ParseError:
-        raise TopDeckedException.bad_request("Arquivo XML inválido")
+        torneio = gravar_tdf(session, ler_tdf(arquivo.file), loja_id)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    session.refresh(torneio)
+
+    recalcular_conquistas_dos_torneios(session, [torneio.id])
+
+    return torneio
 
-    _bloquear_se_houver_dnf(xml)
 
-    torneio = _importar_metadados(xml, loja_id)
+def gravar_tdf(session: SessionDep, tdf: "TdfLido", loja_id: int) -> Torneio:
+    """Cria na loja o torneio de um .tdf já lido (ver ler_tdf). Recusa
+    torneio que já existe. Não faz commit."""
+    torneio = _importar_metadados(tdf, loja_id)
 
     if session.get(Torneio, torneio.id):
         raise TopDeckedException.bad_request(
             f"Torneio já criado anteriormente")
 
+    _gravar_torneio(session, torneio, tdf)
+    return torneio
+
+
+def recalcular_conquistas_dos_torneios(session: SessionDep, torneio_ids: list[str]) -> None:
+    """Uma vez por jogador com conta, mesmo que ele esteja em vários dos
+    torneios. Cada recálculo faz seu próprio commit."""
+    for jogador_id in _jogadores_com_conta(session, torneio_ids):
+        recalcular_conquistas_jogador(session, jogador_id)
+
+
+def _gravar_torneio(session: SessionDep, torneio: Torneio, tdf: "TdfLido") -> None:
+    """Grava o torneio lido do arquivo, com participações, rodadas,
+    classificação e snapshot do ranking. Não faz commit."""
     session.add(torneio)
-    session.commit()
-    session.refresh(torneio)
+    session.flush()
 
-    jogadores_dict = _criar_relacao_jogador_torneio(xml, torneio, session)
-    inicio_real, fim_real = _importar_rodadas(xml, jogadores_dict, torneio.id, torneio.loja_id, session)
-    _importar_classificacao_oficial(xml, jogadores_dict, session)
+    jogadores_dict = _criar_relacao_jogador_torneio(tdf.jogadores, torneio, session)
+    _importar_partidas(tdf.partidas, jogadores_dict, torneio.id, torneio.loja_id, session)
+    _importar_classificacao_oficial(tdf.classificacao, jogadores_dict, session)
 
     # Torneio importado já nasce FINALIZADO, então nunca pode ficar sem data
     # real — o .tdf normalmente traz timestamps de partida suficientes pra
     # calculá-la, mas um arquivo sem rodadas (ou sem timestamp em nenhuma
     # partida) deixaria inicio_real/fim_real nulos sem este fallback.
-    torneio.inicio_real = inicio_real or agora_brasil()
-    torneio.fim_real = fim_real or agora_brasil()
+    torneio.inicio_real = tdf.inicio_real or agora_brasil()
+    torneio.fim_real = tdf.fim_real or agora_brasil()
     # Torneio importado é histórico, não uma reserva de vagas futura — "vagas"
     # aqui deve refletir quantos jogadores de fato participaram.
     torneio.vagas = len(jogadores_dict)
     session.add(torneio)
-    session.commit()
-    session.refresh(torneio)
+    atualizar_ranking_snapshot_torneio(session, torneio)
+
 
-    jogadores_ids = session.exec(
+def _jogadores_com_conta(session: SessionDep, torneio_ids: list[str]) -> list[int]:
+    """Jogadores com conta que participaram de algum dos torneios — os que
+    têm conquistas pra recalcular."""
+    if not torneio_ids:
+        return []
+    return session.exec(
         select(JogadorCriado.jogador_id)
         .join(JogadorTorneioLink, JogadorTorneioLink.jogador_criado_id == JogadorCriado.id)
         .where(
-            (JogadorTorneioLink.torneio_id == torneio.id) &
+            (JogadorTorneioLink.torneio_id.in_(torneio_ids)) &
             (JogadorCriado.jogador_id.is_not(None))
         )
         .distinct()
     ).all()
-    for jogador_id in jogadores_ids:
-        recalcular_conquistas_jogador(session, jogador_id)
-
-    return torneio
-
 
-def _bloquear_se_houver_dnf(xml: ET.Element) -> None:
-    standings = xml.find("standings")
-    if standings is None:
-        return
 
-    for pod in standings.findall("pod"):
-        if pod.get("type") == TIPO_POD_DNF and pod.find("player") is not None:
-            raise TopDeckedException.bad_request(
-                "Atenção: Existem jogadores com status DNF neste torneio. A importação foi "
-                "bloqueada. Por favor, entre em contato com o administrador do sistema."
+def _importar_classificacao_oficial(classificacao: list[tuple[str | None, str | None]], jogadores_dict: dict, session: SessionDep) -> None:
+    colocacoes = []
+    for userid, colocacao_str in classificacao:
+        if userid is None:
+            raise _erro_importacao(
+                "O atributo 'id' não foi encontrado de um jogador na classificação final do arquivo — "
+                "esse arquivo pode ter um formato de exportação diferente do que a plataforma espera."
             )
+        colocacao = _int_obrigatorio(colocacao_str, "A colocação final de um jogador na classificação do arquivo")
 
+        link_id = jogadores_dict.get(userid)
+        if link_id is None:
+            raise _erro_importacao(
+                f"O jogador de ID '{userid}' aparece na classificação final, mas não está na "
+                "lista de jogadores do torneio — o arquivo pode estar incompleto ou corrompido."
+            )
+        colocacoes.append({"id": link_id, "classificacao_oficial": colocacao})
 
-def _importar_classificacao_oficial(xml: ET.Element, jogadores_dict: dict, session: SessionDep) -> None:
-    standings = xml.find("standings")
-    if standings is None:
-        return
-
-    for pod in standings.findall("pod"):
-        if pod.get("type") != TIPO_POD_FINALIZADO:
-            continue
-
-        for jogador_el in pod.findall("player"):
-            userid = _exigir_atributo(jogador_el, "id", "de um jogador na classificação final do arquivo")
-            colocacao = _int_obrigatorio(
-                jogador_el.get("place"), "A colocação final de um jogador na classificação do arquivo")
-
-            link_id = jogadores_dict.get(userid)
-            if link_id is None:
-                raise _erro_importacao(
-                    f"O jogador de ID '{userid}' aparece na classificação final, mas não está na "
-                    "lista de jogadores do torneio — o arquivo pode estar incompleto ou corrompido."
-                )
-
-            link = session.get(JogadorTorneioLink, link_id)
-            link.classificacao_oficial = colocacao
-            session.add(link)
-
-    session.commit()
+    if colocacoes:
+        session.execute(update(JogadorTorneioLink), colocacoes)
 
 
-def _importar_metadados(xml: ET.Element, loja_id: int):
-    dados = xml.find("data")
+def _importar_metadados(tdf: "TdfLido", loja_id: int):
+    dados = tdf.dados
     if dados is None:
         raise TopDeckedException.bad_request(
             "Bloco 'data' não encontrado no XML")
 
-    id = dados.findtext("id", default="")
-    nome = dados.findtext("name")
-    cidade = dados.findtext("city")
-    estado = dados.findtext("state")
-    tempo_por_rodada = dados.findtext("roundtime", default="30")
-    data_planejada_str = dados.findtext("startdate")
+    id = dados.get("id", "")
+    nome = dados.get("name")
+    cidade = dados.get("city")
+    estado = dados.get("state")
+    tempo_por_rodada = dados.get("roundtime", "30")
+    data_planejada_str = dados.get("startdate")
 
     if not cidade or not data_planejada_str:
         raise TopDeckedException.bad_request(
@@ -194,191 +216,471 @@ def _data_nascimento_importada(birthdate_str: str | None):
         return None
 
 
-def _criar_relacao_jogador_torneio(xml: ET.Element, torneio: Torneio, session: SessionDep):
-    jogadores_dict = {}
-
-    dados = xml.find("players")
-
-    if dados is None:
-        return jogadores_dict
-
-    for jogador in dados.findall("player"):
-        gameid_importado = jogador.attrib.get("userid")
-        if not gameid_importado:
-            raise _erro_importacao(
-                "Um jogador do arquivo não tem ID ('userid') — não é possível identificá-lo."
-            )
-        primeiro_nome = jogador.findtext("firstname", "").strip()
-        ultimo_nome = jogador.findtext("lastname", "").strip()
-        nome = f"{primeiro_nome} {ultimo_nome}".strip()
-
-        jogador_criado = session.exec(
-            select(JogadorCriado).where(
-                (JogadorCriado.game_id == gameid_importado) &
-                (JogadorCriado.tcg == TCG.POKEMON)
-            )
-        ).first()
-
-        if not jogador_criado:
-            jogador_criado = JogadorCriado(
-                game_id=gameid_importado,
-                tcg=TCG.POKEMON,
-                apelido=nome,
+def _criar_relacao_jogador_torneio(jogadores: list[tuple[str, str, str | None]], torneio: Torneio, session: SessionDep):
+    """Cria as participações do torneio (e os JogadorCriado/LojaJogadorLink
+    que faltarem) com uma consulta e um INSERT em lote por tabela, em vez de
+    uma ida ao banco por jogador. Retorna {userid do arquivo: id da
+    participação}."""
+    if not jogadores:
+        return {}
+
+    game_ids = {gameid_importado for gameid_importado, _, _ in jogadores}
+    existentes = _jogadores_criados_por_game_id(session, game_ids)
+
+    novos = {}
+    for gameid_importado, nome, birthdate_str in jogadores:
+        if gameid_importado not in existentes and gameid_importado not in novos:
+            novos[gameid_importado] = {
+                "game_id": gameid_importado,
+                "tcg": TCG.POKEMON,
+                "apelido": nome,
                 # Só preenchida na criação — se o JogadorCriado já existir
                 # (import repetido, ou já veio de outra loja/torneio), o
                 # valor atual é mantido como está, mesmo que seja None.
-                data_nascimento=_data_nascimento_importada(jogador.findtext("birthdate")),
+                "data_nascimento": _data_nascimento_importada(birthdate_str),
+            }
+    if novos:
+        session.execute(insert(JogadorCriado), list(novos.values()))
+        existentes.update(_jogadores_criados_por_game_id(session, set(novos)))
+
+    # Jogador com conta que ainda não tem vínculo com a loja ganha um, com o
+    # apelido da primeira vez que aparece no arquivo.
+    apelido_por_jogador = {}
+    for gameid_importado, nome, _ in jogadores:
+        jogador_id = existentes[gameid_importado][1]
+        if jogador_id is not None:
+            apelido_por_jogador.setdefault(jogador_id, nome)
+    if apelido_por_jogador:
+        ja_vinculados = set(session.exec(
+            select(LojaJogadorLink.jogador_id).where(
+                (LojaJogadorLink.loja_id == torneio.loja_id) &
+                (LojaJogadorLink.jogador_id.in_(apelido_por_jogador))
             )
-            session.add(jogador_criado)
-            session.flush()
-            session.refresh(jogador_criado)
-
-        if jogador_criado.jogador_id:
-            link_loja = session.exec(select(LojaJogadorLink)
-                                    .where((LojaJogadorLink.loja_id == torneio.loja_id) &
-                                            (LojaJogadorLink.jogador_id == jogador_criado.jogador_id))).first()
-            if not link_loja:
-                novo_link_loja = LojaJogadorLink(jogador_id=jogador_criado.jogador_id,
-                                                 apelido=nome,
-                                                 loja_id=torneio.loja_id)
-                session.add(novo_link_loja)
-
-        participacao = JogadorTorneioLink(
-            jogador_criado_id=jogador_criado.id,
-            torneio_id=torneio.id,
-            loja_id=torneio.loja_id,
-            apelido=nome,
+        ).all())
+        vinculos = [
+            {"jogador_id": jogador_id, "apelido": apelido, "loja_id": torneio.loja_id}
+            for jogador_id, apelido in apelido_por_jogador.items()
+            if jogador_id not in ja_vinculados
+        ]
+        if vinculos:
+            session.execute(insert(LojaJogadorLink), vinculos)
+
+    session.execute(insert(JogadorTorneioLink), [
+        {
+            "jogador_criado_id": existentes[gameid_importado][0],
+            "torneio_id": torneio.id,
+            "loja_id": torneio.loja_id,
+            "apelido": nome,
+        }
+        for gameid_importado, nome, _ in jogadores
+    ])
+    # Os ids voltam numa consulta pelo torneio — cada JogadorCriado tem no
+    # máximo uma participação nele.
+    link_por_jogador_criado = dict(session.exec(
+        select(JogadorTorneioLink.jogador_criado_id, JogadorTorneioLink.id)
+        .where(JogadorTorneioLink.torneio_id == torneio.id)
+    ).all())
+
+    return {
+        gameid_importado: link_por_jogador_criado[jogador_criado_id]
+        for gameid_importado, (jogador_criado_id, _) in existentes.items()
+    }
+
+
+def _jogadores_criados_por_game_id(session: SessionDep, game_ids: set[str]) -> dict[str, tuple[int, int | None]]:
+    """{game_id: (id do JogadorCriado, jogador_id)} dos game_ids que já existem no Pokémon."""
+    linhas = session.exec(
+        select(JogadorCriado.game_id, JogadorCriado.id, JogadorCriado.jogador_id).where(
+            (JogadorCriado.game_id.in_(game_ids)) &
+            (JogadorCriado.tcg == TCG.POKEMON)
         )
+    ).all()
+    return {game_id: (jogador_criado_id, jogador_id) for game_id, jogador_criado_id, jogador_id in linhas}
 
-        session.add(participacao)
-        session.commit()
-        session.refresh(participacao)
 
-        jogadores_dict[gameid_importado] = participacao.id
+def _importar_partidas(partidas: list[tuple], jogadores_dict: dict, torneio_id: str, loja_id: int, session: SessionDep) -> None:
+    linhas = []
+    for num_rodada, jogador1_id, jogador2_id, vencedor, mesa, data_de_inicio in partidas:
+        # Partida "bye" (rodada ímpar): o XML só traz um único <player>, então
+        # jogador2_id/vencedor podem ser None aqui — não são gameids reais,
+        # então não estão (e não devem estar) em jogadores_dict.
+        try:
+            jogador1_link_id = jogadores_dict[jogador1_id]
+            jogador2_link_id = jogadores_dict[jogador2_id] if jogador2_id is not None else None
+            vencedor_link_id = jogadores_dict[vencedor] if vencedor is not None else None
+        except KeyError as chave_ausente:
+            raise _erro_importacao(
+                f"O jogador de ID '{chave_ausente.args[0]}' aparece numa partida da rodada "
+                f"{num_rodada}, mas não está na lista de jogadores do torneio — o arquivo pode "
+                "estar incompleto ou corrompido."
+            )
+
+        linhas.append({
+            "jogador1_id": jogador1_link_id,
+            "jogador2_id": jogador2_link_id,
+            "vencedor_id": vencedor_link_id,
+            "torneio_id": torneio_id,
+            "loja_id": loja_id,
+            "num_rodada": num_rodada,
+            "mesa": mesa,
+            "data_de_inicio": data_de_inicio,
+            "finalizada": True,
+        })
+
+    # Todas as rodadas do arquivo num INSERT em lote só.
+    if linhas:
+        session.execute(insert(Rodada), linhas)
+
+
+# Leitura do .tdf
+#
+# O arquivo é lido em fluxo (iterparse), numa passada só: cada <player>,
+# <match> e jogador da classificação vira uma tupla assim que o elemento
+# fecha e é descartado da árvore em seguida, então a memória fica no tamanho
+# das tuplas, não no da árvore XML inteira. Tudo que dá pra validar sem o
+# banco é validado aqui, com as mesmas mensagens de antes; o que depende dos
+# ids do banco (jogador da partida fora da lista de jogadores, por exemplo)
+# fica para a gravação.
+
+_DATA = ("data",)
+_JOGADOR = ("players", "player")
+_PODS = ("pods",)
+_POD = ("pods", "pod")
+_ROUNDS = ("pods", "pod", "rounds")
+_RODADA = ("pods", "pod", "rounds", "round")
+_MATCHES = ("pods", "pod", "rounds", "round", "matches")
+_PARTIDA = ("pods", "pod", "rounds", "round", "matches", "match")
+_POD_CLASSIFICACAO = ("standings", "pod")
+_JOGADOR_CLASSIFICACAO = ("standings", "pod", "player")
+
+
+class TdfLido:
+    """O que a importação usa de um .tdf: `dados` os textos do bloco <data>
+    (None sem o bloco), `jogadores` (userid, nome, birthdate), `partidas`
+    (rodada, userid 1, userid 2, userid vencedor, mesa, início) na ordem do
+    arquivo, `classificacao` (id, place) dos pods finalizados, e
+    `inicio_real`/`fim_real` — primeiro timestamp da menor rodada e último
+    da maior."""
+
+    def __init__(self):
+        self.dados: dict[str, str] | None = None
+        self.jogadores: list[tuple[str, str, str | None]] = []
+        self.partidas: list[tuple[int, str, str | None, str | None, int, datetime]] = []
+        self.classificacao: list[tuple[str | None, str | None]] = []
+        self.inicio_real: datetime | None = None
+        self.fim_real: datetime | None = None
+        # rodada -> (primeiro, último) timestamp
+        self._horarios: dict[int, tuple[datetime, datetime]] = {}
+
+    def _registrar_horario(self, num_rodada: int, horario: datetime) -> None:
+        primeiro, ultimo = self._horarios.get(num_rodada, (horario, horario))
+        self._horarios[num_rodada] = (min(primeiro, horario), max(ultimo, horario))
+
+    def _fechar(self) -> None:
+        if self._horarios:
+            self.inicio_real = self._horarios[min(self._horarios)][0]
+            self.fim_real = self._horarios[max(self._horarios)][1]
+
+
+def ler_tdf(arquivo: BinaryIO) -> TdfLido:
+    tdf = TdfLido()
+    caminho: list[str] = []
+    abertos: list[ET.Element] = []
+    # Blocos obrigatórios já vistos dentro do elemento aberto correspondente.
+    tem_pods = False
+    pod_tem_rounds = False
+    rodada_tem_matches = False
+    num_rodada = 0
+    tipo_pod_classificacao = None
 
-    return jogadores_dict
+    try:
+        for evento, elemento in ET.iterparse(arquivo, events=("start", "end")):
+            if evento == "start":
+                caminho.append(elemento.tag)
+                abertos.append(elemento)
+                atual = tuple(caminho[1:])
+                if atual == _POD:
+                    pod_tem_rounds = False
+                elif atual == _RODADA:
+                    num_rodada = _int_obrigatorio(elemento.get("number"), "O número de uma rodada")
+                    rodada_tem_matches = False
+                elif atual == _POD_CLASSIFICACAO:
+                    tipo_pod_classificacao = elemento.get("type")
+                continue
+
+            atual = tuple(caminho[1:])
+            descartar = True
+            if atual == _DATA:
+                if tdf.dados is None:
+                    tdf.dados = {filho.tag: filho.text or "" for filho in reversed(elemento)}
+            elif atual == _JOGADOR:
+                tdf.jogadores.append(_ler_jogador(elemento))
+            elif atual == _PARTIDA:
+                partida = _ler_partida(elemento, num_rodada)
+                tdf._registrar_horario(num_rodada, partida[5])
+                tdf.partidas.append(partida)
+            elif atual == _JOGADOR_CLASSIFICACAO:
+                if tipo_pod_classificacao == TIPO_POD_DNF:
+                    raise TopDeckedException.bad_request(
+                        "Atenção: Existem jogadores com status DNF neste torneio. A importação foi "
+                        "bloqueada. Por favor, entre em contato com o administrador do sistema."
+                    )
+                if tipo_pod_classificacao == TIPO_POD_FINALIZADO:
+                    tdf.classificacao.append((elemento.get("id"), elemento.get("place")))
+            elif atual == _MATCHES:
+                rodada_tem_matches = True
+            elif atual == _RODADA:
+                if not rodada_tem_matches:
+                    raise _bloco_ausente("matches", f"na rodada {num_rodada} do arquivo")
+            elif atual == _ROUNDS:
+                pod_tem_rounds = True
+            elif atual == _POD:
+                if not pod_tem_rounds:
+                    raise _bloco_ausente("rounds", "dentro de um 'pod' do arquivo")
+            elif atual == _PODS:
+                tem_pods = True
+            else:
+                descartar = False
+
+            caminho.pop()
+            abertos.pop()
+            if descartar and abertos:
+                abertos[-1].remove(elemento)
+    except ET.ParseError:
+        raise TopDeckedException.bad_request("Arquivo XML inválido")
 
+    if not tem_pods:
+        raise _bloco_ausente("pods", "no arquivo")
 
-def _importar_rodadas(xml: ET.Element, jogadores_dict: dict, torneio_id: str, loja_id: int, session: SessionDep):
-    pods = _exigir_elemento(xml, "pods", "no arquivo").findall("pod")
-    rodadas = []
-    for pod in pods:
-        rounds_el = _exigir_elemento(pod, "rounds", "dentro de um 'pod' do arquivo")
-        rodadas.extend(rounds_el.findall("round"))
+    tdf._fechar()
+    return tdf
 
-    inicio_real = _calcular_inicio_real(rodadas)
-    fim_real = _calcular_fim_real(rodadas)
 
-    for rodada in rodadas:
-        num_rodada = _int_obrigatorio(rodada.get("number"), "O número de uma rodada")
-        partidas = _exigir_elemento(rodada, "matches", f"na rodada {num_rodada} do arquivo")
+def _ler_jogador(jogador: ET.Element) -> tuple[str, str, str | None]:
+    gameid_importado = jogador.attrib.get("userid")
+    if not gameid_importado:
+        raise _erro_importacao(
+            "Um jogador do arquivo não tem ID ('userid') — não é possível identificá-lo."
+        )
+    primeiro_nome = jogador.findtext("firstname", "").strip()
+    ultimo_nome = jogador.findtext("lastname", "").strip()
+    nome = f"{primeiro_nome} {ultimo_nome}".strip()
+    return gameid_importado, nome, jogador.findtext("birthdate")
+
+
+def _ler_partida(partida: ET.Element, num_rodada: int) -> tuple[int, str, str | None, str | None, int, datetime]:
+    jogador1_id = None
+    jogador2_id = None
+
+    jogador = partida.find("player")
+    if jogador is not None:
+        jogador1_id = _exigir_atributo(
+            jogador, "userid", f"de um jogador (partida com bye) da rodada {num_rodada}")
+    else:
+        player1_el = _exigir_elemento(partida, "player1", f"numa partida da rodada {num_rodada}")
+        player2_el = _exigir_elemento(partida, "player2", f"numa partida da rodada {num_rodada}")
+        jogador1_id = _exigir_atributo(player1_el, "userid", f"do jogador 1 de uma partida da rodada {num_rodada}")
+        jogador2_id = _exigir_atributo(player2_el, "userid", f"do jogador 2 de uma partida da rodada {num_rodada}")
+
+    outcome_str = partida.get("outcome")
+    if outcome_str is None:
+        raise _erro_importacao(
+            f"Uma partida da rodada {num_rodada} não tem o resultado ('outcome') no arquivo — "
+            "não é possível saber quem venceu."
+        )
+    outcome = _int_obrigatorio(outcome_str, f"O resultado ('outcome') de uma partida da rodada {num_rodada}")
+
+    if outcome == OUTCOME_JOGADOR1_VENCEU:
+        vencedor = jogador1_id
+    elif outcome == OUTCOME_JOGADOR2_VENCEU:
+        vencedor = jogador2_id
+    elif outcome == OUTCOME_EMPATE:
+        vencedor = None
+    elif outcome == OUTCOME_BYE:
+        vencedor = jogador1_id
+    else:
+        raise _erro_importacao(
+            f"O resultado (outcome={outcome}) de uma partida da rodada {num_rodada} não é um "
+            "valor reconhecido pela plataforma (esperado 1, 2, 3 ou 5)."
+        )
 
-        _importar_partidas(partidas, jogadores_dict, torneio_id, loja_id, num_rodada, session)
+    mesa = _int_obrigatorio(
+        partida.findtext("tablenumber"), f"O número da mesa de uma partida da rodada {num_rodada}")
+
+    data_de_inicio = parse_datetime(partida.findtext("timestamp"))
+
+    return num_rodada, jogador1_id, jogador2_id, vencedor, mesa, data_de_inicio
+
+
+# Importação em lote
+#
+# Vários .tdf (soltos ou dentro de .zip) de uma vez: a leitura — a parte que
+# só usa CPU — roda num pool de processos, e a gravação segue a ordem do
+# envio, em transações de até IMPORTACAO_LOTE_TAMANHO torneios. As
+# conquistas são recalculadas uma vez por jogador no fim, não uma vez por
+# arquivo.
+
+_pool_leitura: ProcessPoolExecutor | None = None
+_pool_leitura_lock = threading.Lock()
+
+
+def arquivos_do_upload(nome: str, conteudo: bytes, recebidos: list[tuple[str, bytes]]) -> list[tuple[str, bytes]]:
+    """Um arquivo enviado vira a lista de .tdf que ele contém: ele mesmo,
+    ou cada .tdf de dentro de um .zip (nomeados "lote.zip/arquivo.tdf").
+
+    Os limites do envio (IMPORTACAO_LOTE_MAX_ARQUIVOS, IMPORTACAO_TDF_MAX_BYTES
+    e IMPORTACAO_LOTE_MAX_BYTES), contando o que já foi `recebidos`, são
+    conferidos pelo índice do .zip antes de descompactar qualquer coisa, e
+    cada entrada é lida só até o limite — o tamanho declarado no índice
+    pode mentir."""
+    quantidade = len(recebidos)
+    total = sum(len(tdf) for _, tdf in recebidos)
+
+    if not zipfile.is_zipfile(BytesIO(conteudo)):
+        _conferir_limites_do_lote(nome, quantidade + 1, len(conteudo), total + len(conteudo))
+        return [(nome, conteudo)]
+
+    with zipfile.ZipFile(BytesIO(conteudo)) as compactado:
+        entradas = [
+            entrada for entrada in compactado.infolist()
+            if not entrada.is_dir() and entrada.filename.lower().endswith(".tdf")
+            and not entrada.filename.startswith("__MACOSX/")
+        ]
+        quantidade += len(entradas)
+        for entrada in entradas:
+            total += entrada.file_size
+            _conferir_limites_do_lote(f"{nome}/{entrada.filename}", quantidade, entrada.file_size, total)
+
+        arquivos = []
+        for entrada in entradas:
+            nome_entrada = f"{nome}/{entrada.filename}"
+            with compactado.open(entrada) as descompactado:
+                tdf = descompactado.read(settings.IMPORTACAO_TDF_MAX_BYTES + 1)
+            _conferir_limites_do_lote(nome_entrada, quantidade, len(tdf), 0)
+            arquivos.append((nome_entrada, tdf))
+        return arquivos
+
+
+def _conferir_limites_do_lote(nome: str, quantidade: int, tamanho: int, total: int) -> None:
+    if quantidade > settings.IMPORTACAO_LOTE_MAX_ARQUIVOS:
+        raise TopDeckedException.bad_request(
+            f"Envie no máximo {settings.IMPORTACAO_LOTE_MAX_ARQUIVOS} arquivos .tdf por vez")
+    if tamanho > settings.IMPORTACAO_TDF_MAX_BYTES:
+        raise TopDeckedException.bad_request(
+            f"{nome}: um .tdf pode ter no máximo {settings.IMPORTACAO_TDF_MAX_BYTES // 1024} KB")
+    if total > settings.IMPORTACAO_LOTE_MAX_BYTES:
+        raise TopDeckedException.bad_request(
+            f"Os .tdf do envio podem somar no máximo {settings.IMPORTACAO_LOTE_MAX_BYTES // 1024} KB descompactados")
 
-    return inicio_real, fim_real
 
+def importar_torneios_em_lote(session: SessionDep, arquivos: list[tuple[str, bytes]], loja_id: int) -> list[ResultadoImportacaoArquivo]:
+    resultados = [ResultadoImportacaoArquivo(arquivo=nome, status=StatusImportacaoArquivo.FALHOU) for nome, _ in arquivos]
+    lidos = _ler_varios_tdf([conteudo for _, conteudo in arquivos])
 
-def _timestamps_da_rodada(rodadas: list[ET.Element], numero: int) -> list[datetime]:
-    stamps = []
-    for rodada in rodadas:
-        if _int_obrigatorio(rodada.get("number"), "O número de uma rodada") != numero:
+    # (posição no envio, torneio, arquivo lido) dos que vão pro banco.
+    pendentes: list[tuple[int, Torneio, TdfLido]] = []
+    ids_no_envio = set()
+    for posicao, (tdf, motivo) in enumerate(lidos):
+        resultado = resultados[posicao]
+        if tdf is None:
+            resultado.motivo = motivo
+            continue
+        try:
+            torneio = _importar_metadados(tdf, loja_id)
+        except HTTPException as erro:
+            resultado.motivo = erro.detail
             continue
-        matches_el = _exigir_elemento(rodada, "matches", f"na rodada {numero} do arquivo")
-        for match in matches_el.findall("match"):
-            ts = match.findtext("timestamp")
-            if ts:
-                stamps.append(parse_datetime(ts))
-    return stamps
 
+        resultado.torneio_id = torneio.id
+        if torneio.id in ids_no_envio or session.get(Torneio, torneio.id):
+            resultado.status = StatusImportacaoArquivo.DUPLICADO
+            continue
+        ids_no_envio.add(torneio.id)
+        pendentes.append((posicao, torneio, tdf))
 
-def _calcular_inicio_real(rodadas: list[ET.Element]) -> datetime | None:
-    if not rodadas:
-        return None
-    primeira_rodada_num = min(_int_obrigatorio(r.get("number"), "O número de uma rodada") for r in rodadas)
-    stamps = _timestamps_da_rodada(rodadas, primeira_rodada_num)
-    return min(stamps) if stamps else None
+    tamanho = max(settings.IMPORTACAO_LOTE_TAMANHO, 1)
+    for inicio in range(0, len(pendentes), tamanho):
+        lote = pendentes[inicio:inicio + tamanho]
+        if _gravar_lote(session, lote, resultados) or len(lote) == 1:
+            continue
+        # Um arquivo do lote falhou na gravação e levou o lote junto: regrava
+        # um a um, pra só ele ficar de fora.
+        for posicao, torneio, tdf in lote:
+            _gravar_lote(session, [(posicao, _importar_metadados(tdf, loja_id), tdf)], resultados)
 
+    recalcular_conquistas_dos_torneios(
+        session, [r.torneio_id for r in resultados if r.status == StatusImportacaoArquivo.IMPORTADO])
 
-def _calcular_fim_real(rodadas: list[ET.Element]) -> datetime | None:
-    if not rodadas:
-        return None
-    ultima_rodada_num = max(_int_obrigatorio(r.get("number"), "O número de uma rodada") for r in rodadas)
-    stamps = _timestamps_da_rodada(rodadas, ultima_rodada_num)
-    return max(stamps) if stamps else None
-
-
-def _importar_partidas(partidas: ET.Element, jogadores_dict: dict, torneio_id: str, loja_id: int, num_rodada: int, session: SessionDep):
-    partidas_criadas = []
-    for partida in partidas.findall("match"):
-        jogador1_id = None
-        jogador2_id = None
-
-        jogador = partida.find("player")
-        if jogador is not None:
-            jogador1_id = _exigir_atributo(
-                jogador, "userid", f"de um jogador (partida com bye) da rodada {num_rodada}")
-        else:
-            player1_el = _exigir_elemento(partida, "player1", f"numa partida da rodada {num_rodada}")
-            player2_el = _exigir_elemento(partida, "player2", f"numa partida da rodada {num_rodada}")
-            jogador1_id = _exigir_atributo(player1_el, "userid", f"do jogador 1 de uma partida da rodada {num_rodada}")
-            jogador2_id = _exigir_atributo(player2_el, "userid", f"do jogador 2 de uma partida da rodada {num_rodada}")
-
-        outcome_str = partida.get("outcome")
-        if outcome_str is None:
-            raise _erro_importacao(
-                f"Uma partida da rodada {num_rodada} não tem o resultado ('outcome') no arquivo — "
-                "não é possível saber quem venceu."
-            )
-        outcome = _int_obrigatorio(outcome_str, f"O resultado ('outcome') de uma partida da rodada {num_rodada}")
-
-        if outcome == OUTCOME_JOGADOR1_VENCEU:
-            vencedor = jogador1_id
-        elif outcome == OUTCOME_JOGADOR2_VENCEU:
-            vencedor = jogador2_id
-        elif outcome == OUTCOME_EMPATE:
-            vencedor = None
-        elif outcome == OUTCOME_BYE:
-            vencedor = jogador1_id
-        else:
-            raise _erro_importacao(
-                f"O resultado (outcome={outcome}) de uma partida da rodada {num_rodada} não é um "
-                "valor reconhecido pela plataforma (esperado 1, 2, 3 ou 5)."
-            )
+    return resultados
 
-        mesa = _int_obrigatorio(
-            partida.findtext("tablenumber"), f"O número da mesa de uma partida da rodada {num_rodada}")
 
-        timestamp_str = partida.findtext("timestamp")
-        data_de_inicio = parse_datetime(timestamp_str)
+def _gravar_lote(session: SessionDep, lote: list[tuple[int, Torneio, "TdfLido"]], resultados: list[ResultadoImportacaoArquivo]) -> bool:
+    """Grava os torneios do lote numa transação só. Se algum falhar, nada
+    do lote fica no banco e o motivo vai pros resultados dele (com mais de
+    um no lote, não dá pra saber de quem é a culpa — quem chama regrava um
+    a um)."""
+    try:
+        for _, torneio, tdf in lote:
+            _gravar_torneio(session, torneio, tdf)
+        session.commit()
+    except Exception as erro:
+        session.rollback()
+        motivo = erro.detail if isinstance(erro, HTTPException) else "Erro ao gravar o torneio no banco."
+        for posicao, _, _ in lote:
+            resultados[posicao].motivo = motivo
+        return False
+
+    for posicao, torneio, _ in lote:
+        resultados[posicao].status = StatusImportacaoArquivo.IMPORTADO
+        resultados[posicao].torneio_id = torneio.id
+        resultados[posicao].motivo = None
+    return True
+
+
+def _ler_tdf_de_bytes(conteudo: bytes) -> tuple["TdfLido | None", str | None]:
+    """Roda nos processos do pool: devolve o arquivo lido ou o motivo da
+    recusa (a HTTPException em si não atravessa o pickle)."""
+    try:
+        return ler_tdf(BytesIO(conteudo)), None
+    except HTTPException as erro:
+        return None, erro.detail
 
-        # Partida "bye" (rodada ímpar): o XML só traz um único <player>, então
-        # jogador2_id/vencedor podem ser None aqui — não são gameids reais,
-        # então não estão (e não devem estar) em jogadores_dict.
+
+def _ler_varios_tdf(conteudos: list[bytes]) -> list[tuple["TdfLido | None", str | None]]:
+    if settings.IMPORTACAO_PROCESSOS <= 1 or len(conteudos) <= 1:
+        return [_ler_tdf_de_bytes(conteudo) for conteudo in conteudos]
+
+    pool = _pool_de_leitura()
+    futuros = [pool.submit(_ler_tdf_de_bytes, conteudo) for conteudo in conteudos]
+    lidos = []
+    for futuro in futuros:
         try:
-            jogador1_link_id = jogadores_dict[jogador1_id]
-            jogador2_link_id = jogadores_dict[jogador2_id] if jogador2_id is not None else None
-            vencedor_link_id = jogadores_dict[vencedor] if vencedor is not None else None
-        except KeyError as chave_ausente:
-            raise _erro_importacao(
-                f"O jogador de ID '{chave_ausente.args[0]}' aparece numa partida da rodada "
-                f"{num_rodada}, mas não está na lista de jogadores do torneio — o arquivo pode "
-                "estar incompleto ou corrompido."
+            lidos.append(futuro.result())
+        except BrokenProcessPool:
+            _descartar_pool_de_leitura(pool)
+            lidos.append((None, "A leitura do arquivo foi interrompida. Tente enviá-lo de novo."))
+        except Exception:
+            lidos.append((None, "Erro inesperado ao ler o arquivo."))
+    return lidos
+
+
+def _pool_de_leitura() -> ProcessPoolExecutor:
+    """Pool do processo, criado no primeiro lote. Processos novos com
+    "spawn", não "fork": o servidor tem threads e conexões abertas que um
+    fork copiaria pela metade."""
+    global _pool_leitura
+    with _pool_leitura_lock:
+        if _pool_leitura is None:
+            _pool_leitura = ProcessPoolExecutor(
+                max_workers=settings.IMPORTACAO_PROCESSOS,
+                mp_context=multiprocessing.get_context("spawn"),
             )
+        return _pool_leitura
 
-        partida_criada = Rodada(
-            jogador1_id=jogador1_link_id,
-            jogador2_id=jogador2_link_id,
-            vencedor_id=vencedor_link_id,
-            torneio_id=torneio_id,
-            loja_id=loja_id,
-            num_rodada=num_rodada,
-            mesa=mesa,
-            data_de_inicio=data_de_inicio,
-            finalizada=True
-        )
-        session.add(partida_criada)
-        session.commit()
-        session.refresh(partida_criada)
-        partidas_criadas.append(partida_criada)
 
-    return partidas_criadas
+def _descartar_pool_de_leitura(pool: ProcessPoolExecutor) -> None:
+    global _pool_leitura
+    with _pool_leitura_lock:
+        if _pool_leitura is pool:
+            _pool_leitura = None
+    pool.shutdown(wait=False, cancel_futures=True)
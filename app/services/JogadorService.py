@@ -5,8 +5,11 @@ from sqlmodel import select, text
 from sqlalchemy import func
 from typing import List
 from app.utils.Enums import MesEnum, TCG
-from app.services.RankingService import calcula_ranking_geral, calcular_taxa_vitoria
-from app.utils.datetimeUtil import data_agora_brasil
+from app.services.RankingService import (
+    posicao_no_ranking_geral, calcular_taxas_vitoria, estatisticas_mensais_do_jogador, atualizar_estatisticas_mensais,
+    lados_das_rodadas, contagem_vde,
+)
+from app.services.RankingCacheService import invalidar_todo_ranking_apos_commit
 from app.utils.Enums import StatusTorneio, TipoTorneio
 from app.utils.TorneioDataUtil import data_efetiva_torneio
 from app.schemas.GameID import GameIDPublico
@@ -26,7 +29,7 @@ def apagar_jogador_completo(session: SessionDep, jogador: Jogador) -> None:
     DELETE do banco. Não faz commit — quem chama decide quando."""
     jogador_id = jogador.id
 
-    session.exec(text("UPDATE jogadorcriado SET jogador_id = NULL WHERE jogador_id = :jogador_id").bindparams(jogador_id=jogador_id))
+    session.exec(text("UPDATE jogadorcriado SET jogador_id = NULL, versao = versao + 1 WHERE jogador_id = :jogador_id").bindparams(jogador_id=jogador_id))
     session.exec(text("UPDATE historicocredito SET jogador_id = NULL WHERE jogador_id = :jogador_id").bindparams(jogador_id=jogador_id))
     session.exec(text("UPDATE transacao SET jogador_id = NULL WHERE jogador_id = :jogador_id").bindparams(jogador_id=jogador_id))
 
@@ -40,16 +43,11 @@ def apagar_jogador_completo(session: SessionDep, jogador: Jogador) -> None:
 
     session.exec(text("DELETE FROM historicoconquista WHERE jogador_id = :jogador_id").bindparams(jogador_id=jogador_id))
     session.exec(text("DELETE FROM jogadorconquista WHERE jogador_id = :jogador_id").bindparams(jogador_id=jogador_id))
+    session.exec(text("DELETE FROM estatisticamensaljogador WHERE jogador_id = :jogador_id").bindparams(jogador_id=jogador_id))
 
     session.exec(text("DELETE FROM jogador WHERE id = :jogador_id").bindparams(jogador_id=jogador_id))
     session.exec(text("DELETE FROM usuario WHERE id = :usuario_id").bindparams(usuario_id=jogador.usuario_id))
-
-
-def posicao_do_jogador(ranking: list, jogador_id: int):
-    for index, r in enumerate(ranking, start=1):
-        if r.jogador_id == jogador_id:
-            return index
-    return None
+    invalidar_todo_ranking_apos_commit(session)
 
 
 def calcular_estatisticas(
@@ -74,12 +72,12 @@ def calcular_estatisticas(
     torneio_totais = len(torneios_links)
     torneios_historico = _retornar_estatisticas_torneio(
         session, jogador, torneios_links)
-    taxa_vitoria = calcular_taxa_vitoria(session, jogador, loja_id=loja_id, tcg=tcg)
-    rank_geral = posicao_do_jogador(calcula_ranking_geral(session, loja_id=loja_id, tcg=tcg), jogador.id)
-    rank_mensal = posicao_do_jogador(calcula_ranking_geral(
-        session, mes=data_agora_brasil().month, loja_id=loja_id, tcg=tcg), jogador.id)
-    rank_anual = posicao_do_jogador(calcula_ranking_geral(
-        session, ano=data_agora_brasil().year, loja_id=loja_id, tcg=tcg), jogador.id)
+    taxa_vitoria = calcular_taxas_vitoria(session, {jogador.id}, loja_id=loja_id, tcg=tcg)[jogador.id]
+    # O ranking geral ordena sempre pelo total de pontos — mês/ano só
+    # recortam V/D/E (ver RankingService.posicao_no_ranking_geral) —, então a
+    # posição mensal e a anual são a mesma da geral: uma consulta só.
+    rank_geral, total_ranking = posicao_no_ranking_geral(session, jogador.id, loja_id=loja_id, tcg=tcg)
+    rank_mensal = rank_anual = rank_geral
     vde = retornar_vde_jogador_finalizados(session, jogador.id, loja_id=loja_id, tcg=tcg)
 
     return {"estatisticas_anuais": estat_por_mes,
@@ -88,6 +86,7 @@ def calcular_estatisticas(
             "rank_geral": rank_geral,
             "rank_mensal": rank_mensal,
             "rank_anual": rank_anual,
+            "total_ranking": total_ranking,
             "historico": torneios_historico,
             **vde}
 
@@ -113,66 +112,31 @@ def _retornar_estatisticas_torneio(session: SessionDep, jogador: Jogador,
 def _retornar_estatisticas_mensais(
     session: SessionDep, jogador_id: str, loja_id: int | None = None, tcg: str | None = None,
 ):
-    query_rodadas = select(Rodada).join(Torneio).where(
-        (Torneio.status == StatusTorneio.FINALIZADO) &
-        ((Rodada.jogador1_id == jogador_id) |
-         (Rodada.jogador2_id == jogador_id))
-    )
-    query_links = (
-        select(JogadorTorneioLink)
-        .join(Torneio)
-        .join(JogadorCriado, JogadorCriado.id == JogadorTorneioLink.jogador_criado_id)
-        .where((Torneio.status == StatusTorneio.FINALIZADO) &
-               (JogadorCriado.jogador_id == jogador_id))
-    )
-    if loja_id is not None:
-        query_rodadas = query_rodadas.where(Torneio.loja_id == loja_id)
-        query_links = query_links.where(Torneio.loja_id == loja_id)
-    if tcg is not None:
-        query_rodadas = query_rodadas.where(Torneio.jogo == tcg)
-        query_links = query_links.where(Torneio.jogo == tcg)
-
-    rodadas = session.exec(query_rodadas).all()
-    links = session.exec(query_links).all()
-
-    estatisticas = defaultdict(
-        lambda: {"pontos": 0, "vitorias": 0, "derrotas": 0, "empates": 0})
-    for link in links:
-        data = data_efetiva_torneio(link.torneio)
-        chave = (data.year, data.month)
-        estatisticas[chave]["pontos"] += link.pontuacao_com_regras or 0
-
-    for rodada in rodadas:
-        ano = rodada.data_de_inicio.year
-        mes = rodada.data_de_inicio.month
-        chave = (ano, mes)
-
-        if not rodada.vencedor:
-            estatisticas[chave]["empates"] += 1
-        elif rodada.vencedor == jogador_id:
-            estatisticas[chave]["vitorias"] += 1
-        else:
-            estatisticas[chave]["derrotas"] += 1
-
+    # Lido da tabela de estatísticas mensais (EstatisticaMensalJogador),
+    # mantida junto com o RankingSnapshot — em vez de varrer todas as
+    # rodadas e participações da conta a cada abertura do painel.
     resultado_formatado = []
-    for (ano, mes), dados in sorted(estatisticas.items()):
+    for ano, mes, pontos, vitorias, derrotas, empates in estatisticas_mensais_do_jogador(
+        session, jogador_id, loja_id, tcg
+    ):
         resultado_formatado.append({
             "mes": MesEnum.abreviacao(mes),
             "ano": ano,
-            "pontos": dados["pontos"],
-            "vitorias": dados["vitorias"],
-            "derrotas": dados["derrotas"],
-            "empates": dados["empates"]
+            "pontos": pontos,
+            "vitorias": vitorias,
+            "derrotas": derrotas,
+            "empates": empates
         })
 
     return resultado_formatado
 
 
 def colocacao_jogador(session: SessionDep, torneio: Torneio, jogador: Jogador):
+    forca_por_link = calcular_forcas_oponentes(session, torneio)
     ranking = []
     for j in torneio.jogadores:
         pontuacao = j.pontuacao
-        forca_oponentes = calcular_forca_oponente(session, torneio, j)
+        forca_oponentes = forca_por_link.get(j.id, 0)
         ranking.append((j, pontuacao, forca_oponentes))
 
     ranking.sort(key=lambda x: (x[1], x[2]), reverse=True)
@@ -183,30 +147,41 @@ def colocacao_jogador(session: SessionDep, torneio: Torneio, jogador: Jogador):
     return None
 
 
-def calcular_forca_oponente(session: SessionDep, torneio: Torneio, link: JogadorTorneioLink):
-    oponentes_vencidos = []
+def calcular_forcas_oponentes(session: SessionDep, torneio: Torneio) -> dict[int, float]:
+    """Força dos oponentes (média da taxa de vitória das contas que cada
+    participante venceu no torneio; oponente sem conta não entra) de todos os
+    participantes de uma vez: as rodadas do torneio, o dono de cada
+    participação e as taxas de todos os oponentes numa consulta agregada só
+    (ver RankingService.calcular_taxas_vitoria). Chaveado pelo id da
+    participação (JogadorTorneioLink); quem não venceu ninguém fica de fora."""
     rodadas = session.exec(
         select(Rodada).where(Rodada.torneio_id == torneio.id)
     ).all()
 
+    oponentes_vencidos = defaultdict(list)
     for rodada in rodadas:
-        if rodada.vencedor_id == link.id:
-            oponente_link_id = rodada.jogador2_id if rodada.jogador1_id == link.id else rodada.jogador1_id
-            if oponente_link_id:
-                oponentes_vencidos.append(oponente_link_id)
+        if rodada.vencedor_id is None:
+            continue
+        oponente_link_id = rodada.jogador2_id if rodada.jogador1_id == rodada.vencedor_id else rodada.jogador1_id
+        if oponente_link_id:
+            oponentes_vencidos[rodada.vencedor_id].append(oponente_link_id)
 
     if not oponentes_vencidos:
-        return 0
+        return {}
 
-    taxas = []
-    for op_link_id in oponentes_vencidos:
-        oponente_link = session.get(JogadorTorneioLink, op_link_id)
-        if oponente_link and oponente_link.jogador_criado and oponente_link.jogador_criado.jogador_id:
-            op_jogador = session.get(Jogador, oponente_link.jogador_criado.jogador_id)
-            if op_jogador:
-                taxas.append(calcular_taxa_vitoria(session, op_jogador))
+    links_oponentes = {link_id for vencidos in oponentes_vencidos.values() for link_id in vencidos}
+    jogador_por_link = dict(session.exec(
+        select(JogadorTorneioLink.id, JogadorCriado.jogador_id)
+        .join(JogadorCriado, JogadorCriado.id == JogadorTorneioLink.jogador_criado_id)
+        .where(JogadorTorneioLink.id.in_(links_oponentes), JogadorCriado.jogador_id.is_not(None))
+    ).all())
+    taxas_por_jogador = calcular_taxas_vitoria(session, set(jogador_por_link.values()))
 
-    return sum(taxas) / len(taxas) if len(taxas) != 0 else 0
+    forcas = {}
+    for link_id, vencidos in oponentes_vencidos.items():
+        taxas = [taxas_por_jogador[jogador_por_link[op]] for op in vencidos if op in jogador_por_link]
+        forcas[link_id] = sum(taxas) / len(taxas) if taxas else 0
+    return forcas
 
 
 def _descobrir_oponente(rodada: Rodada, jogador: str):
@@ -321,6 +296,31 @@ def retornar_vde_jogador(session: SessionDep, jogador_id: int | None, torneio: T
     return vde
 
 
+def retornar_vde_participantes(session: SessionDep, torneio: Torneio) -> dict[int, dict]:
+    """V/D/E dentro do torneio de todos os participantes de uma vez —
+    mesma regra de `retornar_vde_jogador` com `torneio` (só rodadas
+    finalizadas; participação sem conta fica zerada), num agregado só em
+    vez de duas consultas por participante. Chaveado pelo id da participação
+    (JogadorTorneioLink); quem não aparece fica com tudo zerado."""
+    lados = lados_das_rodadas()
+    consulta = (
+        select(lados.c.link_id, *contagem_vde(lados))
+        .select_from(lados)
+        .join(JogadorTorneioLink, JogadorTorneioLink.id == lados.c.link_id)
+        .join(JogadorCriado, JogadorCriado.id == JogadorTorneioLink.jogador_criado_id)
+        .where(
+            lados.c.torneio_id == torneio.id,
+            lados.c.finalizada.is_(True),
+            JogadorCriado.jogador_id.is_not(None),
+        )
+        .group_by(lados.c.link_id)
+    )
+    return {
+        link_id: {"vitorias": vitorias or 0, "derrotas": derrotas or 0, "empates": empates or 0}
+        for link_id, vitorias, derrotas, empates in session.exec(consulta).all()
+    }
+
+
 def retornar_todas_rodadas(session: SessionDep, jogador: Jogador):
     rodadas = session.exec(
         select(Rodada).where(
@@ -439,6 +439,9 @@ def desvincular_gameid_antigo(session: SessionDep, jogador_criado_antigo: Jogado
 
 
 def vincular_historico_e_creditos(session: SessionDep, game_ids: List[GameIDPublico], jogador_id: int):
+    # O ranking mostra o nome da conta e agrupa a taxa de vitória por conta —
+    # mudar quem é dono de um GameID muda as duas coisas.
+    invalidar_todo_ranking_apos_commit(session)
     for game_id in game_ids:
         jogador_criado_existente = session.exec(
             select(JogadorCriado).where(
@@ -470,3 +473,8 @@ def vincular_historico_e_creditos(session: SessionDep, game_ids: List[GameIDPubl
             session.add(jogador_criado_existente)
         else:
             session.add(JogadorCriado(game_id=game_id.id, tcg=game_id.tcg, jogador_id=jogador_id))
+
+    # As estatísticas mensais são por conta: trocar/vincular GameID traz (ou
+    # leva embora) o histórico inteiro dele, em todas as lojas.
+    session.flush()
+    atualizar_estatisticas_mensais(session, {jogador_id})
@@ -2,6 +2,7 @@ from sqlmodel import select, text
 from app.core.db import SessionDep
 from app.models import Loja, Torneio, Evento
 from app.services.TorneioService import apagar_torneio_completo
+from app.services.RankingCacheService import invalidar_todo_ranking_apos_commit
 
 
 def apagar_loja_completa(session: SessionDep, loja: Loja) -> None:
@@ -49,6 +50,10 @@ def apagar_loja_completa(session: SessionDep, loja: Loja) -> None:
     session.exec(text("DELETE FROM item WHERE loja_id = :loja_id").bindparams(loja_id=loja_id))
     session.exec(text("DELETE FROM categoria WHERE loja_id = :loja_id").bindparams(loja_id=loja_id))
 
+    session.exec(text("DELETE FROM rankingsnapshot WHERE loja_id = :loja_id").bindparams(loja_id=loja_id))
+    session.exec(text("DELETE FROM estatisticamensaljogador WHERE loja_id = :loja_id").bindparams(loja_id=loja_id))
+    invalidar_todo_ranking_apos_commit(session)
+
     session.exec(text("DELETE FROM tipojogador WHERE loja_id = :loja_id").bindparams(loja_id=loja_id))
     session.exec(text("DELETE FROM temporada WHERE loja_id = :loja_id").bindparams(loja_id=loja_id))
 
@@ -12,6 +12,7 @@ from app.models import (
 )
 from app.schemas.PontuacaoExtra import PontuacaoExtraCriarDTO
 from app.services.TorneioService import salvar_link_ou_conflito
+from app.services.RankingService import atualizar_ranking_snapshot_torneio
 from app.utils.Enums import MotivoPontuacaoExtra, TipoParticipanteTorneio
 
 
@@ -60,6 +61,7 @@ def criar_pontuacao_extra(session: SessionDep, torneio: Torneio, dados: Pontuaca
         pontos=dados.pontos,
     )
     session.add(pontuacao_extra)
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(pontuacao_extra)
     return pontuacao_extra
@@ -0,0 +1,73 @@
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.utils.CacheLRU import CacheLRU
+
+# Ranking geral por (mes, ano, loja_id, tcg) — o resultado só depende desses
+# filtros e só muda quando o RankingSnapshot muda (ver
+# RankingService.atualizar_ranking_snapshot) ou quando a identidade de um
+# jogador muda (nome, GameID vinculado, conta apagada).
+cache_ranking_geral = CacheLRU(settings.RANKING_CACHE_TAMANHO)
+
+_CHAVE_INVALIDACOES = "_ranking_invalidacoes"
+_TUDO = "tudo"
+
+
+def chave_ranking_geral(mes=None, ano=None, loja_id=None, tcg=None) -> tuple:
+    # Normaliza o que o ranking trata como "sem filtro" (`if mes:`) e TCG
+    # como enum ou string, pra que as duas formas caiam na mesma entrada.
+    return (mes or None, ano or None, loja_id, getattr(tcg, "value", tcg))
+
+
+def invalidar_ranking_apos_commit(session: Session, loja_id: int, tcgs: Iterable[str]) -> None:
+    """Agenda a invalidação das entradas do ranking que podem conter
+    resultados da loja/TCGs informados — só depois do commit: invalidar antes
+    deixaria outra requisição recalcular (e guardar) o ranking ainda com os
+    dados antigos, e um rollback não deve invalidar nada."""
+    pendentes = session.info.setdefault(_CHAVE_INVALIDACOES, set())
+    pendentes.update((loja_id, getattr(tcg, "value", tcg)) for tcg in tcgs)
+
+
+def invalidar_todo_ranking_apos_commit(session: Session) -> None:
+    """Pra mudanças que não se limitam a uma loja/TCG — nome do jogador,
+    GameID vinculado/desvinculado, conta apagada, edição pelo admin."""
+    session.info.setdefault(_CHAVE_INVALIDACOES, set()).add(_TUDO)
+
+
+def _entrada_afetada(pendentes: set):
+    def afetada(chave: tuple) -> bool:
+        _, _, loja_id, tcg = chave
+        return any(
+            (loja_id is None or loja_id == loja_pendente) and (tcg is None or tcg == tcg_pendente)
+            for loja_pendente, tcg_pendente in pendentes
+        )
+    return afetada
+
+
+def _aplicar_invalidacoes(session: Session) -> None:
+    pendentes = session.info.pop(_CHAVE_INVALIDACOES, None)
+    if not pendentes:
+        return
+    if _TUDO in pendentes:
+        cache_ranking_geral.invalidar()
+    else:
+        cache_ranking_geral.invalidar(_entrada_afetada(pendentes))
+
+
+def _descartar_invalidacoes(session: Session, previous_transaction=None) -> None:
+    session.info.pop(_CHAVE_INVALIDACOES, None)
+
+
+event.listen(Session, "after_commit", _aplicar_invalidacoes)
+event.listen(Session, "after_soft_rollback", _descartar_invalidacoes)
+
+
+def estatisticas_cache_ranking() -> dict[str, int]:
+    return cache_ranking_geral.estatisticas()
+
+
+def limpar_cache_ranking() -> None:
+    cache_ranking_geral.invalidar()
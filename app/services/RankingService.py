@@ -1,247 +1,790 @@
 from app.core.db import SessionDep
 from app.schemas.Ranking import Ranking, RankingPorLoja, RankingPorFormato
-from sqlmodel import select, extract
-from app.models import Jogador, JogadorCriado, JogadorTorneioLink, Rodada, Loja, Torneio
+from sqlmodel import select, extract, func, case, cast, Integer
+from sqlalchemy import union_all, and_, not_, delete, insert
+from app.models import (
+    Jogador, JogadorCriado, JogadorTorneioLink, Rodada, Loja, Torneio, RankingSnapshot, EstatisticaMensalJogador,
+)
 from app.utils.Enums import StatusTorneio
-from app.utils.TorneioDataUtil import data_efetiva_torneio
+from app.services.RankingCacheService import (
+    cache_ranking_geral,
+    chave_ranking_geral,
+    invalidar_ranking_apos_commit,
+    invalidar_todo_ranking_apos_commit,
+)
 from collections import defaultdict
+from typing import Iterable
 
+# Filtro de loja dos agregadores e da manutenção do snapshot/estatísticas:
+# uma loja, os torneios sem loja (None — linhas antigas, anteriores ao
+# loja_id obrigatório na criação) ou, com este valor, todas.
+_TODAS_AS_LOJAS = object()
 
-def calcula_ranking_geral(session: SessionDep, mes=None, ano=None, loja_id=None, tcg=None):
-    query_jogadores_criados = select(JogadorCriado)
+
+def _da_loja(coluna, loja_id):
+    return coluna.is_(None) if loja_id is None else coluna == loja_id
+
+
+def lados_das_rodadas():
+    """Cada rodada vista uma vez por lado (jogador1, jogador2), como linhas
+    (rodada, link) — sem isso, agrupar resultados por participação exigiria
+    um JOIN com `OR` (jogador1_id = link OR jogador2_id = link), que o
+    banco não consegue resolver por índice."""
+    colunas = (Rodada.id, Rodada.torneio_id, Rodada.vencedor_id, Rodada.data_de_inicio, Rodada.finalizada)
+    lado1 = select(*colunas, Rodada.jogador1_id.label("link_id")).where(Rodada.jogador1_id.is_not(None))
+    lado2 = select(*colunas, Rodada.jogador2_id.label("link_id")).where(Rodada.jogador2_id.is_not(None))
+    return union_all(lado1, lado2).subquery("lado_rodada")
+
+
+def _pontos_truncados(session: SessionDep, coluna):
+    """`int()` do Python (usado desde sempre pra somar os pontos de cada
+    participação no ranking) trunca em direção a zero. `CAST(x AS INTEGER)`
+    faz exatamente isso no SQLite, mas ARREDONDA no Postgres — lá o
+    equivalente é `trunc()`."""
+    if session.get_bind().dialect.name == "postgresql":
+        return func.trunc(coluna)
+    return cast(coluna, Integer)
+
+
+def contagem_vde(lados):
+    """Agregados (vitórias, derrotas, empates) sobre `lados_das_rodadas()`,
+    do ponto de vista de cada `link_id`."""
+    return (
+        func.sum(case((lados.c.vencedor_id == lados.c.link_id, 1), else_=0)),
+        func.sum(case(((lados.c.vencedor_id.is_not(None)) & (lados.c.vencedor_id != lados.c.link_id), 1), else_=0)),
+        func.sum(case((lados.c.vencedor_id.is_(None), 1), else_=0)),
+    )
+
+
+def _taxa_vitoria(vitorias: int, derrotas: int, empates: int) -> int:
+    total = vitorias + derrotas + empates
+    return int((vitorias / total) * 100) if total > 0 else 0
+
+
+def _agregar_ranking_snapshot(
+    session: SessionDep, loja_id: int | None = _TODAS_AS_LOJAS, jogador_criado_ids: set[int] | None = None,
+) -> dict[tuple, dict[str, int]]:
+    """Linhas do RankingSnapshot calculadas direto das participações e
+    rodadas, chaveadas por (jogador_criado_id, loja_id, tcg, ano, mes) —
+    usado tanto pela atualização incremental (uma loja, poucos jogadores)
+    quanto pela reconstrução completa (sem filtro nenhum)."""
+    linhas = defaultdict(lambda: {"pontos": 0, "torneios": 0, "vitorias": 0, "derrotas": 0, "empates": 0})
+
+    consulta_links = (
+        select(
+            JogadorTorneioLink.jogador_criado_id, JogadorTorneioLink.pontuacao_com_regras,
+            Torneio.id, Torneio.loja_id, Torneio.jogo, Torneio.ano_mes_efetivo,
+        )
+        .join(Torneio, Torneio.id == JogadorTorneioLink.torneio_id)
+    )
+    if loja_id is not _TODAS_AS_LOJAS:
+        consulta_links = consulta_links.where(_da_loja(Torneio.loja_id, loja_id))
+    if jogador_criado_ids is not None:
+        consulta_links = consulta_links.where(JogadorTorneioLink.jogador_criado_id.in_(jogador_criado_ids))
+
+    # (loja, tcg, ano, mês) de cada torneio — o mês da data efetiva já vem
+    # gravado no próprio torneio (Torneio.ano_mes_efetivo).
+    chave_por_torneio = {}
+    for jogador_criado_id, pontuacao, torneio_id, loja_do_torneio, tcg, ano_mes in session.exec(consulta_links).all():
+        if torneio_id not in chave_por_torneio:
+            chave_por_torneio[torneio_id] = (loja_do_torneio, tcg, *divmod(ano_mes, 100))
+        linha = linhas[(jogador_criado_id, *chave_por_torneio[torneio_id])]
+        linha["pontos"] += int(pontuacao)
+        linha["torneios"] += 1
+
+    if not chave_por_torneio:
+        return {}
+
+    lados = lados_das_rodadas()
+    ano_rodada = extract("year", lados.c.data_de_inicio)
+    mes_rodada = extract("month", lados.c.data_de_inicio)
+    consulta_vde = (
+        select(JogadorTorneioLink.jogador_criado_id, Torneio.id, ano_rodada, mes_rodada, *contagem_vde(lados))
+        .select_from(lados)
+        .join(JogadorTorneioLink, JogadorTorneioLink.id == lados.c.link_id)
+        .join(Torneio, (Torneio.id == lados.c.torneio_id) & (Torneio.id == JogadorTorneioLink.torneio_id))
+        .where(Torneio.status == StatusTorneio.FINALIZADO)
+        .group_by(JogadorTorneioLink.jogador_criado_id, Torneio.id, ano_rodada, mes_rodada)
+    )
+    if loja_id is not _TODAS_AS_LOJAS:
+        consulta_vde = consulta_vde.where(_da_loja(Torneio.loja_id, loja_id))
+    if jogador_criado_ids is not None:
+        consulta_vde = consulta_vde.where(JogadorTorneioLink.jogador_criado_id.in_(jogador_criado_ids))
+
+    for jogador_criado_id, torneio_id, ano, mes, vitorias, derrotas, empates in session.exec(consulta_vde).all():
+        if torneio_id not in chave_por_torneio:
+            continue
+        loja_do_torneio, tcg, ano_torneio, mes_torneio = chave_por_torneio[torneio_id]
+        # Rodada sem data de início (não deveria existir, mas a coluna
+        # aceita NULL) cai no mês do próprio torneio.
+        if ano is None or mes is None:
+            ano, mes = ano_torneio, mes_torneio
+        linha = linhas[(jogador_criado_id, loja_do_torneio, tcg, int(ano), int(mes))]
+        linha["vitorias"] += vitorias or 0
+        linha["derrotas"] += derrotas or 0
+        linha["empates"] += empates or 0
+
+    return linhas
+
+
+def _gravar_ranking_snapshot(session: SessionDep, linhas: dict[tuple, dict[str, int]]) -> None:
+    if not linhas:
+        return
+    session.execute(insert(RankingSnapshot), [
+        {"jogador_criado_id": jogador_criado_id, "loja_id": loja_id, "tcg": tcg, "ano": ano, "mes": mes, **valores}
+        for (jogador_criado_id, loja_id, tcg, ano, mes), valores in linhas.items()
+    ])
+
+
+def atualizar_ranking_snapshot(session: SessionDep, loja_id: int | None, jogador_criado_ids: Iterable[int]) -> None:
+    """Refaz, dentro de uma loja, todas as linhas do snapshot dos jogadores
+    informados (todos os meses e TCGs) — recalcular o jogador inteiro na
+    loja, e não só o torneio alterado, é o que cobre de graça mudança de
+    data/status/jogo do torneio (a linha "muda de mês") sem precisar saber
+    o valor antigo. Restrito a uma loja, também funciona sob o RLS da loja
+    autenticada. `loja_id` None: os torneios sem loja, que também entram no
+    ranking sem filtro de loja. Não faz commit — quem chama decide quando."""
+    jogador_criado_ids = set(jogador_criado_ids)
+    if not jogador_criado_ids:
+        return
+
+    # TCGs cujo ranking em cache pode mudar: o dos GameIDs (filtro `tcg` do
+    # ranking) e o dos torneios antes e depois da mudança (filtro da taxa de
+    # vitória) — um torneio que trocou de jogo mexe nos dois.
+    tcgs = set(session.exec(
+        select(JogadorCriado.tcg).where(JogadorCriado.id.in_(jogador_criado_ids)).distinct()
+    ).all())
+    tcgs.update(session.exec(
+        select(RankingSnapshot.tcg).where(
+            _da_loja(RankingSnapshot.loja_id, loja_id) &
+            (RankingSnapshot.jogador_criado_id.in_(jogador_criado_ids))).distinct()
+    ).all())
+
+    session.execute(
+        delete(RankingSnapshot).where(
+            _da_loja(RankingSnapshot.loja_id, loja_id) &
+            (RankingSnapshot.jogador_criado_id.in_(jogador_criado_ids)))
+    )
+    linhas = _agregar_ranking_snapshot(session, loja_id=loja_id, jogador_criado_ids=jogador_criado_ids)
+    _gravar_ranking_snapshot(session, linhas)
+
+    tcgs.update(tcg for _, _, tcg, _, _ in linhas)
+    invalidar_ranking_apos_commit(session, loja_id, tcgs)
+
+    # As estatísticas mensais do painel mudam exatamente quando o snapshot
+    # muda — mesmos resultados, agrupados pela conta em vez do GameID.
+    atualizar_estatisticas_mensais(session, session.exec(
+        select(JogadorCriado.jogador_id).where(
+            JogadorCriado.id.in_(jogador_criado_ids), JogadorCriado.jogador_id.is_not(None))
+    ).all(), loja_id=loja_id)
+
+
+def atualizar_ranking_snapshot_torneio(
+    session: SessionDep, torneio: Torneio, jogador_criado_ids_removidos: Iterable[int] = (),
+) -> None:
+    """Atalho de `atualizar_ranking_snapshot` pros participantes atuais de
+    um torneio. Quem acabou de SAIR do torneio (desinscrição, juiz
+    removido, torneio reimportado) não aparece mais nos links — quem chama
+    passa esses ids em `jogador_criado_ids_removidos`."""
+    atualizar_ranking_snapshot(
+        session, torneio.loja_id,
+        jogadores_criados_do_torneio(session, torneio.id) | set(jogador_criado_ids_removidos))
+
+
+def jogadores_criados_do_torneio(session: SessionDep, torneio_id: str) -> set[int]:
+    return set(session.exec(
+        select(JogadorTorneioLink.jogador_criado_id).where(JogadorTorneioLink.torneio_id == torneio_id)
+    ).all())
+
+
+def reconstruir_ranking_snapshot(session: SessionDep) -> int:
+    """Apaga e recalcula o snapshot inteiro, de todas as lojas. Em Postgres
+    precisa de leitura pública liberada na sessão (RLS), senão só enxerga os
+    torneios da loja corrente. Não faz commit. Retorna quantas linhas foram
+    gravadas."""
+    session.execute(delete(RankingSnapshot))
+    linhas = _agregar_ranking_snapshot(session)
+    _gravar_ranking_snapshot(session, linhas)
+    invalidar_todo_ranking_apos_commit(session)
+    return len(linhas)
+
+
+def _agregar_estatisticas_mensais(
+    session: SessionDep, jogador_ids: set[int] | None = None, loja_id: int | None = _TODAS_AS_LOJAS,
+) -> dict[tuple, dict[str, float]]:
+    """Linhas de EstatisticaMensalJogador calculadas direto das participações
+    e rodadas, chaveadas por (jogador_id, loja_id, tcg, ano, mes) — sem
+    `jogador_ids`, de todas as contas (reconstrução completa)."""
+    linhas = defaultdict(lambda: {"pontos": 0, "vitorias": 0, "derrotas": 0, "empates": 0})
+
+    def _filtrar(consulta):
+        consulta = consulta.where(Torneio.status == StatusTorneio.FINALIZADO)
+        if jogador_ids is None:
+            consulta = consulta.where(JogadorCriado.jogador_id.is_not(None))
+        else:
+            consulta = consulta.where(JogadorCriado.jogador_id.in_(jogador_ids))
+        if loja_id is not _TODAS_AS_LOJAS:
+            consulta = consulta.where(_da_loja(Torneio.loja_id, loja_id))
+        return consulta
+
+    colunas_torneio = (JogadorCriado.jogador_id, Torneio.loja_id, Torneio.jogo, Torneio.ano_mes_efetivo)
+    consulta_pontos = _filtrar(
+        select(*colunas_torneio, func.sum(func.coalesce(JogadorTorneioLink.pontuacao_com_regras, 0)))
+        .select_from(JogadorTorneioLink)
+        .join(Torneio, Torneio.id == JogadorTorneioLink.torneio_id)
+        .join(JogadorCriado, JogadorCriado.id == JogadorTorneioLink.jogador_criado_id)
+        .group_by(*colunas_torneio)
+    )
+    for jogador_id, loja_do_torneio, tcg, ano_mes, pontos in session.exec(consulta_pontos).all():
+        linhas[(jogador_id, loja_do_torneio, tcg, *divmod(ano_mes, 100))]["pontos"] += pontos or 0
+
+    lados = lados_das_rodadas()
+    ano_rodada = extract("year", lados.c.data_de_inicio)
+    mes_rodada = extract("month", lados.c.data_de_inicio)
+    consulta_vde = _filtrar(
+        select(*colunas_torneio, ano_rodada, mes_rodada, *contagem_vde(lados))
+        .select_from(lados)
+        .join(JogadorTorneioLink, JogadorTorneioLink.id == lados.c.link_id)
+        .join(JogadorCriado, JogadorCriado.id == JogadorTorneioLink.jogador_criado_id)
+        .join(Torneio, (Torneio.id == lados.c.torneio_id) & (Torneio.id == JogadorTorneioLink.torneio_id))
+        .group_by(*colunas_torneio, ano_rodada, mes_rodada)
+    )
+    for jogador_id, loja_do_torneio, tcg, ano_mes, ano, mes, vitorias, derrotas, empates in (
+        session.exec(consulta_vde).all()
+    ):
+        # Rodada sem data de início cai no mês do próprio torneio, como no
+        # snapshot.
+        if ano is None or mes is None:
+            ano, mes = divmod(ano_mes, 100)
+        linha = linhas[(jogador_id, loja_do_torneio, tcg, int(ano), int(mes))]
+        linha["vitorias"] += vitorias or 0
+        linha["derrotas"] += derrotas or 0
+        linha["empates"] += empates or 0
+
+    return linhas
+
+
+def _gravar_estatisticas_mensais(session: SessionDep, linhas: dict[tuple, dict[str, float]]) -> None:
+    if not linhas:
+        return
+    session.execute(insert(EstatisticaMensalJogador), [
+        {"jogador_id": jogador_id, "loja_id": loja_id, "tcg": tcg, "ano": ano, "mes": mes, **valores}
+        for (jogador_id, loja_id, tcg, ano, mes), valores in linhas.items()
+    ])
+
+
+def atualizar_estatisticas_mensais(
+    session: SessionDep, jogador_ids: Iterable[int], loja_id: int | None = _TODAS_AS_LOJAS,
+) -> None:
+    """Refaz as estatísticas mensais das contas informadas — numa loja só
+    (mudança de resultado de torneio, chamada por
+    `atualizar_ranking_snapshot`; None são os torneios sem loja) ou em
+    todas, sem `loja_id` (GameID vinculado/desvinculado: a conta ganha ou
+    perde um histórico inteiro).
+    Sem `loja_id`, em Postgres precisa de leitura pública liberada na
+    sessão (RLS). Não faz commit."""
+    jogador_ids = set(jogador_ids)
+    if not jogador_ids:
+        return
+
+    remover = delete(EstatisticaMensalJogador).where(EstatisticaMensalJogador.jogador_id.in_(jogador_ids))
+    if loja_id is not _TODAS_AS_LOJAS:
+        remover = remover.where(_da_loja(EstatisticaMensalJogador.loja_id, loja_id))
+    session.execute(remover)
+    _gravar_estatisticas_mensais(session, _agregar_estatisticas_mensais(session, jogador_ids, loja_id=loja_id))
+
+
+def reconstruir_estatisticas_mensais(session: SessionDep) -> int:
+    """Apaga e recalcula as estatísticas mensais de todas as contas, de
+    todas as lojas. Mesmas condições de `reconstruir_ranking_snapshot`. Não
+    faz commit. Retorna quantas linhas foram gravadas."""
+    session.execute(delete(EstatisticaMensalJogador))
+    linhas = _agregar_estatisticas_mensais(session)
+    _gravar_estatisticas_mensais(session, linhas)
+    return len(linhas)
+
+
+def estatisticas_mensais_do_jogador(
+    session: SessionDep, jogador_id: int, loja_id: int | None = None, tcg: str | None = None,
+) -> list[tuple[int, int, float, int, int, int]]:
+    """(ano, mes, pontos, vitorias, derrotas, empates) da conta, mês a mês em
+    ordem cronológica — uma leitura de poucas linhas pelo índice
+    (jogador_id, loja_id, tcg, ano, mes)."""
+    consulta = (
+        select(
+            EstatisticaMensalJogador.ano,
+            EstatisticaMensalJogador.mes,
+            func.sum(EstatisticaMensalJogador.pontos),
+            func.sum(EstatisticaMensalJogador.vitorias),
+            func.sum(EstatisticaMensalJogador.derrotas),
+            func.sum(EstatisticaMensalJogador.empates),
+        )
+        .where(EstatisticaMensalJogador.jogador_id == jogador_id)
+        .group_by(EstatisticaMensalJogador.ano, EstatisticaMensalJogador.mes)
+        .order_by(EstatisticaMensalJogador.ano, EstatisticaMensalJogador.mes)
+    )
+    if loja_id is not None:
+        consulta = consulta.where(EstatisticaMensalJogador.loja_id == loja_id)
     if tcg is not None:
-        query_jogadores_criados = query_jogadores_criados.where(JogadorCriado.tcg == tcg)
-    jogadores_criados = session.exec(query_jogadores_criados).all()
-    ranking = []
+        consulta = consulta.where(EstatisticaMensalJogador.tcg == tcg)
+    return session.exec(consulta).all()
+
+
+def _taxas_vitoria_por_jogador(
+    session: SessionDep, jogador_ids: set[int], loja_id: int | None = None, tcg: str | None = None,
+) -> dict[int, int]:
+    """Mesma regra de `calcular_taxas_vitoria`, mas somando o V/D/E já
+    agregado no snapshot em vez de varrer as rodadas — é o que o ranking
+    usa, pra que a leitura dele não dependa do volume de rodadas."""
+    if not jogador_ids:
+        return {}
+
+    consulta = (
+        select(
+            JogadorCriado.jogador_id,
+            func.sum(RankingSnapshot.vitorias),
+            func.sum(RankingSnapshot.derrotas),
+            func.sum(RankingSnapshot.empates),
+        )
+        .join(JogadorCriado, JogadorCriado.id == RankingSnapshot.jogador_criado_id)
+        .where(JogadorCriado.jogador_id.in_(jogador_ids))
+        .group_by(JogadorCriado.jogador_id)
+    )
+    if loja_id is not None:
+        consulta = consulta.where(RankingSnapshot.loja_id == loja_id)
+    if tcg is not None:
+        consulta = consulta.where(RankingSnapshot.tcg == tcg)
+
+    return {
+        jogador_id: _taxa_vitoria(vitorias or 0, derrotas or 0, empates or 0)
+        for jogador_id, vitorias, derrotas, empates in session.exec(consulta).all()
+    }
+
+
+def _totais_ranking_geral(mes=None, ano=None, loja_id=None, tcg=None):
+    """Subconsulta com uma linha por entrada do ranking geral (jogador criado
+    com soma de pontos diferente de zero): pontos, torneios e V/D/E, lidos do
+    RankingSnapshot. `mes`/`ano` só recortam as rodadas (V/D/E) — pontos e
+    torneios são sempre o total, como sempre foram."""
+    periodo = []
+    if mes:
+        periodo.append(RankingSnapshot.mes == mes)
+    if ano:
+        periodo.append(RankingSnapshot.ano == ano)
+
+    def _soma_no_periodo(coluna):
+        if not periodo:
+            return func.sum(coluna)
+        return func.sum(case((and_(*periodo), coluna), else_=0))
+
+    pontos = func.sum(RankingSnapshot.pontos)
+    consulta = (
+        select(
+            RankingSnapshot.jogador_criado_id.label("jogador_criado_id"),
+            pontos.label("pontos"),
+            func.sum(RankingSnapshot.torneios).label("torneios"),
+            _soma_no_periodo(RankingSnapshot.vitorias).label("vitorias"),
+            _soma_no_periodo(RankingSnapshot.derrotas).label("derrotas"),
+            _soma_no_periodo(RankingSnapshot.empates).label("empates"),
+        )
+        .join(JogadorCriado, JogadorCriado.id == RankingSnapshot.jogador_criado_id)
+        .group_by(RankingSnapshot.jogador_criado_id)
+        .having(pontos != 0)
+    )
+    if loja_id is not None:
+        consulta = consulta.where(RankingSnapshot.loja_id == loja_id)
+    if tcg is not None:
+        consulta = consulta.where(JogadorCriado.tcg == tcg)
+    return consulta.subquery("totais")
+
+
+def _chaves_ranking_geral(totais) -> tuple:
+    # Pontos desc; empate pelo id do jogador criado — a ordem em que o
+    # ranking sempre saiu (lista montada por id + sort estável por pontos).
+    return totais.c.pontos, totais.c.jogador_criado_id
+
+
+def _ordem(chaves: tuple, invertida: bool = False) -> tuple:
+    """ORDER BY de um ranking a partir das suas chaves: a primeira (pontos)
+    decrescente, os desempates crescentes — ou tudo ao contrário."""
+    pontos, *desempates = chaves
+    if invertida:
+        return pontos.asc(), *(coluna.desc() for coluna in desempates)
+    return pontos.desc(), *desempates
+
+
+def _comparar_com_cursor(chaves: tuple, cursor: tuple, depois: bool):
+    """Entradas que vêm depois (ou antes) de `cursor` na ordem de `_ordem` —
+    a comparação lexicográfica escrita por extenso, que o banco consegue
+    resolver a partir do ponto do cursor em vez de varrer desde o início."""
+    condicao = None
+    for indice in reversed(range(len(chaves))):
+        coluna, valor = chaves[indice], cursor[indice]
+        decrescente = indice == 0
+        passa = (coluna < valor) if decrescente == depois else (coluna > valor)
+        condicao = passa if condicao is None else passa | ((coluna == valor) & condicao)
+    return condicao
+
+
+def _pagina(session: SessionDep, totais, chaves: tuple, limite: int, apos: tuple | None):
+    """(linhas, posição da primeira) da página de `limite` entradas logo
+    depois do cursor `apos` (as chaves da última entrada da página anterior).
+    É paginação por keyset: o banco continua da posição do cursor na ordem
+    do ranking em vez de contar e descartar OFFSET linhas, e uma entrada que
+    mude de posição entre duas páginas não faz outra aparecer duplicada."""
+    consulta = select(*totais.c).order_by(*_ordem(chaves)).limit(limite)
+    primeira_posicao = 1
+    if apos is not None:
+        depois = _comparar_com_cursor(chaves, apos, depois=True)
+        consulta = consulta.where(depois)
+        primeira_posicao += session.exec(select(func.count()).select_from(totais).where(not_(depois))).one()
+    return session.exec(consulta).all(), primeira_posicao
+
+
+def _em_torno(session: SessionDep, totais, chaves: tuple, jogador_id: int, janela: int):
+    """(linhas, posição da primeira) da melhor entrada do jogador e até
+    `janela` entradas acima e abaixo dela — ([], None) se ele não está no
+    ranking. A melhor porque um jogador com GameIDs em mais de um TCG pode
+    aparecer mais de uma vez."""
+    entrada = session.exec(
+        select(*totais.c)
+        .join(JogadorCriado, JogadorCriado.id == totais.c.jogador_criado_id)
+        .where(JogadorCriado.jogador_id == jogador_id)
+        .order_by(*_ordem(chaves))
+        .limit(1)
+    ).first()
+    if not entrada:
+        return [], None
+
+    cursor = tuple(getattr(entrada, coluna.name) for coluna in chaves)
+    antes = _comparar_com_cursor(chaves, cursor, depois=False)
+    acima = session.exec(
+        select(*totais.c).where(antes).order_by(*_ordem(chaves, invertida=True)).limit(janela)
+    ).all() if janela else []
+    abaixo = session.exec(
+        select(*totais.c).where(_comparar_com_cursor(chaves, cursor, depois=True))
+        .order_by(*_ordem(chaves)).limit(janela)
+    ).all() if janela else []
+    posicao = session.exec(select(func.count()).select_from(totais).where(antes)).one() + 1
+
+    return [*reversed(acima), entrada, *abaixo], posicao - len(acima)
+
+
+def _montar_ranking(session: SessionDep, linhas, loja_id=None, tcg=None, primeira_posicao: int = 1) -> list[Ranking]:
+    """Entradas do ranking (nome, taxa de vitória por conta) só das linhas
+    de `_totais_ranking_geral` informadas, já na ordem do ranking — uma
+    página custa duas consultas pequenas, não importa o tamanho do ranking."""
+    if not linhas:
+        return []
 
-    for jogador_criado in jogadores_criados:
-        total_pontos = 0
-        total_torneios = 0
-        total_vitorias = 0
-        total_derrotas = 0
-        total_empates = 0
-        jogador = jogador_criado.jogador
-
-        links = session.exec(
-            select(JogadorTorneioLink).where(
-                JogadorTorneioLink.jogador_criado_id == jogador_criado.id)
+    jogadores_criados = {
+        jogador_criado.id: (jogador_criado, jogador)
+        for jogador_criado, jogador in session.exec(
+            select(JogadorCriado, Jogador)
+            .join(Jogador, Jogador.id == JogadorCriado.jogador_id, isouter=True)
+            .where(JogadorCriado.id.in_([linha.jogador_criado_id for linha in linhas]))
         ).all()
+    }
 
-        for link in links:
-            torneio = link.torneio
-            if not torneio:
-                continue
-            if loja_id is not None and torneio.loja_id != loja_id:
-                continue
-
-            total_torneios += 1
-            total_pontos += int(link.pontuacao_com_regras)
-
-            rodadas = select(Rodada).join(Torneio).where(
-                (Torneio.status == StatusTorneio.FINALIZADO) &
-                (Rodada.torneio_id == link.torneio_id) &
-                ((Rodada.jogador1_id == link.id) |
-                 (Rodada.jogador2_id == link.id))
-            )
-            if mes:
-                rodadas = rodadas.where(
-                    extract("month", Rodada.data_de_inicio) == mes)
-            if ano:
-                rodadas = rodadas.where(
-                    extract("year", Rodada.data_de_inicio) == ano)
-
-            rodadas = session.exec(rodadas).all()
-            for rodada in rodadas:
-                if (rodada.vencedor_id == link.id):
-                    total_vitorias += 1
-                elif (rodada.vencedor_id is not None):
-                    total_derrotas += 1
-                else:
-                    total_empates += 1
-        if total_pontos == 0:
-            continue
+    taxas_por_jogador = _taxas_vitoria_por_jogador(
+        session, {jogador.id for _, jogador in jogadores_criados.values() if jogador}, loja_id=loja_id, tcg=tcg)
+
+    ranking = []
+    for posicao, linha in enumerate(linhas, start=primeira_posicao):
+        jogador_criado, jogador = jogadores_criados[linha.jogador_criado_id]
+        vitorias, derrotas, empates = linha.vitorias or 0, linha.derrotas or 0, linha.empates or 0
 
         ranking.append(Ranking(
+            posicao=posicao,
+            jogador_criado_id=jogador_criado.id,
             jogador_id=jogador.id if jogador else None,
             game_id=jogador_criado.game_id,
             nome_jogador=jogador.nome if jogador else jogador_criado.apelido,
-            pontos=total_pontos,
-            torneios=total_torneios,
-            vitorias=total_vitorias,
-            derrotas=total_derrotas,
-            empates=total_empates,
-            taxa_vitoria=calcular_taxa_vitoria(session, jogador, loja_id=loja_id, tcg=tcg) if jogador else (
-                int((total_vitorias / (total_vitorias + total_derrotas + total_empates)) * 100)
-                if (total_vitorias + total_derrotas + total_empates) > 0 else 0
+            pontos=int(linha.pontos),
+            torneios=linha.torneios or 0,
+            vitorias=vitorias,
+            derrotas=derrotas,
+            empates=empates,
+            taxa_vitoria=taxas_por_jogador.get(jogador.id, 0) if jogador else (
+                _taxa_vitoria(vitorias, derrotas, empates)
             )
         ))
 
-    ranking.sort(key=lambda x: x.pontos, reverse=True)
-
     return ranking
 
 
-def calcula_ranking_geral_por_loja(session: SessionDep, mes: int = None):
-    lojas = session.exec(select(Loja)).all()
-    ranking = []
-    for loja in lojas:
-        jogadores_criados_da_loja = session.exec(
-            select(JogadorCriado)
-            .join(JogadorTorneioLink, JogadorTorneioLink.jogador_criado_id == JogadorCriado.id)
-            .join(Torneio, Torneio.id == JogadorTorneioLink.torneio_id)
-            .where(Torneio.loja_id == loja.id)
-            .distinct()
-        ).all()
-
-        for jogador_criado in jogadores_criados_da_loja:
-            jogador = jogador_criado.jogador
-            links = select(JogadorTorneioLink).where(
-                (JogadorTorneioLink.jogador_criado_id == jogador_criado.id) &
-                (JogadorTorneioLink.torneio_id.in_(
-                    select(Torneio.id).where(Torneio.loja_id == loja.id)
-                ))
-            )
-
-            links = session.exec(links).all()
-            # Filtro por mês em Python (não em SQL): pra torneios FINALIZADOS
-            # o mês que vale é o da data efetiva (real), não a planejada —
-            # ver TorneioDataUtil.data_efetiva_torneio.
-            if mes is not None:
-                links = [link for link in links if data_efetiva_torneio(link.torneio).month == mes]
-            if not links:
-                continue
-            total_pontos = 0
-            total_torneios = 0
-            total_vitorias = 0
-            total_derrotas = 0
-            total_empates = 0
-            for link in links:
-                total_torneios += 1
-                total_pontos += int(link.pontuacao_com_regras)
-
-                rodadas = session.exec(
-                    select(Rodada).where(
-                        (Rodada.torneio_id == link.torneio_id) &
-                        ((Rodada.jogador1_id == link.id) |
-                         (Rodada.jogador2_id == link.id))
-                    )
-                ).all()
-
-                for rodada in rodadas:
-                    if (rodada.vencedor_id == link.id):
-                        total_vitorias += 1
-                    elif (rodada.vencedor_id is not None):
-                        total_derrotas += 1
-                    else:
-                        total_empates += 1
-
-            if total_pontos == 0:
-                continue
-
-            total_rodadas = total_vitorias + total_derrotas + total_empates
-            taxa_vitoria = int((total_vitorias / total_rodadas)
-                               * 100) if total_rodadas > 0 else 0
-
-            ranking.append(RankingPorLoja(
-                nome_jogador=jogador.nome if jogador else jogador_criado.apelido,
-                nome_loja=loja.nome,
-                pontos=total_pontos,
-                torneios=total_torneios,
-                vitorias=total_vitorias,
-                derrotas=total_derrotas,
-                empates=total_empates,
-                taxa_vitoria=taxa_vitoria
-            ))
-
-    ranking.sort(key=lambda x: x.pontos, reverse=True)
-
-    return ranking
-
-
-def desempenho_por_formato(session: SessionDep, jogador: Jogador) -> list[RankingPorFormato]:
-    links = session.exec(
-        select(JogadorTorneioLink)
-        .join(Torneio)
-        .join(JogadorCriado, JogadorCriado.id == JogadorTorneioLink.jogador_criado_id)
-        .where(
-            (Torneio.status == StatusTorneio.FINALIZADO) &
-            (JogadorCriado.jogador_id == jogador.id))
-    ).all()
-
-    if not links:
+def calcula_ranking_geral(session: SessionDep, mes=None, ano=None, loja_id=None, tcg=None):
+    """Ranking de toda a plataforma lido do RankingSnapshot (ver
+    `atualizar_ranking_snapshot`): um agregado já ordenado, uma consulta pros
+    nomes e uma pra taxa de vitória por conta."""
+    totais = _totais_ranking_geral(mes, ano, loja_id, tcg)
+    linhas = session.exec(select(*totais.c).order_by(*_ordem(_chaves_ranking_geral(totais)))).all()
+    return _montar_ranking(session, linhas, loja_id=loja_id, tcg=tcg)
+
+
+def pagina_ranking_geral(
+    session: SessionDep, limite: int, apos: tuple[int, int] | None = None,
+    mes=None, ano=None, loja_id=None, tcg=None,
+) -> list[Ranking]:
+    """Até `limite` entradas do ranking geral logo depois do cursor `apos` —
+    (pontos, jogador_criado_id) da última entrada da página anterior (ver
+    `_pagina`). Sem cursor, é o top `limite`."""
+    totais = _totais_ranking_geral(mes, ano, loja_id, tcg)
+    linhas, primeira_posicao = _pagina(session, totais, _chaves_ranking_geral(totais), limite, apos)
+    return _montar_ranking(session, linhas, loja_id=loja_id, tcg=tcg, primeira_posicao=primeira_posicao)
+
+
+def ranking_geral_em_torno(
+    session: SessionDep, jogador_id: int, janela: int = 10,
+    mes=None, ano=None, loja_id=None, tcg=None,
+) -> list[Ranking]:
+    """A entrada do jogador no ranking geral e até `janela` entradas acima e
+    abaixo dela (o "você está aqui" do painel do jogador); vazio se ele não
+    está no ranking. Com GameIDs em mais de um TCG (sem filtro de `tcg`),
+    centraliza na melhor posição, como `posicao_no_ranking_geral`."""
+    totais = _totais_ranking_geral(mes, ano, loja_id, tcg)
+    linhas, primeira_posicao = _em_torno(session, totais, _chaves_ranking_geral(totais), jogador_id, janela)
+    return _montar_ranking(session, linhas, loja_id=loja_id, tcg=tcg, primeira_posicao=primeira_posicao)
+
+
+def posicao_no_ranking_geral(
+    session: SessionDep, jogador_id: int, loja_id: int | None = None, tcg: str | None = None,
+) -> tuple[int | None, int]:
+    """Posição de UM jogador no ranking geral, e quantas entradas o ranking
+    tem, numa única consulta com `row_number()` — sem montar o ranking
+    inteiro pra procurar uma linha. Mesmas entradas e mesma ordem de
+    `calcula_ranking_geral`. Jogador com GameIDs em mais de um TCG aparece
+    mais de uma vez sem filtro de `tcg` — vale a melhor posição, como em
+    `posicao_do_jogador` antes. `mes`/`ano` não entram: no ranking geral eles
+    só recortam V/D/E, nunca os pontos, então não mudam a posição."""
+    totais = _totais_ranking_geral(loja_id=loja_id, tcg=tcg)
+    posicoes = select(
+        totais.c.jogador_criado_id,
+        func.row_number().over(order_by=_ordem(_chaves_ranking_geral(totais))).label("posicao"),
+    ).subquery("posicoes")
+
+    posicao, total = session.exec(
+        select(
+            func.min(case((JogadorCriado.jogador_id == jogador_id, posicoes.c.posicao))),
+            func.count(),
+        )
+        .select_from(posicoes)
+        .join(JogadorCriado, JogadorCriado.id == posicoes.c.jogador_criado_id)
+    ).one()
+    return posicao, total
+
+
+def calcula_ranking_geral_em_cache(session: SessionDep, mes=None, ano=None, loja_id=None, tcg=None):
+    """`calcula_ranking_geral` através do cache LRU (ver RankingCacheService).
+    Devolve uma lista nova a cada chamada — quem chama pode reordenar/fatiar
+    à vontade sem mexer na entrada em cache."""
+    chave = chave_ranking_geral(mes, ano, loja_id, tcg)
+    encontrado, ranking = cache_ranking_geral.obter(chave)
+    if not encontrado:
+        geracao = cache_ranking_geral.geracao
+        ranking = tuple(calcula_ranking_geral(session, mes=mes, ano=ano, loja_id=loja_id, tcg=tcg))
+        cache_ranking_geral.guardar(chave, ranking, geracao)
+    return list(ranking)
+
+
+def _totais_ranking_por_loja(session: SessionDep, mes: int | None = None):
+    """Subconsulta com uma linha por (loja, jogador criado) que somou pontos
+    diferentes de zero nos torneios da loja: pontos, torneios e V/D/E, direto
+    das participações e rodadas. Aqui (diferente do ranking geral) o mês
+    recorta tudo, pelo mês da data efetiva do torneio — a real pra
+    FINALIZADOS, a planejada pro resto (Torneio.ano_mes_efetivo). As
+    rodadas contam independente do status do torneio, e rodada sem vencedor
+    conta como empate, como sempre contaram."""
+    lados = lados_das_rodadas()
+    vitorias, derrotas, empates = contagem_vde(lados)
+    # V/D/E agregados por participação ANTES do JOIN com as participações —
+    # juntar as rodadas direto multiplicaria os pontos de cada participação
+    # pelo número de rodadas dela.
+    resultados = (
+        select(
+            lados.c.link_id, lados.c.torneio_id,
+            vitorias.label("vitorias"), derrotas.label("derrotas"), empates.label("empates"),
+        )
+        .group_by(lados.c.link_id, lados.c.torneio_id)
+        .subquery("resultados")
+    )
+
+    pontos = func.sum(_pontos_truncados(session, JogadorTorneioLink.pontuacao_com_regras))
+    consulta = (
+        select(
+            Torneio.loja_id.label("loja_id"),
+            JogadorTorneioLink.jogador_criado_id.label("jogador_criado_id"),
+            pontos.label("pontos"),
+            func.count(JogadorTorneioLink.id).label("torneios"),
+            func.coalesce(func.sum(resultados.c.vitorias), 0).label("vitorias"),
+            func.coalesce(func.sum(resultados.c.derrotas), 0).label("derrotas"),
+            func.coalesce(func.sum(resultados.c.empates), 0).label("empates"),
+        )
+        .select_from(JogadorTorneioLink)
+        .join(Torneio, Torneio.id == JogadorTorneioLink.torneio_id)
+        .join(resultados, and_(
+            resultados.c.link_id == JogadorTorneioLink.id,
+            resultados.c.torneio_id == JogadorTorneioLink.torneio_id,
+        ), isouter=True)
+        .where(Torneio.loja_id.is_not(None), JogadorTorneioLink.jogador_criado_id.is_not(None))
+        .group_by(Torneio.loja_id, JogadorTorneioLink.jogador_criado_id)
+        .having(pontos != 0)
+    )
+    if mes is not None:
+        consulta = consulta.where(Torneio.ano_mes_efetivo % 100 == mes)
+    return consulta.subquery("totais_loja")
+
+
+def _chaves_ranking_por_loja(totais) -> tuple:
+    # Ordem total (pontos desc, loja, jogador criado): sem desempate fixo a
+    # ordem entre empatados variava de uma chamada pra outra, e a paginação
+    # por cursor precisa que ela seja sempre a mesma.
+    return totais.c.pontos, totais.c.loja_id, totais.c.jogador_criado_id
+
+
+def _montar_ranking_por_loja(session: SessionDep, linhas, primeira_posicao: int = 1) -> list[RankingPorLoja]:
+    if not linhas:
         return []
 
-    formatos_data = defaultdict(lambda: {
-        "pontos": 0,
-        "vitorias": 0,
-        "total_partidas": 0
-    })
-
-    for link in links:
-        formato = link.torneio.formato if link.torneio.formato else "Desconhecido"
-        formatos_data[formato]["pontos"] += float(link.pontuacao_com_regras)
-
-        rodadas = session.exec(
-            select(Rodada).where(
-                (Rodada.torneio_id == link.torneio_id) &
-                ((Rodada.jogador1_id == jogador.id) |
-                 (Rodada.jogador2_id == jogador.id))
-            )
+    jogadores_criados = {
+        jogador_criado.id: (jogador_criado, jogador)
+        for jogador_criado, jogador in session.exec(
+            select(JogadorCriado, Jogador)
+            .join(Jogador, Jogador.id == JogadorCriado.jogador_id, isouter=True)
+            .where(JogadorCriado.id.in_({linha.jogador_criado_id for linha in linhas}))
         ).all()
-
-        for rodada in rodadas:
-            formatos_data[formato]["total_partidas"] += 1
-            if rodada.vencedor == jogador.id:
-                formatos_data[formato]["vitorias"] += 1
+    }
+    nomes_das_lojas = dict(session.exec(
+        select(Loja.id, Loja.nome).where(Loja.id.in_({linha.loja_id for linha in linhas}))
+    ).all())
 
     ranking = []
-    for formato, dados in formatos_data.items():
-        total_partidas = dados["total_partidas"]
-        taxa_vitoria = round(
-            dados["vitorias"] / total_partidas, 2) if total_partidas > 0 else 0.0
-
-        ranking.append(RankingPorFormato(
-            formato=formato,
-            pontos=dados["pontos"],
-            vitorias=dados["vitorias"],
-            taxa_vitoria=taxa_vitoria
+    for posicao, linha in enumerate(linhas, start=primeira_posicao):
+        jogador_criado, jogador = jogadores_criados[linha.jogador_criado_id]
+        ranking.append(RankingPorLoja(
+            posicao=posicao,
+            jogador_id=jogador.id if jogador else None,
+            jogador_criado_id=jogador_criado.id,
+            loja_id=linha.loja_id,
+            nome_jogador=jogador.nome if jogador else jogador_criado.apelido,
+            nome_loja=nomes_das_lojas[linha.loja_id],
+            pontos=int(linha.pontos),
+            torneios=linha.torneios,
+            vitorias=linha.vitorias,
+            derrotas=linha.derrotas,
+            empates=linha.empates,
+            taxa_vitoria=_taxa_vitoria(linha.vitorias, linha.derrotas, linha.empates),
         ))
 
     return ranking
 
 
-def calcular_taxa_vitoria(
-    session: SessionDep, jogador: Jogador, loja_id: int | None = None, tcg: str | None = None,
-):
-    links = session.exec(
-        select(JogadorTorneioLink)
+def calcula_ranking_geral_por_loja(session: SessionDep, mes: int = None):
+    """Ranking de cada jogador em cada loja: um agregado agrupado e já
+    ordenado, mais uma consulta pros nomes de jogadores e uma pros de lojas."""
+    totais = _totais_ranking_por_loja(session, mes)
+    linhas = session.exec(select(*totais.c).order_by(*_ordem(_chaves_ranking_por_loja(totais)))).all()
+    return _montar_ranking_por_loja(session, linhas)
+
+
+def pagina_ranking_por_loja(
+    session: SessionDep, limite: int, apos: tuple[int, int, int] | None = None, mes: int = None,
+) -> list[RankingPorLoja]:
+    """Até `limite` entradas do ranking por loja logo depois do cursor `apos`
+    — (pontos, loja_id, jogador_criado_id) da última entrada da página
+    anterior (ver `_pagina`)."""
+    totais = _totais_ranking_por_loja(session, mes)
+    linhas, primeira_posicao = _pagina(session, totais, _chaves_ranking_por_loja(totais), limite, apos)
+    return _montar_ranking_por_loja(session, linhas, primeira_posicao)
+
+
+def ranking_por_loja_em_torno(
+    session: SessionDep, jogador_id: int, janela: int = 10, mes: int = None,
+) -> list[RankingPorLoja]:
+    """A melhor entrada do jogador no ranking por loja e até `janela`
+    entradas acima e abaixo dela; vazio se ele não está no ranking."""
+    totais = _totais_ranking_por_loja(session, mes)
+    linhas, primeira_posicao = _em_torno(session, totais, _chaves_ranking_por_loja(totais), jogador_id, janela)
+    return _montar_ranking_por_loja(session, linhas, primeira_posicao)
+
+
+def desempenho_por_formato(session: SessionDep, jogador: Jogador) -> list[RankingPorFormato]:
+    """Pontos, partidas e vitórias do jogador por formato de torneio, em
+    todos os torneios FINALIZADOS de todos os GameIDs da conta — numa
+    consulta agrupada só. As rodadas são atribuídas pela participação
+    (JogadorTorneioLink.id, que é o que Rodada.jogador1_id/jogador2_id/
+    vencedor_id guardam), nunca pelo id do Jogador."""
+    lados = lados_das_rodadas()
+    # Partidas/vitórias agregadas por participação ANTES do JOIN, pra não
+    # multiplicar os pontos da participação pelo número de rodadas dela.
+    resultados = (
+        select(
+            lados.c.link_id, lados.c.torneio_id,
+            func.count().label("partidas"),
+            func.sum(case((lados.c.vencedor_id == lados.c.link_id, 1), else_=0)).label("vitorias"),
+        )
+        .group_by(lados.c.link_id, lados.c.torneio_id)
+        .subquery("resultados")
+    )
+    linhas = session.exec(
+        select(
+            Torneio.formato,
+            func.sum(JogadorTorneioLink.pontuacao_com_regras),
+            func.coalesce(func.sum(resultados.c.partidas), 0),
+            func.coalesce(func.sum(resultados.c.vitorias), 0),
+        )
+        .select_from(JogadorTorneioLink)
+        .join(Torneio, Torneio.id == JogadorTorneioLink.torneio_id)
         .join(JogadorCriado, JogadorCriado.id == JogadorTorneioLink.jogador_criado_id)
-        .where(JogadorCriado.jogador_id == jogador.id)
+        .join(resultados, and_(
+            resultados.c.link_id == JogadorTorneioLink.id,
+            resultados.c.torneio_id == JogadorTorneioLink.torneio_id,
+        ), isouter=True)
+        .where(Torneio.status == StatusTorneio.FINALIZADO, JogadorCriado.jogador_id == jogador.id)
+        .group_by(Torneio.formato)
+        .order_by(Torneio.formato)
     ).all()
-    link_ids = {link.id for link in links}
 
-    vitorias, derrotas, empates = 0, 0, 0
-    if not link_ids:
-        return 0
-
-    consulta = (select(Rodada)
-                .join(Torneio)
-                .where(
-                    (Torneio.status == StatusTorneio.FINALIZADO) &
-                    (Rodada.jogador1_id.in_(link_ids) | Rodada.jogador2_id.in_(link_ids))))
+    return [
+        RankingPorFormato(
+            formato=formato if formato else "Desconhecido",
+            pontos=pontos or 0,
+            vitorias=vitorias,
+            taxa_vitoria=round(vitorias / partidas, 2) if partidas > 0 else 0.0,
+        )
+        for formato, pontos, partidas, vitorias in linhas
+    ]
+
+
+def calcular_taxas_vitoria(
+    session: SessionDep, jogador_ids: Iterable[int], loja_id: int | None = None, tcg: str | None = None,
+) -> dict[int, int]:
+    """Taxa de vitória (0-100) de vários jogadores numa passada só: um
+    agregado das rodadas de torneios FINALIZADOS, agrupado pela conta dono
+    de cada lado — todas as participações de todos os GameIDs da conta,
+    como sempre foi. `loja_id`/`tcg` recortam pela loja e pelo jogo do
+    torneio. Jogador sem nenhuma rodada fica com 0."""
+    jogador_ids = set(jogador_ids)
+    if not jogador_ids:
+        return {}
+
+    lados = lados_das_rodadas()
+    consulta = (
+        select(JogadorCriado.jogador_id, *contagem_vde(lados))
+        .select_from(lados)
+        .join(JogadorTorneioLink, JogadorTorneioLink.id == lados.c.link_id)
+        .join(JogadorCriado, JogadorCriado.id == JogadorTorneioLink.jogador_criado_id)
+        .join(Torneio, Torneio.id == lados.c.torneio_id)
+        .where(Torneio.status == StatusTorneio.FINALIZADO, JogadorCriado.jogador_id.in_(jogador_ids))
+        .group_by(JogadorCriado.jogador_id)
+    )
     if loja_id is not None:
         consulta = consulta.where(Torneio.loja_id == loja_id)
     if tcg is not None:
         consulta = consulta.where(Torneio.jogo == tcg)
 
-    for rodada in session.exec(consulta).all():
-        meu_link_id = rodada.jogador1_id if rodada.jogador1_id in link_ids else rodada.jogador2_id
-        if rodada.vencedor_id == meu_link_id:
-            vitorias += 1
-        elif rodada.vencedor_id is not None:
-            derrotas += 1
-        else:
-            empates += 1
+    taxas = dict.fromkeys(jogador_ids, 0)
+    for jogador_id, vitorias, derrotas, empates in session.exec(consulta).all():
+        taxas[jogador_id] = _taxa_vitoria(vitorias or 0, derrotas or 0, empates or 0)
+    return taxas
 
-    total = vitorias + derrotas + empates
-    return int((vitorias / total) * 100) if total > 0 else 0
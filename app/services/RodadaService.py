@@ -1,15 +1,23 @@
+from app.core.config import settings
 from app.core.db import SessionDep
-from app.models import Torneio, Rodada, JogadorTorneioLink, Jogador
+from app.models import Torneio, Rodada, JogadorTorneioLink, JogadorCriado
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
-from app.services.ComposicaoService import garantir_composicao_partida
-from app.services.JogadorService import retornar_vde_jogador
+from app.services.ComposicaoService import garantir_composicoes_partida
+from app.services.JogadorService import retornar_vde_participantes
+from app.services.TorneioAoVivoService import publicar_apos_commit
 from app.utils.datetimeUtil import data_agora_brasil
 from app.utils.Enums import TipoParticipanteTorneio
+from app.utils.PareamentoUtil import confrontos_de, parear_suico
 
+_VDE_ZERADO = {"vitorias": 0, "derrotas": 0, "empates": 0}
 
-def _info_participante(session: SessionDep, participante: JogadorTorneioLink, vde: dict) -> dict:
-    jogador_id = participante.jogador_criado.jogador_id if participante.jogador_criado else None
-    jogador_real = session.get(Jogador, jogador_id) if jogador_id else None
+
+def _info_participante(participante: JogadorTorneioLink, vde: dict) -> dict:
+    jogador_criado = participante.jogador_criado
+    jogador_id = jogador_criado.jogador_id if jogador_criado else None
+    jogador_real = jogador_criado.jogador if jogador_id else None
     return {
         "jogador_id": jogador_id,
         "usuario_id": jogador_real.usuario_id if jogador_real else None,
@@ -19,6 +27,9 @@ def _info_participante(session: SessionDep, participante: JogadorTorneioLink, vd
 
 
 def nova_rodada(session: SessionDep, torneio: Torneio):
+    # Tudo que a rodada precisa de cada participante (GameID, conta e o time
+    # a clonar na composição) vem junto, numa consulta por relação — nada de
+    # carregamento preguiçoso por mesa mais abaixo.
     jogadores = session.exec(select(JogadorTorneioLink)
                              .where(
                                  (JogadorTorneioLink.torneio_id == torneio.id) &
@@ -26,83 +37,102 @@ def nova_rodada(session: SessionDep, torneio: Torneio):
                                      TipoParticipanteTorneio.JOGADOR,
                                      TipoParticipanteTorneio.JOGADOR_E_JUIZ,
                                  ]))
+                             )
+                             .options(
+                                 selectinload(JogadorTorneioLink.jogador_criado)
+                                 .selectinload(JogadorCriado.jogador),
+                                 selectinload(JogadorTorneioLink.composicao_unidades),
                              )).all()
 
     jogadores = sorted(jogadores, key=lambda j: (
         j.pontuacao, j.jogador_criado_id), reverse=True)
-    mesa_livre = 1
+    por_id = {jogador.id: jogador for jogador in jogadores}
+
+    # Histórico inteiro do torneio numa consulta só — quem já enfrentou quem
+    # e quem já teve bye —, em vez de um SELECT por par candidato; daí em
+    # diante o pareamento é todo em memória (ver PareamentoUtil).
+    confrontos, com_bye = confrontos_de(session.exec(
+        select(Rodada.jogador1_id, Rodada.jogador2_id)
+        .where(Rodada.torneio_id == torneio.id)
+    ).all())
+    pareamento = parear_suico(
+        [jogador.id for jogador in jogadores], confrontos, com_bye,
+        settings.PAREAMENTO_ORCAMENTO_SEGUNDOS,
+    )
+    mesas = list(pareamento.mesas)
+    if pareamento.bye is not None:
+        mesas.append((pareamento.bye, None))
+
     rodada_atual = torneio.rodada_atual + 1
+    data_de_inicio = data_agora_brasil()
 
-    jogando = {}
-    result = {}
-    for i, jogador in enumerate(jogadores):
-        adversario = None
-        if jogando.get(jogador.id, False):
-            continue
-
-        for pos_adversario in jogadores[i+1:]:
-            if jogando.get(pos_adversario.id, False):
-                continue
-
-            ja_jogaram = session.exec(
-                select(Rodada).where(
-                    ((Rodada.jogador1_id == jogador.id) &
-                     (Rodada.jogador2_id == pos_adversario.id))
-                    |
-                    ((Rodada.jogador1_id == pos_adversario.id) &
-                     (Rodada.jogador2_id == jogador.id))
-                )
-            ).first()
-
-            if ja_jogaram:
-                continue
-
-            adversario = pos_adversario
-            break
-
-        nova_rodada = Rodada(
-            jogador1_id=jogador.id,
-            jogador2_id=adversario.id if adversario else None,
-            torneio_id=torneio.id,
-            loja_id=torneio.loja_id,
-            num_rodada=rodada_atual,
-            mesa=mesa_livre,
-            data_de_inicio=data_agora_brasil(),
-            finalizada=False
-        )
-        session.add(nova_rodada)
-        session.flush()
-
-        # Cada lado da rodada (link de participação, não a Jogador ainda —
-        # essa reatribuição só acontece nas linhas abaixo) ganha sua própria
-        # ComposicaoPartida (mesmo id reaproveitado partida a partida pra
-        # TCG/VGC, id novo a cada rodada só pra Pokémon GO — ver
-        # ComposicaoService.garantir_composicao_partida).
-        garantir_composicao_partida(session, nova_rodada.id, jogador, torneio.jogo)
-        if adversario:
-            garantir_composicao_partida(session, nova_rodada.id, adversario, torneio.jogo)
+    torneio.rodada_atual = rodada_atual
+    session.add(torneio)
+    if not mesas:
+        return {}
+
+    # Todas as mesas num INSERT em lote só, em vez de um flush por mesa; os
+    # ids voltam numa consulta pela rodada (torneio, número) — mesa é única
+    # dentro dela.
+    session.execute(insert(Rodada), [
+        {
+            "jogador1_id": jogador1_id,
+            "jogador2_id": jogador2_id,
+            "torneio_id": torneio.id,
+            "loja_id": torneio.loja_id,
+            "num_rodada": rodada_atual,
+            "mesa": mesa,
+            "data_de_inicio": data_de_inicio,
+            "finalizada": False,
+        }
+        for mesa, (jogador1_id, jogador2_id) in enumerate(mesas, start=1)
+    ])
+    rodada_id_por_mesa = dict(session.exec(
+        select(Rodada.mesa, Rodada.id)
+        .where(Rodada.torneio_id == torneio.id, Rodada.num_rodada == rodada_atual)
+    ).all())
+
+    # Cada lado da rodada (link de participação, não a Jogador) ganha sua
+    # própria ComposicaoPartida (mesmo id reaproveitado partida a partida pra
+    # TCG/VGC, id novo a cada rodada só pra Pokémon GO — ver
+    # ComposicaoService.garantir_composicoes_partida), todas de uma vez.
+    garantir_composicoes_partida(session, [
+        (rodada_id_por_mesa[mesa], por_id[link_id])
+        for mesa, par in enumerate(mesas, start=1)
+        for link_id in par
+        if link_id is not None
+    ], torneio.jogo)
+
+    publicar_apos_commit(session, torneio.id, "rodada", num_rodada=rodada_atual, mesas=[
+        {
+            "id": rodada_id_por_mesa[mesa],
+            "num_rodada": rodada_atual,
+            "mesa": mesa,
+            "jogador1_id": jogador1_id,
+            "jogador2_id": jogador2_id,
+            "vencedor_id": None,
+            "finalizada": False,
+        }
+        for mesa, (jogador1_id, jogador2_id) in enumerate(mesas, start=1)
+    ])
+
+    vde_por_link = retornar_vde_participantes(session, torneio)
 
-        jogando[jogador.id] = True
-        jogador_vde = retornar_vde_jogador(
-            session, jogador.jogador_criado.jogador_id, torneio)
+    result = {}
+    for mesa, (jogador1_id, jogador2_id) in enumerate(mesas, start=1):
+        jogador = por_id[jogador1_id]
+        adversario = por_id.get(jogador2_id)
 
         adversario_info = {}
         if adversario:
-            jogando[adversario.id] = True
-            adversario_vde = retornar_vde_jogador(
-                session, adversario.jogador_criado.jogador_id, torneio)
-            adversario_info = _info_participante(session, adversario, adversario_vde)
+            adversario_info = _info_participante(adversario, vde_por_link.get(adversario.id, _VDE_ZERADO))
 
-        result[str(nova_rodada.id)] = [
+        result[str(rodada_id_por_mesa[mesa])] = [
             {
-                "mesa": mesa_livre,
-                "jogador1": _info_participante(session, jogador, jogador_vde),
+                "mesa": mesa,
+                "jogador1": _info_participante(jogador, vde_por_link.get(jogador.id, _VDE_ZERADO)),
                 "jogador2": adversario_info,
             }
         ]
 
-        mesa_livre += 1
-
-    torneio.rodada_atual = rodada_atual
-    session.add(torneio)
     return result
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import JogadorTorneioLink, Rodada
+
+# Canal de atualizações ao vivo por torneio (ver a rota WebSocket
+# /torneios/{id}/ao-vivo): quem acompanha um torneio recebe só o que mudou —
+# mesas novas, resultados e a pontuação/desempates de quem mudou — em vez de
+# refazer GET /torneios/{id} inteiro a cada poucos segundos. O canal é do
+# processo, como o cache do ranking (ver RankingCacheService): com mais de um
+# worker, cada um só avisa os sockets conectados nele.
+
+CAMPOS_MESA = ("id", "num_rodada", "mesa", "jogador1_id", "jogador2_id", "vencedor_id", "finalizada")
+CAMPOS_PLACAR = (
+    "pontuacao", "pontuacao_com_regras", "vitorias", "derrotas", "empates", "byes",
+    "porcentagem_vitorias_oponentes", "porcentagem_vitorias_oponentes_oponentes",
+)
+
+# Mandado no lugar dos eventos de um cliente que não deu conta de
+# acompanhar: ele perdeu alguma coisa e precisa reler o torneio inteiro.
+RESSINCRONIZAR = json.dumps({"tipo": "ressincronizar"})
+
+_CHAVE_EVENTOS = "_torneio_ao_vivo_eventos"
+
+
+class Inscricao:
+    """Um socket acompanhando um torneio: a fila de mensagens (JSON já
+    serializado) e o event loop dono dela, pra que a publicação — que roda
+    na thread da requisição que fez o commit — entregue pelo loop certo."""
+
+    def __init__(self, torneio_id: str, tamanho_fila: int):
+        self.torneio_id = torneio_id
+        self.loop = asyncio.get_running_loop()
+        self.fila: asyncio.Queue[str] = asyncio.Queue(maxsize=tamanho_fila)
+
+    def _entregar(self, mensagem: str) -> None:
+        try:
+            self.fila.put_nowait(mensagem)
+        except asyncio.QueueFull:
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(RESSINCRONIZAR)
+
+
+class CanalAoVivo:
+    def __init__(self, tamanho_fila: int):
+        self.tamanho_fila = max(tamanho_fila, 1)
+        self._inscricoes: dict[str, set[Inscricao]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def inscrever(self, torneio_id: str) -> Inscricao:
+        """Precisa ser chamado de dentro do event loop que vai ler a fila."""
+        inscricao = Inscricao(torneio_id, self.tamanho_fila)
+        with self._lock:
+            self._inscricoes[torneio_id].add(inscricao)
+        return inscricao
+
+    def cancelar(self, inscricao: Inscricao) -> None:
+        with self._lock:
+            inscricoes = self._inscricoes.get(inscricao.torneio_id)
+            if inscricoes is None:
+                return
+            inscricoes.discard(inscricao)
+            if not inscricoes:
+                del self._inscricoes[inscricao.torneio_id]
+
+    def inscritos(self, torneio_id: str) -> int:
+        with self._lock:
+            return len(self._inscricoes.get(torneio_id, ()))
+
+    def publicar(self, torneio_id: str, evento: dict) -> None:
+        """Serializa o evento uma vez e entrega a todos os inscritos do
+        torneio. Pode ser chamado de qualquer thread."""
+        with self._lock:
+            inscricoes = list(self._inscricoes.get(torneio_id, ()))
+        if not inscricoes:
+            return
+
+        mensagem = json.dumps({"torneio_id": torneio_id, **evento}, default=str)
+        for inscricao in inscricoes:
+            try:
+                inscricao.loop.call_soon_threadsafe(inscricao._entregar, mensagem)
+            except RuntimeError:
+                # Loop já fechado: o socket morreu sem passar pelo cancelar.
+                self.cancelar(inscricao)
+
+
+canal_torneios = CanalAoVivo(settings.AO_VIVO_FILA_TAMANHO)
+
+
+def mesa_ao_vivo(rodada: Rodada) -> dict:
+    return {campo: getattr(rodada, campo) for campo in CAMPOS_MESA}
+
+
+def placar(links: Iterable[JogadorTorneioLink]) -> dict[int, tuple]:
+    """Foto dos campos de classificação de cada participação, pra comparar
+    depois com `diferenca_placar`."""
+    return {link.id: tuple(getattr(link, campo) for campo in CAMPOS_PLACAR) for link in links}
+
+
+def diferenca_placar(antes: dict[int, tuple], links: Iterable[JogadorTorneioLink]) -> list[dict]:
+    """Só as participações que mudaram desde a foto `antes`, e de cada uma
+    só os campos que mudaram."""
+    diferencas = []
+    for link in links:
+        anteriores = antes.get(link.id)
+        mudou = {
+            campo: getattr(link, campo)
+            for i, campo in enumerate(CAMPOS_PLACAR)
+            if anteriores is None or anteriores[i] != getattr(link, campo)
+        }
+        if mudou:
+            diferencas.append({"id": link.id, **mudou})
+    return diferencas
+
+
+def publicar_apos_commit(session: Session, torneio_id: str, tipo: str, **dados) -> None:
+    """Agenda um evento pros sockets do torneio — só depois do commit, pelo
+    mesmo motivo da invalidação do ranking (ver
+    RankingCacheService.invalidar_ranking_apos_commit): o cliente que
+    receber o aviso e reler o torneio tem que ver o dado novo, e um rollback
+    não deve avisar nada. Os dados já vão montados: depois do commit os
+    objetos estão expirados."""
+    session.info.setdefault(_CHAVE_EVENTOS, []).append((torneio_id, {"tipo": tipo, **dados}))
+
+
+def _publicar_eventos(session: Session) -> None:
+    for torneio_id, evento in session.info.pop(_CHAVE_EVENTOS, ()):
+        canal_torneios.publicar(torneio_id, evento)
+
+
+def _descartar_eventos(session: Session, previous_transaction=None) -> None:
+    session.info.pop(_CHAVE_EVENTOS, None)
+
+
+event.listen(Session, "after_commit", _publicar_eventos)
+event.listen(Session, "after_soft_rollback", _descartar_eventos)
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlmodel import Session, func, select
+
+from app.core.config import settings
+from app.models import JogadorCriado, JogadorTorneioLink, Loja, Torneio, TorneioApagado
+from app.schemas.Torneio import TorneioPublico
+from app.services.TorneioService import retornar_torneio_completo
+from app.utils.CacheLRU import CacheLRU
+from app.utils.Enums import StatusTorneio
+from app.utils.RecorteCamposUtil import RecorteCampos
+
+# JSON de GET /lojas/torneios/{id} já serializado, por (torneio, versão,
+# recorte). A versão (ver versao_publicada — torneio, loja e participantes,
+# a mesma do ETag) entra na chave, na memória e no nome do arquivo, então nada
+# precisa ser invalidado: torneio que muda passa a ter outra chave, e a
+# entrada antiga só sai por falta de uso. Limitado pelo total de bytes, não
+# pelo número de torneios — um torneio de 200 jogadores pesa bem mais que
+# um de 8. Torneio apagado é a exceção: sai da memória e do disco depois
+# do commit (ver _apagar_torneios_apos_commit).
+cache_torneio_completo = CacheLRU(settings.TORNEIO_CACHE_BYTES, peso=len)
+
+_CHAVE_APAGADOS = "_torneio_cache_apagados"
+
+
+def _prefixo(torneio_id: str) -> str:
+    # O id vem do .tdf em torneios importados — não vira nome de arquivo direto.
+    return hashlib.sha1(torneio_id.encode()).hexdigest()[:20]
+
+
+def versao_publicada(session: Session, torneio: Torneio) -> str:
+    """Versão do que GET /lojas/torneios/{id} devolve: a do torneio, a da
+    loja (perfil embutido e temporadas, que decidem a categoria) e a soma
+    das versões dos JogadorCriado participantes (game_id, conta e data de
+    nascimento) — ver "Versão do Torneio" em app.models. Com os
+    participantes fixos pela versão do torneio, a soma só cresce. Uma
+    consulta, sem carregar as participações."""
+    versao_loja = select(Loja.versao).where(Loja.id == torneio.loja_id).scalar_subquery()
+    participantes = (
+        select(func.coalesce(func.sum(JogadorCriado.versao), 0))
+        .join(JogadorTorneioLink, JogadorTorneioLink.jogador_criado_id == JogadorCriado.id)
+        .where(JogadorTorneioLink.torneio_id == torneio.id)
+        .scalar_subquery()
+    )
+    loja, soma = session.exec(select(func.coalesce(versao_loja, 0), participantes)).one()
+    return f"{torneio.versao}.{loja}.{soma}"
+
+
+def _arquivo(torneio: Torneio, versao: str, recorte: RecorteCampos) -> Path:
+    nome = f"{_prefixo(torneio.id)}-{versao}-{recorte.chave or 'completo'}.json"
+    return Path(settings.TORNEIO_CACHE_DIRETORIO) / nome
+
+
+def _ler_do_disco(torneio: Torneio, versao: str, recorte: RecorteCampos) -> bytes | None:
+    try:
+        return _arquivo(torneio, versao, recorte).read_bytes()
+    except OSError:
+        return None
+
+
+def _gravar_no_disco(torneio: Torneio, versao: str, recorte: RecorteCampos, corpo: bytes) -> None:
+    """Grava via arquivo temporário + rename, pra que outro worker nunca
+    leia um JSON pela metade, e apaga as versões anteriores do torneio (um
+    torneio finalizado ainda pode ter resultados corrigidos). Falha de disco
+    não derruba a leitura — o JSON continua servido da memória."""
+    destino = _arquivo(torneio, versao, recorte)
+    versao_atual = f"{_prefixo(torneio.id)}-{versao}-"
+    try:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=destino.parent, suffix=".tmp")
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(corpo)
+        os.replace(temporario, destino)
+        for arquivo_do_torneio in destino.parent.glob(f"{_prefixo(torneio.id)}-*.json"):
+            if not arquivo_do_torneio.name.startswith(versao_atual):
+                arquivo_do_torneio.unlink(missing_ok=True)
+    except OSError:
+        return
+
+
+def torneio_completo_json(session: Session, torneio: Torneio, versao: str, recorte: RecorteCampos) -> bytes:
+    """Corpo JSON de retornar_torneio_completo(torneio, recorte) validado
+    por TorneioPublico — da memória, do disco (só torneios finalizados, com
+    TORNEIO_CACHE_DIRETORIO) ou montado agora e guardado nos dois. `versao`
+    é a de versao_publicada, já calculada pela rota pro ETag."""
+    chave = (torneio.id, versao, recorte.chave)
+    encontrado, corpo = cache_torneio_completo.obter(chave)
+    if encontrado:
+        return corpo
+
+    geracao = cache_torneio_completo.geracao
+    persistir = bool(settings.TORNEIO_CACHE_DIRETORIO) and torneio.status == StatusTorneio.FINALIZADO
+    corpo = _ler_do_disco(torneio, versao, recorte) if persistir else None
+    if corpo is None:
+        corpo = recorte.renderizar(TorneioPublico, retornar_torneio_completo(session, torneio, recorte))
+        if persistir:
+            _gravar_no_disco(torneio, versao, recorte, corpo)
+
+    cache_torneio_completo.guardar(chave, corpo, geracao)
+    return corpo
+
+
+def estatisticas_cache_torneio() -> dict[str, int]:
+    return cache_torneio_completo.estatisticas()
+
+
+def limpar_cache_torneio() -> None:
+    cache_torneio_completo.invalidar()
+
+
+def _anotar_torneios_apagados(session: Session, flush_context) -> None:
+    apagados = {obj.id for obj in (*session.new, *session.dirty) if isinstance(obj, TorneioApagado)}
+    if apagados:
+        session.info.setdefault(_CHAVE_APAGADOS, set()).update(apagados)
+
+
+def _apagar_torneios_apos_commit(session: Session) -> None:
+    """O JSON de um torneio apagado não é mais servido (a versão do que for
+    recriado com o mesmo id já é outra), mas ficaria ocupando memória e,
+    no disco, pra sempre — ninguém grava de novo sob aquele prefixo."""
+    apagados = session.info.pop(_CHAVE_APAGADOS, None)
+    if not apagados:
+        return
+    cache_torneio_completo.invalidar(lambda chave: chave[0] in apagados)
+    if not settings.TORNEIO_CACHE_DIRETORIO:
+        return
+    diretorio = Path(settings.TORNEIO_CACHE_DIRETORIO)
+    for torneio_id in apagados:
+        for arquivo in diretorio.glob(f"{_prefixo(torneio_id)}-*.json"):
+            arquivo.unlink(missing_ok=True)
+
+
+def _descartar_torneios_apagados(session: Session, previous_transaction=None) -> None:
+    session.info.pop(_CHAVE_APAGADOS, None)
+
+
+event.listen(Session, "after_flush", _anotar_torneios_apagados)
+event.listen(Session, "after_commit", _apagar_torneios_apos_commit)
+event.listen(Session, "after_soft_rollback", _descartar_torneios_apagados)
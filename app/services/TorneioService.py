@@ -1,13 +1,25 @@
-import random
+import math
+from datetime import date
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
 from sqlmodel import col, select, func, text
+from app.core.config import settings
 from app.core.db import SessionDep
 from app.core.exception import TopDeckedException
 from app.core.security import TokenData
 from app.dependencies import definir_tenant_sessao
-from app.models import Rodada, Torneio, Jogador, JogadorCriado, JogadorTorneioLink, TipoJogador, LojaJogadorLink, LojaJogadorOrganizadorTCG, PontuacaoExtra
-from app.utils.Enums import TCG, TipoParticipanteTorneio
+from app.models import (
+    Rodada, Torneio, Loja, Jogador, JogadorCriado, JogadorTorneioLink, TipoJogador, LojaJogadorLink,
+    LojaJogadorOrganizadorTCG, PontuacaoExtra, Temporada, RepresentacaoComposicao, RepresentacaoComposicaoUnidade,
+    JogadorComposicaoUnidade, registrar_torneio_apagado,
+)
+from app.utils.Enums import TCG, StatusTorneio, TipoParticipanteTorneio
 from app.utils.CategoriaUtil import encontrar_temporada_do_torneio, calcular_categoria_na_temporada
+from app.utils.PontuacaoUtil import MotorTorneio, Regra, ordem_oficial, pontos_do_lado, resultados_da_mesa
+from app.utils.RecorteCamposUtil import RecorteCampos
+from app.services.RankingService import atualizar_ranking_snapshot_torneio
+from app.services.TorneioAoVivoService import diferenca_placar, mesa_ao_vivo, placar, publicar_apos_commit
 
 # Jogos com formato suíço, onde o desempate por OMW%/OOMW% (ver
 # calcular_desempate_suico) faz sentido — outros TCGs (Yu-Gi-Oh!, Magic) usam
@@ -54,7 +66,26 @@ def verificar_permissao_gerenciar_torneio(session: SessionDep, torneio: Torneio,
     raise TopDeckedException.forbidden()
 
 
-def calcular_categoria_do_link(session: SessionDep, torneio: Torneio, link: JogadorTorneioLink) -> str | None:
+# Valor padrão de `temporada` em calcular_categoria_do_link/
+# retornar_link_completo: "ainda não procurada" — diferente de None, que é
+# "procurada e o torneio não cai em temporada nenhuma".
+_BUSCAR_TEMPORADA = object()
+
+# O que `fields`/`include` (ver RecorteCamposUtil) podem recortar do
+# torneio completo e de cada participação dele — tudo que custa consulta ou
+# cálculo próprio.
+RELACOES_LINK = {
+    "composicao_representacao": None,
+    "composicao_unidades": None,
+    "categoria": None,
+    "posicao_ranking": None,
+}
+RELACOES_TORNEIO = {"loja": None, "jogadores": RELACOES_LINK, "rodadas": None}
+
+
+def calcular_categoria_do_link(
+    session: SessionDep, torneio: Torneio, link: JogadorTorneioLink, temporada=_BUSCAR_TEMPORADA,
+) -> str | None:
     if not link.jogador_criado:
         return None
 
@@ -65,18 +96,73 @@ def calcular_categoria_do_link(session: SessionDep, torneio: Torneio, link: Joga
     if not data_nascimento:
         return None
 
-    temporada = encontrar_temporada_do_torneio(session, torneio)
+    if temporada is _BUSCAR_TEMPORADA:
+        temporada = encontrar_temporada_do_torneio(session, torneio)
     if not temporada:
         return None
 
     return calcular_categoria_na_temporada(data_nascimento, temporada)
 
 
+def carregar_participacoes_para_serializar(
+    session: SessionDep, torneio: Torneio, recorte: RecorteCampos | None = None,
+) -> None:
+    """Carrega `torneio.jogadores` já com tudo o que retornar_link_completo
+    lê de cada participação — GameID e conta (categoria), representação da
+    composição com as unidades e as unidades da composição. Sem isso cada
+    participação disparava as próprias consultas preguiçosas (lazy load) e
+    um torneio de 64 jogadores custava centenas de consultas; assim custa o
+    mesmo punhado (uma por relacionamento, via selectinload) qualquer que
+    seja o tamanho.
+
+    `populate_existing`: depois de um commit (o caso de quase toda rota que
+    devolve o torneio) GameIDs, contas e unidades já carregados continuam no
+    identity map, só que expirados — o selectinload pula quem já está lá e
+    cada um acabaria recarregado sozinho no primeiro acesso. A sessão faz
+    autoflush antes da consulta, então nada pendente é sobrescrito.
+
+    O resultado vira a própria coleção `torneio.jogadores` (mesma ordem do
+    relacionamento): o identity map só guarda referência fraca, e as
+    participações carregadas aqui seriam descartadas — e relidas sem nada
+    carregado — antes de alguém tocar na coleção.
+
+    Com `recorte` (o de cada participação), só entra no plano o que ele
+    pede."""
+    recorte = recorte or RecorteCampos()
+    carregar_jogador_criado = selectinload(JogadorTorneioLink.jogador_criado)
+    if recorte.inclui("categoria"):
+        carregar_jogador_criado = carregar_jogador_criado.selectinload(JogadorCriado.jogador)
+    plano = [carregar_jogador_criado]
+    if recorte.inclui("composicao_representacao"):
+        plano.append(
+            selectinload(JogadorTorneioLink.composicao_representacao)
+            .selectinload(RepresentacaoComposicao.unidades)
+            .selectinload(RepresentacaoComposicaoUnidade.unidade)
+        )
+    if recorte.inclui("composicao_unidades"):
+        plano.append(
+            selectinload(JogadorTorneioLink.composicao_unidades).selectinload(JogadorComposicaoUnidade.unidade)
+        )
+
+    links = session.exec(
+        select(JogadorTorneioLink)
+        .where(JogadorTorneioLink.torneio_id == torneio.id)
+        .order_by(JogadorTorneioLink.id)
+        .execution_options(populate_existing=True)
+        .options(*plano)
+    ).all()
+    set_committed_value(torneio, "jogadores", list(links))
+
+
 def retornar_link_completo(
     session: SessionDep, torneio: Torneio, link: JogadorTorneioLink, posicao_ranking: int | None = None,
+    temporada: Temporada | None = _BUSCAR_TEMPORADA, recorte: RecorteCampos | None = None,
 ) -> dict:
+    # Relação fora do `recorte` nem é lida: o campo fica com o valor vazio
+    # do schema (e sai da resposta no recorte final da rota).
+    recorte = recorte or RecorteCampos()
     composicao_representacao = None
-    if link.composicao_representacao:
+    if recorte.inclui("composicao_representacao") and link.composicao_representacao:
         composicao_representacao = {
             "id": link.composicao_representacao.id,
             "tcg": link.composicao_representacao.tcg,
@@ -92,6 +178,10 @@ def retornar_link_completo(
             ],
         }
 
+    categoria = None
+    if recorte.inclui("categoria"):
+        categoria = calcular_categoria_do_link(session, torneio, link, temporada)
+
     return {
         "id": link.id,
         "jogador_criado_id": link.jogador_criado_id,
@@ -115,7 +205,7 @@ def retornar_link_completo(
                     "nome": dc.unidade.nome,
                 },
             }
-            for dc in link.composicao_unidades
+            for dc in (link.composicao_unidades if recorte.inclui("composicao_unidades") else [])
         ],
         "vitorias": link.vitorias,
         "derrotas": link.derrotas,
@@ -124,7 +214,7 @@ def retornar_link_completo(
         "porcentagem_vitorias_oponentes": link.porcentagem_vitorias_oponentes,
         "porcentagem_vitorias_oponentes_oponentes": link.porcentagem_vitorias_oponentes_oponentes,
         "classificacao_oficial": link.classificacao_oficial,
-        "categoria": calcular_categoria_do_link(session, torneio, link),
+        "categoria": categoria,
         "posicao_ranking": posicao_ranking,
     }
 
@@ -181,6 +271,7 @@ def adicionar_juiz(session: SessionDep, torneio: Torneio, jogador_criado_id: int
         tipo=TipoParticipanteTorneio.JUIZ,
     )
     salvar_link_ou_conflito(session, link, "Este jogador já está cadastrado como Juiz neste torneio")
+    atualizar_ranking_snapshot_torneio(session, torneio)
     session.commit()
     session.refresh(link)
     return link
@@ -202,7 +293,9 @@ def remover_juiz(session: SessionDep, torneio: Torneio, link_id: int) -> None:
         session.commit()
         return
 
+    jogador_criado_id = link.jogador_criado_id
     session.delete(link)
+    atualizar_ranking_snapshot_torneio(session, torneio, [jogador_criado_id])
     session.commit()
 
 
@@ -242,41 +335,126 @@ def apagar_torneio_completo(session: SessionDep, torneio_id: str) -> None:
     session.exec(text("DELETE FROM rodada WHERE torneio_id = :torneio_id").bindparams(torneio_id=torneio_id))
     session.exec(text("DELETE FROM jogadortorneiolink WHERE torneio_id = :torneio_id").bindparams(torneio_id=torneio_id))
     session.exec(text("DELETE FROM pontuacaoextra WHERE torneio_id = :torneio_id").bindparams(torneio_id=torneio_id))
+    versao = session.exec(text("SELECT versao FROM torneio WHERE id = :torneio_id").bindparams(torneio_id=torneio_id)).scalar()
+    if versao is not None:
+        registrar_torneio_apagado(session, torneio_id, versao)
     session.exec(text("DELETE FROM torneio WHERE id = :torneio_id").bindparams(torneio_id=torneio_id))
 
 
-def retornar_torneio_completo(session: SessionDep, torneio: Torneio):
+def retornar_torneio_completo(session: SessionDep, torneio: Torneio, recorte: RecorteCampos | None = None):
+    """Torneio com loja, participações e rodadas (TorneioPublico). Com
+    `recorte` (`fields`/`include` da requisição), relação não pedida não é
+    carregada nem calculada — fica None e sai da resposta no recorte final
+    da rota (RecorteCampos.responder)."""
+    recorte = recorte or RecorteCampos()
     torneio_dict = torneio.model_dump()
 
-    posicoes = {
-        link.id: posicao
-        for posicao, link in enumerate(calcular_ranking_oficial(torneio), start=1)
-    }
-
-    torneio_dict["loja"] = torneio.loja
-    torneio_dict["jogadores"] = [
-        retornar_link_completo(session, torneio, link, posicao_ranking=posicoes.get(link.id))
-        for link in torneio.jogadores
-    ]
+    torneio_dict["loja"] = torneio.loja if recorte.inclui("loja") else None
+
+    torneio_dict["jogadores"] = None
+    if recorte.inclui("jogadores"):
+        recorte_link = recorte.sub("jogadores")
+        # Plano de carregamento: participações com tudo o que é serializado
+        # delas numa rodada só de consultas, e a temporada (categoria dos
+        # jogadores) procurada uma vez pro torneio inteiro, não por jogador.
+        carregar_participacoes_para_serializar(session, torneio, recorte_link)
+        temporada = encontrar_temporada_do_torneio(session, torneio) if recorte_link.inclui("categoria") else None
+
+        posicoes = {}
+        if recorte_link.inclui("posicao_ranking"):
+            posicoes = {
+                link.id: posicao
+                for posicao, link in enumerate(calcular_ranking_oficial(torneio), start=1)
+            }
 
-    torneio_dict["rodadas"] = [
-        {
-            "id": rodada.id,
-            "jogador1_id": rodada.jogador1_id,
-            "jogador2_id": rodada.jogador2_id,
-            "vencedor_id": rodada.vencedor_id,
-            "num_rodada": rodada.num_rodada,
-            "mesa": rodada.mesa,
-            "data_de_inicio": rodada.data_de_inicio,
-            "finalizada": rodada.finalizada,
-        }
-        for rodada in torneio.rodadas
-    ]
+        torneio_dict["jogadores"] = [
+            retornar_link_completo(session, torneio, link, posicao_ranking=posicoes.get(link.id),
+                                   temporada=temporada, recorte=recorte_link)
+            for link in torneio.jogadores
+        ]
 
+    torneio_dict["rodadas"] = None
+    if recorte.inclui("rodadas"):
+        torneio_dict["rodadas"] = [
+            {
+                "id": rodada.id,
+                "jogador1_id": rodada.jogador1_id,
+                "jogador2_id": rodada.jogador2_id,
+                "vencedor_id": rodada.vencedor_id,
+                "num_rodada": rodada.num_rodada,
+                "mesa": rodada.mesa,
+                "data_de_inicio": rodada.data_de_inicio,
+                "finalizada": rodada.finalizada,
+            }
+            for rodada in torneio.rodadas
+        ]
 
     return torneio_dict
 
 
+def listar_torneios_resumidos(
+    session: SessionDep,
+    loja_id: int | None = None,
+    tcg: str | None = None,
+    status: StatusTorneio | None = None,
+    data_inicio: date | None = None,
+    data_fim: date | None = None,
+    limite: int | None = None,
+    apos: tuple[date, str] | None = None,
+) -> list[dict]:
+    """Listagem de torneios em modo resumo (ver TorneioResumo): uma consulta
+    só, com a loja e as contagens de jogadores e rodadas já agregadas em
+    subconsultas — em vez de serializar o torneio completo (participações,
+    composições, rodadas) de cada item da lista.
+
+    Mais recentes primeiro, por (data efetiva, id). Com `limite`, devolve
+    uma página; `apos` é o (data_efetiva, id) do último item da página
+    anterior e a próxima continua dali (keyset, sem OFFSET). Os filtros de
+    data valem sobre a data efetiva, com os dois extremos inclusos."""
+    jogadores = (
+        select(JogadorTorneioLink.torneio_id, func.count(JogadorTorneioLink.id).label("total"))
+        .where(JogadorTorneioLink.tipo.in_(
+            (TipoParticipanteTorneio.JOGADOR, TipoParticipanteTorneio.JOGADOR_E_JUIZ)))
+        .group_by(JogadorTorneioLink.torneio_id)
+        .subquery("jogadores_por_torneio")
+    )
+    rodadas = (
+        select(Rodada.torneio_id, func.count(func.distinct(Rodada.num_rodada)).label("total"))
+        .group_by(Rodada.torneio_id)
+        .subquery("rodadas_por_torneio")
+    )
+    consulta = (
+        select(Torneio, Loja, func.coalesce(jogadores.c.total, 0), func.coalesce(rodadas.c.total, 0))
+        .outerjoin(Loja, Loja.id == Torneio.loja_id)
+        .outerjoin(jogadores, jogadores.c.torneio_id == Torneio.id)
+        .outerjoin(rodadas, rodadas.c.torneio_id == Torneio.id)
+        .order_by(Torneio.data_efetiva.desc(), Torneio.id.desc())
+    )
+    if loja_id is not None:
+        consulta = consulta.where(Torneio.loja_id == loja_id)
+    if tcg is not None:
+        consulta = consulta.where(Torneio.jogo == tcg)
+    if status is not None:
+        consulta = consulta.where(Torneio.status == status)
+    if data_inicio is not None:
+        consulta = consulta.where(Torneio.data_efetiva >= data_inicio)
+    if data_fim is not None:
+        consulta = consulta.where(Torneio.data_efetiva <= data_fim)
+    if apos is not None:
+        data_cursor, id_cursor = apos
+        consulta = consulta.where(
+            (Torneio.data_efetiva < data_cursor)
+            | ((Torneio.data_efetiva == data_cursor) & (Torneio.id < id_cursor))
+        )
+    if limite is not None:
+        consulta = consulta.limit(limite)
+
+    return [
+        {**torneio.model_dump(), "loja": loja, "total_jogadores": total_jogadores, "total_rodadas": total_rodadas}
+        for torneio, loja, total_jogadores, total_rodadas in session.exec(consulta).all()
+    ]
+
+
 def regras_extras_atuais(torneio: Torneio) -> dict:
     return {
         str(jt.id): jt.regra_extra_id
@@ -285,11 +463,8 @@ def regras_extras_atuais(torneio: Torneio) -> dict:
     }
 
 
-def editar_torneio_regras(session: SessionDep, torneio: Torneio, regra_basica: int, regras_adicionais: dict):
-    if regra_basica:
-        torneio.regra_basica_id = regra_basica
-
-    pontos_extras_por_jogador = dict(
+def _pontos_extras_por_jogador(session: SessionDep, torneio: Torneio) -> dict[int, float]:
+    return dict(
         session.exec(
             select(PontuacaoExtra.jogador_criado_id, func.sum(PontuacaoExtra.pontos))
             .where(PontuacaoExtra.torneio_id == torneio.id)
@@ -297,6 +472,13 @@ def editar_torneio_regras(session: SessionDep, torneio: Torneio, regra_basica: i
         ).all()
     )
 
+
+def editar_torneio_regras(session: SessionDep, torneio: Torneio, regra_basica: int, regras_adicionais: dict):
+    if regra_basica:
+        torneio.regra_basica_id = regra_basica
+
+    pontos_extras_por_jogador = _pontos_extras_por_jogador(session, torneio)
+
     for jogador in torneio.jogadores:
         jogador.pontuacao = 0
         jogador.pontuacao_com_regras = (
@@ -315,87 +497,151 @@ def editar_torneio_regras(session: SessionDep, torneio: Torneio, regra_basica: i
 
 
 def calcular_pontuacao(session: SessionDep, torneio: Torneio):
-    regra_basica = torneio.regra_basica
+    """Soma, sobre a base já posta por `editar_torneio_regras`
+    (participação + pontos extras), o resultado de todas as mesas e
+    recalcula os desempates suíços — tudo numa passada só pelo torneio
+    carregado em memória (ver PontuacaoUtil.MotorTorneio), gravando só as
+    participações que mudaram.
+
+    Só mesa com resultado declarado pontua — a mesma regra do fluxo normal
+    (PUT rodadas/finalizar só pontua ao finalizar) e do desempate suíço;
+    sem isso, recalcular no meio de uma rodada daria empate a toda mesa
+    ainda em andamento."""
+    links = torneio.jogadores
+    motor = _carregar_motor(torneio)
+    motor.pontuar(
+        [link.pontuacao for link in links],
+        [link.pontuacao_com_regras for link in links],
+        _regra(torneio.regra_basica),
+        [_regra(link.regra_extra) for link in links],
+    )
+    if torneio.jogo in JOGOS_FORMATO_SUICO:
+        motor.calcular_desempates()
+    _gravar_motor(session, links, motor, pontuacao=True, desempates=torneio.jogo in JOGOS_FORMATO_SUICO)
+
+
+def _regra(regra: TipoJogador | None) -> Regra | None:
+    if regra is None:
+        return None
+    return (regra.pt_vitoria, regra.pt_derrota, regra.pt_empate,
+            regra.pt_oponente_ganha, regra.pt_oponente_perde, regra.pt_oponente_empate)
+
 
+def _carregar_motor(torneio: Torneio) -> MotorTorneio:
+    motor = MotorTorneio(link.id for link in torneio.jogadores)
     for rodada in torneio.rodadas:
-        calcular_pontuacao_rodada(session,rodada,regra_basica)
+        motor.registrar_rodada(rodada.num_rodada, rodada.jogador1_id, rodada.jogador2_id,
+                               rodada.vencedor_id, bool(rodada.finalizada))
+    return motor
+
+
+def _gravar_motor(session: SessionDep, links: list[JogadorTorneioLink], motor: MotorTorneio,
+                  pontuacao: bool, desempates: bool) -> None:
+    """Copia o resultado do motor pras participações, mas só marca pra
+    gravar (session.add) as que de fato mudaram."""
+    campos = []
+    if pontuacao:
+        campos += [("pontuacao", motor.pontuacao), ("pontuacao_com_regras", motor.pontuacao_com_regras)]
+    if desempates:
+        campos += [
+            ("vitorias", motor.vitorias), ("derrotas", motor.derrotas),
+            ("empates", motor.empates), ("byes", motor.byes),
+            ("porcentagem_vitorias_oponentes", motor.omw),
+            ("porcentagem_vitorias_oponentes_oponentes", motor.oomw),
+        ]
+
+    for slot, link in enumerate(links):
+        mudou = False
+        for campo, valores in campos:
+            if getattr(link, campo) != valores[slot]:
+                setattr(link, campo, valores[slot])
+                mudou = True
+        if mudou:
+            session.add(link)
+
+
+# (jogador1_id, jogador2_id, vencedor_id, finalizada) de uma mesa — o que
+# define quanto ela vale pra cada lado. Guardado antes de editar a mesa pra
+# que repontuar_resultados saiba o que desfazer.
+ResultadoRodada = tuple[int | None, int | None, int | None, bool]
+
+
+def resultado_rodada(rodada: Rodada) -> ResultadoRodada:
+    return (rodada.jogador1_id, rodada.jogador2_id, rodada.vencedor_id, bool(rodada.finalizada))
+
+
+def _rodada_pontua(resultado: ResultadoRodada | None) -> bool:
+    return resultado is not None and resultado[3] and resultado[0] is not None
+
+
+def repontuar_resultados(
+    session: SessionDep,
+    torneio: Torneio,
+    alteracoes: list[tuple[ResultadoRodada | None, ResultadoRodada | None]],
+) -> None:
+    """Atualiza a pontuação depois de mesas editadas ou apagadas sem refazer
+    o torneio inteiro: pra cada (antes, depois) desfaz o que o resultado
+    antigo tinha dado aos dois lados e soma o que o novo dá (None = a mesa
+    não existia/deixou de existir). Só os desempates suíços, que dependem do
+    torneio todo, são recalculados por completo.
+
+    Com PONTUACAO_CONFERIR_INCREMENTAL ligado, o resultado é conferido
+    contra um recálculo completo feito em memória; se divergir (pontuação
+    ajustada à mão, por exemplo), cai no recálculo completo de sempre, que
+    é a fonte da verdade."""
+    if not torneio.regra_basica_id:
+        return
+
+    regra_basica = torneio.regra_basica
+    for antes, depois in alteracoes:
+        if _rodada_pontua(antes):
+            _somar_pontos(session, _pontos_do_resultado(session, regra_basica, antes), sinal=-1)
+        if _rodada_pontua(depois):
+            _somar_pontos(session, _pontos_do_resultado(session, regra_basica, depois))
+
+    if settings.PONTUACAO_CONFERIR_INCREMENTAL and conferir_pontuacao(session, torneio):
+        torneio = editar_torneio_regras(
+            session, torneio, torneio.regra_basica_id, regras_extras_atuais(torneio))
+        session.add(torneio)
+        calcular_pontuacao(session, torneio)
+        return
 
     calcular_desempate_suico(session, torneio)
 
 
-PISO_TAXA_VITORIA = 0.25
-TETO_TAXA_VITORIA_COMPLETOU = 1.0
-TETO_TAXA_VITORIA_DESISTIU = 0.75
+def conferir_pontuacao(session: SessionDep, torneio: Torneio) -> list[int]:
+    """Ids das participações cuja pontuação guardada (pontuacao e
+    pontuacao_com_regras) difere do que um recálculo completo daria —
+    participação e pontos extras mais todas as mesas finalizadas —, sem
+    alterar nada. Lista vazia quando está tudo coerente."""
+    links = torneio.jogadores
+    pontos_extras_por_jogador = _pontos_extras_por_jogador(session, torneio)
+    motor = _carregar_motor(torneio)
+    motor.pontuar(
+        [0.0] * len(links),
+        [torneio.pontuacao_de_participacao + pontos_extras_por_jogador.get(link.jogador_criado_id, 0)
+         for link in links],
+        _regra(torneio.regra_basica),
+        [_regra(link.regra_extra) for link in links],
+    )
+
+    return [
+        link.id for slot, link in enumerate(links)
+        if not (math.isclose(link.pontuacao, motor.pontuacao[slot], abs_tol=1e-6)
+                and math.isclose(link.pontuacao_com_regras, motor.pontuacao_com_regras[slot], abs_tol=1e-6))
+    ]
 
 
 def calcular_desempate_suico(session: SessionDep, torneio: Torneio) -> None:
+    """V/D/E/byes e OMW%/OOMW% de todas as participações, a partir das
+    rodadas finalizadas (regras do piso/teto da taxa de vitória em
+    PontuacaoUtil.MotorTorneio.calcular_desempates)."""
     if torneio.jogo not in JOGOS_FORMATO_SUICO:
         return
 
-    links = torneio.jogadores
-    total_rodadas_torneio = max((r.num_rodada for r in torneio.rodadas), default=0)
-    por_link: dict[int, dict] = {}
-
-    for link in links:
-        vitorias = derrotas = empates = byes = 0
-        oponentes_ids: list[int] = []
-
-        for rodada in torneio.rodadas:
-            if rodada.jogador1_id != link.id and rodada.jogador2_id != link.id:
-                continue
-
-            if not rodada.finalizada:
-                continue
-
-            eh_bye = rodada.jogador1_id is None or rodada.jogador2_id is None
-            if eh_bye:
-                byes += 1
-                continue
-
-            oponente_id = rodada.jogador2_id if rodada.jogador1_id == link.id else rodada.jogador1_id
-            oponentes_ids.append(oponente_id)
-
-            if rodada.vencedor_id == link.id:
-                vitorias += 1
-            elif rodada.vencedor_id == oponente_id:
-                derrotas += 1
-            else:
-                empates += 1
-
-        link.vitorias = vitorias
-        link.derrotas = derrotas
-        link.empates = empates
-        link.byes = byes
-        session.add(link)
-
-        # A taxa de vitória usada no desempate (nunca a pontuação em si)
-        # exclui byes do numerador e do denominador — um bye não conta como
-        # vitória nem consome uma rodada "real" pra esse cálculo — e depois
-        # é limitada a um piso de 25% e um teto que depende de o jogador ter
-        # completado o torneio (100%) ou desistido no meio dele (75%),
-        # detectado comparando quantas rodadas ele de fato disputou (reais +
-        # byes) contra o total de rodadas geradas no torneio.
-        partidas_reais = vitorias + derrotas + empates
-        taxa_bruta = (vitorias / partidas_reais) if partidas_reais else 0.0
-        completou = (vitorias + derrotas + empates + byes) >= total_rodadas_torneio
-        teto = TETO_TAXA_VITORIA_COMPLETOU if completou else TETO_TAXA_VITORIA_DESISTIU
-        taxa_vitoria = min(max(taxa_bruta, PISO_TAXA_VITORIA), teto)
-
-        por_link[link.id] = {"taxa_vitoria": taxa_vitoria, "oponentes_ids": oponentes_ids}
-
-    for link in links:
-        oponentes_ids = por_link[link.id]["oponentes_ids"]
-        taxas_oponentes = [por_link[oid]["taxa_vitoria"] for oid in oponentes_ids if oid in por_link]
-        por_link[link.id]["omw"] = (sum(taxas_oponentes) / len(taxas_oponentes)) if taxas_oponentes else 0.0
-
-    for link in links:
-        oponentes_ids = por_link[link.id]["oponentes_ids"]
-        omws_oponentes = [por_link[oid]["omw"] for oid in oponentes_ids if oid in por_link]
-        oomw = (sum(omws_oponentes) / len(omws_oponentes)) if omws_oponentes else 0.0
-
-        link.porcentagem_vitorias_oponentes = round(por_link[link.id]["omw"] * 100, 2)
-        link.porcentagem_vitorias_oponentes_oponentes = round(oomw * 100, 2)
-        session.add(link)
+    motor = _carregar_motor(torneio)
+    motor.calcular_desempates()
+    _gravar_motor(session, torneio.jogadores, motor, pontuacao=False, desempates=True)
 
 
 def calcular_ranking_oficial(torneio: Torneio) -> list[JogadorTorneioLink]:
@@ -406,10 +652,10 @@ def calcular_ranking_oficial(torneio: Torneio) -> list[JogadorTorneioLink]:
     um `random` puro a cada chamada) só pra a posição não "piscar" sozinha
     toda vez que a tela recarrega — continua sendo, na prática, uma escolha
     arbitrária entre os empatados, exatamente como pede a regra."""
-    participantes = [
-        link for link in torneio.jogadores
+    participantes = {
+        link.id: link for link in torneio.jogadores
         if link.tipo in (TipoParticipanteTorneio.JOGADOR, TipoParticipanteTorneio.JOGADOR_E_JUIZ)
-    ]
+    }
 
     resultado_direto: dict[frozenset, int | None] = {}
     for rodada in torneio.rodadas:
@@ -417,135 +663,148 @@ def calcular_ranking_oficial(torneio: Torneio) -> list[JogadorTorneioLink]:
             continue
         resultado_direto[frozenset((rodada.jogador1_id, rodada.jogador2_id))] = rodada.vencedor_id
 
-    def chave_ordenacao(link: JogadorTorneioLink) -> tuple:
-        return (
-            -link.pontuacao,
-            -(link.porcentagem_vitorias_oponentes or 0),
-            -(link.porcentagem_vitorias_oponentes_oponentes or 0),
+    chaves = {
+        link_id: (
+            link.pontuacao,
+            link.porcentagem_vitorias_oponentes or 0,
+            link.porcentagem_vitorias_oponentes_oponentes or 0,
         )
-
-    ordenados = sorted(participantes, key=chave_ordenacao)
-
-    resultado: list[JogadorTorneioLink] = []
-    i = 0
-    while i < len(ordenados):
-        j = i + 1
-        while j < len(ordenados) and chave_ordenacao(ordenados[j]) == chave_ordenacao(ordenados[i]):
-            j += 1
-        resultado.extend(_desempatar_grupo(ordenados[i:j], resultado_direto, torneio.id))
-        i = j
-
-    return resultado
-
-
-def _desempatar_grupo(
-    grupo: list[JogadorTorneioLink],
-    resultado_direto: dict[frozenset, int | None],
-    torneio_id: str,
-) -> list[JogadorTorneioLink]:
-    if len(grupo) <= 1:
-        return grupo
-
-    if len(grupo) == 2:
-        a, b = grupo
-        vencedor = resultado_direto.get(frozenset((a.id, b.id)))
-        if vencedor == a.id:
-            return [a, b]
-        if vencedor == b.id:
-            return [b, a]
-
-    semente = ":".join(str(link.id) for link in sorted(grupo, key=lambda link: link.id))
-    ordem = list(grupo)
-    random.Random(f"{torneio_id}:{semente}").shuffle(ordem)
-    return ordem
-
-
-def calcular_pontuacao_rodada(session: SessionDep, rodada: Rodada, regra_basica: TipoJogador):
-    jogador1_id = rodada.jogador1_id
-    jogador2_id = rodada.jogador2_id
-    jogador1_link = rodada.jogador1
-    jogador2_link = rodada.jogador2
-    jogador1_extra = jogador1_link.regra_extra
+        for link_id, link in participantes.items()
+    }
+    return [participantes[link_id] for link_id in ordem_oficial(chaves, resultado_direto, torneio.id)]
+
+
+def _pontos_do_resultado(
+    session: SessionDep, regra_basica: TipoJogador, resultado: ResultadoRodada,
+) -> list[tuple[JogadorTorneioLink, float, float]]:
+    """(participação, pontuacao, pontuacao_com_regras) que o resultado de
+    uma mesa dá a cada lado — a conta em si (PontuacaoUtil.pontos_do_lado),
+    sem somar em lugar nenhum, pra servir tanto pra pontuar quanto pra
+    desfazer uma pontuação."""
+    jogador1_id, jogador2_id, vencedor_id, _ = resultado
+    jogador1_link = session.get(JogadorTorneioLink, jogador1_id)
+    jogador2_link = session.get(JogadorTorneioLink, jogador2_id) if jogador2_id is not None else None
+    basica = _regra(regra_basica)
+    extra1 = _regra(jogador1_link.regra_extra)
     # Rodada "bye" (número ímpar de jogadores, sem oponente pareado): não gera
     # bônus de oponente pra ninguém — só a pontuação normal do resultado.
-    jogador2_extra = jogador2_link.regra_extra if jogador2_link else None
-
-    if rodada.vencedor_id == jogador1_id:
-        jogador1_link.pontuacao_com_regras += (
-            regra_basica.pt_vitoria
-            + (jogador1_extra.pt_vitoria if jogador1_extra else 0)
-            + (jogador2_extra.pt_oponente_ganha if jogador2_extra else 0)
-        )
-        if jogador2_link:
-            jogador2_link.pontuacao_com_regras += (
-                regra_basica.pt_derrota
-                + (jogador2_extra.pt_derrota if jogador2_extra else 0)
-                + (jogador1_extra.pt_oponente_perde if jogador1_extra else 0)
-            )
+    extra2 = _regra(jogador2_link.regra_extra) if jogador2_link else None
 
-        jogador1_link.pontuacao += (
-            regra_basica.pt_vitoria
-            + (regra_basica.pt_oponente_ganha if jogador2_link else 0)
-        )
+    resultado1, resultado2 = resultados_da_mesa(jogador1_id, jogador2_id if jogador2_link else None, vencedor_id)
+    pontos = [(jogador1_link, *pontos_do_lado(resultado1, basica, extra1, extra2, jogador2_link is not None))]
+    if jogador2_link:
+        pontos.append((jogador2_link, *pontos_do_lado(resultado2, basica, extra2, extra1, True)))
+    return pontos
+
+
+def _somar_pontos(session: SessionDep, pontos: list[tuple[JogadorTorneioLink, float, float]], sinal: int = 1) -> None:
+    for link, pontuacao, pontuacao_com_regras in pontos:
+        link.pontuacao += sinal * pontuacao
+        link.pontuacao_com_regras += sinal * pontuacao_com_regras
+        # Os dois campos sempre no UPDATE, mesmo quando um lado soma 0 num
+        # deles: o flush só agrupa num executemany UPDATEs seguidos com as
+        # mesmas colunas — sem isso, uma rodada inteira finalizada de uma
+        # vez viraria um UPDATE por participação.
+        flag_modified(link, "pontuacao")
+        flag_modified(link, "pontuacao_com_regras")
+        session.add(link)
 
-        if jogador2_link:
-            jogador2_link.pontuacao += (regra_basica.pt_derrota
-                                            + regra_basica.pt_oponente_perde)
 
-    elif jogador2_link and rodada.vencedor_id == jogador2_id:
-        jogador2_link.pontuacao_com_regras += (
-            regra_basica.pt_vitoria
-            + (jogador2_extra.pt_vitoria if jogador2_extra else 0)
-            + (jogador1_extra.pt_oponente_ganha if jogador1_extra else 0)
-        )
-        jogador1_link.pontuacao_com_regras += (
-            regra_basica.pt_derrota
-            + (jogador1_extra.pt_derrota if jogador1_extra else 0)
-            + (jogador2_extra.pt_oponente_perde if jogador2_extra else 0)
-        )
-        jogador2_link.pontuacao += (regra_basica.pt_vitoria
-                                            + regra_basica.pt_oponente_ganha)
-
-        jogador1_link.pontuacao += (regra_basica.pt_derrota
-                                    + regra_basica.pt_oponente_perde)
-    else:
-        # Empate (ou bye sem vencedor definido).
-        jogador1_link.pontuacao_com_regras += (
-            regra_basica.pt_empate
-            + (jogador1_extra.pt_empate if jogador1_extra else 0)
-            + (jogador2_extra.pt_oponente_empate if jogador2_extra else 0)
+def calcular_pontuacao_rodada(session: SessionDep, rodada: Rodada, regra_basica: TipoJogador):
+    _somar_pontos(session, _pontos_do_resultado(session, regra_basica, resultado_rodada(rodada)))
+
+
+def finalizar_resultados(
+    session: SessionDep, resultados: list[tuple[int, int | None]],
+) -> tuple[list[Torneio], list[JogadorTorneioLink]]:
+    """Finaliza de uma vez várias mesas ((rodada_id, vencedor_id), vencedor
+    None = empate) e soma a pontuação de cada uma. As rodadas, os torneios
+    com a regra básica e as participações dos torneios envolvidos (com
+    regra extra, GameID e conta) vêm antes, numa consulta por tipo — aplicar
+    os resultados não consulta mais nada, qualquer que seja o número de
+    mesas.
+
+    Devolve os torneios alterados e as participações (já pontuadas, em
+    memória) do torneio da última mesa, de onde sai a classificação que a
+    rota responde (ver get_torneio_top). Mesa inexistente, já finalizada
+    (inclusive repetida no mesmo lote) ou com vencedor de fora dela
+    interrompe tudo. Não faz commit."""
+    rodadas = {
+        rodada.id: rodada
+        for rodada in session.exec(select(Rodada).where(col(Rodada.id).in_({r for r, _ in resultados}))).all()
+    }
+    torneios = {
+        torneio.id: torneio
+        for torneio in session.exec(
+            select(Torneio)
+            .where(col(Torneio.id).in_({rodada.torneio_id for rodada in rodadas.values()}))
+            .options(selectinload(Torneio.regra_basica))
+        ).all()
+    }
+    links_por_torneio: dict[str, list[JogadorTorneioLink]] = {torneio_id: [] for torneio_id in torneios}
+    for link in session.exec(
+        select(JogadorTorneioLink)
+        .where(col(JogadorTorneioLink.torneio_id).in_(torneios.keys()))
+        .order_by(JogadorTorneioLink.id)
+        .options(
+            selectinload(JogadorTorneioLink.regra_extra),
+            selectinload(JogadorTorneioLink.jogador_criado).selectinload(JogadorCriado.jogador),
         )
-        if jogador2_link:
-            jogador2_link.pontuacao_com_regras += (
-                regra_basica.pt_empate
-                + (jogador2_extra.pt_empate if jogador2_extra else 0)
-                + (jogador1_extra.pt_oponente_empate if jogador1_extra else 0)
+    ).all():
+        links_por_torneio[link.torneio_id].append(link)
+
+    antes = placar(link for links in links_por_torneio.values() for link in links)
+    alterados: dict[str, Torneio] = {}
+    mesas_por_torneio: dict[str, list[Rodada]] = {}
+    torneio = None
+    for rodada_id, vencedor_id in resultados:
+        rodada = rodadas.get(rodada_id)
+        if not rodada:
+            raise TopDeckedException.not_found(
+                f"Rodada {rodada_id} não encontrada")
+
+        if rodada.finalizada:
+            raise TopDeckedException.bad_request(
+                f"Rodada {rodada_id} já finalizada")
+
+        torneio = torneios.get(rodada.torneio_id)
+        if not torneio:
+            raise TopDeckedException.not_found("Torneio não encontrado")
+
+        if vencedor_id is not None and vencedor_id not in [rodada.jogador1_id, rodada.jogador2_id]:
+            raise TopDeckedException.bad_request(
+                f"Jogador {vencedor_id} não pertence à rodada {rodada_id}"
             )
 
-        jogador1_link.pontuacao += (
-            regra_basica.pt_empate
-            + (regra_basica.pt_oponente_empate if jogador2_link else 0)
+        rodada.vencedor_id = vencedor_id
+        rodada.finalizada = True
+        calcular_pontuacao_rodada(session, rodada, torneio.regra_basica)
+        session.add(rodada)
+        alterados[torneio.id] = torneio
+        mesas_por_torneio.setdefault(torneio.id, []).append(rodada)
+
+    for torneio_id, mesas in mesas_por_torneio.items():
+        publicar_apos_commit(
+            session, torneio_id, "resultados",
+            mesas=[mesa_ao_vivo(mesa) for mesa in mesas],
+            jogadores=diferenca_placar(antes, links_por_torneio[torneio_id]),
         )
-        if jogador2_link:
-            jogador2_link.pontuacao += (regra_basica.pt_empate
-                                    + regra_basica.pt_oponente_empate)
 
-    session.add(jogador1_link)
-    if jogador2_link:
-        session.add(jogador2_link)
+    return list(alterados.values()), links_por_torneio[torneio.id] if torneio else []
 
-def get_torneio_top(session: SessionDep, torneio_id: str):
-    jogadores = session.exec(
-        select(JogadorTorneioLink)
-        .where(
-            (JogadorTorneioLink.torneio_id == torneio_id) &
-            (JogadorTorneioLink.tipo.in_([
-                TipoParticipanteTorneio.JOGADOR,
-                TipoParticipanteTorneio.JOGADOR_E_JUIZ,
-            ]))
-        )
-        .order_by(col(JogadorTorneioLink.pontuacao).desc())
-    ).all()
+
+def get_torneio_top(links: list[JogadorTorneioLink]):
+    """Classificação por pontos das participações dadas (Jogador e
+    Jogador-e-Juiz; juiz não entra), com o nome de quem joga — GameID e
+    conta devem vir carregados (ver finalizar_resultados)."""
+    jogadores = sorted(
+        (
+            link for link in links
+            if link.tipo in (TipoParticipanteTorneio.JOGADOR, TipoParticipanteTorneio.JOGADOR_E_JUIZ)
+        ),
+        key=lambda link: link.pontuacao,
+        reverse=True,
+    )
 
     ranking = []
     for posicao, jt in enumerate(jogadores, start=1):
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+
+class CacheLRU:
+    """Cache em memória com despejo do item usado há mais tempo (LRU) e
+    limite de itens. Vale por processo: cada worker do servidor tem o seu.
+
+    Com `peso` (ex.: `len` pra bytes), o limite passa a ser a soma dos pesos
+    dos itens em vez da contagem — item que sozinho passa da capacidade nem
+    é guardado.
+
+    `geracao` protege contra a corrida clássica de cache com invalidação:
+    quem calcula um valor anota a geração ANTES de ler o banco e a repassa
+    pra `guardar` — se alguma invalidação aconteceu no meio do cálculo, o
+    valor (já potencialmente desatualizado) é descartado em vez de gravado."""
+
+    def __init__(self, capacidade: int, peso: Callable[[Any], int] | None = None):
+        self.capacidade = max(capacidade, 0)
+        self._peso = peso or (lambda valor: 1)
+        self._itens: OrderedDict[Hashable, Any] = OrderedDict()
+        self._ocupacao = 0
+        self._lock = Lock()
+        self.geracao = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.despejos = 0
+        self.invalidacoes = 0
+
+    def obter(self, chave: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return True, self._itens[chave]
+            self.faltas += 1
+            return False, None
+
+    def guardar(self, chave: Hashable, valor: Any, geracao: int) -> None:
+        peso = self._peso(valor)
+        with self._lock:
+            if peso > self.capacidade or geracao != self.geracao:
+                return
+            if chave in self._itens:
+                self._ocupacao -= self._peso(self._itens[chave])
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            self._ocupacao += peso
+            while self._ocupacao > self.capacidade:
+                _, despejado = self._itens.popitem(last=False)
+                self._ocupacao -= self._peso(despejado)
+                self.despejos += 1
+
+    def invalidar(self, afetada: Callable[[Hashable], bool] | None = None) -> int:
+        """Remove as chaves para as quais `afetada(chave)` é verdadeiro (todas,
+        sem predicado). Retorna quantas saíram."""
+        with self._lock:
+            self.geracao += 1
+            chaves = [chave for chave in self._itens if afetada is None or afetada(chave)]
+            for chave in chaves:
+                self._ocupacao -= self._peso(self._itens.pop(chave))
+            self.invalidacoes += len(chaves)
+            return len(chaves)
+
+    def estatisticas(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "capacidade": self.capacidade,
+                "itens": len(self._itens),
+                "ocupacao": self._ocupacao,
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "despejos": self.despejos,
+                "invalidacoes": self.invalidacoes,
+            }
@@ -102,6 +102,25 @@ class TipoTorneio(str, Enum):
     CRIADO = "CRIADO"
 
 
+class StatusImportacaoArquivo(str, Enum):
+    IMPORTADO = "IMPORTADO"
+    DUPLICADO = "DUPLICADO"
+    FALHOU = "FALHOU"
+
+
+class StatusImportacaoJob(str, Enum):
+    PENDENTE = "PENDENTE"
+    PROCESSANDO = "PROCESSANDO"
+    CONCLUIDO = "CONCLUIDO"
+    FALHOU = "FALHOU"
+
+
+class EtapaImportacao(str, Enum):
+    LENDO_ARQUIVO = "LENDO_ARQUIVO"
+    GRAVANDO = "GRAVANDO"
+    CONQUISTAS = "CONQUISTAS"
+
+
 class TipoParticipanteTorneio(str, Enum):
     JOGADOR = "JOGADOR"
     JUIZ = "JUIZ"
@@ -0,0 +1,17 @@
+def gerar_etag(*partes) -> str:
+    """ETag forte com as partes que identificam uma representação (ex.: id,
+    versão e recorte pedido). Parte vazia/None fica de fora."""
+    return '"' + "-".join(str(parte) for parte in partes if parte not in (None, "")) + '"'
+
+
+def etag_confere(if_none_match: str | None, etag: str) -> bool:
+    """Se o `If-None-Match` da requisição já cita `etag` — ou é `*`. Pra
+    GET/HEAD a comparação é fraca (RFC 9110, 13.1.2): `W/` não importa."""
+    if not if_none_match:
+        return False
+    alvo = etag.removeprefix("W/")
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == alvo:
+            return True
+    return False
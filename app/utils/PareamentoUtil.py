@@ -0,0 +1,159 @@
+from time import monotonic
+from typing import Iterable
+
+# Par de participantes (ids de JogadorTorneioLink) que já se enfrentaram no
+# torneio — frozenset porque a ordem (jogador1/jogador2) não importa.
+Confrontos = set[frozenset[int]]
+
+# De quantos em quantos passos da busca o relógio é consultado — olhar a
+# cada passo custaria mais que a própria busca nos casos fáceis.
+_PASSOS_ENTRE_CONSULTAS_AO_RELOGIO = 256
+
+
+class _OrcamentoEsgotado(Exception):
+    pass
+
+
+class ResultadoPareamento:
+    """Mesas de uma rodada suíça: `mesas` na ordem das mesas (a do par mais
+    bem colocado primeiro), `bye` o participante que fica sem adversário
+    (None com número par), `revanches` quantas mesas repetem um confronto e
+    `completo` se a busca terminou dentro do orçamento — False quer dizer
+    que o pareamento veio do guloso de reserva."""
+
+    def __init__(self, mesas: list[tuple[int, int]], bye: int | None, revanches: int, completo: bool):
+        self.mesas = mesas
+        self.bye = bye
+        self.revanches = revanches
+        self.completo = completo
+
+
+def confrontos_de(pares: Iterable[tuple[int, int | None]]) -> tuple[Confrontos, set[int]]:
+    """Histórico do torneio a partir das rodadas já criadas, (jogador1_id,
+    jogador2_id): os confrontos já jogados e quem já recebeu bye (rodada
+    sem jogador2)."""
+    confrontos: Confrontos = set()
+    com_bye: set[int] = set()
+    for jogador1_id, jogador2_id in pares:
+        if jogador2_id is None:
+            com_bye.add(jogador1_id)
+        else:
+            confrontos.add(frozenset((jogador1_id, jogador2_id)))
+    return confrontos, com_bye
+
+
+def _parear_sem_revanche(ordem: list[int], confrontos: Confrontos, prazo: float) -> list[tuple[int, int]] | None:
+    """Busca em profundidade: o mais bem colocado ainda livre enfrenta o
+    próximo da classificação com quem não jogou; se o resto não fecha, tenta
+    o seguinte, e assim por diante. Como `ordem` vem ordenada por pontuação,
+    isso pareia dentro de cada grupo de pontuação e só "desce" alguém pro
+    grupo de baixo quando não tem outro jeito — a mesma ideia do sistema
+    holandês, sem a tabela de critérios toda.
+
+    Os conjuntos de participantes restantes que já se mostraram impossíveis
+    de parear ficam guardados (como máscara de bits) pra não serem
+    explorados de novo por outro caminho. Devolve None se não existe
+    pareamento sem revanche; estoura _OrcamentoEsgotado se o prazo vence."""
+    n = len(ordem)
+    livre = [True] * n
+    restantes = (1 << n) - 1
+    sem_saida: set[int] = set()
+    escolhidos: list[tuple[int, int]] = []
+    passos = 0
+
+    def proximo_livre(posicao: int) -> int:
+        while posicao < n and not livre[posicao]:
+            posicao += 1
+        return posicao
+
+    i = proximo_livre(0)
+    j = i + 1
+    while True:
+        if passos % _PASSOS_ENTRE_CONSULTAS_AO_RELOGIO == 0 and monotonic() > prazo:
+            raise _OrcamentoEsgotado
+        passos += 1
+
+        if i >= n:
+            return [(ordem[a], ordem[b]) for a, b in escolhidos]
+
+        encontrou = False
+        if restantes not in sem_saida:
+            atual = ordem[i]
+            while j < n:
+                if livre[j] and frozenset((atual, ordem[j])) not in confrontos:
+                    encontrou = True
+                    break
+                j += 1
+
+        if encontrou:
+            livre[i] = livre[j] = False
+            restantes ^= (1 << i) | (1 << j)
+            escolhidos.append((i, j))
+            i = proximo_livre(i + 1)
+            j = i + 1
+            continue
+
+        # Nenhum adversário fecha a partir daqui: volta uma mesa e tenta o
+        # próximo adversário do jogador dela.
+        sem_saida.add(restantes)
+        if not escolhidos:
+            return None
+        i, anterior = escolhidos.pop()
+        livre[i] = livre[anterior] = True
+        restantes ^= (1 << i) | (1 << anterior)
+        j = anterior + 1
+
+
+def _parear_guloso(ordem: list[int], confrontos: Confrontos) -> list[tuple[int, int]]:
+    """Reserva pra quando a busca não termina no orçamento (ou não existe
+    rodada sem revanche): cada um, de cima pra baixo, pega o primeiro livre
+    com quem ainda não jogou — ou, se não sobrou nenhum, o primeiro livre."""
+    livres = list(ordem)
+    mesas = []
+    while livres:
+        atual = livres.pop(0)
+        if not livres:
+            break
+        escolhido = next(
+            (pos for pos, outro in enumerate(livres) if frozenset((atual, outro)) not in confrontos), 0)
+        mesas.append((atual, livres.pop(escolhido)))
+    return mesas
+
+
+def _candidatos_a_bye(ordem: list[int], com_bye: set[int]) -> list[int]:
+    # De baixo pra cima na classificação, primeiro quem ainda não teve bye.
+    de_baixo = list(reversed(ordem))
+    return [p for p in de_baixo if p not in com_bye] + [p for p in de_baixo if p in com_bye]
+
+
+def parear_suico(ordem: list[int], confrontos: Confrontos, com_bye: set[int] | None = None,
+                 orcamento_segundos: float = 2.0) -> ResultadoPareamento:
+    """Pareia uma rodada suíça inteira em memória.
+
+    `ordem` são os participantes já na ordem da classificação (mais bem
+    colocado primeiro), `confrontos` os pares que já se enfrentaram e
+    `com_bye` quem já ficou sem adversário numa rodada anterior. Com número
+    ímpar, o bye vai pro pior colocado que ainda não teve um — subindo na
+    classificação enquanto o restante não fechar sem revanche.
+
+    A busca tem `orcamento_segundos` pra achar uma rodada sem nenhuma
+    revanche; esgotado o tempo (ou provado que não existe), o pareamento
+    cai no guloso de reserva, que ainda evita revanches quando consegue."""
+    com_bye = com_bye or set()
+    prazo = monotonic() + orcamento_segundos
+    candidatos = _candidatos_a_bye(ordem, com_bye) if len(ordem) % 2 else [None]
+
+    try:
+        for bye in candidatos:
+            restantes = [p for p in ordem if p != bye]
+            mesas = _parear_sem_revanche(restantes, confrontos, prazo)
+            if mesas is not None:
+                return ResultadoPareamento(mesas, bye, 0, True)
+        completo = True
+    except _OrcamentoEsgotado:
+        completo = False
+
+    bye = candidatos[0]
+    mesas = _parear_guloso([p for p in ordem if p != bye], confrontos)
+    revanches = sum(1 for mesa in mesas if frozenset(mesa) in confrontos)
+    return ResultadoPareamento(mesas, bye, revanches, completo)
@@ -0,0 +1,190 @@
+import random
+from typing import Iterable
+
+# Pontos de uma regra (TipoJogador) como vetor, na ordem dos campos pt_*:
+# o resultado do próprio jogador (vitória/derrota/empate) e, 3 posições
+# adiante, o bônus de quando o OPONENTE dele tem esse mesmo resultado
+# visto do lado dele (oponente ganha/perde/empata).
+Regra = tuple[float, float, float, float, float, float]
+VITORIA, DERROTA, EMPATE = 0, 1, 2
+_BONUS_DO_OPONENTE = 3
+
+REGRA_ZERADA: Regra = (0, 0, 0, 0, 0, 0)
+
+PISO_TAXA_VITORIA = 0.25
+TETO_TAXA_VITORIA_COMPLETOU = 1.0
+TETO_TAXA_VITORIA_DESISTIU = 0.75
+
+
+def pontos_do_lado(resultado: int, basica: Regra, extra: Regra | None, extra_oponente: Regra | None,
+                   tem_oponente: bool) -> tuple[float, float]:
+    """(pontuacao, pontuacao_com_regras) que um lado de uma mesa ganha com
+    `resultado` (VITORIA/DERROTA/EMPATE). `pontuacao` usa só a regra básica
+    (com o bônus de oponente dela, que não existe num bye);
+    `pontuacao_com_regras` soma a regra extra do próprio jogador e o bônus
+    da regra extra do oponente."""
+    pontuacao = basica[resultado] + (basica[resultado + _BONUS_DO_OPONENTE] if tem_oponente else 0)
+    pontuacao_com_regras = (
+        basica[resultado]
+        + (extra[resultado] if extra else 0)
+        + (extra_oponente[resultado + _BONUS_DO_OPONENTE] if extra_oponente else 0)
+    )
+    return pontuacao, pontuacao_com_regras
+
+
+def resultados_da_mesa(jogador1_id: int, jogador2_id: int | None, vencedor_id: int | None) -> tuple[int, int | None]:
+    """Resultado de cada lado: quem não é o vencedor declarado perde, e sem
+    vencedor (ou vencedor que não é nenhum dos dois) é empate — bye sem
+    vencedor conta como empate do jogador1."""
+    if vencedor_id == jogador1_id:
+        return VITORIA, (DERROTA if jogador2_id is not None else None)
+    if jogador2_id is not None and vencedor_id == jogador2_id:
+        return DERROTA, VITORIA
+    return EMPATE, (EMPATE if jogador2_id is not None else None)
+
+
+class MotorTorneio:
+    """Um torneio inteiro em listas indexadas por "slot" (a posição de cada
+    participação em `link_ids`), pra pontuar, calcular os desempates suíços
+    e a ordem oficial numa passada pelas rodadas em vez de uma passada por
+    participante.
+
+    `registrar_rodada` alimenta os contadores (V/D/E/byes), os oponentes de
+    cada um e o confronto direto; `pontuar` soma os pontos das mesas
+    finalizadas a partir de uma base; `calcular_desempates` preenche OMW% e
+    OOMW% (`omw`/`oomw`, já em porcentagem com 2 casas)."""
+
+    def __init__(self, link_ids: Iterable[int]):
+        self.link_ids = list(link_ids)
+        self.slot = {link_id: i for i, link_id in enumerate(self.link_ids)}
+        n = len(self.link_ids)
+        self.vitorias = [0] * n
+        self.derrotas = [0] * n
+        self.empates = [0] * n
+        self.byes = [0] * n
+        self.oponentes: list[list[int]] = [[] for _ in range(n)]
+        self.pontuacao = [0.0] * n
+        self.pontuacao_com_regras = [0.0] * n
+        self.omw = [0.0] * n
+        self.oomw = [0.0] * n
+        self.total_rodadas = 0
+        self.resultado_direto: dict[frozenset, int | None] = {}
+        # (slot1, slot2 ou None, resultado1, resultado2) das mesas que pontuam.
+        self._mesas_pontuaveis: list[tuple[int, int | None, int, int | None]] = []
+
+    def registrar_rodada(self, num_rodada: int, jogador1_id: int | None, jogador2_id: int | None,
+                         vencedor_id: int | None, finalizada: bool) -> None:
+        self.total_rodadas = max(self.total_rodadas, num_rodada)
+        if not finalizada:
+            return
+
+        slot1 = self.slot.get(jogador1_id)
+        slot2 = self.slot.get(jogador2_id)
+        if jogador1_id is not None and jogador2_id is not None:
+            self.resultado_direto[frozenset((jogador1_id, jogador2_id))] = vencedor_id
+
+        if jogador1_id is None or jogador2_id is None:
+            # Bye: conta como rodada disputada pro desempate, mas não como
+            # partida (nem no numerador nem no denominador da taxa).
+            for slot in (slot1, slot2):
+                if slot is not None:
+                    self.byes[slot] += 1
+        else:
+            for slot, oponente_id in ((slot1, jogador2_id), (slot2, jogador1_id)):
+                if slot is None:
+                    continue
+                self.oponentes[slot].append(self.slot.get(oponente_id, -1))
+                if vencedor_id == self.link_ids[slot]:
+                    self.vitorias[slot] += 1
+                elif vencedor_id == oponente_id:
+                    self.derrotas[slot] += 1
+                else:
+                    self.empates[slot] += 1
+
+        if slot1 is not None:
+            resultado1, resultado2 = resultados_da_mesa(jogador1_id, jogador2_id, vencedor_id)
+            self._mesas_pontuaveis.append((slot1, slot2, resultado1, resultado2))
+
+    def pontuar(self, base_pontuacao: list[float], base_com_regras: list[float],
+                basica: Regra, extras: list[Regra | None]) -> None:
+        """Pontos de cada slot: a base (participação + pontos extras, ver
+        TorneioService.editar_torneio_regras) mais o resultado de cada mesa
+        finalizada, com a regra básica e a regra extra (`extras[slot]`) de
+        cada lado."""
+        self.pontuacao = list(base_pontuacao)
+        self.pontuacao_com_regras = list(base_com_regras)
+        for slot1, slot2, resultado1, resultado2 in self._mesas_pontuaveis:
+            tem_oponente = slot2 is not None
+            extra1 = extras[slot1]
+            extra2 = extras[slot2] if tem_oponente else None
+            pontos, com_regras = pontos_do_lado(resultado1, basica, extra1, extra2, tem_oponente)
+            self.pontuacao[slot1] += pontos
+            self.pontuacao_com_regras[slot1] += com_regras
+            if tem_oponente:
+                pontos, com_regras = pontos_do_lado(resultado2, basica, extra2, extra1, True)
+                self.pontuacao[slot2] += pontos
+                self.pontuacao_com_regras[slot2] += com_regras
+
+    def calcular_desempates(self) -> None:
+        # A taxa de vitória usada no desempate (nunca a pontuação em si)
+        # exclui byes do numerador e do denominador — um bye não conta como
+        # vitória nem consome uma rodada "real" pra esse cálculo — e depois
+        # é limitada a um piso de 25% e um teto que depende de o jogador ter
+        # completado o torneio (100%) ou desistido no meio dele (75%),
+        # detectado comparando quantas rodadas ele de fato disputou (reais +
+        # byes) contra o total de rodadas geradas no torneio.
+        n = len(self.link_ids)
+        taxas = [0.0] * n
+        for slot in range(n):
+            partidas_reais = self.vitorias[slot] + self.derrotas[slot] + self.empates[slot]
+            taxa_bruta = (self.vitorias[slot] / partidas_reais) if partidas_reais else 0.0
+            completou = partidas_reais + self.byes[slot] >= self.total_rodadas
+            teto = TETO_TAXA_VITORIA_COMPLETOU if completou else TETO_TAXA_VITORIA_DESISTIU
+            taxas[slot] = min(max(taxa_bruta, PISO_TAXA_VITORIA), teto)
+
+        omw = [_media(taxas, self.oponentes[slot]) for slot in range(n)]
+        oomw = [_media(omw, self.oponentes[slot]) for slot in range(n)]
+        self.omw = [round(valor * 100, 2) for valor in omw]
+        self.oomw = [round(valor * 100, 2) for valor in oomw]
+
+
+def _media(valores: list[float], slots: list[int]) -> float:
+    # Oponente fora do torneio (slot -1) não entra na média.
+    contados = [valores[slot] for slot in slots if slot >= 0]
+    return (sum(contados) / len(contados)) if contados else 0.0
+
+
+def ordem_oficial(chaves: dict[int, tuple], resultado_direto: dict[frozenset, int | None], torneio_id: str) -> list[int]:
+    """Ids em ordem oficial a partir de `chaves` ({link_id: (pontuação,
+    OMW%, OOMW%)}): maior chave primeiro; empate exato entre dois que se
+    enfrentaram vai pro confronto direto, e o resto por sorteio
+    determinístico por torneio+grupo (ver TorneioService.calcular_ranking_oficial)."""
+    ordenados = sorted(chaves, key=lambda link_id: tuple(-valor for valor in chaves[link_id]))
+
+    resultado: list[int] = []
+    i = 0
+    while i < len(ordenados):
+        j = i + 1
+        while j < len(ordenados) and chaves[ordenados[j]] == chaves[ordenados[i]]:
+            j += 1
+        resultado.extend(_desempatar_grupo(ordenados[i:j], resultado_direto, torneio_id))
+        i = j
+    return resultado
+
+
+def _desempatar_grupo(grupo: list[int], resultado_direto: dict[frozenset, int | None], torneio_id: str) -> list[int]:
+    if len(grupo) <= 1:
+        return grupo
+
+    if len(grupo) == 2:
+        a, b = grupo
+        vencedor = resultado_direto.get(frozenset((a, b)))
+        if vencedor == a:
+            return [a, b]
+        if vencedor == b:
+            return [b, a]
+
+    semente = ":".join(str(link_id) for link_id in sorted(grupo))
+    ordem = list(grupo)
+    random.Random(f"{torneio_id}:{semente}").shuffle(ordem)
+    return ordem
@@ -0,0 +1,134 @@
+import hashlib
+from typing import Annotated, Any
+
+from fastapi import Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.exception import TopDeckedException
+
+# Relações (e campos calculados caros) de um payload, cada uma com as
+# próprias sub-relações — None quando não tem nenhuma. Ex.: {"loja": None,
+# "jogadores": {"categoria": None}}.
+Relacoes = dict[str, "Relacoes | None"]
+
+
+def _partes(valor: str | None) -> set[str] | None:
+    if valor is None:
+        return None
+    return {parte.strip() for parte in valor.split(",") if parte.strip()}
+
+
+def _topo(nomes: set[str]) -> set[str]:
+    return {nome.split(".", 1)[0] for nome in nomes}
+
+
+class RecorteCampos:
+    """Recorte pedido pelo cliente via `fields=` / `include=` (listas
+    separadas por vírgula, com `.` pra descer numa relação — ex.:
+    `fields=id,nome,jogadores.apelido&include=jogadores,rodadas`).
+
+    - `include` diz quais relações vêm; sem ele, vêm as citadas em
+      `fields` — e, sem nenhum dos dois, todas (o payload completo de
+      sempre);
+    - `fields` diz quais campos simples vêm; sem ele, todos.
+
+    Os serializadores consultam `inclui()` ANTES de carregar ou calcular
+    uma relação — relação não pedida não é só descartada da resposta, ela
+    nem chega a ser lida do banco."""
+
+    def __init__(self, campos: set[str] | None = None, inclusoes: set[str] | None = None,
+                 relacoes: Relacoes | None = None):
+        self.campos = campos
+        self.inclusoes = inclusoes
+        self.relacoes = relacoes or {}
+
+    @property
+    def completo(self) -> bool:
+        return self.campos is None and self.inclusoes is None
+
+    @property
+    def chave(self) -> str:
+        """Identifica o recorte (vazia sem recorte) — entra no ETag, já que
+        recortes diferentes do mesmo recurso são representações diferentes."""
+        if self.completo:
+            return ""
+        texto = repr(tuple(sorted(nomes) if nomes is not None else None for nomes in (self.campos, self.inclusoes)))
+        return hashlib.sha1(texto.encode()).hexdigest()[:12]
+
+    def inclui(self, relacao: str) -> bool:
+        if self.inclusoes is not None:
+            return relacao in _topo(self.inclusoes)
+        if self.campos is not None:
+            return relacao in _topo(self.campos)
+        return True
+
+    def sub(self, relacao: str) -> "RecorteCampos":
+        """Recorte de cada item da relação: o que vem depois de `relacao.`
+        em `fields`/`include` — nada citado assim significa tudo."""
+        prefixo = f"{relacao}."
+
+        def _filhos(nomes: set[str] | None) -> set[str] | None:
+            if nomes is None:
+                return None
+            return {nome[len(prefixo):] for nome in nomes if nome.startswith(prefixo)} or None
+
+        return RecorteCampos(_filhos(self.campos), _filhos(self.inclusoes), self.relacoes.get(relacao))
+
+    def validar(self, modelo: type[BaseModel]) -> None:
+        for campo in self.campos or ():
+            if campo.split(".", 1)[0] not in modelo.model_fields:
+                raise TopDeckedException.bad_request(f"Campo desconhecido em 'fields': {campo}")
+        for inclusao in self.inclusoes or ():
+            relacoes = self.relacoes
+            for parte in inclusao.split("."):
+                if relacoes is None or parte not in relacoes:
+                    raise TopDeckedException.bad_request(f"Relação desconhecida em 'include': {inclusao}")
+                relacoes = relacoes[parte]
+
+    def recortar(self, dados: dict[str, Any]) -> dict[str, Any]:
+        campos = _topo(self.campos) if self.campos is not None else None
+        saida = {}
+        for chave, valor in dados.items():
+            if chave in self.relacoes:
+                if not self.inclui(chave):
+                    continue
+                sub = self.sub(chave)
+                if isinstance(valor, list):
+                    valor = [sub.recortar(item) if isinstance(item, dict) else item for item in valor]
+                elif isinstance(valor, dict):
+                    valor = sub.recortar(valor)
+            elif campos is not None and chave not in campos:
+                continue
+            saida[chave] = valor
+        return saida
+
+    def responder(self, modelo: type[BaseModel], dados: dict[str, Any]):
+        """Resposta da rota: sem recorte, o próprio dict (o `response_model`
+        da rota cuida do resto, como sempre); com recorte, o payload
+        validado pelo mesmo modelo e então recortado — por isso devolvido
+        direto como JSONResponse, já que não tem mais todos os campos
+        obrigatórios do modelo."""
+        if self.completo:
+            return dados
+        validado = modelo.model_validate(dados, from_attributes=True)
+        return JSONResponse(self.recortar(validado.model_dump(mode="json")))
+
+    def renderizar(self, modelo: type[BaseModel], dados: dict[str, Any]) -> bytes:
+        """O corpo JSON da resposta (com ou sem recorte) já serializado, pra
+        quem guarda a resposta pronta (ver TorneioCacheService)."""
+        conteudo = modelo.model_validate(dados, from_attributes=True).model_dump(mode="json")
+        return JSONResponse(conteudo if self.completo else self.recortar(conteudo)).body
+
+
+def recorte_de_campos(modelo: type[BaseModel], relacoes: Relacoes):
+    """Dependência FastAPI que lê `fields`/`include` da query string e
+    recusa (400) campo ou relação que `modelo` não tem."""
+    def dependencia(
+        fields: Annotated[str | None, Query(description="Campos a devolver, separados por vírgula.")] = None,
+        include: Annotated[str | None, Query(description="Relações a carregar, separadas por vírgula.")] = None,
+    ) -> RecorteCampos:
+        recorte = RecorteCampos(_partes(fields), _partes(include), relacoes)
+        recorte.validar(modelo)
+        return recorte
+    return dependencia
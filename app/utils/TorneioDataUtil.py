@@ -1,9 +1,16 @@
+from __future__ import annotations
+
 from datetime import date, datetime, time
+from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
-from app.models import Torneio
 from app.utils.Enums import StatusTorneio
 
+if TYPE_CHECKING:
+    # Só pra anotação: app.models importa este módulo pra manter
+    # Torneio.data_efetiva, então importar de volta seria circular.
+    from app.models import Torneio
+
 BRASIL_TZ = ZoneInfo("America/Fortaleza")
 
 
@@ -25,3 +32,10 @@ def data_efetiva_torneio(torneio: Torneio) -> date:
     normalização é o clássico bug de perder um dia perto da virada de mês
     em fusos negativos."""
     return momento_efetivo_torneio(torneio).astimezone(BRASIL_TZ).date()
+
+
+
+def chave_ano_mes(data: date) -> int:
+    """(ano, mês) num inteiro só e ordenável — 2026-04-xx vira 202604 — pra
+    agrupar/filtrar por mês (Torneio.ano_mes_efetivo) com um índice comum."""
+    return data.year * 100 + data.month
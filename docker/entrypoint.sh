@@ -4,5 +4,13 @@ set -e
 echo "Aplicando migrations (alembic upgrade head)..."
 alembic upgrade head
 
+# Só preenchem as tabelas na primeira subida depois da migração que as cria;
+# dali em diante elas são mantidas pela aplicação.
+echo "Preenchendo o snapshot do ranking (se vazio)..."
+python -m app.scripts.reconstruir_ranking_snapshot --se-vazio
+
+echo "Preenchendo as estatísticas mensais dos jogadores (se vazias)..."
+python -m app.scripts.reconstruir_estatisticas_mensais --se-vazio
+
 echo "Subindo aplicação..."
 exec fastapi run app/main.py --host 0.0.0.0 --port 8000
@@ -0,0 +1,54 @@
+"""ranking snapshot
+
+Revision ID: 5b7e0c2a9d41
+Revises: d632edd998c3
+Create Date: 2026-08-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e0c2a9d41'
+down_revision: Union[str, Sequence[str], None] = 'd632edd998c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tabela nasce vazia — popular com
+    # `python -m app.scripts.reconstruir_ranking_snapshot` (o entrypoint do
+    # container já faz isso logo depois do `alembic upgrade head`).
+    op.create_table(
+        'rankingsnapshot',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jogador_criado_id', sa.Integer(), nullable=False),
+        sa.Column('loja_id', sa.Integer(), nullable=False),
+        sa.Column('tcg', sa.Enum('POKEMON', 'ONEPIECE', 'POKEMON_VGC', 'POKEMON_GO', name='tcg'), nullable=False),
+        sa.Column('ano', sa.Integer(), nullable=False),
+        sa.Column('mes', sa.Integer(), nullable=False),
+        sa.Column('pontos', sa.Integer(), nullable=False),
+        sa.Column('torneios', sa.Integer(), nullable=False),
+        sa.Column('vitorias', sa.Integer(), nullable=False),
+        sa.Column('derrotas', sa.Integer(), nullable=False),
+        sa.Column('empates', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['jogador_criado_id'], ['jogadorcriado.id'], ),
+        sa.ForeignKeyConstraint(['loja_id'], ['loja.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('jogador_criado_id', 'loja_id', 'tcg', 'ano', 'mes',
+                            name='ranking_snapshot_jogador_loja_tcg_mes_unique')
+    )
+    with op.batch_alter_table('rankingsnapshot', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_rankingsnapshot_jogador_criado_id'), ['jogador_criado_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_rankingsnapshot_loja_id'), ['loja_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('rankingsnapshot', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_rankingsnapshot_loja_id'))
+        batch_op.drop_index(batch_op.f('ix_rankingsnapshot_jogador_criado_id'))
+
+    op.drop_table('rankingsnapshot')
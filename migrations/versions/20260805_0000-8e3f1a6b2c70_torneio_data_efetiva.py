@@ -0,0 +1,69 @@
+"""torneio data_efetiva
+
+Revision ID: 8e3f1a6b2c70
+Revises: 5b7e0c2a9d41
+Create Date: 2026-08-05 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.TorneioDataUtil import chave_ano_mes, data_efetiva_torneio
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f1a6b2c70'
+down_revision: Union[str, Sequence[str], None] = '5b7e0c2a9d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+
+    with op.batch_alter_table('torneio', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_efetiva', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('ano_mes_efetivo', sa.Integer(), nullable=True))
+
+    # Passo 2: backfill com a mesma regra que o ORM aplica a cada
+    # INSERT/UPDATE (TorneioDataUtil.data_efetiva_torneio) — em Python, não
+    # em SQL, pra que as duas nunca divirjam. Tabela tipada (não texto cru)
+    # pra que datas/horas voltem como date/time/datetime também no SQLite.
+    torneio = sa.table(
+        'torneio',
+        sa.column('id', sa.String()),
+        sa.column('status', sa.String()),
+        sa.column('data_planejada', sa.Date()),
+        sa.column('hora_planejada', sa.Time()),
+        sa.column('inicio_real', sa.DateTime(timezone=True)),
+        sa.column('data_efetiva', sa.Date()),
+        sa.column('ano_mes_efetivo', sa.Integer()),
+    )
+    linhas = conn.execute(sa.select(
+        torneio.c.id, torneio.c.status, torneio.c.data_planejada, torneio.c.hora_planejada, torneio.c.inicio_real,
+    )).fetchall()
+    for linha in linhas:
+        data_efetiva = data_efetiva_torneio(linha)
+        conn.execute(
+            torneio.update().where(torneio.c.id == linha.id),
+            {"data_efetiva": data_efetiva, "ano_mes_efetivo": chave_ano_mes(data_efetiva)},
+        )
+
+    with op.batch_alter_table('torneio', schema=None) as batch_op:
+        batch_op.alter_column('data_efetiva', existing_type=sa.Date(), nullable=False)
+        batch_op.alter_column('ano_mes_efetivo', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index('ix_torneio_loja_jogo_status_data_efetiva',
+                              ['loja_id', 'jogo', 'status', 'data_efetiva'], unique=False)
+        batch_op.create_index('ix_torneio_loja_ano_mes_efetivo', ['loja_id', 'ano_mes_efetivo'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('torneio', schema=None) as batch_op:
+        batch_op.drop_index('ix_torneio_loja_ano_mes_efetivo')
+        batch_op.drop_index('ix_torneio_loja_jogo_status_data_efetiva')
+        batch_op.drop_column('ano_mes_efetivo')
+        batch_op.drop_column('data_efetiva')
@@ -0,0 +1,51 @@
+"""estatistica mensal jogador
+
+Revision ID: c41d7e9f0a52
+Revises: 8e3f1a6b2c70
+Create Date: 2026-08-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e9f0a52'
+down_revision: Union[str, Sequence[str], None] = '8e3f1a6b2c70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tabela nasce vazia — popular com
+    # `python -m app.scripts.reconstruir_estatisticas_mensais` (o entrypoint
+    # do container já faz isso logo depois do `alembic upgrade head`).
+    op.create_table(
+        'estatisticamensaljogador',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jogador_id', sa.Integer(), nullable=False),
+        sa.Column('loja_id', sa.Integer(), nullable=False),
+        sa.Column('tcg', sa.Enum('POKEMON', 'ONEPIECE', 'POKEMON_VGC', 'POKEMON_GO', name='tcg'), nullable=False),
+        sa.Column('ano', sa.Integer(), nullable=False),
+        sa.Column('mes', sa.Integer(), nullable=False),
+        sa.Column('pontos', sa.Float(), nullable=False),
+        sa.Column('vitorias', sa.Integer(), nullable=False),
+        sa.Column('derrotas', sa.Integer(), nullable=False),
+        sa.Column('empates', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['jogador_id'], ['jogador.id'], ),
+        sa.ForeignKeyConstraint(['loja_id'], ['loja.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('jogador_id', 'loja_id', 'tcg', 'ano', 'mes',
+                            name='estatistica_mensal_jogador_loja_tcg_mes_unique')
+    )
+    with op.batch_alter_table('estatisticamensaljogador', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_estatisticamensaljogador_loja_id'), ['loja_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('estatisticamensaljogador', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_estatisticamensaljogador_loja_id'))
+
+    op.drop_table('estatisticamensaljogador')
@@ -0,0 +1,31 @@
+"""torneio versao
+
+Revision ID: 3a7c5d91b2e4
+Revises: c41d7e9f0a52
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c5d91b2e4'
+down_revision: Union[str, Sequence[str], None] = 'c41d7e9f0a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # server_default preenche os torneios que já existem com a versão 1.
+    with op.batch_alter_table('torneio', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('versao', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('torneio', schema=None) as batch_op:
+        batch_op.drop_column('versao')
@@ -0,0 +1,52 @@
+"""importacao job
+
+Revision ID: 7d2e94c1a6f3
+Revises: 3a7c5d91b2e4
+Create Date: 2026-10-18 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e94c1a6f3'
+down_revision: Union[str, Sequence[str], None] = '3a7c5d91b2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'importacaojob',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('loja_id', sa.Integer(), nullable=False),
+        sa.Column('arquivo', sa.String(), nullable=False),
+        sa.Column('status', sa.Enum('PENDENTE', 'PROCESSANDO', 'CONCLUIDO', 'FALHOU',
+                                    name='statusimportacaojob'), nullable=False),
+        sa.Column('etapa', sa.Enum('LENDO_ARQUIVO', 'GRAVANDO', 'CONQUISTAS',
+                                   name='etapaimportacao'), nullable=True),
+        sa.Column('conteudo', sa.LargeBinary(), nullable=True),
+        sa.Column('torneio_id', sa.String(), nullable=True),
+        sa.Column('erro', sa.String(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('iniciado_em', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('concluido_em', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['loja_id'], ['loja.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('importacaojob', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_importacaojob_loja_id'), ['loja_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('importacaojob', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_importacaojob_loja_id'))
+
+    op.drop_table('importacaojob')
+    sa.Enum(name='etapaimportacao').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='statusimportacaojob').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,38 @@
+"""torneio apagado e versao do jogador criado
+
+Revision ID: e5a1c8d3f7b2
+Revises: 7d2e94c1a6f3
+Create Date: 2026-10-18 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c8d3f7b2'
+down_revision: Union[str, Sequence[str], None] = '7d2e94c1a6f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'torneioapagado',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('versao', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('jogadorcriado', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('versao', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jogadorcriado', schema=None) as batch_op:
+        batch_op.drop_column('versao')
+
+    op.drop_table('torneioapagado')
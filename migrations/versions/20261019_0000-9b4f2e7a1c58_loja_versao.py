@@ -0,0 +1,30 @@
+"""loja versao
+
+Revision ID: 9b4f2e7a1c58
+Revises: e5a1c8d3f7b2
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4f2e7a1c58'
+down_revision: Union[str, Sequence[str], None] = 'e5a1c8d3f7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('loja', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('versao', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('loja', schema=None) as batch_op:
+        batch_op.drop_column('versao')
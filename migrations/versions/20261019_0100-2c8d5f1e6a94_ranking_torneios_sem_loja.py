@@ -0,0 +1,36 @@
+"""ranking com torneios sem loja
+
+Revision ID: 2c8d5f1e6a94
+Revises: 9b4f2e7a1c58
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8d5f1e6a94'
+down_revision: Union[str, Sequence[str], None] = '9b4f2e7a1c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabela in ('rankingsnapshot', 'estatisticamensaljogador'):
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column('loja_id', existing_type=sa.Integer(), nullable=True)
+        # As linhas atuais não têm os torneios sem loja: esvaziadas, são
+        # refeitas por inteiro na subida seguinte (entrypoint, --se-vazio).
+        op.execute(sa.text(f"DELETE FROM {tabela}"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabela in ('rankingsnapshot', 'estatisticamensaljogador'):
+        op.execute(sa.text(f"DELETE FROM {tabela} WHERE loja_id IS NULL"))
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            batch_op.alter_column('loja_id', existing_type=sa.Integer(), nullable=False)
@@ -12,6 +12,7 @@ from app.core.db import get_session
 from sqlmodel import Session, select
 
 from app.models import JogadorCriado, JogadorTorneioLink, Loja
+from app.services.RankingService import atualizar_ranking_snapshot_torneio
 from app.utils.Enums import TCG, StatusAprovacaoLoja
 
 
@@ -202,9 +203,13 @@ def test_import_cria_jogador_criado_para_participante_sem_conta_e_aparece_no_ran
     # preexistente, não relacionado a esta mudança) — como o import não
     # aplica nenhuma regra de pontuação sozinho, simula pontuação real aqui
     # (o que uma regra de pontuação normalmente preencheria).
-    for link in session.exec(select(JogadorTorneioLink)).all():
+    links = session.exec(select(JogadorTorneioLink)).all()
+    for link in links:
         link.pontuacao_com_regras = 3
         session.add(link)
+    # Escrita direta no banco pula as rotas que mantêm o snapshot do ranking
+    # — atualiza como elas fariam.
+    atualizar_ranking_snapshot_torneio(session, links[0].torneio)
     session.commit()
 
     # Participante sem conta real: antes desta mudança, ranking geral ignorava
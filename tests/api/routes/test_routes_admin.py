@@ -274,3 +274,18 @@ def test_crud_generico_de_entidade(client: TestClient) -> None:
 def test_crud_generico_requer_admin(client: TestClient) -> None:
     r = client.get("/api/admin/entidades/categoria")
     assert r.status_code == 401, r.text
+
+
+def test_estatisticas_do_cache_do_ranking(client: TestClient) -> None:
+    admin_headers = _criar_admin_autenticado(client, "admin.cache@gmail.com")
+
+    client.get("/api/ranking/geral")
+    client.get("/api/ranking/geral")
+
+    r = client.get("/api/admin/cache/ranking", headers=admin_headers)
+    assert r.status_code == 200, r.text
+    estatisticas = r.json()
+    assert (estatisticas["faltas"], estatisticas["acertos"], estatisticas["itens"]) == (1, 1, 1)
+    assert {"capacidade", "despejos", "invalidacoes"} <= set(estatisticas)
+
+    assert client.get("/api/admin/cache/ranking").status_code == 401
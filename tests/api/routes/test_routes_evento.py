@@ -671,3 +671,27 @@ def test_novo_fluxo_criar_jogador_vincular_gameid_e_participar_conta_pontos(
     r = client.get(f"/api/lojas/eventos/{evento['id']}", headers=headers_loja)
     participante = r.json()["participantes"][0]
     assert participante["pontos_automaticos"] == 5
+
+
+def test_get_evento_com_include_nao_calcula_participantes(client: TestClient, session: Session) -> None:
+    loja, token = _criar_loja_autenticada(client, "Loja Evento Recorte", "loja.eventorecorte@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    evento = _criar_evento(client, headers)
+    jogador = _criar_jogador_da_loja(session, loja["id"], "Jogador Recorte")
+    r = client.post(f"/api/lojas/eventos/{evento['id']}/participantes",
+                    json={"jogador_criado_id": jogador["jogador_criado_id"]}, headers=headers)
+    assert r.status_code == 200, r.text
+    client.post(f"/api/lojas/eventos/{evento['id']}/metas",
+                json={"pontos_necessarios": 5, "recompensa_descricao": "Sleeves", "recompensa_imagem_url": None},
+                headers=headers)
+
+    r = client.get(f"/api/lojas/eventos/{evento['id']}", params={"fields": "nome,status", "include": "metas"},
+                   headers=headers)
+    assert r.status_code == 200, r.text
+    assert set(r.json()) == {"nome", "status", "metas"}
+    assert [m["pontos_necessarios"] for m in r.json()["metas"]] == [5]
+
+    r = client.get(f"/api/lojas/eventos/{evento['id']}", params={"include": "participantes"}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert [p["jogador_criado_id"] for p in r.json()["participantes"]] == [jogador["jogador_criado_id"]]
+    assert "metas" not in r.json() and r.json()["nome"] == "Liga de Verão"
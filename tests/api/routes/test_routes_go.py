@@ -258,7 +258,7 @@ def test_composicao_partida_mantem_o_mesmo_id_em_toda_rodada_para_tcg(client: Te
     ).all()
 
     # TCG/VGC: a mesma ComposicaoPartida é reaproveitada em toda rodada nova
-    # dessa participação — nunca cria outra (ver garantir_composicao_partida).
+    # dessa participação — nunca cria outra (ver garantir_composicoes_partida).
     assert len(composicoes) == 2
     assert composicoes[0].composicao_partida_id == composicoes[1].composicao_partida_id
 
@@ -647,3 +647,383 @@ def test_import_birthdate_malformada_nao_derruba_a_importacao(client: TestClient
 
     jc = session.exec(select(JogadorCriado).where(JogadorCriado.game_id == "gid-nasc-invalido")).first()
     assert jc.data_nascimento is None
+
+
+def test_ler_tdf_calcula_inicio_e_fim_com_rodadas_fora_de_ordem() -> None:
+    """A leitura em fluxo guarda o primeiro/último horário por rodada numa
+    passada só — o início vem da menor rodada e o fim da maior, mesmo com as
+    rodadas fora de ordem e espalhadas em mais de um pod."""
+    from io import BytesIO
+
+    from app.services.ImportacaoService import ler_tdf
+    from app.utils.datetimeUtil import parse_datetime
+
+    def _rodada(numero: int, *horarios: str) -> str:
+        partidas = "".join(
+            f"""<match outcome="5"><player userid="a" /><tablenumber>{mesa}</tablenumber>
+            <timestamp>{horario}</timestamp></match>"""
+            for mesa, horario in enumerate(horarios, start=1)
+        )
+        return f'<round number="{numero}"><matches>{partidas}</matches></round>'
+
+    xml = f"""<?xml version="1.0"?>
+<tournament>
+  <data><name>T</name><city>Fortaleza</city><startdate>08/01/2026</startdate></data>
+  <players><player userid="a"><firstname>A</firstname></player></players>
+  <pods>
+    <pod><rounds>{_rodada(2, "08/01/2026 11:00:00", "08/01/2026 11:30:00")}</rounds></pod>
+    <pod><rounds>{_rodada(3, "08/01/2026 12:10:00", "08/01/2026 12:00:00")}{_rodada(1, "08/01/2026 10:05:00", "08/01/2026 10:00:00")}</rounds></pod>
+  </pods>
+</tournament>"""
+
+    tdf = ler_tdf(BytesIO(xml.encode("utf-8")))
+
+    assert tdf.dados["city"] == "Fortaleza"
+    assert tdf.jogadores == [("a", "A", None)]
+    assert [p[0] for p in tdf.partidas] == [2, 2, 3, 3, 1, 1]
+    assert tdf.inicio_real == parse_datetime("08/01/2026 10:00:00")
+    assert tdf.fim_real == parse_datetime("08/01/2026 12:10:00")
+
+
+def test_import_que_falha_no_meio_nao_deixa_linhas_parciais(client: TestClient, session: Session) -> None:
+    """A importação roda numa transação só: o jogador fantasma só é
+    descoberto depois de o torneio e as participações já terem ido pro
+    banco, e nada disso pode sobrar."""
+    headers = _criar_loja_autenticada(client, "Loja Parcial", "loja.parcial@gmail.com")
+    match_com_fantasma = _match_normal("1").replace('userid="gid-2"', 'userid="gid-fantasma"')
+
+    r = client.post(
+        "/api/lojas/torneios/importar",
+        files={"arquivo": ("torneio.tdf", _tdf_envelope(_PLAYERS_PADRAO, match_com_fantasma), "text/xml")},
+        headers=headers,
+    )
+
+    assert r.status_code == 400
+    assert session.exec(select(Torneio)).all() == []
+    assert session.exec(select(JogadorCriado)).all() == []
+
+
+def test_reimport_que_falha_mantem_o_torneio_anterior(client: TestClient, session: Session) -> None:
+    headers = _criar_loja_autenticada(client, "Loja Reimport", "loja.reimport@gmail.com")
+    xml = _tdf_envelope(_PLAYERS_PADRAO, _match_normal("1")).replace(b"<id></id>", b"<id>T-REIMPORT</id>")
+    r = client.post(
+        "/api/lojas/torneios/importar",
+        files={"arquivo": ("torneio.tdf", xml, "text/xml")},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+
+    quebrado = xml.replace(b'outcome="1"', b'outcome="4"')
+    r = client.post(
+        "/api/lojas/torneios/T-REIMPORT/importar",
+        files={"arquivo": ("torneio.tdf", quebrado, "text/xml")},
+        headers=headers,
+    )
+    assert r.status_code == 400
+
+    # outcome=4 é rejeitado já na leitura; um jogador fantasma só na gravação.
+    fantasma = xml.replace(b'<player2 userid="gid-2" />', b'<player2 userid="gid-fantasma" />')
+    r = client.post(
+        "/api/lojas/torneios/T-REIMPORT/importar",
+        files={"arquivo": ("torneio.tdf", fantasma, "text/xml")},
+        headers=headers,
+    )
+    assert r.status_code == 400
+
+    r = client.get("/api/lojas/torneios/T-REIMPORT", headers=headers)
+    assert r.status_code == 200
+    assert {j["apelido"] for j in r.json()["jogadores"]} == {"Um Teste", "Dois Teste"}
+    assert len(r.json()["rodadas"]) == 1
+
+    r = client.post(
+        "/api/lojas/torneios/T-REIMPORT/importar",
+        files={"arquivo": ("torneio.tdf", xml.replace(b'outcome="1"', b'outcome="2"'), "text/xml")},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["rodadas"][0]["vencedor_id"] == r.json()["rodadas"][0]["jogador2_id"]
+
+
+def test_torneio_apagado_e_importado_de_novo_nao_repete_versao(client: TestClient, session: Session) -> None:
+    headers = _criar_loja_autenticada(client, "Loja Reapagado", "loja.reapagado@gmail.com")
+    xml = _tdf_envelope(_PLAYERS_PADRAO, _match_normal("1")).replace(b"<id></id>", b"<id>T-DE-NOVO</id>")
+    url = "/api/lojas/torneios/T-DE-NOVO"
+
+    def _importar(conteudo: bytes) -> None:
+        r = client.post("/api/lojas/torneios/importar",
+                        files={"arquivo": ("torneio.tdf", conteudo, "text/xml")}, headers=headers)
+        assert r.status_code == 200, r.text
+
+    _importar(xml)
+    r = client.get(url, headers=headers)
+    etag, vencedor = r.headers["etag"], r.json()["rodadas"][0]["vencedor_id"]
+    versao = session.get(Torneio, "T-DE-NOVO").versao
+
+    assert client.delete(url, headers=headers).status_code == 204
+    _importar(xml.replace(b'outcome="1"', b'outcome="2"'))
+    session.expire_all()
+    assert session.get(Torneio, "T-DE-NOVO").versao > versao
+
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200, r.text
+    assert r.headers["etag"] != etag
+    assert r.json()["rodadas"][0]["vencedor_id"] != vencedor
+
+
+def test_import_em_lote_relata_cada_arquivo_e_recalcula_conquistas_uma_vez(
+    client: TestClient, session: Session, monkeypatch
+) -> None:
+    import io
+    import zipfile
+
+    from app.services import ImportacaoService
+
+    recalculados = []
+    monkeypatch.setattr(
+        ImportacaoService, "recalcular_conquistas_jogador",
+        lambda session, jogador_id: recalculados.append(jogador_id),
+    )
+    headers = _criar_loja_autenticada(client, "Loja Lote", "loja.lote@gmail.com")
+    session.add(JogadorCriado(game_id="gid-1", apelido="Um Teste", jogador_id=999))
+    session.commit()
+
+    def _tdf(torneio_id: str) -> bytes:
+        return _tdf_envelope(_PLAYERS_PADRAO, _match_normal("1")).replace(
+            b"<id></id>", f"<id>{torneio_id}</id>".encode())
+
+    compactado = io.BytesIO()
+    with zipfile.ZipFile(compactado, "w") as zip_:
+        zip_.writestr("temporada/b.tdf", _tdf("T-LOTE-B"))
+        zip_.writestr("temporada/a-de-novo.tdf", _tdf("T-LOTE-A"))
+        zip_.writestr("temporada/quebrado.tdf", b"<tournament><data>")
+        zip_.writestr("temporada/leia-me.txt", b"ignorado")
+
+    r = client.post(
+        "/api/lojas/torneios/importar-lote",
+        files=[
+            ("arquivos", ("a.tdf", _tdf("T-LOTE-A"), "text/xml")),
+            ("arquivos", ("temporada.zip", compactado.getvalue(), "application/zip")),
+        ],
+        headers=headers,
+    )
+
+    assert r.status_code == 200, r.text
+    assert [(item["arquivo"], item["status"], item["torneio_id"]) for item in r.json()] == [
+        ("a.tdf", "IMPORTADO", "T-LOTE-A"),
+        ("temporada.zip/temporada/b.tdf", "IMPORTADO", "T-LOTE-B"),
+        ("temporada.zip/temporada/a-de-novo.tdf", "DUPLICADO", "T-LOTE-A"),
+        ("temporada.zip/temporada/quebrado.tdf", "FALHOU", None),
+    ]
+    assert r.json()[3]["motivo"] == "Arquivo XML inválido"
+    assert session.get(Torneio, "T-LOTE-B").vagas == 2
+    # Dois torneios com o mesmo jogador com conta: um recálculo só.
+    assert recalculados == [999]
+
+
+def test_import_em_lote_recusa_zip_grande_demais_sem_descompactar(
+    client: TestClient, session: Session, monkeypatch
+) -> None:
+    import io
+    import zipfile
+
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "IMPORTACAO_TDF_MAX_BYTES", 64 * 1024)
+    monkeypatch.setattr(settings, "IMPORTACAO_LOTE_MAX_BYTES", 128 * 1024)
+    monkeypatch.setattr(settings, "IMPORTACAO_LOTE_MAX_ARQUIVOS", 3)
+    headers = _criar_loja_autenticada(client, "Loja Lote Limite", "loja.lote.limite@gmail.com")
+
+    def _zip(entradas: dict[str, bytes]) -> bytes:
+        compactado = io.BytesIO()
+        with zipfile.ZipFile(compactado, "w", zipfile.ZIP_DEFLATED) as zip_:
+            for nome, conteudo in entradas.items():
+                zip_.writestr(nome, conteudo)
+        return compactado.getvalue()
+
+    # Uns poucos KB compactados, muitos MB descompactados.
+    bomba = _zip({"bomba.tdf": b"\0" * (16 * 1024 * 1024)})
+    assert len(bomba) < 64 * 1024
+    grande_no_total = _zip({f"{n}.tdf": b"\0" * (60 * 1024) for n in range(3)})
+    arquivos_demais = _zip({f"{n}.tdf": b"" for n in range(4)})
+
+    descompactados = []
+    abrir = zipfile.ZipFile.open
+    monkeypatch.setattr(zipfile.ZipFile, "open",
+                        lambda self, nome, *args, **kwargs: descompactados.append(nome) or abrir(self, nome, *args, **kwargs))
+
+    def _enviar(conteudo: bytes) -> str:
+        r = client.post("/api/lojas/torneios/importar-lote",
+                        files=[("arquivos", ("lote.zip", conteudo, "application/zip"))], headers=headers)
+        assert r.status_code == 400, r.text
+        return r.json()["detail"]
+
+    assert "bomba.tdf" in _enviar(bomba)
+    assert "somar" in _enviar(grande_no_total)
+    assert "no máximo 3" in _enviar(arquivos_demais)
+    assert descompactados == []
+    assert session.exec(select(Torneio)).all() == []
+
+
+def test_import_em_lote_isola_arquivo_que_falha_na_gravacao(client: TestClient, session: Session) -> None:
+    """O jogador fantasma só aparece na gravação, com o lote inteiro numa
+    transação: o lote é desfeito e regravado um a um, e só ele fica de fora."""
+    headers = _criar_loja_autenticada(client, "Loja Lote Falha", "loja.lotefalha@gmail.com")
+    valido = _tdf_envelope(_PLAYERS_PADRAO, _match_normal("1")).replace(b"<id></id>", b"<id>T-OK</id>")
+    fantasma = _tdf_envelope(
+        _PLAYERS_PADRAO, _match_normal("1").replace('userid="gid-2"', 'userid="gid-fantasma"'),
+    ).replace(b"<id></id>", b"<id>T-FANTASMA</id>")
+
+    r = client.post(
+        "/api/lojas/torneios/importar-lote",
+        files=[
+            ("arquivos", ("fantasma.tdf", fantasma, "text/xml")),
+            ("arquivos", ("ok.tdf", valido, "text/xml")),
+        ],
+        headers=headers,
+    )
+
+    assert r.status_code == 200, r.text
+    assert [item["status"] for item in r.json()] == ["FALHOU", "IMPORTADO"]
+    assert "gid-fantasma" in r.json()[0]["motivo"]
+    assert session.get(Torneio, "T-FANTASMA") is None
+    assert session.get(Torneio, "T-OK") is not None
+
+
+def _fila_com_sessao_do_teste(monkeypatch, session: Session):
+    from app.services.ImportacaoJobService import fila_importacao
+
+    monkeypatch.setattr(fila_importacao, "abrir_sessao", lambda: Session(session.get_bind()))
+    return fila_importacao
+
+
+def test_importacao_em_segundo_plano_conclui_e_informa_o_torneio(
+    client: TestClient, session: Session, monkeypatch
+) -> None:
+    fila = _fila_com_sessao_do_teste(monkeypatch, session)
+    headers = _criar_loja_autenticada(client, "Loja Job", "loja.job@gmail.com")
+    xml = _tdf_envelope(_PLAYERS_PADRAO, _match_normal("1")).replace(b"<id></id>", b"<id>T-JOB</id>")
+
+    r = client.post("/api/importacoes/", files={"arquivo": ("torneio.tdf", xml, "text/xml")}, headers=headers)
+    assert r.status_code == 202, r.text
+    assert r.json()["status"] in ("PENDENTE", "PROCESSANDO", "CONCLUIDO")
+    job_id = r.json()["id"]
+
+    fila.aguardar()
+    session.expire_all()
+
+    r = client.get(f"/api/importacoes/{job_id}", headers=headers)
+    assert r.status_code == 200, r.text
+    assert (r.json()["status"], r.json()["etapa"], r.json()["torneio_id"]) == ("CONCLUIDO", "CONQUISTAS", "T-JOB")
+    assert r.json()["concluido_em"] is not None
+    assert session.get(Torneio, "T-JOB").vagas == 2
+
+    outra_loja = _criar_loja_autenticada(client, "Outra Loja Job", "outra.loja.job@gmail.com")
+    assert client.get(f"/api/importacoes/{job_id}", headers=outra_loja).status_code == 404
+
+
+def test_importacao_em_segundo_plano_conclui_mesmo_se_as_conquistas_falharem(
+    client: TestClient, session: Session, monkeypatch
+) -> None:
+    from app.services import ImportacaoJobService
+
+    def _falhar(session, torneio_ids):
+        raise RuntimeError("conquistas indisponíveis")
+
+    monkeypatch.setattr(ImportacaoJobService, "recalcular_conquistas_dos_torneios", _falhar)
+    fila = _fila_com_sessao_do_teste(monkeypatch, session)
+    headers = _criar_loja_autenticada(client, "Loja Job Conquistas", "loja.jobconquistas@gmail.com")
+    xml = _tdf_envelope(_PLAYERS_PADRAO, _match_normal("1")).replace(b"<id></id>", b"<id>T-JOB-CONQ</id>")
+
+    r = client.post("/api/importacoes/", files={"arquivo": ("torneio.tdf", xml, "text/xml")}, headers=headers)
+    assert r.status_code == 202, r.text
+
+    fila.aguardar()
+    session.expire_all()
+
+    r = client.get(f"/api/importacoes/{r.json()['id']}", headers=headers)
+    assert (r.json()["status"], r.json()["torneio_id"], r.json()["erro"]) == ("CONCLUIDO", "T-JOB-CONQ", None)
+    assert session.get(Torneio, "T-JOB-CONQ") is not None
+
+
+def test_retomada_na_subida_reprocessa_pendentes_e_encerra_interrompidos(
+    client: TestClient, session: Session, monkeypatch
+) -> None:
+    from datetime import timedelta
+
+    from app.models import ImportacaoJob
+    from app.services.ImportacaoJobService import retomar_jobs_importacao
+    from app.utils.Enums import EtapaImportacao, StatusImportacaoJob
+    from app.utils.datetimeUtil import agora_brasil
+
+    fila = _fila_com_sessao_do_teste(monkeypatch, session)
+    headers = _criar_loja_autenticada(client, "Loja Job Retomada", "loja.jobretomada@gmail.com")
+    loja_id = session.exec(select(Loja).where(Loja.nome == "Loja Job Retomada")).one().id
+    xml = _tdf_envelope(_PLAYERS_PADRAO, _match_normal("1")).replace(b"<id></id>", b"<id>T-RETOMADA</id>")
+    ha_uma_hora = agora_brasil() - timedelta(hours=1)
+
+    # Como o processo teria deixado os jobs ao cair.
+    pendente = ImportacaoJob(loja_id=loja_id, arquivo="pendente.tdf", conteudo=xml)
+    lendo = ImportacaoJob(loja_id=loja_id, arquivo="lendo.tdf", conteudo=xml, status=StatusImportacaoJob.PROCESSANDO,
+                          etapa=EtapaImportacao.GRAVANDO, iniciado_em=ha_uma_hora)
+    gravado = ImportacaoJob(loja_id=loja_id, arquivo="gravado.tdf", conteudo=xml, torneio_id="T-GRAVADO",
+                            status=StatusImportacaoJob.PROCESSANDO, etapa=EtapaImportacao.CONQUISTAS,
+                            iniciado_em=ha_uma_hora)
+    agora = ImportacaoJob(loja_id=loja_id, arquivo="agora.tdf", conteudo=xml, status=StatusImportacaoJob.PROCESSANDO,
+                          etapa=EtapaImportacao.GRAVANDO, iniciado_em=agora_brasil())
+    session.add_all([pendente, lendo, gravado, agora])
+    session.commit()
+    ids = {job.arquivo: job.id for job in (pendente, lendo, gravado, agora)}
+
+    retomar_jobs_importacao(session)
+    fila.aguardar()
+    session.expire_all()
+
+    def _job(arquivo: str) -> dict:
+        r = client.get(f"/api/importacoes/{ids[arquivo]}", headers=headers)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    assert (_job("pendente.tdf")["status"], _job("pendente.tdf")["torneio_id"]) == ("CONCLUIDO", "T-RETOMADA")
+    assert _job("lendo.tdf")["status"] == "FALHOU" and "interrompida" in _job("lendo.tdf")["erro"]
+    assert (_job("gravado.tdf")["status"], _job("gravado.tdf")["erro"]) == ("CONCLUIDO", None)
+    # Recente demais pra saber se caiu: pode ser de outra réplica.
+    assert _job("agora.tdf")["status"] == "PROCESSANDO"
+    for arquivo in ("pendente.tdf", "lendo.tdf", "gravado.tdf"):
+        assert session.get(ImportacaoJob, ids[arquivo]).conteudo is None
+
+
+def test_importacao_em_segundo_plano_registra_o_motivo_da_falha(
+    client: TestClient, session: Session, monkeypatch
+) -> None:
+    from app.models import ImportacaoJob
+
+    fila = _fila_com_sessao_do_teste(monkeypatch, session)
+    headers = _criar_loja_autenticada(client, "Loja Job Falha", "loja.jobfalha@gmail.com")
+    xml = _tdf_envelope(_PLAYERS_PADRAO, _match_normal("4"))
+
+    r = client.post("/api/importacoes/", files={"arquivo": ("torneio.tdf", xml, "text/xml")}, headers=headers)
+    assert r.status_code == 202, r.text
+
+    fila.aguardar()
+    session.expire_all()
+
+    r = client.get(f"/api/importacoes/{r.json()['id']}", headers=headers)
+    assert (r.json()["status"], r.json()["etapa"]) == ("FALHOU", "LENDO_ARQUIVO")
+    assert "outcome=4" in r.json()["erro"]
+    assert session.get(ImportacaoJob, r.json()["id"]).conteudo is None
+
+
+def test_importacao_em_segundo_plano_recusa_com_a_fila_cheia(
+    client: TestClient, session: Session, monkeypatch
+) -> None:
+    from app.models import ImportacaoJob
+    from app.services.ImportacaoJobService import fila_importacao
+
+    monkeypatch.setattr(fila_importacao, "enfileirar", lambda job_id: False)
+    headers = _criar_loja_autenticada(client, "Loja Fila Cheia", "loja.filacheia@gmail.com")
+    xml = _tdf_envelope(_PLAYERS_PADRAO, _match_normal("1"))
+
+    r = client.post("/api/importacoes/", files={"arquivo": ("torneio.tdf", xml, "text/xml")}, headers=headers)
+
+    assert r.status_code == 503
+    assert session.exec(select(ImportacaoJob)).all() == []
@@ -0,0 +1,746 @@
+"""Testes do ranking agregado da plataforma (RankingService): valores de
+pontos/torneios/V-D-E/taxa de vitória por jogador, filtros e custo em
+número de consultas — o ranking é lido por qualquer visitante, então ele
+não pode crescer em consultas junto com o número de jogadores. O ranking é
+lido do RankingSnapshot, então os testes também cobrem a manutenção dele
+pelas rotas de torneio e a reconstrução completa."""
+
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.core.db import get_session
+from app.models import (
+    EstatisticaMensalJogador, Jogador, JogadorCriado, JogadorTorneioLink, Loja, RankingSnapshot, Rodada, Torneio,
+    Usuario,
+)
+from app.services.RankingCacheService import cache_ranking_geral
+from app.services.RankingService import (
+    atualizar_ranking_snapshot_torneio,
+    calcula_ranking_geral,
+    calcula_ranking_geral_em_cache,
+    calcula_ranking_geral_por_loja,
+    calcular_taxas_vitoria,
+    desempenho_por_formato,
+    estatisticas_mensais_do_jogador,
+    posicao_no_ranking_geral,
+    reconstruir_estatisticas_mensais,
+    reconstruir_ranking_snapshot,
+)
+from app.utils.Enums import TCG, FormatoTorneio, StatusAprovacaoLoja, StatusTorneio
+from app.utils.TorneioDataUtil import BRASIL_TZ
+
+
+@contextmanager
+def _contar_consultas(session: Session):
+    consultas = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _registrar)
+    try:
+        yield consultas
+    finally:
+        event.remove(engine, "before_cursor_execute", _registrar)
+
+
+def _login(client: TestClient, email: str, senha: str) -> str:
+    r = client.post("/api/login/token", data={"username": email, "password": senha})
+    assert r.status_code == 200, r.text
+    client.cookies.clear()
+    return r.json()["access_token"]
+
+
+def _criar_loja_autenticada(client: TestClient, nome: str, email: str, senha: str = "senha123") -> tuple[dict, str]:
+    r = client.post(
+        "/api/lojas/",
+        json={"nome": nome, "endereco": "Rua X, 1", "email": email, "senha": senha},
+    )
+    assert r.status_code == 200, r.text
+    session = client.app.dependency_overrides[get_session]()
+    loja_db = session.get(Loja, r.json()["id"])
+    loja_db.status = StatusAprovacaoLoja.APROVADA
+    session.commit()
+    token = _login(client, email, senha)
+    return r.json(), token
+
+
+def _criar_regra(client: TestClient, headers: dict) -> dict:
+    payload = {
+        "nome": "Regra Padrão",
+        "pt_vitoria": 3,
+        "pt_derrota": 0,
+        "pt_empate": 1,
+        "pt_oponente_ganha": 0,
+        "pt_oponente_perde": 0,
+        "pt_oponente_empate": 0,
+        "tcg": "POKEMON",
+    }
+    r = client.post("/api/lojas/tipoJogador/", json=payload, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _criar_loja(session: Session, nome: str) -> Loja:
+    usuario = Usuario(email=f"{nome.lower().replace(' ', '.')}@gmail.com", tipo="loja", senha="x",
+                      data_cadastro=date(2026, 1, 1))
+    session.add(usuario)
+    session.flush()
+    loja = Loja(nome=nome, usuario_id=usuario.id, slug=nome.lower().replace(" ", "-"))
+    session.add(loja)
+    session.commit()
+    session.refresh(loja)
+    return loja
+
+
+def _criar_jogador_criado(session: Session, nome: str, com_conta: bool = True, tcg: TCG = TCG.POKEMON) -> JogadorCriado:
+    jogador_id = None
+    if com_conta:
+        usuario = Usuario(email=f"{nome.lower().replace(' ', '.')}@gmail.com", tipo="jogador", senha="x",
+                          data_cadastro=date(2026, 1, 1))
+        session.add(usuario)
+        session.flush()
+        jogador = Jogador(nome=nome, usuario_id=usuario.id)
+        session.add(jogador)
+        session.flush()
+        jogador_id = jogador.id
+    jogador_criado = JogadorCriado(game_id=f"gid-{nome.lower().replace(' ', '-')}", tcg=tcg,
+                                   apelido=nome, jogador_id=jogador_id)
+    session.add(jogador_criado)
+    session.commit()
+    session.refresh(jogador_criado)
+    return jogador_criado
+
+
+def _criar_torneio_finalizado(
+    session: Session,
+    loja: Loja | None,
+    pontos: dict[int, float],
+    partidas: list[tuple[int, int | None, int | None]],
+    quando: datetime = datetime(2026, 3, 10, 14, 0, tzinfo=BRASIL_TZ),
+    status: StatusTorneio = StatusTorneio.FINALIZADO,
+    loja_das_linhas: Loja | None = None,
+) -> tuple[Torneio, dict[int, int]]:
+    """`pontos`: jogador_criado_id -> pontuacao_com_regras da participação.
+    `partidas`: (jogador_criado_id 1, jogador_criado_id 2 ou None pra bye,
+    jogador_criado_id vencedor ou None pra empate). Torneio sem `loja` (linha
+    antiga) precisa de `loja_das_linhas` pras participações e rodadas."""
+    loja_das_linhas = loja_das_linhas or loja
+    torneio = Torneio(nome="Torneio Ranking", data_planejada=quando.date(), loja_id=loja.id if loja else None,
+                      status=status, inicio_real=quando if status == StatusTorneio.FINALIZADO else None)
+    session.add(torneio)
+    session.flush()
+
+    link_por_jogador_criado = {}
+    for jogador_criado_id, pontuacao in pontos.items():
+        link = JogadorTorneioLink(torneio_id=torneio.id, loja_id=loja_das_linhas.id, jogador_criado_id=jogador_criado_id,
+                                  pontuacao_com_regras=pontuacao)
+        session.add(link)
+        session.flush()
+        link_por_jogador_criado[jogador_criado_id] = link.id
+
+    for mesa, (jogador1, jogador2, vencedor) in enumerate(partidas, start=1):
+        session.add(Rodada(
+            torneio_id=torneio.id, loja_id=loja_das_linhas.id, num_rodada=1, mesa=mesa, data_de_inicio=quando,
+            finalizada=True,
+            jogador1_id=link_por_jogador_criado[jogador1],
+            jogador2_id=link_por_jogador_criado[jogador2] if jogador2 else None,
+            vencedor_id=link_por_jogador_criado[vencedor] if vencedor else None,
+        ))
+    # Inserção direta no banco pula as rotas — atualiza o snapshot como elas
+    # fariam.
+    atualizar_ranking_snapshot_torneio(session, torneio)
+    session.commit()
+    session.refresh(torneio)
+    return torneio, link_por_jogador_criado
+
+
+def test_ranking_geral_soma_pontos_torneios_e_resultados_por_jogador(client: TestClient, session: Session):
+    loja = _criar_loja(session, "Loja Ranking")
+    ana = _criar_jogador_criado(session, "Ana Ranking")
+    beto = _criar_jogador_criado(session, "Beto Ranking", com_conta=False)
+    caio = _criar_jogador_criado(session, "Caio Ranking")
+
+    _criar_torneio_finalizado(session, loja, {ana.id: 6.9, beto.id: 3, caio.id: 1},
+                              [(ana.id, beto.id, ana.id), (caio.id, None, None)])
+    _criar_torneio_finalizado(session, loja, {ana.id: 3, beto.id: 4.5},
+                              [(beto.id, ana.id, beto.id)])
+
+    r = client.get("/api/ranking/geral")
+    assert r.status_code == 200, r.text
+    por_nome = {item["nome_jogador"]: item for item in r.json()}
+
+    assert [item["nome_jogador"] for item in r.json()] == ["Ana Ranking", "Beto Ranking", "Caio Ranking"]
+    # int() por participação, como sempre: 6.9 -> 6, 4.5 -> 4.
+    assert por_nome["Ana Ranking"]["pontos"] == 9
+    assert por_nome["Beto Ranking"]["pontos"] == 7
+    assert por_nome["Ana Ranking"]["torneios"] == 2
+    assert (por_nome["Ana Ranking"]["vitorias"], por_nome["Ana Ranking"]["derrotas"]) == (1, 1)
+    assert por_nome["Ana Ranking"]["taxa_vitoria"] == 50
+    assert por_nome["Beto Ranking"]["jogador_id"] is None
+    assert por_nome["Beto Ranking"]["taxa_vitoria"] == 50
+    assert por_nome["Caio Ranking"]["empates"] == 1
+
+
+def test_ranking_geral_ignora_quem_soma_zero_pontos(client: TestClient, session: Session):
+    loja = _criar_loja(session, "Loja Ranking Zero")
+    ana = _criar_jogador_criado(session, "Ana Zero")
+    beto = _criar_jogador_criado(session, "Beto Zero")
+    _criar_torneio_finalizado(session, loja, {ana.id: 3, beto.id: 0}, [(ana.id, beto.id, ana.id)])
+
+    nomes = [item.nome_jogador for item in calcula_ranking_geral(session)]
+    assert nomes == ["Ana Zero"]
+
+
+def test_ranking_geral_filtros_de_loja_tcg_e_periodo(client: TestClient, session: Session):
+    loja_a = _criar_loja(session, "Loja Filtro A")
+    loja_b = _criar_loja(session, "Loja Filtro B")
+    ana = _criar_jogador_criado(session, "Ana Filtro")
+    beto = _criar_jogador_criado(session, "Beto Filtro")
+    vgc = _criar_jogador_criado(session, "Vivi Filtro", tcg=TCG.POKEMON_VGC)
+
+    _criar_torneio_finalizado(session, loja_a, {ana.id: 3, beto.id: 1, vgc.id: 2},
+                              [(ana.id, beto.id, ana.id)],
+                              quando=datetime(2026, 3, 10, 14, 0, tzinfo=BRASIL_TZ))
+    _criar_torneio_finalizado(session, loja_b, {ana.id: 1, beto.id: 3},
+                              [(beto.id, ana.id, beto.id)],
+                              quando=datetime(2026, 5, 10, 14, 0, tzinfo=BRASIL_TZ))
+
+    so_loja_b = {item.nome_jogador: item for item in calcula_ranking_geral(session, loja_id=loja_b.id)}
+    assert set(so_loja_b) == {"Ana Filtro", "Beto Filtro"}
+    assert so_loja_b["Beto Filtro"].pontos == 3
+    assert so_loja_b["Beto Filtro"].taxa_vitoria == 100
+
+    so_vgc = [item.nome_jogador for item in calcula_ranking_geral(session, tcg=TCG.POKEMON_VGC)]
+    assert so_vgc == ["Vivi Filtro"]
+
+    # Mês recorta só as rodadas — pontos e torneios continuam sendo o total.
+    em_marco = {item.nome_jogador: item for item in calcula_ranking_geral(session, mes=3)}
+    assert em_marco["Ana Filtro"].pontos == 4
+    assert em_marco["Ana Filtro"].torneios == 2
+    assert (em_marco["Ana Filtro"].vitorias, em_marco["Ana Filtro"].derrotas) == (1, 0)
+
+
+def test_ranking_geral_conta_resultados_so_de_torneios_finalizados(client: TestClient, session: Session):
+    loja = _criar_loja(session, "Loja Em Andamento")
+    ana = _criar_jogador_criado(session, "Ana Andamento")
+    beto = _criar_jogador_criado(session, "Beto Andamento")
+    _criar_torneio_finalizado(session, loja, {ana.id: 3, beto.id: 1}, [(ana.id, beto.id, ana.id)],
+                              status=StatusTorneio.EM_ANDAMENTO)
+
+    ana_no_ranking = next(item for item in calcula_ranking_geral(session) if item.nome_jogador == "Ana Andamento")
+    assert ana_no_ranking.pontos == 3
+    assert (ana_no_ranking.vitorias, ana_no_ranking.derrotas, ana_no_ranking.empates) == (0, 0, 0)
+
+
+def test_ranking_geral_nao_cresce_em_consultas_com_o_numero_de_jogadores(client: TestClient, session: Session):
+    loja = _criar_loja(session, "Loja Consultas")
+
+    def _consultas_para(quantidade: int, prefixo: str) -> int:
+        jogadores = [_criar_jogador_criado(session, f"{prefixo} {i}", com_conta=i % 2 == 0) for i in range(quantidade)]
+        pontos = {jc.id: 3 for jc in jogadores}
+        partidas = [(jogadores[i].id, jogadores[i + 1].id, jogadores[i].id) for i in range(0, quantidade - 1, 2)]
+        _criar_torneio_finalizado(session, loja, pontos, partidas)
+        session.expire_all()
+        with _contar_consultas(session) as consultas:
+            calcula_ranking_geral(session)
+        return len(consultas)
+
+    poucos = _consultas_para(4, "Poucos")
+    muitos = _consultas_para(40, "Muitos")
+    assert muitos == poucos
+
+
+def _linhas_do_snapshot(session: Session) -> set[tuple]:
+    session.expire_all()
+    return {
+        (linha.jogador_criado_id, linha.loja_id, linha.tcg, linha.ano, linha.mes,
+         linha.pontos, linha.torneios, linha.vitorias, linha.derrotas, linha.empates)
+        for linha in session.exec(select(RankingSnapshot)).all()
+    }
+
+
+def test_snapshot_acompanha_rodadas_editadas_e_torneio_apagado(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Snapshot", "loja.snapshot@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    r = client.post("/api/lojas/torneios/criar", headers=headers, json={
+        "data_planejada": "2026-08-01", "jogo": "POKEMON", "formato": "PADRAO", "vagas": 8,
+        "regra_basica_id": regra["id"],
+    })
+    assert r.status_code == 200, r.text
+    torneio_id = r.json()["id"]
+
+    ana = _criar_jogador_criado(session, "Ana Snapshot")
+    beto = _criar_jogador_criado(session, "Beto Snapshot")
+    loja_id = session.get(Torneio, torneio_id).loja_id
+    link_por_jogador = {}
+    for jogador_criado in (ana, beto):
+        link = JogadorTorneioLink(torneio_id=torneio_id, loja_id=loja_id,
+                                  jogador_criado_id=jogador_criado.id, apelido=jogador_criado.apelido)
+        session.add(link)
+        session.commit()
+        link_por_jogador[jogador_criado.jogador_id] = link.id
+
+    assert client.put(f"/api/lojas/torneios/{torneio_id}/iniciar", headers=headers).status_code == 200
+    pareamento = client.post(f"/api/lojas/torneios/{torneio_id}/rodada", headers=headers).json()
+    rodada_id = int(list(pareamento.keys())[0])
+    mesa = list(pareamento.values())[0][0]
+    vencedor = mesa["jogador1"]["jogador_id"]
+    perdedor = mesa["jogador2"]["jogador_id"]
+
+    r = client.patch(f"/api/lojas/torneios/{torneio_id}/rodadas/{rodada_id}",
+                     json={"vencedor_id": link_por_jogador[vencedor]}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert client.put(f"/api/lojas/torneios/{torneio_id}/finalizar", headers=headers).status_code == 200
+
+    ranking = {item["jogador_id"]: item for item in client.get("/api/ranking/geral").json()}
+    assert set(ranking) == {vencedor}
+    assert (ranking[vencedor]["pontos"], ranking[vencedor]["vitorias"]) == (3, 1)
+
+    # Inverter o resultado troca quem aparece no ranking.
+    r = client.patch(f"/api/lojas/torneios/{torneio_id}/rodadas/{rodada_id}",
+                     json={"vencedor_id": link_por_jogador[perdedor]}, headers=headers)
+    assert r.status_code == 200, r.text
+    ranking = {item["jogador_id"]: item for item in client.get("/api/ranking/geral").json()}
+    assert set(ranking) == {perdedor}
+    assert (ranking[perdedor]["vitorias"], ranking[perdedor]["derrotas"]) == (1, 0)
+
+    assert _linhas_do_snapshot(session) != set()
+    assert client.delete(f"/api/lojas/torneios/{torneio_id}", headers=headers).status_code == 204
+    assert client.get("/api/ranking/geral").json() == []
+    assert _linhas_do_snapshot(session) == set()
+
+
+def test_reconstruir_snapshot_reproduz_o_mantido_incrementalmente(client: TestClient, session: Session):
+    loja_a = _criar_loja(session, "Loja Reconstruir A")
+    loja_b = _criar_loja(session, "Loja Reconstruir B")
+    ana = _criar_jogador_criado(session, "Ana Reconstruir")
+    beto = _criar_jogador_criado(session, "Beto Reconstruir", com_conta=False)
+
+    _criar_torneio_finalizado(session, loja_a, {ana.id: 4, beto.id: 2}, [(ana.id, beto.id, None)],
+                              quando=datetime(2026, 1, 31, 22, 0, tzinfo=BRASIL_TZ))
+    _criar_torneio_finalizado(session, loja_b, {ana.id: 1, beto.id: 5}, [(beto.id, ana.id, beto.id)],
+                              quando=datetime(2026, 2, 14, 14, 0, tzinfo=BRASIL_TZ))
+    _criar_torneio_finalizado(session, loja_a, {beto.id: 2}, [], status=StatusTorneio.ABERTO)
+
+    incremental = _linhas_do_snapshot(session)
+    assert incremental
+
+    reconstruir_ranking_snapshot(session)
+    session.commit()
+    assert _linhas_do_snapshot(session) == incremental
+
+
+def _ranking_calculado_na_hora(session: Session, loja_id: int | None = None) -> dict[str, tuple]:
+    """O cálculo de antes do snapshot (participação por participação, rodada
+    por rodada), por GameID: (pontos, torneios, vitórias, derrotas, empates)."""
+    ranking = {}
+    for jogador_criado in session.exec(select(JogadorCriado)).all():
+        totais = [0, 0, 0, 0, 0]
+        for link in session.exec(
+                select(JogadorTorneioLink).where(JogadorTorneioLink.jogador_criado_id == jogador_criado.id)).all():
+            if loja_id is not None and link.torneio.loja_id != loja_id:
+                continue
+            totais[0] += int(link.pontuacao_com_regras)
+            totais[1] += 1
+            if link.torneio.status != StatusTorneio.FINALIZADO:
+                continue
+            for rodada in session.exec(select(Rodada).where(
+                    (Rodada.torneio_id == link.torneio_id) &
+                    ((Rodada.jogador1_id == link.id) | (Rodada.jogador2_id == link.id)))).all():
+                if rodada.vencedor_id == link.id:
+                    totais[2] += 1
+                elif rodada.vencedor_id is not None:
+                    totais[3] += 1
+                else:
+                    totais[4] += 1
+        if totais[0] != 0:
+            ranking[jogador_criado.game_id] = tuple(totais)
+    return ranking
+
+
+def test_ranking_do_snapshot_bate_com_o_calculado_na_hora_com_torneios_sem_loja(
+        client: TestClient, session: Session):
+    loja_a = _criar_loja(session, "Loja Sem Loja A")
+    loja_b = _criar_loja(session, "Loja Sem Loja B")
+    ana = _criar_jogador_criado(session, "Ana Sem Loja")
+    beto = _criar_jogador_criado(session, "Beto Sem Loja", com_conta=False)
+    caio = _criar_jogador_criado(session, "Caio Sem Loja")
+
+    _criar_torneio_finalizado(session, loja_a, {ana.id: 3, beto.id: 1}, [(ana.id, beto.id, ana.id)])
+    _criar_torneio_finalizado(session, loja_b, {ana.id: 1, caio.id: 4}, [(caio.id, ana.id, caio.id)])
+    # Torneios antigos, sem loja — um deles com quem só jogou sem loja.
+    sem_loja, _ = _criar_torneio_finalizado(session, None, {beto.id: 5, caio.id: 2}, [(beto.id, caio.id, None)],
+                                            loja_das_linhas=loja_a)
+    _criar_torneio_finalizado(session, None, {ana.id: 2, caio.id: 6}, [(caio.id, ana.id, caio.id)],
+                              quando=datetime(2026, 4, 2, 14, 0, tzinfo=BRASIL_TZ), loja_das_linhas=loja_b)
+
+    def _do_snapshot(**filtros) -> dict[str, tuple]:
+        return {
+            item.game_id: (item.pontos, item.torneios, item.vitorias, item.derrotas, item.empates)
+            for item in calcula_ranking_geral(session, **filtros)
+        }
+
+    assert _do_snapshot() == _ranking_calculado_na_hora(session)
+    assert _do_snapshot()[beto.game_id] == (6, 2, 0, 1, 1)
+    for loja in (loja_a, loja_b):
+        assert _do_snapshot(loja_id=loja.id) == _ranking_calculado_na_hora(session, loja_id=loja.id)
+
+    # A manutenção incremental dos torneios sem loja bate com a reconstrução.
+    link = session.exec(select(JogadorTorneioLink).where(
+        (JogadorTorneioLink.torneio_id == sem_loja.id) & (JogadorTorneioLink.jogador_criado_id == beto.id))).one()
+    link.pontuacao_com_regras = 8
+    atualizar_ranking_snapshot_torneio(session, sem_loja)
+    session.commit()
+    assert _do_snapshot() == _ranking_calculado_na_hora(session)
+    incremental = _linhas_do_snapshot(session)
+    estatisticas = _linhas_das_estatisticas_mensais(session)
+    assert any(linha[1] is None for linha in incremental)
+    assert any(linha[1] is None for linha in estatisticas)
+    reconstruir_ranking_snapshot(session)
+    reconstruir_estatisticas_mensais(session)
+    session.commit()
+    assert _linhas_do_snapshot(session) == incremental
+    assert _linhas_das_estatisticas_mensais(session) == estatisticas
+
+
+def test_cache_do_ranking_invalida_so_as_entradas_da_loja_e_tcg_alterados(client: TestClient, session: Session):
+    loja_a = _criar_loja(session, "Loja Cache A")
+    loja_b = _criar_loja(session, "Loja Cache B")
+    ana = _criar_jogador_criado(session, "Ana Cache")
+    beto = _criar_jogador_criado(session, "Beto Cache")
+    torneio_a, _ = _criar_torneio_finalizado(session, loja_a, {ana.id: 3, beto.id: 1}, [(ana.id, beto.id, ana.id)])
+    _criar_torneio_finalizado(session, loja_b, {ana.id: 1, beto.id: 3}, [(beto.id, ana.id, beto.id)])
+    loja_a_id, loja_b_id = loja_a.id, loja_b.id
+
+    for filtros in ({}, {"loja_id": loja_a_id}, {"loja_id": loja_b_id}, {"tcg": TCG.POKEMON_VGC}):
+        calcula_ranking_geral_em_cache(session, **filtros)
+    assert cache_ranking_geral.estatisticas()["itens"] == 4
+
+    with _contar_consultas(session) as consultas:
+        calcula_ranking_geral_em_cache(session, loja_id=loja_b_id)
+    assert consultas == []
+
+    link_ana = session.exec(select(JogadorTorneioLink).where(
+        (JogadorTorneioLink.torneio_id == torneio_a.id) & (JogadorTorneioLink.jogador_criado_id == ana.id))).one()
+    link_ana.pontuacao_com_regras = 10
+    session.add(link_ana)
+    atualizar_ranking_snapshot_torneio(session, torneio_a)
+    # Só depois do commit — até lá, o cache continua servindo o valor antigo.
+    assert cache_ranking_geral.estatisticas()["itens"] == 4
+    session.commit()
+
+    # Sai a entrada da loja A e a sem filtro de loja; a da loja B e a de
+    # outro TCG continuam valendo.
+    assert cache_ranking_geral.estatisticas()["itens"] == 2
+    por_nome = {item.nome_jogador: item for item in calcula_ranking_geral_em_cache(session)}
+    assert por_nome["Ana Cache"].pontos == 11
+    por_nome = {item.nome_jogador: item for item in calcula_ranking_geral_em_cache(session, loja_id=loja_a_id)}
+    assert por_nome["Ana Cache"].pontos == 10
+    with _contar_consultas(session) as consultas:
+        calcula_ranking_geral_em_cache(session, loja_id=loja_b_id)
+        calcula_ranking_geral_em_cache(session, tcg=TCG.POKEMON_VGC)
+    assert consultas == []
+
+
+def test_cache_do_ranking_despeja_a_entrada_menos_usada(client: TestClient, session: Session, monkeypatch):
+    monkeypatch.setattr(cache_ranking_geral, "capacidade", 2)
+
+    calcula_ranking_geral_em_cache(session, mes=1)
+    calcula_ranking_geral_em_cache(session, mes=2)
+    calcula_ranking_geral_em_cache(session, mes=1)
+    calcula_ranking_geral_em_cache(session, mes=3)
+
+    estatisticas = cache_ranking_geral.estatisticas()
+    assert (estatisticas["itens"], estatisticas["despejos"]) == (2, 1)
+    assert (estatisticas["acertos"], estatisticas["faltas"]) == (1, 3)
+    with _contar_consultas(session) as consultas:
+        calcula_ranking_geral_em_cache(session, mes=1)
+    assert consultas == []
+
+
+def test_posicao_no_ranking_bate_com_a_do_ranking_completo(client: TestClient, session: Session):
+    loja_a = _criar_loja(session, "Loja Posicao A")
+    loja_b = _criar_loja(session, "Loja Posicao B")
+    ana = _criar_jogador_criado(session, "Ana Posicao")
+    beto = _criar_jogador_criado(session, "Beto Posicao")
+    caio = _criar_jogador_criado(session, "Caio Posicao")
+    sem_pontos = _criar_jogador_criado(session, "Duda Posicao")
+    # Mesma conta da Ana, em outro TCG.
+    ana_vgc = JogadorCriado(game_id="gid-ana-posicao-vgc", tcg=TCG.POKEMON_VGC, jogador_id=ana.jogador_id)
+    session.add(ana_vgc)
+    session.commit()
+
+    # Beto e Caio empatam em 4 pontos — desempata pela ordem de cadastro.
+    _criar_torneio_finalizado(session, loja_a, {ana.id: 2, beto.id: 4, caio.id: 1, sem_pontos.id: 0},
+                              [(beto.id, ana.id, beto.id)])
+    _criar_torneio_finalizado(session, loja_b, {caio.id: 3, ana_vgc.id: 9}, [(caio.id, ana_vgc.id, caio.id)])
+
+    for filtros in ({}, {"loja_id": loja_a.id}, {"loja_id": loja_b.id}, {"tcg": TCG.POKEMON},
+                    {"tcg": TCG.POKEMON_VGC}, {"loja_id": loja_a.id, "tcg": TCG.POKEMON_VGC}):
+        ranking = calcula_ranking_geral(session, **filtros)
+        for jogador_criado in (ana, beto, caio, sem_pontos):
+            esperado = next((posicao for posicao, item in enumerate(ranking, start=1)
+                             if item.jogador_id == jogador_criado.jogador_id), None)
+            assert posicao_no_ranking_geral(session, jogador_criado.jogador_id, **filtros) == \
+                (esperado, len(ranking)), (filtros, jogador_criado.apelido)
+
+    assert posicao_no_ranking_geral(session, ana.jogador_id) == (1, 4)
+    with _contar_consultas(session) as consultas:
+        posicao_no_ranking_geral(session, beto.jogador_id, loja_id=loja_a.id)
+    assert len(consultas) == 1
+
+
+def _ranking_com_empates(session: Session) -> list[JogadorCriado]:
+    loja_a = _criar_loja(session, "Loja Pagina A")
+    loja_b = _criar_loja(session, "Loja Pagina B")
+    jogadores = [_criar_jogador_criado(session, f"Pagina {i}", com_conta=i % 3 != 0) for i in range(9)]
+    # Pontos com empates (3, 3, 5, 5, ...) pra exercitar o desempate do cursor.
+    _criar_torneio_finalizado(session, loja_a, {jc.id: 3 + 2 * (i // 2) for i, jc in enumerate(jogadores)},
+                              [(jogadores[0].id, jogadores[1].id, jogadores[0].id)])
+    _criar_torneio_finalizado(session, loja_b, {jogadores[4].id: 2, jogadores[7].id: 1}, [])
+    return jogadores
+
+
+def test_ranking_geral_paginado_por_cursor_reproduz_o_ranking_completo(client: TestClient, session: Session):
+    _ranking_com_empates(session)
+    completo = client.get("/api/ranking/geral").json()
+    assert [item["posicao"] for item in completo] == list(range(1, len(completo) + 1))
+
+    assert client.get("/api/ranking/geral", params={"top": 3}).json() == completo[:3]
+
+    paginas, params = [], {"limite": 4}
+    while True:
+        pagina = client.get("/api/ranking/geral", params=params).json()
+        if not pagina:
+            break
+        paginas.extend(pagina)
+        params = {"limite": 4, "apos_pontos": int(pagina[-1]["pontos"]),
+                  "apos_jogador_criado_id": pagina[-1]["jogador_criado_id"]}
+    assert paginas == completo
+
+
+def test_ranking_geral_em_torno_do_jogador(client: TestClient, session: Session):
+    jogadores = _ranking_com_empates(session)
+    completo = client.get("/api/ranking/geral").json()
+    com_conta = [jc for jc in jogadores if jc.jogador_id]
+
+    for jogador_criado in com_conta:
+        indice = next(i for i, item in enumerate(completo) if item["jogador_id"] == jogador_criado.jogador_id)
+        janela = client.get("/api/ranking/geral", params={"em_torno_de": jogador_criado.jogador_id, "janela": 2}).json()
+        assert janela == completo[max(indice - 2, 0):indice + 3]
+
+    assert client.get("/api/ranking/geral", params={"em_torno_de": 999999}).json() == []
+
+
+def test_ranking_recusa_recortes_combinados_ou_cursor_incompleto(client: TestClient, session: Session):
+    for params in ({"top": 3, "limite": 3}, {"top": 3, "em_torno_de": 1}, {"limite": 3, "apos_pontos": 3},
+                   {"apos_pontos": 3, "apos_jogador_criado_id": 1}):
+        assert client.get("/api/ranking/geral", params=params).status_code == 400, params
+    assert client.get("/api/ranking/lojas", params={"limite": 3, "apos_pontos": 3, "apos_loja_id": 1}).status_code == 400
+
+
+def test_ranking_por_loja_paginado_e_em_torno_do_jogador(client: TestClient, session: Session):
+    jogadores = _ranking_com_empates(session)
+    completo = client.get("/api/ranking/lojas").json()
+    assert [item["posicao"] for item in completo] == list(range(1, len(completo) + 1))
+    assert client.get("/api/ranking/lojas", params={"top": 2}).json() == completo[:2]
+
+    paginas, params = [], {"limite": 3}
+    while True:
+        pagina = client.get("/api/ranking/lojas", params=params).json()
+        if not pagina:
+            break
+        paginas.extend(pagina)
+        params = {"limite": 3, "apos_pontos": int(pagina[-1]["pontos"]), "apos_loja_id": pagina[-1]["loja_id"],
+                  "apos_jogador_criado_id": pagina[-1]["jogador_criado_id"]}
+    assert paginas == completo
+
+    jogador_id = jogadores[4].jogador_id
+    indice = next(i for i, item in enumerate(completo) if item["jogador_id"] == jogador_id)
+    janela = client.get("/api/ranking/lojas", params={"em_torno_de": jogador_id, "janela": 1}).json()
+    assert janela == completo[max(indice - 1, 0):indice + 2]
+
+
+def test_ranking_por_loja_filtra_pelo_mes_da_data_efetiva_do_torneio(client: TestClient, session: Session):
+    loja = _criar_loja(session, "Loja Mes Efetivo")
+    ana = _criar_jogador_criado(session, "Ana Mes Efetivo")
+    beto = _criar_jogador_criado(session, "Beto Mes Efetivo")
+
+    # Planejado pra março, jogado em abril: finalizado, vale o mês real.
+    finalizado, _ = _criar_torneio_finalizado(session, loja, {ana.id: 3, beto.id: 1}, [(ana.id, beto.id, ana.id)],
+                                              quando=datetime(2026, 4, 2, 14, 0, tzinfo=BRASIL_TZ))
+    finalizado.data_planejada = date(2026, 3, 30)
+    # Ainda em andamento: só existe a data planejada.
+    _criar_torneio_finalizado(session, loja, {beto.id: 5}, [], quando=datetime(2026, 3, 5, 14, 0, tzinfo=BRASIL_TZ),
+                              status=StatusTorneio.EM_ANDAMENTO)
+    session.add(finalizado)
+    session.commit()
+
+    def _pontos_no_mes(mes: int) -> dict[str, float]:
+        return {item["nome_jogador"]: item["pontos"]
+                for item in client.get("/api/ranking/lojas", params={"mes": mes}).json()}
+
+    assert _pontos_no_mes(3) == {"Beto Mes Efetivo": 5}
+    assert _pontos_no_mes(4) == {"Ana Mes Efetivo": 3, "Beto Mes Efetivo": 1}
+    abril = client.get("/api/ranking/lojas", params={"mes": 4}).json()
+    assert (abril[0]["vitorias"], abril[1]["derrotas"]) == (1, 1)
+
+
+def test_ranking_por_loja_nao_cresce_em_consultas_com_o_numero_de_jogadores(client: TestClient, session: Session):
+    def _consultas_para(quantidade: int, prefixo: str) -> int:
+        loja = _criar_loja(session, f"Loja {prefixo}")
+        jogadores = [_criar_jogador_criado(session, f"{prefixo} {i}", com_conta=i % 2 == 0) for i in range(quantidade)]
+        partidas = [(jogadores[i].id, jogadores[i + 1].id, jogadores[i].id) for i in range(0, quantidade - 1, 2)]
+        _criar_torneio_finalizado(session, loja, {jc.id: 3 for jc in jogadores}, partidas)
+        session.expire_all()
+        with _contar_consultas(session) as consultas:
+            calcula_ranking_geral_por_loja(session, mes=3)
+        return len(consultas)
+
+    assert _consultas_para(40, "Muitos Loja") == _consultas_para(4, "Poucos Loja")
+
+
+def test_taxas_de_vitoria_em_lote_numa_consulta_so(client: TestClient, session: Session):
+    loja_a = _criar_loja(session, "Loja Taxa A")
+    loja_b = _criar_loja(session, "Loja Taxa B")
+    ana = _criar_jogador_criado(session, "Ana Taxa")
+    beto = _criar_jogador_criado(session, "Beto Taxa")
+    caio = _criar_jogador_criado(session, "Caio Taxa")
+    sem_rodadas = _criar_jogador_criado(session, "Duda Taxa")
+    # Segundo GameID da Ana: conta junto na taxa da conta.
+    ana_vgc = JogadorCriado(game_id="gid-ana-taxa-vgc", tcg=TCG.POKEMON_VGC, jogador_id=ana.jogador_id)
+    session.add(ana_vgc)
+    session.commit()
+
+    _criar_torneio_finalizado(session, loja_a, {ana.id: 3, beto.id: 1, caio.id: 1},
+                              [(ana.id, beto.id, ana.id), (caio.id, None, None)])
+    _criar_torneio_finalizado(session, loja_b, {ana_vgc.id: 0, caio.id: 3}, [(ana_vgc.id, caio.id, caio.id)])
+    # Em andamento: não conta.
+    _criar_torneio_finalizado(session, loja_a, {beto.id: 3, caio.id: 0}, [(beto.id, caio.id, beto.id)],
+                              status=StatusTorneio.EM_ANDAMENTO)
+
+    ids = [jc.jogador_id for jc in (ana, beto, caio, sem_rodadas)]
+    with _contar_consultas(session) as consultas:
+        taxas = calcular_taxas_vitoria(session, ids)
+    assert len(consultas) == 1
+    assert taxas == {ana.jogador_id: 50, beto.jogador_id: 0, caio.jogador_id: 50, sem_rodadas.jogador_id: 0}
+
+    assert calcular_taxas_vitoria(session, ids, loja_id=loja_a.id)[ana.jogador_id] == 100
+    # Recorte pelo jogo do torneio, não pelo TCG do GameID.
+    assert set(calcular_taxas_vitoria(session, ids, tcg=TCG.POKEMON_VGC).values()) == {0}
+
+
+def test_desempenho_por_formato_atribui_rodadas_pela_participacao(client: TestClient, session: Session):
+    loja = _criar_loja(session, "Loja Desempenho")
+    ana = _criar_jogador_criado(session, "Ana Desempenho")
+    beto = _criar_jogador_criado(session, "Beto Desempenho")
+    ana_vgc = JogadorCriado(game_id="gid-ana-desempenho-vgc", tcg=TCG.POKEMON_VGC, jogador_id=ana.jogador_id)
+    session.add(ana_vgc)
+    session.commit()
+
+    padrao, _ = _criar_torneio_finalizado(session, loja, {ana.id: 4.5, beto.id: 1},
+                                          [(ana.id, beto.id, ana.id), (beto.id, ana.id, None)])
+    glc, _ = _criar_torneio_finalizado(session, loja, {ana_vgc.id: 2, beto.id: 3},
+                                       [(ana_vgc.id, beto.id, beto.id)])
+    sem_formato, _ = _criar_torneio_finalizado(session, loja, {ana.id: 1, beto.id: 0}, [(ana.id, None, ana.id)])
+    # Não finalizado: fica de fora.
+    _criar_torneio_finalizado(session, loja, {ana.id: 9, beto.id: 0}, [(ana.id, beto.id, ana.id)],
+                              status=StatusTorneio.EM_ANDAMENTO)
+    padrao.formato, glc.formato = FormatoTorneio.PADRAO, FormatoTorneio.GLC
+    session.add_all([padrao, glc])
+    session.commit()
+
+    desempenho = {item.formato: item for item in desempenho_por_formato(session, session.get(Jogador, ana.jogador_id))}
+    assert set(desempenho) == {"PADRAO", "GLC", "Desconhecido"}
+    assert (desempenho["PADRAO"].pontos, desempenho["PADRAO"].vitorias, desempenho["PADRAO"].taxa_vitoria) == (4.5, 1, 0.5)
+    assert (desempenho["GLC"].pontos, desempenho["GLC"].vitorias, desempenho["GLC"].taxa_vitoria) == (2, 0, 0.0)
+    assert (desempenho["Desconhecido"].vitorias, desempenho["Desconhecido"].taxa_vitoria) == (1, 1.0)
+
+
+def test_desempenho_por_formato_nao_cresce_em_consultas_com_o_numero_de_torneios(client: TestClient, session: Session):
+    loja = _criar_loja(session, "Loja Desempenho Consultas")
+    ana = _criar_jogador_criado(session, "Ana Desempenho Consultas")
+    beto = _criar_jogador_criado(session, "Beto Desempenho Consultas")
+    jogador = session.get(Jogador, ana.jogador_id)
+
+    def _consultas_com(torneios: int) -> int:
+        for _ in range(torneios):
+            _criar_torneio_finalizado(session, loja, {ana.id: 3, beto.id: 0}, [(ana.id, beto.id, ana.id)])
+        session.expire_all()
+        with _contar_consultas(session) as consultas:
+            desempenho_por_formato(session, jogador)
+        return len(consultas)
+
+    assert _consultas_com(2) == _consultas_com(30)
+
+
+def _linhas_das_estatisticas_mensais(session: Session) -> set[tuple]:
+    session.expire_all()
+    return {
+        (linha.jogador_id, linha.loja_id, linha.tcg, linha.ano, linha.mes,
+         linha.pontos, linha.vitorias, linha.derrotas, linha.empates)
+        for linha in session.exec(select(EstatisticaMensalJogador)).all()
+    }
+
+
+def test_estatisticas_mensais_acompanham_os_torneios_e_batem_com_a_reconstrucao(client: TestClient, session: Session):
+    loja_a = _criar_loja(session, "Loja Mensal A")
+    loja_b = _criar_loja(session, "Loja Mensal B")
+    ana = _criar_jogador_criado(session, "Ana Mensal")
+    beto = _criar_jogador_criado(session, "Beto Mensal")
+    caio = _criar_jogador_criado(session, "Caio Mensal", com_conta=False)
+
+    _criar_torneio_finalizado(session, loja_a, {ana.id: 4.5, beto.id: 2, caio.id: 1},
+                              [(ana.id, beto.id, ana.id), (caio.id, None, caio.id)],
+                              quando=datetime(2026, 1, 20, 14, 0, tzinfo=BRASIL_TZ))
+    _criar_torneio_finalizado(session, loja_b, {ana.id: 1, beto.id: 5}, [(beto.id, ana.id, None)],
+                              quando=datetime(2026, 2, 14, 14, 0, tzinfo=BRASIL_TZ))
+    _criar_torneio_finalizado(session, loja_a, {ana.id: 3, beto.id: 0}, [(ana.id, beto.id, beto.id)],
+                              quando=datetime(2026, 2, 20, 14, 0, tzinfo=BRASIL_TZ))
+    # Torneio não finalizado não entra nas estatísticas.
+    _criar_torneio_finalizado(session, loja_a, {ana.id: 9}, [], status=StatusTorneio.ABERTO)
+
+    # Só contas entram — Caio (GameID sem conta) fica de fora.
+    assert _linhas_das_estatisticas_mensais(session) == {
+        (ana.jogador_id, loja_a.id, TCG.POKEMON, 2026, 1, 4.5, 1, 0, 0),
+        (beto.jogador_id, loja_a.id, TCG.POKEMON, 2026, 1, 2, 0, 1, 0),
+        (ana.jogador_id, loja_b.id, TCG.POKEMON, 2026, 2, 1, 0, 0, 1),
+        (beto.jogador_id, loja_b.id, TCG.POKEMON, 2026, 2, 5, 0, 0, 1),
+        (ana.jogador_id, loja_a.id, TCG.POKEMON, 2026, 2, 3, 0, 1, 0),
+        (beto.jogador_id, loja_a.id, TCG.POKEMON, 2026, 2, 0, 1, 0, 0),
+    }
+    # Sem filtro de loja, os meses somam as lojas.
+    assert estatisticas_mensais_do_jogador(session, ana.jogador_id) == [
+        (2026, 1, 4.5, 1, 0, 0), (2026, 2, 4, 0, 1, 1),
+    ]
+    assert estatisticas_mensais_do_jogador(session, ana.jogador_id, loja_id=loja_b.id) == [(2026, 2, 1, 0, 0, 1)]
+
+    incremental = _linhas_das_estatisticas_mensais(session)
+    reconstruir_estatisticas_mensais(session)
+    session.commit()
+    assert _linhas_das_estatisticas_mensais(session) == incremental
+
+
+def test_estatisticas_mensais_do_jogador_nao_crescem_em_consultas_com_o_numero_de_torneios(
+    client: TestClient, session: Session,
+):
+    loja = _criar_loja(session, "Loja Mensal Consultas")
+    ana = _criar_jogador_criado(session, "Ana Mensal Consultas")
+    beto = _criar_jogador_criado(session, "Beto Mensal Consultas")
+
+    def _consultas_com(torneios: int) -> int:
+        for _ in range(torneios):
+            _criar_torneio_finalizado(session, loja, {ana.id: 3, beto.id: 0}, [(ana.id, beto.id, ana.id)])
+        session.expire_all()
+        with _contar_consultas(session) as consultas:
+            estatisticas_mensais_do_jogador(session, ana.jogador_id)
+        return len(consultas)
+
+    assert _consultas_com(2) == _consultas_com(30)
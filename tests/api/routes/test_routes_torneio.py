@@ -1,6 +1,15 @@
+import asyncio
+import json
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 
+from app.core.config import settings
 from app.core.db import get_session
+from sqlalchemy import event
 from sqlmodel import Session, select
 
 from app.models import (
@@ -13,12 +22,18 @@ from app.models import (
     RepresentacaoComposicao,
     RepresentacaoComposicaoUnidade,
     Rodada,
+    RodadaComposicao,
+    Temporada,
     Torneio,
     UnidadeCatalogo,
     Usuario,
 )
+from app.services.RodadaService import nova_rodada
+from app.services.TorneioAoVivoService import RESSINCRONIZAR, CanalAoVivo
+from app.services.TorneioCacheService import cache_torneio_completo, limpar_cache_torneio
+from app.services.TorneioService import retornar_torneio_completo
 from app.utils.datetimeUtil import data_agora_brasil
-from app.utils.Enums import TCG, StatusAprovacaoLoja
+from app.utils.Enums import TCG, MotivoPontuacaoExtra, StatusAprovacaoLoja
 
 
 def _login(client: TestClient, email: str, senha: str) -> str:
@@ -255,6 +270,34 @@ def test_finalizar_torneio_preserva_data_real_ja_preenchida(client: TestClient):
     assert r.json()["fim_real"].startswith("2026-08-01T15:00:00")
 
 
+def test_data_efetiva_acompanha_data_planejada_e_data_real(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Data Efetiva", "loja.dataefetiva@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio = _criar_torneio(client, headers, regra["id"], data_planejada="2026-08-30")
+
+    def _data_efetiva() -> tuple:
+        session.expire_all()
+        linha = session.get(Torneio, torneio["id"])
+        return str(linha.data_efetiva), linha.ano_mes_efetivo
+
+    assert _data_efetiva() == ("2026-08-30", 202608)
+
+    r = client.put(f"/api/lojas/torneios/{torneio['id']}", json={"data_planejada": "2026-07-15"}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert _data_efetiva() == ("2026-07-15", 202607)
+
+    # inicio_real só vale depois de FINALIZADO.
+    r = client.put(f"/api/lojas/torneios/{torneio['id']}", json={"inicio_real": "2026-09-02T10:00:00-03:00"},
+                   headers=headers)
+    assert r.status_code == 200, r.text
+    assert _data_efetiva() == ("2026-07-15", 202607)
+
+    r = client.put(f"/api/lojas/torneios/{torneio['id']}/finalizar", headers=headers)
+    assert r.status_code == 200, r.text
+    assert _data_efetiva() == ("2026-09-02", 202609)
+
+
 def test_pareamento_com_numero_impar_gera_bye_e_pontua_corretamente(client: TestClient, session: Session):
     _semear_jogadores_ruido(session, 5)
 
@@ -314,6 +357,41 @@ def test_pareamento_com_numero_impar_gera_bye_e_pontua_corretamente(client: Test
     assert bye_jogador.pontuacao_com_regras == 3
 
 
+def test_pareamento_fecha_um_todos_contra_todos_sem_revanche(client: TestClient, session: Session):
+    # 6 participantes, 5 rodadas: a última só tem um pareamento possível
+    # sem revanche — o guloso (mais bem colocado pega o primeiro livre)
+    # costuma se encurralar antes disso; a busca volta atrás e acha.
+    _, token = _criar_loja_autenticada(client, "Loja Suico", "loja.suico@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio = _criar_torneio(client, headers, regra["id"])
+    participantes = _adicionar_participantes(
+        session, torneio["id"], regra["id"], ["Suico A", "Suico B", "Suico C", "Suico D", "Suico E", "Suico F"]
+    )
+    jogador_id_para_link_id = {p["jogador_id"]: p["link_id"] for p in participantes}
+
+    r = client.put(f"/api/lojas/torneios/{torneio['id']}/iniciar", headers=headers)
+    assert r.status_code == 200, r.text
+
+    confrontos = []
+    for _ in range(5):
+        r = client.post(f"/api/lojas/torneios/{torneio['id']}/rodada", headers=headers)
+        assert r.status_code == 200, r.text
+        pareamento = r.json()
+        assert len(pareamento) == 3
+        resultados = []
+        for rodada_id, (mesa,) in pareamento.items():
+            jogador1 = jogador_id_para_link_id[mesa["jogador1"]["jogador_id"]]
+            jogador2 = jogador_id_para_link_id[mesa["jogador2"]["jogador_id"]]
+            confrontos.append(frozenset((jogador1, jogador2)))
+            resultados.append({"id_rodada": int(rodada_id), "id_vencedor": jogador1})
+        r = client.put("/api/lojas/torneios/rodadas/finalizar", json=resultados, headers=headers)
+        assert r.status_code == 200, r.text
+
+    assert len(confrontos) == 15
+    assert len(set(confrontos)) == 15
+
+
 def test_rodada_pendente_nao_conta_como_empate_no_desempate_suico(client: TestClient, session: Session):
     _semear_jogadores_ruido(session, 3)
 
@@ -1085,6 +1163,119 @@ def test_editar_rodada_rejeita_jogador1_igual_jogador2(client: TestClient, sessi
     assert r.status_code == 400
 
 
+
+def _pontuacoes(session: Session, torneio_id: str) -> dict[int, tuple]:
+    session.expire_all()
+    return {
+        link.id: (link.pontuacao, link.pontuacao_com_regras, link.vitorias, link.derrotas, link.empates,
+                  link.porcentagem_vitorias_oponentes, link.porcentagem_vitorias_oponentes_oponentes)
+        for link in session.get(Torneio, torneio_id).jogadores
+    }
+
+
+def test_editar_e_apagar_rodada_repontuam_so_a_mesa_e_batem_com_o_recalculo_completo(
+    client: TestClient, session: Session, monkeypatch,
+):
+    # Sem a conferência, pra que um erro no caminho incremental não seja
+    # mascarado pelo recálculo completo de reserva.
+    monkeypatch.setattr(settings, "PONTUACAO_CONFERIR_INCREMENTAL", False)
+    _, token = _criar_loja_autenticada(client, "Loja Repontuar", "loja.repontuar@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    regra_extra = _criar_regra(
+        client, headers, nome="Extra Repontuar", pt_vitoria=10, pt_derrota=-5, pt_empate=2,
+        pt_oponente_ganha=7, pt_oponente_perde=100, pt_oponente_empate=1,
+    )
+    torneio = _criar_torneio(client, headers, regra["id"])
+    participantes = _adicionar_participantes(
+        session, torneio["id"], regra["id"], ["Repontuar A", "Repontuar B", "Repontuar C", "Repontuar D", "Repontuar E"]
+    )
+    r = client.patch(
+        f"/api/lojas/torneios/{torneio['id']}/jogadores/{participantes[0]['link_id']}/regra",
+        json={"regra_extra_id": regra_extra["id"]},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    jogador_id_para_link_id = {p["jogador_id"]: p["link_id"] for p in participantes}
+
+    client.put(f"/api/lojas/torneios/{torneio['id']}/iniciar", headers=headers)
+    r = client.post(f"/api/lojas/torneios/{torneio['id']}/rodada", headers=headers)
+    mesas = {int(rodada_id): mesa for rodada_id, (mesa,) in r.json().items()}
+    r = client.put("/api/lojas/torneios/rodadas/finalizar", json=[
+        {"id_rodada": rodada_id, "id_vencedor": jogador_id_para_link_id[mesa["jogador1"]["jogador_id"]]}
+        for rodada_id, mesa in mesas.items()
+    ], headers=headers)
+    assert r.status_code == 200, r.text
+    # A rodada 2 fica em andamento: mesa pendente não pode pontuar nem no
+    # caminho incremental nem no recálculo completo.
+    r = client.post(f"/api/lojas/torneios/{torneio['id']}/rodada", headers=headers)
+    assert r.status_code == 200, r.text
+
+    def _recalculado() -> dict[int, tuple]:
+        # O recálculo completo é a referência: se o incremental estiver
+        # certo, ele não muda nada.
+        antes = _pontuacoes(session, torneio["id"])
+        r = client.post(f"/api/lojas/torneios/{torneio['id']}/recalcular-pontuacao", json={}, headers=headers)
+        assert r.status_code == 200, r.text
+        return antes, _pontuacoes(session, torneio["id"])
+
+    rodada_id, mesa = next((rid, m) for rid, m in mesas.items() if m["jogador2"])
+    jogador2_link_id = jogador_id_para_link_id[mesa["jogador2"]["jogador_id"]]
+    for vencedor_id in (jogador2_link_id, None):
+        r = client.patch(
+            f"/api/lojas/torneios/{torneio['id']}/rodadas/{rodada_id}",
+            json={"vencedor_id": vencedor_id},
+            headers=headers,
+        )
+        assert r.status_code == 200, r.text
+        incremental, completo = _recalculado()
+        assert incremental == completo
+
+    r = client.delete(f"/api/lojas/torneios/{torneio['id']}/rodadas/2", headers=headers)
+    assert r.status_code == 200, r.text
+    incremental, completo = _recalculado()
+    assert incremental == completo
+
+    r = client.delete(f"/api/lojas/torneios/{torneio['id']}/rodadas/1", headers=headers)
+    assert r.status_code == 200, r.text
+    assert all(pontos[:2] == (0, 0) for pontos in _pontuacoes(session, torneio["id"]).values())
+
+
+def test_editar_rodada_com_pontuacao_divergente_cai_no_recalculo_completo(client: TestClient, session: Session):
+    """Pontuação ajustada à mão não é o que as mesas dariam — a conferência
+    do caminho incremental percebe e refaz tudo do zero, como sempre foi."""
+    _, token = _criar_loja_autenticada(client, "Loja Divergente", "loja.divergente@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio = _criar_torneio(client, headers, regra["id"])
+    participantes = _adicionar_participantes(session, torneio["id"], regra["id"], ["Um", "Dois"])
+    jogador_id_para_link_id = {p["jogador_id"]: p["link_id"] for p in participantes}
+
+    client.put(f"/api/lojas/torneios/{torneio['id']}/iniciar", headers=headers)
+    r = client.post(f"/api/lojas/torneios/{torneio['id']}/rodada", headers=headers)
+    rodada_id = int(list(r.json().keys())[0])
+    mesa = list(r.json().values())[0][0]
+    vencedor_link_id = jogador_id_para_link_id[mesa["jogador1"]["jogador_id"]]
+    perdedor_link_id = jogador_id_para_link_id[mesa["jogador2"]["jogador_id"]]
+
+    r = client.patch(
+        f"/api/lojas/torneios/{torneio['id']}/jogadores/{perdedor_link_id}/pontuacao",
+        json={"pontuacao": 40, "pontuacao_com_regras": 40},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+
+    r = client.patch(
+        f"/api/lojas/torneios/{torneio['id']}/rodadas/{rodada_id}",
+        json={"vencedor_id": vencedor_link_id},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+
+    session.expire_all()
+    assert session.get(JogadorTorneioLink, vencedor_link_id).pontuacao_com_regras == 3
+    assert session.get(JogadorTorneioLink, perdedor_link_id).pontuacao_com_regras == 0
+
 def test_editar_torneio_com_formato_vazio_e_tratado_como_sem_formato(client: TestClient, session: Session):
     """Regressão: o <Select> de "Formato" na tela de editar torneio usa
     `torneio?.formato ?? ''` como valor inicial — um torneio sem formato
@@ -1275,3 +1466,627 @@ def test_loja_id_e_denormalizado_em_link_rodada_e_pontuacao_extra(client: TestCl
     assert links and all(link.loja_id == loja_id_esperado for link in links)
     assert rodadas and all(rodada.loja_id == loja_id_esperado for rodada in rodadas)
     assert pontuacoes_extras and all(pe.loja_id == loja_id_esperado for pe in pontuacoes_extras)
+
+
+@contextmanager
+def _contar_consultas(session: Session):
+    consultas = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _registrar)
+    try:
+        yield consultas
+    finally:
+        event.remove(engine, "before_cursor_execute", _registrar)
+
+
+def test_torneio_completo_serializa_em_numero_constante_de_consultas(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Serializacao", "loja.serializacao@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+    loja_id = session.get(Torneio, torneio_id).loja_id
+    session.add(Temporada(tcg=TCG.POKEMON, loja_id=loja_id, ano_inicio=2026, mes_inicio=1, ano_fim=2026, mes_fim=12))
+
+    unidades = [UnidadeCatalogo(tcg=TCG.POKEMON, external_id=9100 + i, nome=f"unidade-serial-{i}", manual=True)
+                for i in range(2)]
+    representacao = RepresentacaoComposicao(tcg=TCG.POKEMON, nome="Representação Serialização")
+    session.add_all([*unidades, representacao])
+    session.commit()
+    for ordem, unidade in enumerate(unidades):
+        session.add(RepresentacaoComposicaoUnidade(representacao_id=representacao.id, ordem=ordem,
+                                                   unidade_catalogo_id=unidade.id))
+    session.commit()
+
+    def _consultas_com(jogadores: int) -> tuple[int, dict]:
+        total = len(session.get(Torneio, torneio_id).jogadores)
+        nomes = [f"Serial {total + i}" for i in range(jogadores)]
+        for participante in _adicionar_participantes(session, torneio_id, regra["id"], nomes):
+            session.get(Jogador, participante["jogador_id"]).data_nascimento = date(2016, 5, 1)
+            link = session.get(JogadorTorneioLink, participante["link_id"])
+            link.composicao_representacao_id = representacao.id
+            session.add_all([
+                JogadorComposicaoUnidade(jogador_torneio_link_id=link.id, unidade_catalogo_id=unidade.id, quantidade=1)
+                for unidade in unidades
+            ])
+        session.commit()
+
+        session.expire_all()
+        torneio = session.get(Torneio, torneio_id)
+        with _contar_consultas(session) as consultas:
+            completo = retornar_torneio_completo(session, torneio)
+        return len(consultas), completo
+
+    consultas_poucos, _ = _consultas_com(2)
+    consultas_muitos, completo = _consultas_com(30)
+    # Uma consulta por relacionamento serializado (mais a temporada, uma
+    # vez pro torneio) — nenhuma por jogador.
+    assert consultas_poucos == consultas_muitos == 10
+
+    assert len(completo["jogadores"]) == 32
+    for jogador in completo["jogadores"]:
+        assert jogador["categoria"] == "Junior"
+        assert [u["unidade"]["nome"] for u in jogador["composicao_unidades"]] == ["unidade-serial-0", "unidade-serial-1"]
+        assert [u["nome"] for u in jogador["composicao_representacao"]["unidades"]] == [
+            "unidade-serial-0", "unidade-serial-1",
+        ]
+
+
+def test_nova_rodada_em_numero_constante_de_consultas(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Rodada Lote", "loja.rodada.lote@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    unidade = UnidadeCatalogo(tcg=TCG.POKEMON, external_id=9200, nome="unidade-rodada-lote", manual=True)
+    session.add(unidade)
+    session.commit()
+
+    def _consultas_por_rodada(jogadores: int) -> tuple[list[int], str]:
+        torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+        nomes = [f"Lote {jogadores} {i}" for i in range(jogadores)]
+        for participante in _adicionar_participantes(session, torneio_id, regra["id"], nomes):
+            session.add(JogadorComposicaoUnidade(
+                jogador_torneio_link_id=participante["link_id"], unidade_catalogo_id=unidade.id, quantidade=2,
+            ))
+        session.commit()
+
+        consultas_por_rodada = []
+        for _ in range(2):
+            session.expire_all()
+            torneio = session.get(Torneio, torneio_id)
+            with _contar_consultas(session) as consultas:
+                pareamento = nova_rodada(session, torneio)
+                session.flush()
+            session.commit()
+            consultas_por_rodada.append(len(consultas))
+            assert len(pareamento) == jogadores // 2
+        return consultas_por_rodada, torneio_id
+
+    consultas_poucos, _ = _consultas_por_rodada(4)
+    consultas_muitos, torneio_id = _consultas_por_rodada(40)
+    # Participantes, histórico, V/D/E e os INSERTs em lote — nada por mesa
+    # nem por jogador, na primeira rodada (que clona os times) e nas seguintes
+    # (que reaproveitam a composição anterior).
+    assert consultas_poucos == consultas_muitos
+
+    composicoes = session.exec(
+        select(RodadaComposicao).join(Rodada).where(Rodada.torneio_id == torneio_id)
+    ).all()
+    assert len(composicoes) == 80
+    por_link = {}
+    for composicao in composicoes:
+        por_link.setdefault(composicao.jogador_torneio_link_id, set()).add(composicao.composicao_partida_id)
+    assert len(por_link) == 40
+    assert all(len(ids) == 1 for ids in por_link.values())
+    assert all(
+        [(u.unidade_catalogo_id, u.quantidade) for u in composicao.composicao_partida.unidades] == [(unidade.id, 2)]
+        for composicao in composicoes
+    )
+
+
+
+def test_finalizar_rodada_inteira_em_numero_constante_de_consultas(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Finalizar Lote", "loja.finalizar.lote@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    regra_extra = _criar_regra(client, headers, nome="Extra Lote", pt_vitoria=1)
+
+    def _finalizar(jogadores: int) -> tuple[int, list[dict]]:
+        torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+        nomes = [f"Finalizar {jogadores} {i}" for i in range(jogadores)]
+        participantes = _adicionar_participantes(session, torneio_id, regra["id"], nomes)
+        for participante in participantes[::2]:
+            session.get(JogadorTorneioLink, participante["link_id"]).regra_extra_id = regra_extra["id"]
+        session.commit()
+        jogador_id_para_link_id = {p["jogador_id"]: p["link_id"] for p in participantes}
+
+        client.put(f"/api/lojas/torneios/{torneio_id}/iniciar", headers=headers)
+        r = client.post(f"/api/lojas/torneios/{torneio_id}/rodada", headers=headers)
+        assert r.status_code == 200, r.text
+        resultados = [
+            {"id_rodada": int(rodada_id), "id_vencedor": jogador_id_para_link_id[mesa["jogador1"]["jogador_id"]]}
+            for rodada_id, (mesa,) in r.json().items()
+        ]
+
+        session.expire_all()
+        with _contar_consultas(session) as consultas:
+            r = client.put("/api/lojas/torneios/rodadas/finalizar", json=resultados, headers=headers)
+        assert r.status_code == 200, r.text
+        return len(consultas), r.json()["ranking"]
+
+    consultas_poucos, _ = _finalizar(4)
+    consultas_muitos, ranking = _finalizar(40)
+    assert consultas_poucos == consultas_muitos
+
+    assert len(ranking) == 40
+    assert [item["posicao"] for item in ranking] == list(range(1, 41))
+    pontos = [item["pontuacao"] for item in ranking]
+    assert pontos == sorted(pontos, reverse=True)
+    assert pontos.count(5) == 20 and pontos.count(-1) == 20  # 3 + 2 / 0 - 1: vitória/derrota + bônus de oponente
+    assert all(item["jogador_nome"].startswith("Finalizar 40 ") for item in ranking)
+
+
+def test_finalizar_rejeita_a_mesma_mesa_duas_vezes_no_lote(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Lote Repetido", "loja.lote.repetido@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio = _criar_torneio(client, headers, regra["id"])
+    participantes = _adicionar_participantes(session, torneio["id"], regra["id"], ["Um", "Dois"])
+
+    client.put(f"/api/lojas/torneios/{torneio['id']}/iniciar", headers=headers)
+    r = client.post(f"/api/lojas/torneios/{torneio['id']}/rodada", headers=headers)
+    rodada_id = int(list(r.json().keys())[0])
+
+    r = client.put("/api/lojas/torneios/rodadas/finalizar", json=[
+        {"id_rodada": rodada_id, "id_vencedor": participantes[0]["link_id"]},
+        {"id_rodada": rodada_id, "id_vencedor": participantes[1]["link_id"]},
+    ], headers=headers)
+    assert r.status_code == 400, r.text
+    assert "já finalizada" in r.json()["detail"]
+
+
+def test_ao_vivo_transmite_so_o_que_mudou_depois_do_commit(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Ao Vivo", "loja.ao.vivo@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+    participantes = _adicionar_participantes(session, torneio_id, regra["id"], ["Vivo A", "Vivo B", "Vivo C", "Vivo D"])
+    links = {p["link_id"] for p in participantes}
+
+    with client.websocket_connect(f"/api/lojas/torneios/{torneio_id}/ao-vivo?token={token}") as ws:
+        client.put(f"/api/lojas/torneios/{torneio_id}/iniciar", headers=headers)
+        assert ws.receive_json() == {"torneio_id": torneio_id, "tipo": "status", "status": "EM_ANDAMENTO"}
+
+        client.post(f"/api/lojas/torneios/{torneio_id}/rodada", headers=headers)
+        evento = ws.receive_json()
+        assert evento["tipo"] == "rodada" and evento["num_rodada"] == 1
+        assert len(evento["mesas"]) == 2
+        assert {mesa["jogador1_id"] for mesa in evento["mesas"]} | {mesa["jogador2_id"] for mesa in evento["mesas"]} == links
+        mesa, outra_mesa = evento["mesas"]
+
+        # Finalizar uma mesa só: só os dois lados dela vêm, e só com os
+        # campos que mudaram — a derrota não mexe em pontuacao_com_regras
+        # (o bônus de oponente da regra básica só entra em pontuacao).
+        r = client.put("/api/lojas/torneios/rodadas/finalizar",
+                       json=[{"id_rodada": mesa["id"], "id_vencedor": mesa["jogador1_id"]}], headers=headers)
+        assert r.status_code == 200, r.text
+        evento = ws.receive_json()
+        assert evento["tipo"] == "resultados"
+        assert evento["mesas"] == [{**mesa, "vencedor_id": mesa["jogador1_id"], "finalizada": True}]
+        assert sorted(evento["jogadores"], key=lambda j: j["id"]) == sorted([
+            {"id": mesa["jogador1_id"], "pontuacao": 5, "pontuacao_com_regras": 3},
+            {"id": mesa["jogador2_id"], "pontuacao": -1},
+        ], key=lambda j: j["id"])
+
+        # Edição que não passa na validação não chega a comitar — nada é avisado.
+        r = client.patch(f"/api/lojas/torneios/{torneio_id}/rodadas/{outra_mesa['id']}",
+                         json={"vencedor_id": mesa["jogador1_id"]}, headers=headers)
+        assert r.status_code == 400, r.text
+
+        r = client.patch(f"/api/lojas/torneios/{torneio_id}/rodadas/{outra_mesa['id']}",
+                         json={"vencedor_id": None}, headers=headers)
+        assert r.status_code == 200, r.text
+        evento = ws.receive_json()
+        assert evento["tipo"] == "resultados"
+        assert evento["mesas"] == [{**outra_mesa, "finalizada": True}]
+        assert {j["id"] for j in evento["jogadores"]} >= {outra_mesa["jogador1_id"], outra_mesa["jogador2_id"]}
+
+        client.put(f"/api/lojas/torneios/{torneio_id}/finalizar", headers=headers)
+        assert ws.receive_json() == {"torneio_id": torneio_id, "tipo": "status", "status": "FINALIZADO"}
+
+
+def test_ao_vivo_recusa_sem_token_e_torneio_inexistente(client: TestClient):
+    _, token = _criar_loja_autenticada(client, "Loja Ao Vivo Recusa", "loja.ao.vivo.recusa@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    torneio_id = _criar_torneio(client, headers, _criar_regra(client, headers)["id"])["id"]
+
+    for url in (f"/api/lojas/torneios/{torneio_id}/ao-vivo",
+                f"/api/lojas/torneios/nao-existe/ao-vivo?token={token}"):
+        with pytest.raises(WebSocketDisconnect) as erro:
+            with client.websocket_connect(url):
+                pass
+        assert erro.value.code == 1008
+
+
+def test_versao_do_torneio_sobe_com_participacoes_rodadas_e_pontuacao_extra(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Versao", "loja.versao@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+    outro_id = _criar_torneio(client, headers, regra["id"])["id"]
+    participantes = _adicionar_participantes(session, torneio_id, regra["id"], ["Versao A", "Versao B"])
+    torneio = session.get(Torneio, torneio_id)
+    outro = session.get(Torneio, outro_id)
+
+    def _mudou(alterar) -> bool:
+        antes = torneio.versao
+        alterar()
+        session.commit()
+        return torneio.versao > antes
+
+    link = session.get(JogadorTorneioLink, participantes[0]["link_id"])
+    assert _mudou(lambda: setattr(link, "pontuacao", 7))
+    assert not _mudou(lambda: session.add(link))
+    assert _mudou(lambda: session.add(JogadorComposicaoUnidade(
+        jogador_torneio_link_id=link.id, unidade_catalogo_id=_unidade(session).id)))
+    assert _mudou(lambda: session.add(Rodada(
+        torneio_id=torneio_id, loja_id=torneio.loja_id, num_rodada=1, mesa=1,
+        jogador1_id=link.id, jogador2_id=participantes[1]["link_id"])))
+    assert _mudou(lambda: session.add(PontuacaoExtra(
+        torneio_id=torneio_id, loja_id=torneio.loja_id, jogador_criado_id=link.jogador_criado_id,
+        motivo=MotivoPontuacaoExtra.OUTROS, pontos=2)))
+    assert _mudou(lambda: setattr(torneio, "nome", "Renomeado"))
+    assert outro.versao == 1
+
+
+def _unidade(session: Session) -> UnidadeCatalogo:
+    unidade = UnidadeCatalogo(tcg=TCG.POKEMON, external_id=9001, nome="Unidade Versao")
+    session.add(unidade)
+    session.commit()
+    return unidade
+
+
+def test_get_torneio_responde_304_sem_carregar_participacoes_nem_rodadas(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja ETag", "loja.etag@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+    participantes = _adicionar_participantes(session, torneio_id, regra["id"], ["ETag A", "ETag B"])
+    url = f"/api/lojas/torneios/{torneio_id}"
+
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200, r.text
+    etag = r.headers["etag"]
+
+    session.expire_all()
+    with _contar_consultas(session) as consultas:
+        r = client.get(url, headers={**headers, "If-None-Match": f"W/{etag}"})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag and r.content == b""
+    assert not any("FROM jogadortorneiolink" in consulta or "FROM rodada" in consulta for consulta in consultas)
+
+    # Recorte diferente, representação diferente.
+    r = client.get(f"{url}?include=rodadas", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["etag"] != etag
+    etag_recorte = r.headers["etag"]
+    assert client.get(f"{url}?include=rodadas", headers={**headers, "If-None-Match": etag_recorte}).status_code == 304
+
+    client.put(f"{url}/iniciar", headers=headers)
+    client.post(f"{url}/rodada", headers=headers)
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200, r.text
+    assert r.headers["etag"] != etag
+    assert {rodada["jogador1_id"] for rodada in r.json()["rodadas"]} <= {p["link_id"] for p in participantes}
+
+
+def test_etag_do_torneio_muda_quando_participante_muda_de_gameid_ou_de_conta(client: TestClient, session: Session):
+    # O jogador que reivindica o GameID não escreve no torneio da loja (RLS):
+    # quem versiona é o JogadorCriado, e o ETag do torneio soma essas versões.
+    _, token = _criar_loja_autenticada(client, "Loja ETag GameID", "loja.etag.gameid@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+    participantes = _adicionar_participantes(session, torneio_id, regra["id"], ["GameID A", "GameID B"])
+    url = f"/api/lojas/torneios/{torneio_id}"
+    jogador_criado = session.get(JogadorTorneioLink, participantes[0]["link_id"]).jogador_criado
+    versao_torneio = session.get(Torneio, torneio_id).versao
+
+    def _etag_nova(etag: str) -> str:
+        r = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert r.status_code == 200, r.text
+        assert r.headers["etag"] != etag
+        return r.headers["etag"]
+
+    etag = client.get(url, headers=headers).headers["etag"]
+    jogador_criado.game_id = "gid-reivindicado"
+    session.commit()
+    etag = _etag_nova(etag)
+    jogador_criado.jogador_id = None
+    session.commit()
+    _etag_nova(etag)
+    assert session.get(Torneio, torneio_id).versao == versao_torneio
+    assert jogador_criado.versao == 3
+
+
+def test_etag_e_cache_do_torneio_acompanham_temporadas_nascimento_e_loja(client: TestClient, session: Session):
+    # Categoria dos participantes (temporadas da loja + data de nascimento)
+    # e a loja embutida também estão no payload.
+    _, token = _criar_loja_autenticada(client, "Loja ETag Categoria", "loja.etag.categoria@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+    participante = _adicionar_participantes(session, torneio_id, regra["id"], ["Categoria A"])[0]
+    jogador = session.get(Jogador, participante["jogador_id"])
+    jogador.data_nascimento = date(2015, 5, 1)
+    session.commit()
+    url = f"/api/lojas/torneios/{torneio_id}"
+    versao_torneio = session.get(Torneio, torneio_id).versao
+
+    def _get(etag: str | None = None) -> tuple[str, dict]:
+        r = client.get(url, headers={**headers, "If-None-Match": etag} if etag else headers)
+        assert r.status_code == 200, r.text
+        assert r.headers["etag"] != etag
+        return r.headers["etag"], r.json()
+
+    etag, corpo = _get()
+    assert corpo["jogadores"][0]["categoria"] is None
+
+    r = client.post("/api/lojas/temporadas/", json={"tcg": "POKEMON", "ano_inicio": 2026, "mes_inicio": 1,
+                                                    "ano_fim": 2026, "mes_fim": 12}, headers=headers)
+    assert r.status_code == 200, r.text
+    etag, corpo = _get(etag)
+    assert corpo["jogadores"][0]["categoria"] == "Junior"
+
+    jogador.data_nascimento = date(1990, 5, 1)
+    session.commit()
+    etag, corpo = _get(etag)
+    assert corpo["jogadores"][0]["categoria"] == "Master"
+
+    assert client.put("/api/lojas/", json={"telefone": "85 99999-0000"}, headers=headers).status_code == 200
+    etag, corpo = _get(etag)
+    assert corpo["loja"]["telefone"] == "85 99999-0000"
+    assert session.get(Torneio, torneio_id).versao == versao_torneio
+
+
+def test_cache_do_torneio_finalizado_nao_serve_categoria_antiga(
+        client: TestClient, session: Session, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "TORNEIO_CACHE_DIRETORIO", str(tmp_path))
+    _, token = _criar_loja_autenticada(client, "Loja Cache Categoria", "loja.cache.categoria@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+    participantes = _adicionar_participantes(session, torneio_id, regra["id"], ["Cache Cat A", "Cache Cat B"])
+    for participante in participantes:
+        session.get(Jogador, participante["jogador_id"]).data_nascimento = date(2015, 5, 1)
+    session.commit()
+    url = f"/api/lojas/torneios/{torneio_id}"
+    client.put(f"{url}/iniciar", headers=headers)
+    client.post(f"{url}/rodada", headers=headers)
+    client.put(f"{url}/finalizar", headers=headers)
+
+    antes = client.get(url, headers=headers).json()
+    assert {j["categoria"] for j in antes["jogadores"]} == {None}
+    assert len(list(tmp_path.iterdir())) == 1
+
+    r = client.post("/api/lojas/temporadas/", json={"tcg": "POKEMON", "ano_inicio": 2026, "mes_inicio": 1,
+                                                    "ano_fim": 2026, "mes_fim": 12}, headers=headers)
+    assert r.status_code == 200, r.text
+    depois = client.get(url, headers=headers)
+    assert {j["categoria"] for j in depois.json()["jogadores"]} == {"Junior"}
+    # Nem da memória, nem do disco (outro worker, reinício): o arquivo
+    # antigo sai quando o da versão nova é gravado.
+    limpar_cache_torneio()
+    assert client.get(url, headers=headers).content == depois.content
+    assert [arquivo.read_bytes() for arquivo in tmp_path.iterdir()] == [depois.content]
+
+
+def test_get_torneio_serve_json_em_cache_por_versao_e_grava_finalizado_no_disco(
+        client: TestClient, session: Session, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "TORNEIO_CACHE_DIRETORIO", str(tmp_path))
+    _, token = _criar_loja_autenticada(client, "Loja Cache Torneio", "loja.cache.torneio@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio_id = _criar_torneio(client, headers, regra["id"])["id"]
+    _adicionar_participantes(session, torneio_id, regra["id"], ["Cache A", "Cache B", "Cache C"])
+    url = f"/api/lojas/torneios/{torneio_id}"
+
+    def _get(caminho: str = url) -> tuple[bytes, list[str]]:
+        session.expire_all()
+        with _contar_consultas(session) as consultas:
+            r = client.get(caminho, headers=headers)
+        assert r.status_code == 200, r.text
+        return r.content, consultas
+
+    def _carregou_o_torneio_inteiro(consultas: list[str]) -> bool:
+        return any("FROM jogadortorneiolink" in consulta for consulta in consultas)
+
+    primeiro, consultas = _get()
+    assert _carregou_o_torneio_inteiro(consultas)
+    segundo, consultas = _get()
+    assert segundo == primeiro and not _carregou_o_torneio_inteiro(consultas)
+    # Recorte é outra entrada — e não é servido com o corpo do completo.
+    recortado, _ = _get(f"{url}?fields=id,nome")
+    assert json.loads(recortado) == {"id": torneio_id, "nome": json.loads(primeiro)["nome"]}
+
+    # O mesmo JSON que a rota montaria sem cache nenhum.
+    monkeypatch.setattr(cache_torneio_completo, "capacidade", 0)
+    sem_cache, _ = _get()
+    assert json.loads(sem_cache) == json.loads(primeiro)
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "TORNEIO_CACHE_DIRETORIO", str(tmp_path))
+
+    # Torneio em andamento não vai pro disco; finalizado vai, e é lido de
+    # lá quando a memória não tem (outro worker, reinício).
+    client.put(f"{url}/iniciar", headers=headers)
+    client.post(f"{url}/rodada", headers=headers)
+    assert list(tmp_path.iterdir()) == []
+    client.put(f"{url}/finalizar", headers=headers)
+    finalizado, _ = _get()
+    assert json.loads(finalizado)["status"] == "FINALIZADO"
+    assert [arquivo.read_bytes() for arquivo in tmp_path.iterdir()] == [finalizado]
+
+    limpar_cache_torneio()
+    do_disco, consultas = _get()
+    assert do_disco == finalizado and not _carregou_o_torneio_inteiro(consultas)
+
+    # Corrigir um resultado depois de finalizado troca a versão: o JSON é
+    # refeito e o arquivo da versão anterior sai.
+    rodada_id = json.loads(finalizado)["rodadas"][0]["id"]
+    r = client.patch(f"{url}/rodadas/{rodada_id}", json={"vencedor_id": None}, headers=headers)
+    assert r.status_code == 200, r.text
+    corrigido, consultas = _get()
+    assert corrigido != finalizado and _carregou_o_torneio_inteiro(consultas)
+    assert [arquivo.read_bytes() for arquivo in tmp_path.iterdir()] == [corrigido]
+
+    # Torneio apagado sai da memória e do disco.
+    assert client.delete(url, headers=headers).status_code == 204
+    assert list(tmp_path.iterdir()) == []
+    assert not any(chave[0] == torneio_id for chave in cache_torneio_completo._itens)
+
+
+def test_ao_vivo_cliente_lento_e_mandado_ressincronizar():
+    canal = CanalAoVivo(tamanho_fila=2)
+
+    async def _cenario():
+        inscricao = canal.inscrever("t")
+        for i in range(3):
+            canal.publicar("t", {"tipo": "status", "i": i})
+        canal.publicar("outro", {"tipo": "status"})
+        await asyncio.sleep(0)
+        mensagens = [inscricao.fila.get_nowait() for _ in range(inscricao.fila.qsize())]
+        canal.cancelar(inscricao)
+        return mensagens
+
+    assert asyncio.run(_cenario()) == [RESSINCRONIZAR]
+    assert canal.inscritos("t") == 0
+
+def test_listagem_de_torneios_vem_resumida_com_contagens(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Resumo", "loja.resumo@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio = _criar_torneio(client, headers, regra["id"])
+    loja_id = session.get(Torneio, torneio["id"]).loja_id
+    ana, beto, caio = _adicionar_participantes(session, torneio["id"], regra["id"], ["Ana Resumo", "Beto Resumo", "Caio Resumo"])
+    _criar_rodada_direta(session, torneio["id"], loja_id, 1, ana["link_id"], beto["link_id"], ana["link_id"])
+    _criar_rodada_direta(session, torneio["id"], loja_id, 1, caio["link_id"], None, caio["link_id"])
+    _criar_rodada_direta(session, torneio["id"], loja_id, 2, ana["link_id"], caio["link_id"], None)
+
+    r = client.get("/api/lojas/torneios/loja", headers=headers)
+    assert r.status_code == 200, r.text
+    [resumo] = r.json()
+    assert (resumo["id"], resumo["total_jogadores"], resumo["total_rodadas"]) == (torneio["id"], 3, 2)
+    assert resumo["loja"]["nome"] == "Loja Resumo"
+    assert resumo["data_efetiva"] == "2026-08-01"
+    assert "jogadores" not in resumo and "rodadas" not in resumo
+
+
+def test_listagem_de_torneios_paginada_por_cursor_e_filtrada(client: TestClient):
+    _, token = _criar_loja_autenticada(client, "Loja Paginas", "loja.paginas@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    for dia in (1, 1, 1, 5, 9, 9, 20):
+        _criar_torneio(client, headers, regra["id"], data_planejada=f"2026-08-{dia:02d}")
+    finalizado = _criar_torneio(client, headers, regra["id"], data_planejada="2026-08-09")
+    r = client.put(
+        f"/api/lojas/torneios/{finalizado['id']}",
+        json={"inicio_real": "2026-08-09T10:00:00", "fim_real": "2026-08-09T15:00:00"},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    assert client.put(f"/api/lojas/torneios/{finalizado['id']}/finalizar", headers=headers).status_code == 200
+
+    completa = client.get("/api/lojas/torneios/loja", headers=headers).json()
+    assert len(completa) == 8
+    chaves = [(t["data_efetiva"], t["id"]) for t in completa]
+    assert chaves == sorted(chaves, reverse=True)
+
+    paginas, params = [], {"limite": 3}
+    while True:
+        pagina = client.get("/api/lojas/torneios/loja", params=params, headers=headers).json()
+        if not pagina:
+            break
+        paginas.extend(pagina)
+        params = {"limite": 3, "apos_data": pagina[-1]["data_efetiva"], "apos_id": pagina[-1]["id"]}
+    assert paginas == completa
+
+    r = client.get("/api/lojas/torneios/loja", headers=headers,
+                   params={"data_inicio": "2026-08-05", "data_fim": "2026-08-09"})
+    assert [t["data_efetiva"] for t in r.json()] == ["2026-08-09"] * 3 + ["2026-08-05"]
+    r = client.get("/api/lojas/torneios/loja", params={"status": "FINALIZADO"}, headers=headers)
+    assert [t["id"] for t in r.json()] == [finalizado["id"]]
+
+
+def test_listagem_de_torneios_recusa_cursor_incompleto_ou_sem_limite(client: TestClient):
+    r = client.get("/api/lojas/torneios/", params={"limite": 5, "apos_data": "2026-08-01"})
+    assert r.status_code == 400
+    r = client.get("/api/lojas/torneios/", params={"apos_data": "2026-08-01", "apos_id": "x"})
+    assert r.status_code == 400
+
+
+def test_listagem_de_torneios_nao_cresce_em_consultas_com_o_numero_de_torneios(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Listagem Consultas", "loja.listagemconsultas@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+
+    def _consultas_com(torneios: int) -> int:
+        for _ in range(torneios):
+            torneio = _criar_torneio(client, headers, regra["id"])
+            total = len(session.get(Torneio, torneio["id"]).jogadores)
+            _adicionar_participantes(session, torneio["id"], regra["id"],
+                                     [f"Listagem {torneio['id'][:8]} {i}" for i in range(total, total + 2)])
+        with _contar_consultas(session) as consultas:
+            r = client.get("/api/lojas/torneios/loja", headers=headers)
+        assert r.status_code == 200, r.text
+        return len(consultas)
+
+    assert _consultas_com(2) == _consultas_com(15)
+
+
+def test_get_torneio_com_fields_e_include_nem_carrega_o_que_nao_foi_pedido(client: TestClient, session: Session):
+    _, token = _criar_loja_autenticada(client, "Loja Recorte", "loja.recorte@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio = _criar_torneio(client, headers, regra["id"], nome="Torneio Recorte")
+    loja_id = session.get(Torneio, torneio["id"]).loja_id
+    ana, beto = _adicionar_participantes(session, torneio["id"], regra["id"], ["Ana Recorte", "Beto Recorte"])
+    _criar_rodada_direta(session, torneio["id"], loja_id, 1, ana["link_id"], beto["link_id"], ana["link_id"])
+
+    with _contar_consultas(session) as consultas:
+        r = client.get(f"/api/lojas/torneios/{torneio['id']}", params={"fields": "id,nome", "include": "loja"},
+                       headers=headers)
+    assert r.status_code == 200, r.text
+    assert set(r.json()) == {"id", "nome", "loja"}
+    assert r.json()["nome"] == "Torneio Recorte"
+    assert r.json()["loja"]["nome"] == "Loja Recorte"
+    # Só a soma das versões dos participantes (ETag), sem carregar as participações.
+    assert not any("FROM jogadortorneiolink" in c or "FROM rodada" in c for c in consultas)
+
+    r = client.get(f"/api/lojas/torneios/{torneio['id']}", params={"fields": "id,jogadores.apelido"}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == {"id": torneio["id"], "jogadores": [{"apelido": "Ana Recorte"}, {"apelido": "Beto Recorte"}]}
+
+    r = client.get(f"/api/lojas/torneios/{torneio['id']}",
+                   params={"fields": "id", "include": "jogadores.posicao_ranking"}, headers=headers)
+    assert r.status_code == 200, r.text
+    posicoes = {j["id"]: j["posicao_ranking"] for j in r.json()["jogadores"]}
+    assert posicoes == {ana["link_id"]: 1, beto["link_id"]: 2}
+    assert "categoria" not in r.json()["jogadores"][0]
+
+    # Sem recorte, o payload completo de sempre.
+    r = client.get(f"/api/lojas/torneios/{torneio['id']}", headers=headers)
+    assert {"jogadores", "rodadas", "loja", "status"} <= set(r.json())
+    assert len(r.json()["rodadas"]) == 1
+
+
+def test_get_torneio_recusa_campo_ou_relacao_desconhecidos(client: TestClient):
+    _, token = _criar_loja_autenticada(client, "Loja Recorte Invalido", "loja.recorteinvalido@gmail.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    regra = _criar_regra(client, headers)
+    torneio = _criar_torneio(client, headers, regra["id"])
+
+    r = client.get(f"/api/lojas/torneios/{torneio['id']}", params={"fields": "id,senha"}, headers=headers)
+    assert r.status_code == 400
+    r = client.get(f"/api/lojas/torneios/{torneio['id']}", params={"include": "jogadores.usuario"}, headers=headers)
+    assert r.status_code == 400
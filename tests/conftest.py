@@ -9,6 +9,8 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.core.db import get_session
 from app.core.config import settings
+from app.services.RankingCacheService import cache_ranking_geral
+from app.services.TorneioCacheService import limpar_cache_torneio
 
 
 @pytest.fixture(autouse=True)
@@ -16,6 +18,24 @@ def _root_domain_padrao_de_teste(monkeypatch):
     monkeypatch.setattr(settings, "ROOT_DOMAIN", "brickei.com.br")
 
 
+@pytest.fixture(autouse=True)
+def _cache_do_ranking_zerado():
+    """Cada teste tem um banco novo, mas o cache do ranking é do processo —
+    sem zerar, um teste leria o ranking guardado pelo anterior (e os
+    contadores viriam somados)."""
+    cache_ranking_geral.invalidar()
+    cache_ranking_geral.acertos = cache_ranking_geral.faltas = 0
+    cache_ranking_geral.despejos = cache_ranking_geral.invalidacoes = 0
+
+
+@pytest.fixture(autouse=True)
+def _cache_de_torneio_zerado():
+    """Mesma coisa pro JSON de torneio em cache: torneios importados têm o
+    id do arquivo, então dois testes importando o mesmo .tdf teriam a mesma
+    chave (id, versão) em bancos diferentes."""
+    limpar_cache_torneio()
+
+
 @pytest.fixture(name="session")
 def session_fixture():
     engine = create_engine(
@@ -0,0 +1,27 @@
+"""Testes de app.utils.CacheLRU com limite por peso (bytes) em vez de
+contagem de itens."""
+from app.utils.CacheLRU import CacheLRU
+
+
+def test_limite_por_peso_despeja_os_menos_usados_ate_caber():
+    cache = CacheLRU(10, peso=len)
+    cache.guardar("a", b"aaaa", cache.geracao)
+    cache.guardar("b", b"bbbb", cache.geracao)
+    cache.obter("a")
+    cache.guardar("c", b"cccc", cache.geracao)
+
+    assert cache.obter("b") == (False, None)
+    assert cache.obter("a") == (True, b"aaaa")
+    assert cache.estatisticas()["ocupacao"] == 8
+
+
+def test_item_maior_que_a_capacidade_nem_entra_e_substituir_recalcula_o_peso():
+    cache = CacheLRU(10, peso=len)
+    cache.guardar("grande", b"x" * 11, cache.geracao)
+    cache.guardar("a", b"aaaa", cache.geracao)
+    cache.guardar("a", b"aa", cache.geracao)
+
+    assert cache.obter("grande") == (False, None)
+    assert cache.estatisticas()["ocupacao"] == 2
+    cache.invalidar()
+    assert cache.estatisticas()["ocupacao"] == 0
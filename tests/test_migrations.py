@@ -119,3 +119,35 @@ def test_migration_backfill_slug_resolve_colisao_de_nomes_duplicados(monkeypatch
     assert slugs == ["loja-repetida", "loja-repetida-2", "loja-repetida-3"]
 
     command.check(cfg)
+
+
+def test_migration_preenche_data_efetiva_dos_torneios_existentes(monkeypatch, tmp_path):
+    import sqlalchemy as sa
+    from app.core.config import settings
+
+    scratch_db = tmp_path / "migrations_data_efetiva.db"
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{scratch_db}")
+
+    cfg = Config(str(ALEMBIC_INI))
+    command.upgrade(cfg, "5b7e0c2a9d41")  # head anterior à data_efetiva
+
+    engine = sa.create_engine(f"sqlite:///{scratch_db}")
+    with engine.begin() as conn:
+        for id_, status, planejada, inicio_real in (
+            ("planejado", "ABERTO", "2026-03-30", None),
+            ("jogado-depois", "FINALIZADO", "2026-03-30", "2026-04-02 14:00:00.000000"),
+            ("finalizado-sem-inicio", "FINALIZADO", "2026-05-10", None),
+        ):
+            conn.execute(sa.text(
+                "INSERT INTO torneio (id, data_planejada, inicio_real, status, tempo_por_rodada, vagas, melhor_de, "
+                "jogo, tipo, taxa, n_rodadas, rodada_atual, pontuacao_de_participacao, conta_em_eventos) "
+                "VALUES (:id, :planejada, :inicio_real, :status, 30, 0, 'MD1', 'POKEMON', 'IMPORTADO', 0, 0, 0, 0, 1)"
+            ), {"id": id_, "planejada": planejada, "inicio_real": inicio_real, "status": status})
+
+    command.upgrade(cfg, "head")
+
+    with engine.begin() as conn:
+        linhas = dict(conn.execute(sa.text("SELECT id, ano_mes_efetivo FROM torneio")).fetchall())
+    assert linhas == {"planejado": 202603, "jogado-depois": 202604, "finalizado-sem-inicio": 202605}
+
+    command.check(cfg)
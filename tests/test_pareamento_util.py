@@ -0,0 +1,55 @@
+"""Testes de app.utils.PareamentoUtil — o motor de pareamento suíço em
+memória usado por RodadaService.nova_rodada."""
+from app.utils.PareamentoUtil import confrontos_de, parear_suico
+
+
+def _par(a: int, b: int) -> frozenset[int]:
+    return frozenset((a, b))
+
+
+def test_pareia_vizinhos_de_classificacao_sem_historico():
+    resultado = parear_suico([1, 2, 3, 4, 5, 6], set())
+
+    assert resultado.mesas == [(1, 2), (3, 4), (5, 6)]
+    assert resultado.bye is None
+    assert resultado.revanches == 0
+    assert resultado.completo
+
+
+def test_volta_atras_quando_o_guloso_deixaria_uma_revanche():
+    # O guloso faria 1x2 e sobraria 3x4, que já se enfrentaram; a busca
+    # reorganiza pra que ninguém repita adversário.
+    resultado = parear_suico([1, 2, 3, 4], {_par(3, 4), _par(1, 3)})
+
+    assert resultado.mesas == [(1, 4), (2, 3)]
+    assert resultado.revanches == 0
+
+
+def test_bye_vai_pro_pior_colocado_que_ainda_nao_teve_bye():
+    resultado = parear_suico([1, 2, 3, 4, 5], set(), com_bye={5})
+
+    assert resultado.bye == 4
+    assert resultado.mesas == [(1, 2), (3, 5)]
+
+
+def test_sem_pareamento_possivel_sem_revanche_cai_no_guloso():
+    # Dois jogadores que já se enfrentaram: não tem como evitar.
+    resultado = parear_suico([1, 2], {_par(1, 2)})
+
+    assert resultado.mesas == [(1, 2)]
+    assert resultado.revanches == 1
+    assert resultado.completo
+
+
+def test_orcamento_esgotado_devolve_o_guloso():
+    resultado = parear_suico(list(range(1, 41)), set(), orcamento_segundos=-1)
+
+    assert not resultado.completo
+    assert len(resultado.mesas) == 20
+
+
+def test_confrontos_de_separa_confrontos_e_byes():
+    confrontos, com_bye = confrontos_de([(1, 2), (3, None), (2, 1)])
+
+    assert confrontos == {_par(1, 2)}
+    assert com_bye == {3}
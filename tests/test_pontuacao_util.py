@@ -0,0 +1,58 @@
+"""Testes de app.utils.PontuacaoUtil — o motor de pontuação e desempate
+suíço em memória usado por TorneioService."""
+from app.utils.PontuacaoUtil import DERROTA, EMPATE, VITORIA, MotorTorneio, ordem_oficial, pontos_do_lado
+
+BASICA = (3, 0, 1, 2, -1, 0)
+EXTRA = (10, -5, 2, 7, 100, 1)
+
+
+def test_pontos_do_lado_soma_extra_proprio_e_bonus_do_extra_do_oponente():
+    assert pontos_do_lado(VITORIA, BASICA, EXTRA, None, True) == (5, 13)
+    assert pontos_do_lado(DERROTA, BASICA, None, EXTRA, True) == (-1, 100)
+    assert pontos_do_lado(EMPATE, BASICA, EXTRA, EXTRA, True) == (1, 4)
+
+
+def test_bye_nao_recebe_bonus_de_oponente():
+    assert pontos_do_lado(VITORIA, BASICA, None, None, False) == (3, 3)
+
+
+def test_pontuar_soma_so_mesas_finalizadas_sobre_a_base():
+    motor = MotorTorneio([1, 2, 3])
+    motor.registrar_rodada(1, 1, 2, 1, True)
+    motor.registrar_rodada(1, 3, None, 3, True)
+    motor.registrar_rodada(2, 1, 3, None, False)
+
+    motor.pontuar([0, 0, 0], [10, 10, 10], BASICA, [EXTRA, None, None])
+
+    assert motor.pontuacao == [5, -1, 3]
+    assert motor.pontuacao_com_regras == [10 + 13, 10 + 100, 10 + 3]
+
+
+def test_desempates_com_piso_teto_e_desistencia():
+    motor = MotorTorneio([1, 2, 3, 4])
+    motor.registrar_rodada(1, 1, 2, 1, True)
+    motor.registrar_rodada(1, 3, 4, 3, True)
+    motor.registrar_rodada(2, 1, 3, 1, True)
+    motor.registrar_rodada(2, 2, None, 2, True)
+
+    motor.calcular_desempates()
+
+    assert (motor.vitorias, motor.derrotas, motor.byes) == ([2, 0, 1, 0], [0, 1, 1, 1], [0, 1, 0, 0])
+    # 2: perdeu a única partida (piso de 25%); 3: 50%; 4 desistiu depois
+    # da rodada 1 — fica no piso, e o teto de 75% não chega a pesar.
+    assert motor.omw[0] == round((0.25 + 0.5) / 2 * 100, 2)
+    assert motor.omw[3] == 50.0
+    assert motor.oomw[3] == motor.omw[2]
+
+
+def test_ordem_oficial_usa_confronto_direto_entre_dois_empatados():
+    chaves = {1: (6, 50, 50), 2: (3, 40, 40), 3: (3, 40, 40)}
+
+    assert ordem_oficial(chaves, {frozenset((2, 3)): 3}, "t") == [1, 3, 2]
+    assert ordem_oficial(chaves, {frozenset((2, 3)): 2}, "t") == [1, 2, 3]
+
+
+def test_ordem_oficial_sorteio_e_deterministico_por_torneio():
+    chaves = {link_id: (0, 0, 0) for link_id in range(1, 6)}
+
+    assert ordem_oficial(chaves, {}, "t") == ordem_oficial(chaves, {}, "t")